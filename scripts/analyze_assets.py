@@ -3,8 +3,6 @@
 # 该脚本扫描素材目录并生成规范命名方案
 # 导入 argparse 解析命令行参数
 import argparse
-# 导入 json 生成输出文件
-import json
 # 导入 unicodedata 用于半角化字符
 import unicodedata
 # 导入 re 处理正则匹配
@@ -24,10 +22,17 @@ if str(SCRIPT_ROOT.parent) not in sys.path:
 from scripts.utils_png_probe import probe_png_size
 # 导入本地音频探测工具
 from scripts.utils_audio_probe import probe_audio_container
+# 导入文件状态缓存工具
+from scripts.utils_file_state import file_state, load_state_cache, rules_fingerprint, save_state_cache
+# 导入流式 JSON 写出工具
+from scripts.utils_json_stream import JSON_FORMATS, stream_path, write_json_stream
 
 # 定义计划版本常量
 PLAN_VERSION = 1
 
+# 定义分类缓存默认路径
+DEFAULT_CACHE_PATH = Path("assets/.cache/analyze_assets.json")
+
 # 定义路径映射模板
 DEFAULT_IMAGE_DIR = Path("assets/build/images")
 DEFAULT_AUDIO_DIR = Path("assets/build/audio")
@@ -248,9 +253,53 @@ def iterate_files(sources: Iterable[Path]) -> Iterable[Path]:
 # 定义仓库根目录
 REPO_ROOT = SCRIPT_ROOT.parent
 
+# 定义计算分类规则指纹的函数
+def classifier_fingerprint() -> str:
+    """分类规则与探测代码任一变化都会使缓存整体失效"""
+    # 计划版本与三个脚本内容共同组成指纹
+    return rules_fingerprint([
+        PLAN_VERSION,
+        Path(__file__).resolve(),
+        SCRIPT_ROOT / "utils_png_probe.py",
+        SCRIPT_ROOT / "utils_audio_probe.py",
+    ])
+
+# 定义带缓存的分类函数
+def classify_cached(
+    abs_path: Path,
+    rel_path: Path,
+    cache: Optional[Dict[str, Dict]],
+    seen: Dict[str, Dict],
+) -> Tuple[str, Path, List[str], List[str], bool]:
+    """文件状态未变时复用缓存结果，返回值末位表示是否重新分类"""
+    # 以相对路径作为缓存键
+    key = str(rel_path)
+    # 读取当前文件状态
+    state = file_state(abs_path)
+    # 命中缓存则直接复用
+    cached = cache.get(key) if cache is not None else None
+    if cached is not None and state is not None and cached.get("state") == state:
+        category, target, reasons, tags = cached["result"]
+        seen[key] = cached
+        return category, Path(target), list(reasons), list(tags), False
+    # 未命中则重新分类
+    category, target, reasons, tags = classify_file(abs_path, rel_path)
+    # 记录新的缓存条目
+    seen[key] = {"state": state, "result": [category, str(target), reasons, tags]}
+    return category, target, reasons, tags, True
+
 # 定义生成计划的主逻辑
-def build_plan(sources: List[Path]) -> Tuple[List[Dict], List[Dict]]:
-    """生成改名计划与冲突列表"""
+def build_plan(
+    sources: List[Path],
+    cache: Optional[Dict[str, Dict]] = None,
+    stats: Optional[Dict[str, int]] = None,
+) -> Tuple[List[Dict], List[Dict]]:
+    """生成改名计划与冲突列表，传入 cache 时仅重新分类新增或变更的文件"""
+    # 记录本次扫描到的缓存条目
+    seen: Dict[str, Dict] = {}
+    # 统计复用与重新分类数量
+    reused = 0
+    reclassified = 0
     # 存储计划项目
     plan_items: List[Dict] = []
     # 存储冲突信息
@@ -258,18 +307,27 @@ def build_plan(sources: List[Path]) -> Tuple[List[Dict], List[Dict]]:
     # 记录目标去重
     target_map: Dict[Path, Path] = {}
     # 遍历所有文件
+    # 缓存已解析的目录，避免逐文件 realpath
+    resolved_dirs: Dict[Path, Path] = {}
     for file_path in iterate_files(sources):
         # 计算相对路径（相对于仓库根目录）
-        # 获取文件绝对路径
-        abs_path = file_path.resolve()
+        # 获取文件绝对路径（仅解析所在目录一次）
+        parent = file_path.parent
+        if parent not in resolved_dirs:
+            resolved_dirs[parent] = parent.resolve()
+        abs_path = resolved_dirs[parent] / file_path.name
         try:
             # 转换为相对于仓库根目录的相对路径
             rel_path = abs_path.relative_to(REPO_ROOT)
         except ValueError:
             # 若无法转换则退化为文件名
             rel_path = Path(abs_path.name)
-        # 分类与命名
-        category, target, reasons, tags = classify_file(abs_path, rel_path)
+        # 分类与命名（文件状态未变时复用缓存）
+        category, target, reasons, tags, fresh = classify_cached(abs_path, rel_path, cache, seen)
+        if fresh:
+            reclassified += 1
+        else:
+            reused += 1
         # 构建计划项
         if category == "unknown":
             conflicts.append({
@@ -296,7 +354,7 @@ def build_plan(sources: List[Path]) -> Tuple[List[Dict], List[Dict]]:
         # 记录目标映射
         target_map[target] = file_path
         # 检查目标是否已存在不同文件
-        if target.exists() and target.resolve() != file_path.resolve():
+        if target.exists() and target.resolve() != abs_path:
             conflicts.append({
                 "src": str(rel_path),
                 "issue": "target-exists",
@@ -311,16 +369,26 @@ def build_plan(sources: List[Path]) -> Tuple[List[Dict], List[Dict]]:
             "tags_append": tags,
             "notes": ["不会修改文件内容，仅改名/移动"],
         })
+    # 用本次扫描结果替换缓存，已删除的文件随之淘汰
+    if cache is not None:
+        cache.clear()
+        cache.update(seen)
+    # 输出统计信息
+    if stats is not None:
+        stats["reused"] = reused
+        stats["reclassified"] = reclassified
     # 返回计划与冲突
     return plan_items, conflicts
 
 # 定义写入 JSON 的函数
-def write_json(path: Path, payload: Dict) -> None:
-    """写入 JSON 文件"""
-    # 确保父目录存在
-    path.parent.mkdir(parents=True, exist_ok=True)
-    # 写入文件并保持中文
-    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+def write_json(path: Path, payload: Dict, json_format: str = "pretty") -> Path:
+    """逐条目写入 JSON 文件，返回实际路径（jsonl 格式改用 .jsonl 后缀）"""
+    # 按格式换算输出路径
+    path = stream_path(path, json_format)
+    # 流式写出并保持中文，内容未变化时跳过写入以保持文件时间戳稳定
+    write_json_stream(path, payload, json_format)
+    # 返回实际路径
+    return path
 
 # 定义主函数
 def main(argv: Optional[List[str]] = None) -> int:
@@ -333,19 +401,33 @@ def main(argv: Optional[List[str]] = None) -> int:
     parser.add_argument("--out-plan", type=Path, required=True, help="改名计划输出路径")
     # 添加冲突输出路径
     parser.add_argument("--out-conflicts", type=Path, required=True, help="冲突列表输出路径")
+    # 添加缓存路径
+    parser.add_argument("--cache", type=Path, default=DEFAULT_CACHE_PATH, help="分类缓存路径")
+    # 添加禁用缓存开关
+    parser.add_argument("--no-cache", action="store_true", help="忽略缓存并全量重新分类")
+    # 添加输出格式参数
+    parser.add_argument("--json-format", choices=JSON_FORMATS, default="pretty", help="输出格式：pretty（默认）、compact 或 jsonl（后缀改为 .jsonl）")
     # 解析参数
     args = parser.parse_args(argv)
+    # 计算规则指纹并读取缓存
+    fingerprint = classifier_fingerprint()
+    cache = {} if args.no_cache else load_state_cache(args.cache, fingerprint)
     # 生成计划
-    plan_items, conflicts = build_plan(list(args.sources))
+    stats: Dict[str, int] = {}
+    plan_items, conflicts = build_plan(list(args.sources), cache, stats)
+    # 保存更新后的缓存
+    save_state_cache(args.cache, fingerprint, cache)
     # 构造计划对象
     plan_payload = {
         "plan_version": PLAN_VERSION,
         "items": plan_items,
     }
     # 写入计划文件
-    write_json(args.out_plan, plan_payload)
+    write_json(args.out_plan, plan_payload, args.json_format)
     # 写入冲突文件
-    write_json(args.out_conflicts, {"items": conflicts})
+    write_json(args.out_conflicts, {"items": conflicts}, args.json_format)
+    # 打印缓存统计
+    print(f"cache: reused={stats['reused']}, reclassified={stats['reclassified']}")
     # 打印完成信息
     print("✅ analyze complete (text-only)")
     # 返回成功状态
@@ -3,8 +3,6 @@
 # 该脚本根据改名计划执行文件移动并同步索引
 # 导入 argparse 解析命令行参数
 import argparse
-# 导入 json 读取与写入文本
-import json
 # 导入 sys 控制退出状态
 import sys
 # 导入 datetime 记录执行时间并使用 UTC 时区
@@ -18,6 +16,11 @@ from typing import Dict, List, Optional, Tuple
 SCRIPT_ROOT = Path(__file__).resolve().parent
 # 定义仓库根目录
 REPO_ROOT = SCRIPT_ROOT.parent
+# 确保仓库根目录在模块搜索路径中
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+# 导入流式 JSON 读写工具
+from scripts.utils_json_stream import read_json_stream, write_json_stream
 # 定义索引文件路径列表
 INDEX_FILES = [
     REPO_ROOT / "assets/build/index.json",
@@ -32,20 +35,18 @@ METADATA_FILES = [
 
 # 定义读取 JSON 的辅助函数
 def load_json(path: Path) -> Optional[Dict]:
-    """读取 JSON 文件"""
+    """读取 JSON 文件，.jsonl 计划按行还原"""
     # 如果文件不存在则返回 None
     if not path.exists():
         return None
     # 返回解析后的对象
-    return json.loads(path.read_text(encoding="utf-8"))
+    return read_json_stream(path)
 
 # 定义写入 JSON 的辅助函数
 def dump_json(path: Path, data: Dict) -> None:
-    """写入 JSON 文件"""
-    # 确保父目录存在
-    path.parent.mkdir(parents=True, exist_ok=True)
-    # 写入带缩进的中文 JSON
-    path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    """逐条目写入带缩进的中文 JSON，内容未变化时不改写"""
+    # 流式写出，自动创建父目录
+    write_json_stream(path, data)
 
 # 定义相对路径转换函数
 def to_repo_path(path_str: str) -> Path:
@@ -296,7 +297,7 @@ def main(argv: Optional[List[str]] = None) -> int:
     # 构造参数解析器
     parser = argparse.ArgumentParser(description="Apply asset rename plan")
     # 添加计划参数
-    parser.add_argument("--plan", type=Path, help="改名计划 JSON")
+    parser.add_argument("--plan", type=Path, help="改名计划 JSON（也接受 analyze_assets --json-format jsonl 写出的 .jsonl）")
     # 添加执行开关
     parser.add_argument("--apply", action="store_true", help="执行改名而非干跑")
     # 添加回滚参数
@@ -0,0 +1,97 @@
+"""比较 HPA* 分层寻路与逐格 A* 在演示地图上的查询耗时与路径代价。"""  # 模块功能说明
+from __future__ import annotations  # 启用未来注解支持
+
+import argparse  # 导入命令行参数解析库
+import heapq  # 导入堆实现逐格 A*
+import sys  # 导入 sys 以调整模块搜索路径
+import time  # 导入 time 计时
+from pathlib import Path  # 导入路径处理库
+from typing import Dict, List, Optional, Tuple  # 导入类型提示工具
+
+import numpy as np  # 导入 NumPy 抽取查询点
+
+SCRIPT_ROOT = Path(__file__).resolve().parent  # 计算脚本目录
+if str(SCRIPT_ROOT.parent) not in sys.path:  # 确保仓库根目录在模块搜索路径中
+    sys.path.insert(0, str(SCRIPT_ROOT.parent))  # 插入仓库根目录
+
+from scripts.build_hpa_graph import DEFAULT_CLUSTER_SIZE, build_map_graph  # 导入建图函数
+from scripts.build_nav_sidecar import load_binding  # 导入绑定表读取函数
+from scripts.gen_demo_map import generate_map  # 导入地图生成函数
+
+DEFAULT_SIZES = (256, 512, 1024)  # 默认测试的地图边长
+
+
+def grid_astar(passable: np.ndarray, start: Tuple[int, int], goal: Tuple[int, int]) -> Optional[int]:  # 定义逐格 A* 函数
+    """四邻接、曼哈顿启发的逐格 A*，作为运行时的对照实现"""  # 函数说明
+    height, width = passable.shape  # 读取尺寸
+    open_cells = passable.reshape(-1).tolist()  # 转为列表加速逐格访问
+    target = goal[1] * width + goal[0]  # 目标下标
+    origin = start[1] * width + start[0]  # 起点下标
+    best: Dict[int, int] = {origin: 0}  # 已知最短代价
+    heap = [(abs(start[0] - goal[0]) + abs(start[1] - goal[1]), 0, origin)]  # (f, g, 下标)
+    while heap:  # 主循环
+        _f, g_score, index = heapq.heappop(heap)  # 取出最小 f
+        if index == target:  # 到达目标
+            return g_score  # 返回代价
+        if g_score > best[index]:  # 过期条目
+            continue  # 跳过
+        x, y = index % width, index // width  # 当前坐标
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):  # 四个邻居
+            if 0 <= nx < width and 0 <= ny < height and open_cells[ny * width + nx]:  # 可通行
+                neighbour = ny * width + nx  # 邻居下标
+                if g_score + 1 < best.get(neighbour, 1 << 30):  # 更优
+                    best[neighbour] = g_score + 1  # 更新代价
+                    heapq.heappush(heap, (g_score + 1 + abs(nx - goal[0]) + abs(ny - goal[1]), g_score + 1, neighbour))  # 入堆
+    return None  # 不可达
+
+
+def measure(size: int, seed: int, queries: int, cluster_size: int) -> Dict[str, float]:  # 定义单个尺寸的测量函数
+    """生成地图、建图，并在同一连通分量内随机抽取起终点比较两种查询"""  # 函数说明
+    map_json, _counts = generate_map(size, size, 32, seed)  # 生成地图
+    binding = load_binding()  # 读取绑定表
+    start_time = time.perf_counter()  # 开始计时
+    graph = build_map_graph(map_json, binding, cluster_size)  # 构建图
+    build_seconds = time.perf_counter() - start_time  # 建图耗时
+    labels = graph.labels  # 连通分量标签
+    largest = int(np.bincount(labels.reshape(-1))[1:].argmax()) + 1  # 最大分量
+    cells = np.argwhere(labels == largest)  # 最大分量内的格子
+    rng = np.random.default_rng(seed)  # 抽样随机流
+    pairs = [(tuple(cells[a][::-1].tolist()), tuple(cells[b][::-1].tolist())) for a, b in rng.integers(0, len(cells), size=(queries, 2))]  # 起终点对
+    hpa_seconds = flat_seconds = 0.0  # 累计耗时
+    ratios: List[float] = []  # 代价比值
+    for start, goal in pairs:  # 遍历查询
+        begin = time.perf_counter()  # 开始计时
+        result = graph.find_path(start, goal)  # HPA* 查询
+        hpa_seconds += time.perf_counter() - begin  # 累计耗时
+        begin = time.perf_counter()  # 开始计时
+        optimal = grid_astar(graph.passable, start, goal)  # 逐格 A*
+        flat_seconds += time.perf_counter() - begin  # 累计耗时
+        if result is not None and optimal:  # 两者均有路径
+            ratios.append(result[0] / optimal)  # 记录比值
+    return {  # 返回统计
+        "build_s": round(build_seconds, 2),  # 建图耗时
+        "nodes": int(graph.nodes.size),  # 节点数
+        "edges": int(graph.targets.size),  # 边数
+        "hpa_ms": round(hpa_seconds / queries * 1000, 2),  # 平均 HPA* 查询耗时
+        "flat_ms": round(flat_seconds / queries * 1000, 2),  # 平均逐格 A* 耗时
+        "ratio": round(float(np.mean(ratios)) if ratios else 1.0, 3),  # 平均代价比
+    }  # 统计结束
+
+
+def main() -> None:  # 定义脚本主入口
+    """输出 Markdown 表格，便于直接粘贴到 README"""  # 函数说明
+    parser = argparse.ArgumentParser(description="比较 HPA* 与逐格 A* 的查询耗时")  # 创建解析器
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="地图边长列表")  # 添加尺寸参数
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")  # 添加种子参数
+    parser.add_argument("--queries", type=int, default=50, help="每个尺寸的查询次数")  # 添加查询次数参数
+    parser.add_argument("--cluster-size", type=int, default=DEFAULT_CLUSTER_SIZE, help="簇边长（格）")  # 添加簇尺寸参数
+    args = parser.parse_args()  # 解析参数
+    print("| 尺寸 | 建图 | 节点/边 | HPA* 查询 | 逐格 A* | 代价比 |")  # 打印表头
+    print("| --- | ---: | ---: | ---: | ---: | ---: |")  # 打印分隔行
+    for size in args.sizes:  # 遍历尺寸
+        row = measure(size, args.seed, args.queries, args.cluster_size)  # 测量
+        print(f"| {size}×{size} | {row['build_s']} s | {row['nodes']:,}/{row['edges']:,} | {row['hpa_ms']} ms | {row['flat_ms']} ms | {row['ratio']} |")  # 打印结果行
+
+
+if __name__ == "__main__":  # 判断是否直接执行脚本
+    main()  # 调用主函数
@@ -0,0 +1,64 @@
+"""比较演示地图在不同图层编码下的文件体积与解析耗时。"""  # 模块功能说明
+from __future__ import annotations  # 启用未来注解支持
+
+import argparse  # 导入命令行参数解析库
+import json  # 导入 JSON 序列化库
+import sys  # 导入 sys 以调整模块搜索路径
+import time  # 导入 time 计时
+from pathlib import Path  # 导入路径处理库
+from typing import Dict, List, Tuple  # 导入类型提示工具
+
+SCRIPT_ROOT = Path(__file__).resolve().parent  # 计算脚本目录
+if str(SCRIPT_ROOT.parent) not in sys.path:  # 确保仓库根目录在模块搜索路径中
+    sys.path.insert(0, str(SCRIPT_ROOT.parent))  # 插入仓库根目录
+
+from scripts.gen_demo_map import generate_map  # 导入地图生成函数
+from scripts.utils_tiled_layers import encode_layer, iter_layer_regions, zstd_available  # 导入图层编解码工具
+
+DEFAULT_SIZES = (64, 256, 1024, 2048)  # 默认测试的地图边长
+
+
+def variants() -> List[Tuple[str, str, str]]:  # 定义编码组合函数
+    """返回 (标签, encoding, compression) 列表，zstd 仅在安装时加入"""  # 函数说明
+    items = [("csv", "csv", ""), ("base64", "base64", ""), ("base64+zlib", "base64", "zlib"), ("base64+gzip", "base64", "gzip")]  # 基础组合
+    if zstd_available():  # 安装了 zstandard
+        items.append(("base64+zstd", "base64", "zstd"))  # 加入 zstd
+    return items  # 返回组合
+
+
+def measure(size: int, seed: int, repeat: int) -> List[Dict[str, object]]:  # 定义单个尺寸的测量函数
+    """生成一次地图，对每种编码测量写出体积与“解析 JSON + 解码图层”的最短耗时"""  # 函数说明
+    base, _counts = generate_map(size, size, 32, seed)  # 生成地图
+    data = base["layers"][0]["data"]  # 保留原始数据
+    rows = []  # 记录结果
+    for label, encoding, compression in variants():  # 遍历编码组合
+        layer = dict(base["layers"][0], data=list(data))  # 复制图层
+        map_json = dict(base, layers=[encode_layer(layer, encoding, compression)])  # 构造编码后的地图
+        text = json.dumps(map_json, ensure_ascii=False, indent=2)  # 与生成脚本相同的写出格式
+        best = float("inf")  # 最短耗时
+        for _ in range(repeat):  # 重复测量
+            start = time.perf_counter()  # 开始计时
+            parsed = json.loads(text)  # 解析 JSON
+            for _region in iter_layer_regions(parsed["layers"][0]):  # 解码图层
+                pass  # 仅计时
+            best = min(best, time.perf_counter() - start)  # 更新最短耗时
+        rows.append({"size": size, "encoding": label, "bytes": len(text.encode("utf-8")), "parse_ms": round(best * 1000, 2)})  # 记录结果
+    return rows  # 返回结果
+
+
+def main() -> None:  # 定义脚本主入口
+    """输出 Markdown 表格，便于直接粘贴到 README"""  # 函数说明
+    parser = argparse.ArgumentParser(description="比较地图图层编码的体积与解析耗时")  # 创建解析器
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="地图边长列表")  # 添加尺寸参数
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")  # 添加种子参数
+    parser.add_argument("--repeat", type=int, default=3, help="每种编码重复测量次数")  # 添加重复次数参数
+    args = parser.parse_args()  # 解析参数
+    print("| 尺寸 | 编码 | 文件体积 | 解析+解码 |")  # 打印表头
+    print("| --- | --- | ---: | ---: |")  # 打印分隔行
+    for size in args.sizes:  # 遍历尺寸
+        for row in measure(size, args.seed, args.repeat):  # 遍历结果
+            print(f"| {size}×{size} | {row['encoding']} | {row['bytes'] / 1024:,.1f} KiB | {row['parse_ms']} ms |")  # 打印结果行
+
+
+if __name__ == "__main__":  # 判断是否直接执行脚本
+    main()  # 调用主函数
@@ -0,0 +1,82 @@
+"""在生成的大规模 tags.json 上端到端测量 synth_defaults：三遍合成与单遍合成、顺序写出与进程池写出。"""  # 模块功能说明
+from __future__ import annotations  # 启用未来注解支持
+
+import argparse  # 导入命令行参数解析库
+import json  # 导入 JSON 序列化库
+import random  # 导入 random 生成标签
+import sys  # 导入 sys 以调整模块搜索路径
+import tempfile  # 导入 tempfile 创建临时项目目录
+import time  # 导入 time 计时
+from pathlib import Path  # 导入路径处理库
+from typing import Dict, List  # 导入类型提示工具
+
+SCRIPT_ROOT = Path(__file__).resolve().parent  # 计算脚本目录
+if str(SCRIPT_ROOT.parent) not in sys.path:  # 确保仓库根目录在模块搜索路径中
+    sys.path.insert(0, str(SCRIPT_ROOT.parent))  # 插入仓库根目录
+
+from scripts.synth_defaults import (  # 导入被测函数
+    DEFAULT_RULES,
+    CompiledRules,
+    build_tag_sets,
+    run_synthesis,
+    synthesize_all,
+    synthesize_blueprints,
+    synthesize_quests,
+    synthesize_shops,
+)  # 导入结束
+
+MODIFIER_TAGS = ("cheap", "expensive", "discount", "inflation")  # 影响成本与价格的标签
+
+
+def generate_catalogue(base: Path, count: int, seed: int, rules: Dict) -> None:  # 定义测试目录生成函数
+    """在 base 下写出 count 个资产的 tags.json、descriptions.json 与规则文件"""  # 函数说明
+    rng = random.Random(seed)  # 固定随机流
+    rule_tags = sorted({tag for key in ("tags_to_blueprints", "tags_to_shop", "tags_to_quests") for tag in CompiledRules(rules.get(key, [])).vocabulary})  # 规则用到的标签（含 match_all / match_none / 嵌套表达式）
+    extra = list(MODIFIER_TAGS) + [f"style:{index}" for index in range(500)]  # 规则之外的标签
+    tags = {f"images:pack{index // 1000}/asset_{index}.png": rng.sample(rule_tags, rng.randint(1, min(6, len(rule_tags)))) + rng.sample(extra, rng.randint(0, 3)) for index in range(count)}  # 资产标签（多数资产会同时带有 match_all 要求的标签）
+    descriptions = {asset_id: f"素材 {index}" for index, asset_id in enumerate(tags) if index % 3}  # 三分之二的资产有描述
+    (base / "assets" / "metadata").mkdir(parents=True)  # 创建元数据目录
+    (base / "scripts").mkdir()  # 创建规则目录
+    (base / "assets" / "metadata" / "tags.json").write_text(json.dumps(tags, ensure_ascii=False), encoding="utf-8")  # 写出标签
+    (base / "assets" / "metadata" / "descriptions.json").write_text(json.dumps(descriptions, ensure_ascii=False), encoding="utf-8")  # 写出描述
+    (base / "scripts" / "rules_mapping.json").write_text(json.dumps(rules, ensure_ascii=False), encoding="utf-8")  # 写出规则
+
+
+def main() -> None:  # 定义脚本主入口
+    """输出 Markdown 表格，便于直接粘贴到 README"""  # 函数说明
+    parser = argparse.ArgumentParser(description="synth_defaults 端到端耗时基准")  # 创建解析器
+    parser.add_argument("--assets", type=int, default=100_000, help="生成的资产数量")  # 添加资产数量参数
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")  # 添加种子参数
+    parser.add_argument("--rules", type=Path, default=SCRIPT_ROOT / "rules_mapping.json", help="使用的规则文件")  # 添加规则参数
+    args = parser.parse_args()  # 解析参数
+    rules = json.loads(args.rules.read_text(encoding="utf-8")) if args.rules.exists() else DEFAULT_RULES  # 读取规则
+    with tempfile.TemporaryDirectory() as temp_dir:  # 临时项目目录
+        base = Path(temp_dir)  # 项目根目录
+        generate_catalogue(base, args.assets, args.seed, rules)  # 生成测试数据
+        tags = json.loads((base / "assets" / "metadata" / "tags.json").read_text(encoding="utf-8"))  # 读取标签
+        descriptions = json.loads((base / "assets" / "metadata" / "descriptions.json").read_text(encoding="utf-8"))  # 读取描述
+        rows: List[str] = []  # 表格行
+        start = time.perf_counter()  # 开始计时
+        tag_sets = build_tag_sets(tags)  # 构造标签集合
+        report: List[str] = []  # 报告行
+        separate = (synthesize_blueprints(tags, descriptions, rules, report, tag_sets), synthesize_shops(tags, rules, report, tag_sets), synthesize_quests(tags, descriptions, rules, report, tag_sets))  # 三遍合成
+        rows.append(f"| 合成：三遍 | {time.perf_counter() - start:.2f} s |")  # 记录耗时
+        start = time.perf_counter()  # 开始计时
+        fused = synthesize_all(tags, descriptions, rules, [], build_tag_sets(tags))  # 单遍合成
+        rows.append(f"| 合成：单遍 | {time.perf_counter() - start:.2f} s |")  # 记录耗时
+        if fused != separate:  # 两种方式结果必须一致
+            raise SystemExit("单遍合成结果与三遍合成不一致")  # 终止基准
+        for workers, json_format, label in ((1, "pretty", "顺序写出"), (None, "pretty", "进程池写出"), (1, "compact", "顺序紧凑写出"), (1, "jsonl", "顺序 JSONL 写出")):  # 各种写出方式
+            start = time.perf_counter()  # 开始计时
+            run_synthesis(base, workers, json_format=json_format)  # 端到端执行
+            rows.append(f"| 端到端（读取 + 单遍合成 + {label}） | {time.perf_counter() - start:.2f} s |")  # 记录耗时
+        sizes = sum(path.stat().st_size for path in (base / "assets" / "auto").glob("*.json"))  # 默认格式输出文件总大小
+    print(f"资产 {args.assets:,} 个，输出 {sizes / 1e6:.1f} MB")  # 打印规模
+    print("| 阶段 | 耗时 |")  # 打印表头
+    print("| --- | ---: |")  # 打印分隔行
+    for row in rows:  # 逐行打印
+        print(row)  # 打印结果行
+
+
+if __name__ == "__main__":  # 判断是否直接执行脚本
+    main()  # 调用主函数
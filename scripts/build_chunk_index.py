@@ -0,0 +1,114 @@
+"""为 Tiled 地图生成按块划分的空间摘要索引：gid 计数、非地面内容包围盒与内容哈希。"""  # 模块功能说明
+from __future__ import annotations  # 启用未来注解支持
+
+import argparse  # 导入命令行参数解析库
+import hashlib  # 导入 hashlib 计算块内容哈希
+import json  # 导入 JSON 序列化库
+import sys  # 导入 sys 以调整模块搜索路径
+from pathlib import Path  # 导入路径处理库
+from typing import Any, Dict, List, Optional  # 导入类型提示工具
+
+import numpy as np  # 导入 NumPy 进行向量化统计
+
+SCRIPT_ROOT = Path(__file__).resolve().parent  # 计算脚本目录
+if str(SCRIPT_ROOT.parent) not in sys.path:  # 确保仓库根目录在模块搜索路径中
+    sys.path.insert(0, str(SCRIPT_ROOT.parent))  # 插入仓库根目录
+
+from scripts.build_nav_sidecar import BINDING_PATH, default_maps, load_binding, terrain_gids  # 导入绑定表工具
+from scripts.utils_tiled_layers import iter_tile_layers, layer_grid  # 导入图层拼装工具
+
+INDEX_VERSION = 1  # 索引格式版本
+INDEX_SUFFIX = ".chunks.json"  # 索引文件后缀
+INDEX_CHUNK_SIZE = 32  # 默认索引块边长（格）
+CHUNKS_PLACEHOLDER = "__index_chunks__"  # 流式写出时的块数组占位符
+
+
+def chunk_summaries(grid: np.ndarray, origin_x: int, origin_y: int, chunk_size: int, ground_gid: int) -> List[Dict[str, Any]]:  # 定义块摘要计算函数
+    """把网格按 chunk_size 切块（不足部分以 0 补齐），行优先返回每块的计数、包围盒与哈希；全空的块不返回"""  # 函数说明
+    height, width = grid.shape  # 读取尺寸
+    rows, cols = -(-height // chunk_size), -(-width // chunk_size)  # 块行列数
+    padded = np.zeros((rows * chunk_size, cols * chunk_size), dtype="<u4")  # 补齐后的网格
+    padded[:height, :width] = grid  # 写入原始数据
+    blocks = np.ascontiguousarray(padded.reshape(rows, chunk_size, cols, chunk_size).swapaxes(1, 2)).reshape(rows * cols, chunk_size, chunk_size)  # (块数, C, C)
+    values, inverse = np.unique(blocks, return_inverse=True)  # 压缩 gid 取值以便分块计数
+    owners = np.repeat(np.arange(rows * cols), chunk_size * chunk_size)  # 每格所属块
+    counts = np.bincount(owners * values.size + inverse.reshape(-1), minlength=rows * cols * values.size).reshape(rows * cols, values.size)  # 每块每种 gid 的数量
+    content = (blocks != ground_gid) & (blocks != 0)  # 非地面内容
+    row_any, col_any = content.any(axis=2), content.any(axis=1)  # 每块的行/列是否含内容
+    has_content = row_any.any(axis=1)  # 块内是否有内容
+    top, left = row_any.argmax(axis=1), col_any.argmax(axis=1)  # 首个含内容的行/列
+    bottom = chunk_size - row_any[:, ::-1].argmax(axis=1)  # 末个含内容的行（开区间）
+    right = chunk_size - col_any[:, ::-1].argmax(axis=1)  # 末个含内容的列（开区间）
+    nonzero = values != 0  # 计数时排除空格子
+    summaries: List[Dict[str, Any]] = []  # 记录结果
+    for index in range(rows * cols):  # 逐块组装
+        cy, cx = divmod(index, cols)  # 块坐标
+        x0, y0 = origin_x + cx * chunk_size, origin_y + cy * chunk_size  # 块左上角地图坐标
+        present = nonzero & (counts[index] > 0)  # 出现过的 gid
+        if not present.any():  # 全为空格子（如补齐区域或无限地图的空白处）
+            continue  # 不写出
+        summaries.append({  # 写入摘要
+            "x": x0,  # 块左上角 X（格），宽高均为 chunkSize
+            "y": y0,  # 左上角 Y（格）
+            "counts": {str(gid): int(count) for gid, count in zip(values[present].tolist(), counts[index][present].tolist())},  # gid 计数
+            "bbox": [x0 + int(left[index]), y0 + int(top[index]), x0 + int(right[index]), y0 + int(bottom[index])] if has_content[index] else None,  # 非地面内容包围盒 [x0, y0, x1, y1)
+            "hash": hashlib.blake2b(blocks[index].tobytes(), digest_size=8).hexdigest(),  # 小端 uint32 内容哈希
+        })  # 摘要结束
+    return summaries  # 返回结果
+
+
+def index_header(chunk_size: int, ground_gid: int) -> Dict[str, Any]:  # 定义索引头部函数
+    """索引文件的公共字段"""  # 函数说明
+    return {"version": INDEX_VERSION, "chunkSize": chunk_size, "groundGid": ground_gid, "hash": "blake2b-64", "layers": []}  # 返回头部
+
+
+def build_chunk_index(map_json: Dict[str, Any], chunk_size: int = INDEX_CHUNK_SIZE, ground_gid: int = 1) -> Dict[str, Any]:  # 定义索引构建函数
+    """为地图的每个瓦片图层生成块摘要"""  # 函数说明
+    index = index_header(chunk_size, ground_gid)  # 初始化索引
+    for layer in iter_tile_layers(map_json):  # 遍历瓦片图层
+        grid, origin_x, origin_y = layer_grid(layer)  # 拼装网格
+        index["layers"].append({"id": layer.get("id"), "name": layer.get("name"), "chunks": chunk_summaries(grid, origin_x, origin_y, chunk_size, ground_gid)})  # 写入图层摘要
+    return index  # 返回索引
+
+
+def index_path(map_path: Path, output_dir: Optional[Path] = None) -> Path:  # 定义索引路径函数
+    """索引与地图同名，后缀为 .chunks.json"""  # 函数说明
+    return (output_dir or map_path.parent) / f"{map_path.stem}{INDEX_SUFFIX}"  # 返回路径
+
+
+def dump_index(index: Dict[str, Any]) -> str:  # 定义索引序列化函数
+    """每块摘要单独一行，便于增量比对与按行读取"""  # 函数说明
+    layers = [dict(layer, chunks=CHUNKS_PLACEHOLDER) for layer in index["layers"]]  # 用占位符代替块数组
+    text = json.dumps(dict(index, layers=layers), ensure_ascii=False, indent=2)  # 序列化外层结构
+    for layer in index["layers"]:  # 逐层替换占位符
+        body = ",".join("\n" + json.dumps(chunk, separators=(",", ":")) for chunk in layer["chunks"])  # 块数组内容
+        text = text.replace(json.dumps(CHUNKS_PLACEHOLDER), "[" + body + "\n" + " " * 6 + "]", 1)  # 替换一个占位符
+    return text + "\n"  # 返回文本
+
+
+def main() -> None:  # 定义脚本主入口
+    """为指定地图写出块索引"""  # 函数说明
+    parser = argparse.ArgumentParser(description="为 Tiled 地图生成按块的空间摘要索引")  # 创建解析器
+    parser.add_argument("maps", nargs="*", type=Path, help="地图 JSON 路径，默认处理 assets/user_imports/maps")  # 添加地图参数
+    parser.add_argument("--chunk-size", type=int, default=INDEX_CHUNK_SIZE, help="索引块边长（格）")  # 添加块尺寸参数
+    parser.add_argument("--binding", type=Path, default=BINDING_PATH, help="瓦片绑定表路径")  # 添加绑定表参数
+    parser.add_argument("--ground", default="GRASS", help="视为地面、不计入包围盒的地形名称")  # 添加地面地形参数
+    parser.add_argument("--output-dir", type=Path, help="索引输出目录，默认与地图同目录")  # 添加输出目录参数
+    args = parser.parse_args()  # 解析参数
+    maps = args.maps or default_maps()  # 确定地图列表
+    if not maps:  # 没有可处理的地图
+        print("未找到需要处理的地图")  # 打印提示
+        return  # 结束
+    binding = load_binding(args.binding)  # 读取绑定表
+    for map_path in maps:  # 遍历地图
+        map_json = json.loads(map_path.read_text(encoding="utf-8"))  # 读取地图
+        tilesets = map_json.get("tilesets", [])  # 读取图集列表
+        ground_gid = terrain_gids(binding, [args.ground], int(tilesets[0].get("firstgid", 1)) if tilesets else 1)[0]  # 地面 gid
+        path = index_path(map_path, args.output_dir)  # 计算输出路径
+        path.parent.mkdir(parents=True, exist_ok=True)  # 确保目录存在
+        path.write_text(dump_index(build_chunk_index(map_json, args.chunk_size, ground_gid)), encoding="utf-8")  # 写出索引
+        print(f"已生成块索引: {path}")  # 打印提示
+
+
+if __name__ == "__main__":  # 判断是否直接执行脚本
+    main()  # 调用主函数
@@ -0,0 +1,336 @@
+"""为 Tiled 地图离线构建 HPA* 分层寻路图，并提供 Python 参考查询接口。"""  # 模块功能说明
+from __future__ import annotations  # 启用未来注解支持
+
+import argparse  # 导入命令行参数解析库
+import heapq  # 导入堆实现抽象图上的 A*
+import json  # 导入 JSON 序列化库
+import sys  # 导入 sys 以调整模块搜索路径
+from pathlib import Path  # 导入路径处理库
+from typing import Any, Dict, List, Optional, Tuple  # 导入类型提示工具
+
+import numpy as np  # 导入 NumPy 进行向量化计算
+
+SCRIPT_ROOT = Path(__file__).resolve().parent  # 计算脚本目录
+if str(SCRIPT_ROOT.parent) not in sys.path:  # 确保仓库根目录在模块搜索路径中
+    sys.path.insert(0, str(SCRIPT_ROOT.parent))  # 插入仓库根目录
+
+from scripts.build_nav_sidecar import (  # 复用导航数据的通行解析与编码工具
+    BINDING_PATH,
+    UNREACHABLE,
+    default_maps,
+    label_components,
+    load_binding,
+    map_passability,
+    pack_array,
+    passability_lut,
+    unpack_array,
+)  # 导入结束
+
+HPA_VERSION = 1  # 图文件格式版本
+GRAPH_SUFFIX = ".hpa.json"  # 图文件后缀
+DEFAULT_CLUSTER_SIZE = 16  # 默认簇边长（格）
+ENTRANCE_SPLIT = 6  # 入口段长度达到该值时在两端各放一个节点，否则只在中点放一个
+BFS_BATCH_CELLS = 1 << 20  # 批量簇内 BFS 每批处理的格子数上限
+
+Cell = Tuple[int, int]  # 网格坐标 (x, y)
+
+
+def border_entrances(passable: np.ndarray, cluster_size: int) -> List[Tuple[int, int]]:  # 定义入口检测函数
+    """扫描所有簇边界，返回跨边界相邻的展平下标对 (a, b)，a 与 b 分属相邻两簇"""  # 函数说明
+    height, width = passable.shape  # 读取尺寸
+    pairs: List[Tuple[int, int]] = []  # 记录入口对
+    for axis, limit, span in ((1, width, height), (0, height, width)):  # 先处理竖直边界，再处理水平边界
+        for border in range(cluster_size, limit, cluster_size):  # 遍历簇边界
+            if axis == 1:  # 竖直边界：左列 border-1，右列 border
+                both = passable[:, border - 1] & passable[:, border]  # 两侧都可通行
+            else:  # 水平边界：上行 border-1，下行 border
+                both = passable[border - 1, :] & passable[border, :]  # 两侧都可通行
+            positions = np.arange(span)  # 沿边界的位置
+            starts = both & ~np.concatenate(([False], both[:-1])) | both & (positions % cluster_size == 0)  # 段起点（在簇角处强制断开）
+            ends = both & ~np.concatenate((both[1:], [False])) | both & (positions % cluster_size == cluster_size - 1)  # 段终点
+            for start, end in zip(np.flatnonzero(starts).tolist(), np.flatnonzero(ends).tolist()):  # 遍历段
+                picks = (start + (end - start) // 2,) if end - start + 1 < ENTRANCE_SPLIT else (start, end)  # 选择入口位置
+                for pos in picks:  # 写入入口对
+                    if axis == 1:  # 竖直边界
+                        pairs.append((pos * width + border - 1, pos * width + border))  # 左右两格
+                    else:  # 水平边界
+                        pairs.append(((border - 1) * width + pos, border * width + pos))  # 上下两格
+    return pairs  # 返回入口对
+
+
+def cluster_windows(passable: np.ndarray, cluster_size: int) -> np.ndarray:  # 定义簇窗口函数
+    """把通行位图切为 (簇数, C, C) 的窗口，地图边缘不足的部分以不可通行填充，簇按行优先编号"""  # 函数说明
+    height, width = passable.shape  # 读取尺寸
+    rows, cols = -(-height // cluster_size), -(-width // cluster_size)  # 簇行列数（向上取整）
+    padded = np.zeros((rows * cluster_size, cols * cluster_size), dtype=bool)  # 填充后的位图
+    padded[:height, :width] = passable  # 写入原图
+    return padded.reshape(rows, cluster_size, cols, cluster_size).swapaxes(1, 2).reshape(rows * cols, cluster_size, cluster_size)  # 重排为窗口
+
+
+def batched_window_bfs(windows: np.ndarray, owners: np.ndarray, sources: np.ndarray) -> np.ndarray:  # 定义批量簇内 BFS 函数
+    """对每个起点在其所属簇窗口内同时做四邻接 BFS，返回 (起点数, C*C) 的 uint16 距离"""  # 函数说明
+    count, size = owners.size, windows.shape[1]  # 起点数量与簇边长
+    distance = np.full((count, size * size), UNREACHABLE, dtype=np.uint16)  # 初始化距离
+    batch = max(1, BFS_BATCH_CELLS // (size * size))  # 每批起点数
+    for begin in range(0, count, batch):  # 分批处理以限制内存
+        chunk = slice(begin, min(count, begin + batch))  # 当前批次
+        passable = windows[owners[chunk]]  # (k, C, C) 的通行窗口
+        frontier = np.zeros_like(passable)  # 初始化前沿
+        frontier.reshape(passable.shape[0], -1)[np.arange(passable.shape[0]), sources[chunk]] = True  # 写入起点
+        frontier &= passable  # 起点必须可通行
+        visited = frontier.copy()  # 已访问标记
+        result = distance[chunk].reshape(passable.shape)  # 当前批次的距离视图
+        step = 0  # 当前距离
+        while frontier.any():  # 任一起点仍在扩张
+            result[frontier] = step  # 写入距离
+            grown = np.zeros_like(frontier)  # 下一圈
+            grown[:, 1:] |= frontier[:, :-1]  # 向下扩张
+            grown[:, :-1] |= frontier[:, 1:]  # 向上扩张
+            grown[:, :, 1:] |= frontier[:, :, :-1]  # 向右扩张
+            grown[:, :, :-1] |= frontier[:, :, 1:]  # 向左扩张
+            frontier = grown & passable & ~visited  # 过滤不可通行与已访问格子
+            visited |= frontier  # 标记访问
+            step += 1  # 距离加一
+    return distance  # 返回距离
+
+
+class HpaGraph:  # 定义分层寻路图
+    """簇入口节点 + 簇内缓存代价的抽象图；边以 CSR（offsets/targets/costs）存储"""  # 类说明
+
+    def __init__(  # 定义构造函数
+        self,
+        passable: np.ndarray,
+        cluster_size: int,
+        nodes: np.ndarray,
+        offsets: np.ndarray,
+        targets: np.ndarray,
+        costs: np.ndarray,
+        origin: Cell = (0, 0),
+    ) -> None:
+        self.passable = passable  # 通行位图
+        self.cluster_size = cluster_size  # 簇边长
+        self.nodes = nodes  # 每个节点的展平下标，按 (簇, 下标) 排序
+        self.offsets = offsets  # CSR 行偏移
+        self.targets = targets  # CSR 目标节点
+        self.costs = costs  # CSR 边代价
+        self.origin = origin  # 网格左上角在地图中的坐标
+        self.height, self.width = passable.shape  # 网格尺寸
+        self.columns = -(-self.width // cluster_size)  # 每行簇数
+        clusters = self.cluster_of_index(nodes)  # 每个节点所属簇
+        self.cluster_starts = np.searchsorted(clusters, np.arange(self.columns * -(-self.height // cluster_size) + 1))  # 各簇节点区间
+        self._labels: Optional[np.ndarray] = None  # 连通分量标签（按需计算）
+
+    @classmethod  # 声明类方法
+    def build(cls, passable: np.ndarray, cluster_size: int = DEFAULT_CLUSTER_SIZE, origin: Cell = (0, 0)) -> "HpaGraph":  # 定义构建方法
+        """检测入口、批量计算簇内代价并组装 CSR 图"""  # 函数说明
+        width = passable.shape[1]  # 地图宽度
+        pairs = np.array(border_entrances(passable, cluster_size), dtype=np.int64).reshape(-1, 2)  # 入口对
+        cells = np.unique(pairs)  # 入口格子（角上的格子可能同时属于两条边界）
+        columns = -(-width // cluster_size)  # 每行簇数
+        clusters = (cells // width // cluster_size) * columns + (cells % width) // cluster_size  # 入口所属簇
+        order = np.lexsort((cells, clusters))  # 按 (簇, 下标) 排序
+        nodes, node_clusters = cells[order], clusters[order]  # 排序后的节点
+        local = ((nodes // width) % cluster_size) * cluster_size + (nodes % width) % cluster_size  # 节点在簇窗口内的下标
+        distance = batched_window_bfs(cluster_windows(passable, cluster_size), node_clusters, local)  # 簇内距离
+        starts = np.searchsorted(node_clusters, node_clusters, side="left")  # 每个节点所在簇的第一个节点
+        counts = np.searchsorted(node_clusters, node_clusters, side="right") - starts  # 每个节点所在簇的节点数
+        owner = np.repeat(np.arange(nodes.size), counts)  # 簇内节点对的起点
+        peer = starts[owner] + np.arange(owner.size) - np.repeat(np.cumsum(counts) - counts, counts)  # 簇内节点对的终点
+        cost = distance[owner, local[peer]]  # 簇内代价
+        keep = (owner != peer) & (cost != UNREACHABLE)  # 排除自身与不可达
+        rank = np.empty_like(order)  # 有序入口格子到节点编号的映射
+        rank[order] = np.arange(order.size)  # 写入节点编号
+        inter = rank[np.searchsorted(cells, pairs)]  # 跨簇边两端的节点编号
+        sources = np.concatenate((owner[keep], inter[:, 0], inter[:, 1]))  # 边起点（跨簇边双向）
+        targets = np.concatenate((peer[keep], inter[:, 1], inter[:, 0]))  # 边终点
+        weights = np.concatenate((cost[keep], np.ones(2 * len(inter), dtype=np.uint16)))  # 相邻格代价为 1
+        edges = np.stack((sources, targets), axis=1).astype(np.int64)  # 边表
+        edges, unique_index = np.unique(edges, axis=0, return_index=True)  # 去重并按起点排序
+        weights = weights[unique_index]  # 对应代价
+        offsets = np.concatenate(([0], np.cumsum(np.bincount(edges[:, 0], minlength=nodes.size)))).astype(np.uint32)  # CSR 偏移
+        return cls(passable, cluster_size, nodes.astype(np.uint32), offsets, edges[:, 1].astype(np.uint32), weights, origin)  # 返回图
+
+    def cluster_of_index(self, index: Any) -> Any:  # 定义簇编号计算方法
+        """展平下标所属的簇编号（行优先）"""  # 函数说明
+        index = np.asarray(index, dtype=np.int64)  # 统一为数组
+        return (index // self.width // self.cluster_size) * self.columns + (index % self.width) // self.cluster_size  # 计算簇编号
+
+    @property  # 声明属性
+    def labels(self) -> np.ndarray:  # 定义连通分量属性
+        """首次使用时计算连通分量标签，用于 O(1) 排除不可达目标"""  # 函数说明
+        if self._labels is None:  # 尚未计算
+            self._labels, _sizes = label_components(self.passable)  # 标记连通分量
+        return self._labels  # 返回标签
+
+    def _cluster_window(self, cluster: int) -> Tuple[int, int, np.ndarray]:  # 定义簇窗口读取方法
+        """返回簇左上角坐标与其通行窗口（地图边缘的簇可能小于 C×C）"""  # 函数说明
+        x0 = (cluster % self.columns) * self.cluster_size  # 簇左上角 X
+        y0 = (cluster // self.columns) * self.cluster_size  # 簇左上角 Y
+        return x0, y0, self.passable[y0 : y0 + self.cluster_size, x0 : x0 + self.cluster_size]  # 返回窗口
+
+    def _local_distance(self, cell: Cell) -> Tuple[int, int, np.ndarray]:  # 定义簇内距离计算方法
+        """在格子所在簇内做 BFS，返回簇左上角坐标与距离窗口"""  # 函数说明
+        x0, y0, window = self._cluster_window(int(self.cluster_of_index(cell[1] * self.width + cell[0])))  # 读取簇窗口
+        padded = np.zeros((self.cluster_size, self.cluster_size), dtype=bool)  # 补齐为 C×C
+        padded[: window.shape[0], : window.shape[1]] = window  # 写入窗口
+        source = np.array([(cell[1] - y0) * self.cluster_size + cell[0] - x0])  # 起点在窗口内的下标
+        distance = batched_window_bfs(padded[None], np.zeros(1, dtype=np.int64), source)[0]  # 单次 BFS
+        return x0, y0, distance.reshape(self.cluster_size, self.cluster_size)  # 返回距离窗口
+
+    def _cluster_links(self, cell: Cell) -> Dict[int, int]:  # 定义临时连接计算方法
+        """把任意格子临时接入抽象图：返回 {同簇节点编号: 代价}"""  # 函数说明
+        x0, y0, distance = self._local_distance(cell)  # 簇内距离
+        cluster = int(self.cluster_of_index(cell[1] * self.width + cell[0]))  # 所在簇
+        peers = np.arange(self.cluster_starts[cluster], self.cluster_starts[cluster + 1])  # 同簇节点
+        cells = self.nodes[peers].astype(np.int64)  # 节点下标
+        cost = distance[cells // self.width - y0, cells % self.width - x0]  # 到各节点的代价
+        keep = cost != UNREACHABLE  # 可达节点
+        return dict(zip(peers[keep].tolist(), cost[keep].tolist()))  # 返回连接
+
+    def find_path(self, start: Cell, goal: Cell, refine: bool = False) -> Optional[Tuple[int, List[Cell]]]:  # 定义寻路方法
+        """在抽象图上做 A*，返回 (代价, 路径点)；refine 为真时展开为逐格路径，不可达返回 None"""  # 函数说明
+        for x, y in (start, goal):  # 校验坐标
+            if not (0 <= x < self.width and 0 <= y < self.height):  # 超出网格
+                raise ValueError(f"坐标 ({x}, {y}) 超出地图范围")  # 抛出错误
+        labels = self.labels  # 连通分量标签
+        if not labels[start[1], start[0]] or labels[start[1], start[0]] != labels[goal[1], goal[0]]:  # 不可通行或不连通
+            return None  # O(1) 拒绝
+        best: Optional[Tuple[int, List[Cell]]] = None  # 当前最优结果
+        if self.cluster_of_index(start[1] * self.width + start[0]) == self.cluster_of_index(goal[1] * self.width + goal[0]):  # 同簇时先尝试簇内直达
+            x0, y0, distance = self._local_distance(start)  # 簇内距离
+            direct = int(distance[goal[1] - y0, goal[0] - x0])  # 直达代价
+            if direct != UNREACHABLE:  # 簇内可达
+                best = (direct, [start, goal])  # 记录结果
+        start_links, goal_links = self._cluster_links(start), self._cluster_links(goal)  # 临时接入抽象图
+        gx, gy = goal  # 目标坐标
+        open_heap: List[Tuple[int, int, int]] = []  # (f, g, 节点)
+        cost_so_far: Dict[int, int] = {}  # 已知最短代价
+        came_from: Dict[int, int] = {}  # 前驱节点（-1 表示起点）
+        for node, cost in start_links.items():  # 从起点出发
+            cost_so_far[node] = cost  # 记录代价
+            came_from[node] = -1  # 前驱为起点
+            cell = int(self.nodes[node])  # 节点下标
+            heapq.heappush(open_heap, (cost + abs(cell % self.width - gx) + abs(cell // self.width - gy), cost, node))  # 入堆
+        reached: Optional[Tuple[int, int]] = None  # (总代价, 最后节点)
+        while open_heap:  # A* 主循环
+            f_score, g_score, node = heapq.heappop(open_heap)  # 取出最小 f
+            if g_score > cost_so_far.get(node, UNREACHABLE):  # 过期条目
+                continue  # 跳过
+            if reached is not None and f_score >= reached[0]:  # 曼哈顿距离可采纳，已无更优解
+                break  # 结束搜索
+            if node in goal_links and (reached is None or g_score + goal_links[node] < reached[0]):  # 可接到目标
+                reached = (g_score + goal_links[node], node)  # 更新结果
+            for edge in range(int(self.offsets[node]), int(self.offsets[node + 1])):  # 遍历出边
+                neighbour = int(self.targets[edge])  # 邻居节点
+                tentative = g_score + int(self.costs[edge])  # 新代价
+                if tentative < cost_so_far.get(neighbour, UNREACHABLE):  # 更优
+                    cost_so_far[neighbour] = tentative  # 更新代价
+                    came_from[neighbour] = node  # 更新前驱
+                    cell = int(self.nodes[neighbour])  # 邻居下标
+                    heapq.heappush(open_heap, (tentative + abs(cell % self.width - gx) + abs(cell // self.width - gy), tentative, neighbour))  # 入堆
+        if reached is not None and (best is None or reached[0] < best[0]):  # 抽象路径更优
+            chain: List[Cell] = [goal]  # 反向收集路径点
+            node = reached[1]  # 从最后节点回溯
+            while node != -1:  # 直到起点
+                cell = int(self.nodes[node])  # 节点下标
+                chain.append((cell % self.width, cell // self.width))  # 记录坐标
+                node = came_from[node]  # 回溯
+            chain.append(start)  # 加入起点
+            points = chain[::-1]  # 改为正向
+            best = (reached[0], [point for index, point in enumerate(points) if index == 0 or point != points[index - 1]])  # 去掉起点/终点本身是节点时的重复点
+        if best is None:  # 理论上同一分量总能找到路径
+            return None  # 返回不可达
+        return (best[0], self.refine(best[1])) if refine else best  # 返回结果
+
+    def refine(self, waypoints: List[Cell]) -> List[Cell]:  # 定义路径展开方法
+        """把路径点展开为逐格路径：相邻点直接相连，同簇点沿簇内 BFS 距离下降"""  # 函数说明
+        path: List[Cell] = [waypoints[0]]  # 初始化路径
+        for current, target in zip(waypoints, waypoints[1:]):  # 遍历路径段
+            if abs(current[0] - target[0]) + abs(current[1] - target[1]) == 1:  # 跨簇边或相邻格
+                path.append(target)  # 直接相连
+                continue  # 下一段
+            x0, y0, distance = self._local_distance(target)  # 以段终点为源的簇内距离
+            x, y = current  # 当前位置
+            while (x, y) != target:  # 沿距离梯度下降
+                here = distance[y - y0, x - x0]  # 当前距离
+                for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):  # 尝试四个方向
+                    nx, ny = x + dx - x0, y + dy - y0  # 邻居窗口坐标
+                    if 0 <= nx < self.cluster_size and 0 <= ny < self.cluster_size and distance[ny, nx] == here - 1:  # 距离减一
+                        x, y = x + dx, y + dy  # 前进
+                        break  # 继续下降
+                path.append((x, y))  # 记录格子
+        return path  # 返回逐格路径
+
+    def to_json(self) -> Dict[str, Any]:  # 定义序列化方法
+        """序列化为紧凑 JSON：数组字段均为小端二进制经 zlib + base64"""  # 函数说明
+        return {  # 返回图数据
+            "version": HPA_VERSION,  # 格式版本
+            "width": self.width,  # 宽度（格）
+            "height": self.height,  # 高度（格）
+            "originX": self.origin[0],  # 网格左上角 X
+            "originY": self.origin[1],  # 网格左上角 Y
+            "clusterSize": self.cluster_size,  # 簇边长
+            "nodeCount": int(self.nodes.size),  # 节点数
+            "edgeCount": int(self.targets.size),  # 有向边数
+            "encoding": "base64",  # 二进制字段编码
+            "compression": "zlib",  # 二进制字段压缩
+            "passable": pack_array(np.packbits(self.passable.reshape(-1), bitorder="little")),  # 通行位图（小端位序）
+            "nodes": pack_array(self.nodes.astype("<u4")),  # 节点展平下标
+            "offsets": pack_array(self.offsets.astype("<u4")),  # CSR 偏移
+            "targets": pack_array(self.targets.astype("<u4")),  # CSR 目标
+            "costs": pack_array(self.costs.astype("<u2")),  # CSR 代价
+        }  # 图数据结束
+
+    @classmethod  # 声明类方法
+    def from_json(cls, data: Dict[str, Any]) -> "HpaGraph":  # 定义反序列化方法
+        """读取 to_json 的输出"""  # 函数说明
+        width, height = int(data["width"]), int(data["height"])  # 网格尺寸
+        bits = unpack_array(data["passable"], "u1", (-1,))  # 解码位图
+        passable = np.unpackbits(bits, count=width * height, bitorder="little").astype(bool).reshape(height, width)  # 还原通行位图
+        return cls(  # 返回图
+            passable,
+            int(data["clusterSize"]),
+            unpack_array(data["nodes"], "<u4", (-1,)),
+            unpack_array(data["offsets"], "<u4", (-1,)),
+            unpack_array(data["targets"], "<u4", (-1,)),
+            unpack_array(data["costs"], "<u2", (-1,)),
+            (int(data.get("originX", 0)), int(data.get("originY", 0))),
+        )  # 构造结束
+
+
+def build_map_graph(map_json: Dict[str, Any], binding: Dict[str, Any], cluster_size: int = DEFAULT_CLUSTER_SIZE) -> HpaGraph:  # 定义地图建图函数
+    """按绑定表计算通行位图并构建分层寻路图"""  # 函数说明
+    tilesets = map_json.get("tilesets", [])  # 读取图集列表
+    firstgid = int(tilesets[0].get("firstgid", 1)) if tilesets else 1  # 绑定表对应第一个图集
+    passable, _ground, left, top = map_passability(map_json, passability_lut(binding, firstgid))  # 计算通行位图
+    return HpaGraph.build(passable, cluster_size, (left, top))  # 构建图
+
+
+def graph_path(map_path: Path, output_dir: Optional[Path] = None) -> Path:  # 定义图文件路径函数
+    """图文件与地图同名，后缀为 .hpa.json"""  # 函数说明
+    return (output_dir or map_path.parent) / f"{map_path.stem}{GRAPH_SUFFIX}"  # 返回路径
+
+
+def main() -> None:  # 定义脚本主入口
+    """为指定地图写出 HPA* 图文件"""  # 函数说明
+    parser = argparse.ArgumentParser(description="为 Tiled 地图构建 HPA* 分层寻路图")  # 创建解析器
+    parser.add_argument("maps", nargs="*", type=Path, help="地图 JSON 路径，默认处理 assets/user_imports/maps")  # 添加地图参数
+    parser.add_argument("--binding", type=Path, default=BINDING_PATH, help="瓦片绑定表路径")  # 添加绑定表参数
+    parser.add_argument("--cluster-size", type=int, default=DEFAULT_CLUSTER_SIZE, help="簇边长（格）")  # 添加簇尺寸参数
+    parser.add_argument("--output-dir", type=Path, help="图文件输出目录，默认与地图同目录")  # 添加输出目录参数
+    args = parser.parse_args()  # 解析参数
+    binding = load_binding(args.binding)  # 读取绑定表
+    maps = args.maps or default_maps()  # 确定地图列表
+    if not maps:  # 没有可处理的地图
+        print("未找到需要处理的地图")  # 打印提示
+        return  # 结束
+    for map_path in maps:  # 遍历地图
+        graph = build_map_graph(json.loads(map_path.read_text(encoding="utf-8")), binding, args.cluster_size)  # 构建图
+        path = graph_path(map_path, args.output_dir)  # 计算输出路径
+        path.parent.mkdir(parents=True, exist_ok=True)  # 确保目录存在
+        path.write_text(json.dumps(graph.to_json(), indent=2) + "\n", encoding="utf-8")  # 写出图文件
+        print(f"已生成 HPA* 图: {path}（节点 {graph.nodes.size}，边 {graph.targets.size}）")  # 打印提示
+
+
+if __name__ == "__main__":  # 判断是否直接执行脚本
+    main()  # 调用主函数
@@ -0,0 +1,238 @@
+"""为 Tiled 地图预计算导航数据：通行位图、连通分量标签与到道路的距离场。"""  # 模块功能说明
+from __future__ import annotations  # 启用未来注解支持
+
+import argparse  # 导入命令行参数解析库
+import base64  # 导入 base64 编码位图
+import json  # 导入 JSON 序列化库
+import sys  # 导入 sys 以调整模块搜索路径
+import zlib  # 导入 zlib 压缩二进制字段
+from pathlib import Path  # 导入路径处理库
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple  # 导入类型提示工具
+
+import numpy as np  # 导入 NumPy 进行向量化计算
+
+SCRIPT_ROOT = Path(__file__).resolve().parent  # 计算脚本目录
+if str(SCRIPT_ROOT.parent) not in sys.path:  # 确保仓库根目录在模块搜索路径中
+    sys.path.insert(0, str(SCRIPT_ROOT.parent))  # 插入仓库根目录
+
+from scripts.utils_tiled_layers import GID_MASK, iter_tile_layers, layer_grid  # 导入图层拼装工具
+
+NAV_VERSION = 1  # 导航数据格式版本
+BINDING_PATH = Path("assets/mapping/tileset_binding.json")  # 瓦片绑定表路径
+USER_MAPS_DIR = Path("assets/user_imports/maps")  # 用户地图目录
+SIDECAR_SUFFIX = ".nav.json"  # 导航数据文件后缀
+DERIVED_SUFFIXES = (SIDECAR_SUFFIX, ".hpa.json", ".chunks.json", ".spawns.json")  # 由地图派生的附属文件后缀，扫描地图时排除
+DEFAULT_ROAD_TERRAINS = ("ROAD",)  # 默认作为距离场起点的地形
+UNREACHABLE = 0xFFFF  # 距离场中不可达格子的取值
+
+
+def load_binding(path: Path = BINDING_PATH) -> Dict[str, Any]:  # 定义绑定表读取函数
+    """读取瓦片绑定表 JSON"""  # 函数说明
+    return json.loads(path.read_text(encoding="utf-8"))  # 解析并返回
+
+
+def terrain_passability(binding: Dict[str, Any]) -> Dict[str, bool]:  # 定义通行性解析函数
+    """从 bindings 中 `_comment_<地形>` 的“可通行/不可通行”说明解析各地形是否可通行"""  # 函数说明
+    bindings = binding.get("bindings", {})  # 读取绑定
+    passable: Dict[str, bool] = {}  # 初始化结果
+    for name in bindings:  # 遍历地形
+        if name.startswith("_"):  # 跳过注释键
+            continue  # 继续
+        comment = str(bindings.get(f"_comment_{name}", ""))  # 读取说明
+        if "不可通行" in comment:  # 明确不可通行
+            passable[name] = False  # 记录
+        elif "可通行" in comment:  # 明确可通行
+            passable[name] = True  # 记录
+        else:  # 说明缺失
+            raise ValueError(f"地形 {name} 的说明未标注是否可通行")  # 抛出错误，避免静默猜测
+    return passable  # 返回结果
+
+
+def passability_lut(binding: Dict[str, Any], firstgid: int = 1) -> np.ndarray:  # 定义 gid 通行查找表函数
+    """返回按 gid 下标的布尔查找表，图集索引 i 对应 gid firstgid + i，未绑定的 gid 视为不可通行"""  # 函数说明
+    bindings = binding.get("bindings", {})  # 读取绑定
+    flags = terrain_passability(binding)  # 解析通行性
+    lut = np.zeros(firstgid + max(int(bindings[name]) for name in flags) + 1, dtype=bool)  # 初始化查找表
+    for name, flag in flags.items():  # 写入各地形
+        lut[firstgid + int(bindings[name])] = flag  # 设置通行性
+    return lut  # 返回查找表
+
+
+def terrain_gids(binding: Dict[str, Any], names: Iterable[str], firstgid: int = 1) -> List[int]:  # 定义地形 gid 查询函数
+    """把地形名称转换为 gid 列表"""  # 函数说明
+    bindings = binding.get("bindings", {})  # 读取绑定
+    return [firstgid + int(bindings[name]) for name in names]  # 返回 gid
+
+
+def map_passability(map_json: Dict[str, Any], lut: np.ndarray) -> Tuple[np.ndarray, np.ndarray, int, int]:  # 定义地图通行计算函数
+    """合并全部瓦片图层：任一层的非空瓦片不可通行则阻挡，全部为空的格子不可通行；返回 (通行, 地面 gid, 原点 x, 原点 y)"""  # 函数说明
+    layers = [layer_grid(layer) for layer in iter_tile_layers(map_json)]  # 拼装全部图层
+    if not layers:  # 没有瓦片图层
+        raise ValueError("地图不含瓦片图层")  # 抛出错误
+    left = min(x for _grid, x, _y in layers)  # 合并范围左边界
+    top = min(y for _grid, _x, y in layers)  # 合并范围上边界
+    right = max(x + grid.shape[1] for grid, x, _y in layers)  # 合并范围右边界
+    bottom = max(y + grid.shape[0] for grid, _x, y in layers)  # 合并范围下边界
+    passable = np.ones((bottom - top, right - left), dtype=bool)  # 初始化通行位图
+    covered = np.zeros_like(passable)  # 记录是否有瓦片
+    ground = np.zeros(passable.shape, dtype=np.uint32)  # 最底层的 gid
+    for index, (grid, x, y) in enumerate(layers):  # 遍历图层
+        gids = (grid & GID_MASK).astype(np.int64)  # 去掉翻转标志
+        ok = lut[np.minimum(gids, lut.size - 1)] & (gids < lut.size)  # 查表，越界 gid 不可通行
+        window = (slice(y - top, y - top + grid.shape[0]), slice(x - left, x - left + grid.shape[1]))  # 图层在合并范围中的位置
+        filled = gids != 0  # 非空瓦片
+        passable[window] &= ~filled | ok  # 非空且不可通行时阻挡
+        covered[window] |= filled  # 标记覆盖
+        if index == 0:  # 第一层作为地面
+            ground[window] = gids  # 记录地面 gid
+    return passable & covered, ground, left, top  # 返回结果
+
+
+def label_components(passable: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:  # 定义连通分量标记函数
+    """四邻接连通分量标记：先按行提取连续段，再以向量化并查集合并上下相接的段；返回 (标签, 各分量格数)，标签 0 表示不可通行"""  # 函数说明
+    height, width = passable.shape  # 读取尺寸
+    flat = passable.reshape(-1)  # 展平视图
+    starts = flat & ~np.concatenate(([False], flat[:-1]))  # 段起点（含跨行相接的情况）
+    starts.reshape(height, width)[:, 0] = passable[:, 0]  # 每行第一格只要可通行就是段起点
+    run_ids = np.cumsum(starts) * flat  # 为每格写入所在段编号（从 1 开始）
+    run_count = int(starts.sum())  # 段数量
+    runs = run_ids.reshape(height, width)  # 二维段编号
+    vertical = passable[:-1] & passable[1:]  # 上下相邻且都可通行
+    upper, lower = runs[:-1][vertical], runs[1:][vertical]  # 需要合并的段对
+    roots = np.arange(run_count + 1, dtype=np.int64)  # 并查集父节点，始终满足 roots[i] <= i
+    while True:  # 挂接与路径压缩交替进行，轮数约为对数级
+        root_a, root_b = roots[upper], roots[lower]  # 压缩后父节点即根
+        differ = root_a != root_b  # 尚未合并的段对
+        if not differ.any():  # 全部合并完成
+            break  # 结束
+        np.minimum.at(roots, np.maximum(root_a, root_b)[differ], np.minimum(root_a, root_b)[differ])  # 较大的根挂到较小的根下
+        while True:  # 路径压缩
+            jumped = roots[roots]  # 指针跳跃
+            if np.array_equal(jumped, roots):  # 已全部指向根
+                break  # 结束
+            roots = jumped  # 更新父节点
+    _unique, compact = np.unique(roots, return_inverse=True)  # 根按编号升序压缩，0 仍为 0，分量按行优先首次出现排序
+    labels = compact.reshape(-1)[run_ids].astype(np.uint32).reshape(height, width)  # 写回每格标签
+    sizes = np.bincount(labels.reshape(-1), minlength=int(compact.max()) + 1)[1:]  # 各分量格数
+    return labels, sizes  # 返回结果
+
+
+def distance_field(passable: np.ndarray, sources: np.ndarray) -> np.ndarray:  # 定义距离场计算函数
+    """从全部起点同时做四邻接广度优先搜索，每一步整体扩张一圈；不可达与不可通行格子为 UNREACHABLE"""  # 函数说明
+    height, width = passable.shape  # 读取尺寸
+    open_cells = passable.reshape(-1)  # 展平的通行位图
+    distance = np.full(open_cells.size, UNREACHABLE, dtype=np.uint16)  # 初始化距离
+    frontier = np.flatnonzero(sources.reshape(-1) & open_cells)  # 初始前沿（展平下标）
+    step = 0  # 当前距离
+    while frontier.size and step < UNREACHABLE:  # 前沿非空
+        distance[frontier] = step  # 写入距离
+        column = frontier % width  # 前沿所在列
+        neighbours = np.concatenate((  # 四个方向的邻居，只处理前沿而非整张网格
+            frontier[frontier >= width] - width,
+            frontier[frontier < open_cells.size - width] + width,
+            frontier[column > 0] - 1,
+            frontier[column < width - 1] + 1,
+        ))  # 邻居结束
+        neighbours = neighbours[open_cells[neighbours] & (distance[neighbours] == UNREACHABLE)]  # 过滤不可通行与已访问格子
+        frontier = np.unique(neighbours)  # 去重得到下一圈
+        step += 1  # 距离加一
+    return distance.reshape(height, width)  # 返回距离场
+
+
+def pack_array(values: np.ndarray) -> str:  # 定义二进制字段编码函数
+    """把小端数组压缩为 base64 文本"""  # 函数说明
+    return base64.b64encode(zlib.compress(np.ascontiguousarray(values).tobytes(), 9)).decode("ascii")  # 返回文本
+
+
+def unpack_array(text: str, dtype: str, shape: Sequence[int]) -> np.ndarray:  # 定义二进制字段解码函数
+    """pack_array 的逆操作"""  # 函数说明
+    return np.frombuffer(zlib.decompress(base64.b64decode(text)), dtype=dtype).reshape(shape)  # 返回数组
+
+
+def build_nav(map_json: Dict[str, Any], binding: Dict[str, Any], road_terrains: Sequence[str] = DEFAULT_ROAD_TERRAINS) -> Dict[str, Any]:  # 定义导航数据构建函数
+    """计算地图的导航数据，返回可直接写出的 JSON 对象"""  # 函数说明
+    tilesets = map_json.get("tilesets", [])  # 读取图集列表
+    firstgid = int(tilesets[0].get("firstgid", 1)) if tilesets else 1  # 绑定表对应第一个图集
+    passable, ground, left, top = map_passability(map_json, passability_lut(binding, firstgid))  # 计算通行位图
+    labels, sizes = label_components(passable)  # 标记连通分量
+    road_gids = terrain_gids(binding, road_terrains, firstgid)  # 道路 gid
+    distance = distance_field(passable, np.isin(ground, road_gids))  # 计算到道路的距离
+    reachable = distance != UNREACHABLE  # 可达格子
+    height, width = passable.shape  # 读取尺寸
+    return {  # 返回导航数据
+        "version": NAV_VERSION,  # 格式版本
+        "width": width,  # 宽度（格）
+        "height": height,  # 高度（格）
+        "originX": left,  # 网格左上角在地图中的 X（无限地图可能为负）
+        "originY": top,  # 网格左上角在地图中的 Y
+        "encoding": "base64",  # 二进制字段编码
+        "compression": "zlib",  # 二进制字段压缩
+        "passable": {"bitorder": "little", "count": int(passable.sum()), "data": pack_array(np.packbits(passable.reshape(-1), bitorder="little"))},  # 行优先通行位图
+        "components": {"count": int(sizes.size), "sizes": sizes.tolist(), "dtype": "<u4", "data": pack_array(labels.astype("<u4"))},  # 连通分量标签，0 为不可通行
+        "roadDistance": {  # 到道路的四邻接步数
+            "terrains": list(road_terrains),  # 起点地形
+            "unreachable": UNREACHABLE,  # 不可达取值
+            "max": int(distance[reachable].max()) if reachable.any() else 0,  # 最大距离
+            "dtype": "<u2",  # 数据类型
+            "data": pack_array(distance.astype("<u2")),  # 距离数据
+        },  # 距离场结束
+    }  # 导航数据结束
+
+
+def load_nav(nav: Dict[str, Any]) -> Dict[str, np.ndarray]:  # 定义导航数据读取函数
+    """把导航 JSON 解码为 passable / labels / road_distance 三个二维数组"""  # 函数说明
+    shape = (int(nav["height"]), int(nav["width"]))  # 网格尺寸
+    bits = unpack_array(nav["passable"]["data"], "u1", (-1,))  # 解码位图
+    passable = np.unpackbits(bits, count=shape[0] * shape[1], bitorder="little").astype(bool).reshape(shape)  # 还原通行位图
+    labels = unpack_array(nav["components"]["data"], nav["components"]["dtype"], shape)  # 解码标签
+    distance = unpack_array(nav["roadDistance"]["data"], nav["roadDistance"]["dtype"], shape)  # 解码距离
+    return {"passable": passable, "labels": labels, "road_distance": distance}  # 返回数组
+
+
+def reachable(labels: np.ndarray, start: Tuple[int, int], target: Tuple[int, int]) -> bool:  # 定义可达性查询函数
+    """O(1) 判断两格 (x, y) 是否四邻接可达：两者可通行且属于同一连通分量"""  # 函数说明
+    label = labels[start[1], start[0]]  # 起点标签
+    return bool(label) and label == labels[target[1], target[0]]  # 比较标签
+
+
+def sidecar_path(map_path: Path, output_dir: Optional[Path] = None) -> Path:  # 定义导航文件路径函数
+    """导航数据与地图同名，后缀为 .nav.json"""  # 函数说明
+    return (output_dir or map_path.parent) / f"{map_path.stem}{SIDECAR_SUFFIX}"  # 返回路径
+
+
+def write_nav_sidecar(map_json: Dict[str, Any], map_path: Path, binding: Dict[str, Any], output_dir: Optional[Path] = None, road_terrains: Sequence[str] = DEFAULT_ROAD_TERRAINS) -> Path:  # 定义导航文件写出函数
+    """计算并写出地图的导航数据文件，返回文件路径"""  # 函数说明
+    path = sidecar_path(map_path, output_dir)  # 计算路径
+    path.parent.mkdir(parents=True, exist_ok=True)  # 确保目录存在
+    path.write_text(json.dumps(build_nav(map_json, binding, road_terrains), ensure_ascii=False, indent=2) + "\n", encoding="utf-8")  # 写出文件
+    return path  # 返回路径
+
+
+def default_maps() -> List[Path]:  # 定义默认地图列表函数
+    """未指定地图时处理用户地图目录中的全部 Tiled JSON 地图"""  # 函数说明
+    if not USER_MAPS_DIR.is_dir():  # 目录不存在
+        return []  # 返回空列表
+    return sorted(path for path in USER_MAPS_DIR.glob("*.json") if not path.name.endswith(DERIVED_SUFFIXES))  # 排除已有附属文件
+
+
+def main() -> None:  # 定义脚本主入口
+    """为指定地图写出导航数据文件"""  # 函数说明
+    parser = argparse.ArgumentParser(description="为 Tiled 地图预计算通行位图、连通分量与到道路距离")  # 创建解析器
+    parser.add_argument("maps", nargs="*", type=Path, help="地图 JSON 路径，默认处理 assets/user_imports/maps")  # 添加地图参数
+    parser.add_argument("--binding", type=Path, default=BINDING_PATH, help="瓦片绑定表路径")  # 添加绑定表参数
+    parser.add_argument("--output-dir", type=Path, help="导航文件输出目录，默认与地图同目录")  # 添加输出目录参数
+    parser.add_argument("--road", nargs="+", default=list(DEFAULT_ROAD_TERRAINS), help="作为距离场起点的地形名称")  # 添加道路地形参数
+    args = parser.parse_args()  # 解析参数
+    binding = load_binding(args.binding)  # 读取绑定表
+    maps = args.maps or default_maps()  # 确定地图列表
+    if not maps:  # 没有可处理的地图
+        print("未找到需要处理的地图")  # 打印提示
+        return  # 结束
+    for map_path in maps:  # 遍历地图
+        map_json = json.loads(map_path.read_text(encoding="utf-8"))  # 读取地图
+        path = write_nav_sidecar(map_json, map_path, binding, args.output_dir, args.road)  # 写出导航数据
+        print(f"已生成导航数据: {path}")  # 打印提示
+
+
+if __name__ == "__main__":  # 判断是否直接执行脚本
+    main()  # 调用主函数
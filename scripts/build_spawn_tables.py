@@ -0,0 +1,179 @@
+"""按地形为地图格子标注生态区，并为 spawn_and_drops.json 的每个刷怪点预计算候选格子与权重别名表。"""  # 模块功能说明
+from __future__ import annotations  # 启用未来注解支持
+
+import argparse  # 导入命令行参数解析库
+import json  # 导入 JSON 序列化库
+import sys  # 导入 sys 以调整模块搜索路径
+from pathlib import Path  # 导入路径处理库
+from typing import Any, Dict, List, Optional, Sequence, Tuple  # 导入类型提示工具
+
+import numpy as np  # 导入 NumPy 进行向量化计算
+
+SCRIPT_ROOT = Path(__file__).resolve().parent  # 计算脚本目录
+if str(SCRIPT_ROOT.parent) not in sys.path:  # 确保仓库根目录在模块搜索路径中
+    sys.path.insert(0, str(SCRIPT_ROOT.parent))  # 插入仓库根目录
+
+from scripts.build_nav_sidecar import (  # 导入导航数据工具
+    BINDING_PATH,
+    default_maps,
+    load_binding,
+    map_passability,
+    pack_array,
+    passability_lut,
+    terrain_gids,
+    unpack_array,
+)  # 导入结束
+from scripts.utils_tiled_layers import GID_MASK, iter_tile_layers, layer_grid  # 导入图层拼装工具
+
+SPAWN_VERSION = 1  # 刷怪表格式版本
+SPAWN_SUFFIX = ".spawns.json"  # 刷怪表文件后缀
+SPAWN_CONFIG_PATH = Path("assets/data/spawn_and_drops.json")  # 刷怪配置路径
+BIOME_RULES: Tuple[Tuple[str, Dict[str, Any]], ...] = (  # 生态区规则，按顺序匹配，先匹配者优先
+    ("forest", {"ground": ("GRASS",), "near": ("TREE",), "radius": 2, "min": 3}),  # 半径 2 的方窗内至少 3 棵树的草地
+    ("field", {"ground": ("GRASS",)}),  # 其余草地
+)  # 规则结束
+NO_BIOME = 0  # 生态区标签中“无生态区”的取值
+
+
+def terrain_presence(map_json: Dict[str, Any], gids: Sequence[int], shape: Tuple[int, int], left: int, top: int) -> np.ndarray:  # 定义地形出现位图函数
+    """任一瓦片图层在该格放置了 gids 中的瓦片即为真，范围与 map_passability 的合并范围一致"""  # 函数说明
+    present = np.zeros(shape, dtype=bool)  # 初始化位图
+    for layer in iter_tile_layers(map_json):  # 遍历图层
+        grid, x, y = layer_grid(layer)  # 拼装网格
+        window = (slice(y - top, y - top + grid.shape[0]), slice(x - left, x - left + grid.shape[1]))  # 图层在合并范围中的位置
+        present[window] |= np.isin(grid & GID_MASK, gids)  # 标记出现
+    return present  # 返回结果
+
+
+def window_counts(mask: np.ndarray, radius: int) -> np.ndarray:  # 定义方窗计数函数
+    """用二维前缀和计算每格 (2r+1)×(2r+1) 方窗内真值的数量，越界部分按 0 计"""  # 函数说明
+    height, width = mask.shape  # 读取尺寸
+    table = np.zeros((height + 1, width + 1), dtype=np.int64)  # 前缀和表（首行首列为 0）
+    table[1:, 1:] = mask.astype(np.int64).cumsum(axis=0).cumsum(axis=1)  # 累加
+    rows, cols = np.arange(height), np.arange(width)  # 行列坐标
+    y0, y1 = np.clip(rows - radius, 0, height)[:, None], np.clip(rows + radius + 1, 0, height)[:, None]  # 窗口上下边界
+    x0, x1 = np.clip(cols - radius, 0, width)[None, :], np.clip(cols + radius + 1, 0, width)[None, :]  # 窗口左右边界
+    return table[y1, x1] - table[y0, x1] - table[y1, x0] + table[y0, x0]  # 容斥得到窗口和
+
+
+def tag_biomes(map_json: Dict[str, Any], binding: Dict[str, Any], rules: Sequence[Tuple[str, Dict[str, Any]]] = BIOME_RULES) -> Tuple[np.ndarray, List[str], np.ndarray, int, int]:  # 定义生态区标注函数
+    """返回 (生态区标签, 生态区名称, 通行位图, 原点 x, 原点 y)；标签 i 对应名称 names[i - 1]，只有可通行格子会被标注"""  # 函数说明
+    tilesets = map_json.get("tilesets", [])  # 读取图集列表
+    firstgid = int(tilesets[0].get("firstgid", 1)) if tilesets else 1  # 绑定表对应第一个图集
+    passable, ground, left, top = map_passability(map_json, passability_lut(binding, firstgid))  # 通行位图与地面 gid
+    tags = np.full(passable.shape, NO_BIOME, dtype=np.uint8)  # 初始化标签
+    names: List[str] = []  # 生态区名称
+    for index, (name, rule) in enumerate(rules, start=1):  # 按顺序应用规则
+        names.append(name)  # 记录名称
+        match = passable & (tags == NO_BIOME) & np.isin(ground, terrain_gids(binding, rule["ground"], firstgid))  # 地面符合且尚未标注
+        if rule.get("near"):  # 需要附近出现指定地形
+            near = terrain_presence(map_json, terrain_gids(binding, rule["near"], firstgid), passable.shape, left, top)  # 指定地形位图
+            match &= window_counts(near, int(rule.get("radius", 1))) >= int(rule.get("min", 1))  # 窗口内数量足够
+        tags[match] = index  # 写入标签
+    return tags, names, passable, left, top  # 返回结果
+
+
+def alias_table(weights: Sequence[float]) -> Tuple[np.ndarray, np.ndarray]:  # 定义别名表构建函数
+    """Vose 别名法：返回 (概率, 别名)；抽样时取均匀下标 i，以 prob[i] 的概率选 i，否则选 alias[i]"""  # 函数说明
+    scaled = np.asarray(weights, dtype=np.float64)  # 读取权重
+    if scaled.size == 0 or (scaled < 0).any() or scaled.sum() <= 0:  # 权重不合法
+        raise ValueError("候选权重必须非负且总和大于 0")  # 抛出错误
+    scaled = scaled * (scaled.size / scaled.sum())  # 归一化为平均值 1
+    prob = np.ones(scaled.size, dtype=np.float64)  # 初始化概率（剩余项为 1）
+    alias = np.arange(scaled.size, dtype=np.int64)  # 初始化别名（指向自身）
+    small = [index for index in range(scaled.size) if scaled[index] < 1.0]  # 不足 1 的列
+    large = [index for index in range(scaled.size) if scaled[index] >= 1.0]  # 不小于 1 的列
+    while small and large:  # 每次用一个大列补齐一个小列
+        less, more = small.pop(), large.pop()  # 取出一对
+        prob[less], alias[less] = scaled[less], more  # 小列剩余部分由大列填充
+        scaled[more] -= 1.0 - scaled[less]  # 大列扣除借出的部分
+        (small if scaled[more] < 1.0 else large).append(more)  # 按剩余量放回
+    return prob, alias  # 剩余列因浮点误差保持概率 1
+
+
+def build_spawns(map_json: Dict[str, Any], binding: Dict[str, Any], spawners: Dict[str, Any], rules: Sequence[Tuple[str, Dict[str, Any]]] = BIOME_RULES) -> Dict[str, Any]:  # 定义刷怪表构建函数
+    """为每个刷怪点列出其生态区内全部可通行格子（行优先下标），并附带候选权重的别名表"""  # 函数说明
+    tags, names, passable, left, top = tag_biomes(map_json, binding, rules)  # 标注生态区
+    height, width = passable.shape  # 读取尺寸
+    flat_tags = tags.reshape(-1)  # 展平标签
+    cells_by_biome = {name: np.flatnonzero(flat_tags == index) for index, name in enumerate(names, start=1)}  # 各生态区格子
+    tables: Dict[str, Any] = {}  # 刷怪点表
+    for spawner_id, spawner in spawners.items():  # 遍历刷怪点
+        biome = spawner.get("biome")  # 所需生态区
+        if biome not in cells_by_biome:  # 规则中没有该生态区
+            raise ValueError(f"刷怪点 {spawner_id} 的生态区 {biome} 未在生态区规则中定义")  # 抛出错误
+        candidates = spawner.get("candidates", [])  # 候选怪物
+        prob, alias = alias_table([float(candidate.get("weight", 1)) for candidate in candidates])  # 构建别名表
+        cells = cells_by_biome[biome]  # 候选格子
+        tables[spawner_id] = {  # 写入刷怪点
+            "biome": biome,  # 生态区
+            "time": spawner.get("time"),  # 时段，由运行时按昼夜过滤
+            "limit": spawner.get("limit"),  # 数量上限
+            "respawnSec": spawner.get("respawnSec"),  # 重生间隔
+            "cells": {"count": int(cells.size), "dtype": "<u4", "data": pack_array(cells.astype("<u4"))},  # 候选格子的行优先下标
+            "candidates": [candidate["id"] for candidate in candidates],  # 候选怪物 ID
+            "alias": {"prob": [round(float(value), 9) for value in prob], "alias": alias.tolist()},  # 候选权重别名表
+        }  # 刷怪点结束
+    return {  # 返回刷怪表
+        "version": SPAWN_VERSION,  # 格式版本
+        "width": width,  # 宽度（格）
+        "height": height,  # 高度（格）
+        "originX": left,  # 网格左上角在地图中的 X
+        "originY": top,  # 网格左上角在地图中的 Y
+        "encoding": "base64",  # 二进制字段编码
+        "compression": "zlib",  # 二进制字段压缩
+        "biomes": {"names": names, "counts": {name: int(cells.size) for name, cells in cells_by_biome.items()}, "dtype": "<u1", "data": pack_array(tags)},  # 生态区标签，0 为无生态区
+        "spawners": tables,  # 刷怪点表
+    }  # 刷怪表结束
+
+
+def load_spawner_cells(spawns: Dict[str, Any], spawner_id: str) -> np.ndarray:  # 定义候选格子读取函数
+    """解码某刷怪点的候选格子下标"""  # 函数说明
+    cells = spawns["spawners"][spawner_id]["cells"]  # 读取字段
+    return unpack_array(cells["data"], cells["dtype"], (cells["count"],)).astype(np.int64)  # 解码
+
+
+def sample_spawn(spawns: Dict[str, Any], spawner_id: str, rng: np.random.Generator, cells: Optional[np.ndarray] = None) -> Optional[Tuple[str, int, int]]:  # 定义单次刷怪抽样函数
+    """O(1) 抽取一次刷怪：均匀选一个候选格子，再用别名表按权重选怪物；返回 (怪物 ID, 地图 x, 地图 y)，没有候选格子时返回 None"""  # 函数说明
+    table = spawns["spawners"][spawner_id]  # 刷怪点表
+    cells = load_spawner_cells(spawns, spawner_id) if cells is None else cells  # 候选格子（运行时应缓存）
+    if cells.size == 0:  # 生态区不存在于地图中
+        return None  # 无法刷怪
+    cell = int(cells[rng.integers(cells.size)])  # 均匀选格子
+    column = int(rng.integers(len(table["candidates"])))  # 均匀选别名表列
+    pick = column if rng.random() < table["alias"]["prob"][column] else table["alias"]["alias"][column]  # 按概率选自身或别名
+    y, x = divmod(cell, int(spawns["width"]))  # 下标转坐标
+    return table["candidates"][pick], x + int(spawns["originX"]), y + int(spawns["originY"])  # 返回结果
+
+
+def spawns_path(map_path: Path, output_dir: Optional[Path] = None) -> Path:  # 定义刷怪表路径函数
+    """刷怪表与地图同名，后缀为 .spawns.json"""  # 函数说明
+    return (output_dir or map_path.parent) / f"{map_path.stem}{SPAWN_SUFFIX}"  # 返回路径
+
+
+def main() -> None:  # 定义脚本主入口
+    """为指定地图写出刷怪表"""  # 函数说明
+    parser = argparse.ArgumentParser(description="按生态区预计算刷怪候选格子与权重别名表")  # 创建解析器
+    parser.add_argument("maps", nargs="*", type=Path, help="地图 JSON 路径，默认处理 assets/user_imports/maps")  # 添加地图参数
+    parser.add_argument("--config", type=Path, default=SPAWN_CONFIG_PATH, help="刷怪配置路径")  # 添加配置参数
+    parser.add_argument("--binding", type=Path, default=BINDING_PATH, help="瓦片绑定表路径")  # 添加绑定表参数
+    parser.add_argument("--output-dir", type=Path, help="刷怪表输出目录，默认与地图同目录")  # 添加输出目录参数
+    args = parser.parse_args()  # 解析参数
+    maps = args.maps or default_maps()  # 确定地图列表
+    if not maps:  # 没有可处理的地图
+        print("未找到需要处理的地图")  # 打印提示
+        return  # 结束
+    binding = load_binding(args.binding)  # 读取绑定表
+    spawners = json.loads(args.config.read_text(encoding="utf-8")).get("spawners", {})  # 读取刷怪点
+    for map_path in maps:  # 遍历地图
+        map_json = json.loads(map_path.read_text(encoding="utf-8"))  # 读取地图
+        spawns = build_spawns(map_json, binding, spawners)  # 构建刷怪表
+        path = spawns_path(map_path, args.output_dir)  # 计算输出路径
+        path.parent.mkdir(parents=True, exist_ok=True)  # 确保目录存在
+        path.write_text(json.dumps(spawns, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")  # 写出文件
+        counts = ", ".join(f"{name}={count}" for name, count in spawns["biomes"]["counts"].items())  # 生态区格数
+        print(f"已生成刷怪表: {path}（{counts}）")  # 打印提示
+
+
+if __name__ == "__main__":  # 判断是否直接执行脚本
+    main()  # 调用主函数
@@ -0,0 +1,170 @@
+"""生成地形对之间的 47 格 blob 自动拼接过渡图集与邻接掩码查找表。"""  # 模块docstring中文说明
+from __future__ import annotations  # 启用未来注解支持
+
+import argparse  # 导入参数解析模块处理命令行输入
+import json  # 导入JSON库写出描述文件
+import sys  # 导入sys以调整模块搜索路径
+from pathlib import Path  # 导入Path类方便处理路径
+from typing import Dict, List, Sequence, Tuple  # 导入类型用于函数签名说明
+
+import numpy as np  # 导入NumPy进行向量化掩码合成
+from PIL import Image  # 导入Pillow保存PNG
+
+SCRIPT_ROOT = Path(__file__).resolve().parent  # 计算脚本目录
+if str(SCRIPT_ROOT.parent) not in sys.path:  # 确保仓库根目录在模块搜索路径中
+    sys.path.insert(0, str(SCRIPT_ROOT.parent))  # 插入仓库根目录
+
+from scripts.gen_tiles_and_player import SHEET_COLUMNS, compose_sheet, ensure_directory, find_spec, render_tile  # 复用基础绘制函数
+
+NORTH, NORTH_EAST, EAST, SOUTH_EAST, SOUTH, SOUTH_WEST, WEST, NORTH_WEST = (1 << bit for bit in range(8))  # 八邻域位定义（顺时针）
+NEIGHBOUR_OFFSETS: Tuple[Tuple[int, int, int], ...] = (  # 邻域位对应的 (位, dx, dy)
+    (NORTH, 0, -1),
+    (NORTH_EAST, 1, -1),
+    (EAST, 1, 0),
+    (SOUTH_EAST, 1, 1),
+    (SOUTH, 0, 1),
+    (SOUTH_WEST, -1, 1),
+    (WEST, -1, 0),
+    (NORTH_WEST, -1, -1),
+)  # 偏移定义结束
+CORNERS: Tuple[Tuple[int, int, int], ...] = (  # 角位及其相邻的两条边
+    (NORTH_EAST, NORTH, EAST),
+    (SOUTH_EAST, SOUTH, EAST),
+    (SOUTH_WEST, SOUTH, WEST),
+    (NORTH_WEST, NORTH, WEST),
+)  # 角位定义结束
+DEFAULT_PAIRS = ("GRASS:ROAD", "GRASS:WATER", "WATER:LAKE")  # 默认生成的地形对（前者为中心地形）
+BORDER_RATIO = 0.25  # 过渡带宽度占瓦片边长的比例
+FEATHER_PIXELS = 1.5  # 过渡边缘的羽化宽度
+
+
+def reduce_mask(mask: int) -> int:  # 定义掩码归约函数
+    """角位只有在相邻两条边都相同时才有意义，否则清除，从而把 256 种掩码归约为 47 种。"""  # 函数说明
+    for corner, edge_a, edge_b in CORNERS:  # 遍历四个角
+        if not (mask & edge_a and mask & edge_b):  # 任一相邻边不同
+            mask &= ~corner  # 清除角位
+    return mask  # 返回归约后的掩码
+
+
+def blob_masks() -> List[int]:  # 定义47种掩码列表函数
+    """返回升序排列的 47 种归约掩码，列表下标即过渡瓦片索引。"""  # 函数说明
+    return sorted({reduce_mask(mask) for mask in range(256)})  # 去重排序
+
+
+def build_lookup_table() -> np.ndarray:  # 定义查找表构建函数
+    """返回长度 256 的数组，把任意八邻域掩码映射到 0-46 的瓦片索引。"""  # 函数说明
+    index_of = {mask: index for index, mask in enumerate(blob_masks())}  # 掩码到索引的映射
+    return np.array([index_of[reduce_mask(mask)] for mask in range(256)], dtype=np.uint8)  # 生成查找表
+
+
+def feature_distances(tile_size: int) -> Tuple[np.ndarray, np.ndarray]:  # 定义距离场计算函数
+    """计算像素中心到四条边与四个角点的距离，返回 (4, t, t) 与 (4, t, t) 两组距离场。"""  # 函数说明
+    centers = np.arange(tile_size, dtype=np.float32) + 0.5  # 像素中心坐标
+    ys, xs = np.meshgrid(centers, centers, indexing="ij")  # 构造二维坐标
+    far = float(tile_size)  # 对侧边界坐标
+    edges = np.stack((ys, far - xs, far - ys, xs))  # 北、东、南、西边的距离
+    corners = np.stack(  # 东北、东南、西南、西北角点的距离
+        (
+            np.hypot(far - xs, ys),
+            np.hypot(far - xs, far - ys),
+            np.hypot(xs, far - ys),
+            np.hypot(xs, ys),
+        )
+    )  # 角点距离结束
+    return edges, corners  # 返回距离场
+
+
+def coverage_masks(tile_size: int, masks: Sequence[int]) -> np.ndarray:  # 定义覆盖率计算函数
+    """一次性为所有掩码计算中心地形的覆盖率，返回 (n, t, t) 浮点数组。"""  # 函数说明
+    edges, corners = feature_distances(tile_size)  # 计算距离场
+    features = np.concatenate((edges, corners))  # 合并为 (8, t, t)
+    mask_array = np.array(masks, dtype=np.int64)[:, None]  # 掩码列向量
+    edge_bits = np.array([NORTH, EAST, SOUTH, WEST], dtype=np.int64)  # 四条边的位
+    corner_bits = np.array([corner for corner, _a, _b in CORNERS], dtype=np.int64)  # 四个角的位
+    corner_edges = np.array([edge_a | edge_b for _c, edge_a, edge_b in CORNERS], dtype=np.int64)  # 角相邻两边的位
+    edge_active = (mask_array & edge_bits) == 0  # 邻居不同的边形成过渡带
+    corner_active = ((mask_array & corner_edges) == corner_edges) & ((mask_array & corner_bits) == 0)  # 两边相同而角不同形成内角
+    active = np.concatenate((edge_active, corner_active), axis=1)  # 合并为 (n, 8)
+    distance = np.where(active[:, :, None, None], features[None], np.inf).min(axis=1)  # 取最近的过渡特征距离
+    border = tile_size * BORDER_RATIO  # 过渡带宽度
+    return np.clip((distance - border) / FEATHER_PIXELS + 0.5, 0.0, 1.0)  # 羽化后的覆盖率
+
+
+def composite_blob_set(center: np.ndarray, outer: np.ndarray, masks: Sequence[int]) -> np.ndarray:  # 定义批量合成函数
+    """按覆盖率在中心地形与外围地形之间逐像素混合，返回 (n, t, t, 4) 瓦片数组。"""  # 函数说明
+    alpha = coverage_masks(center.shape[0], masks)[..., None]  # 计算覆盖率并扩展通道维
+    blended = center[None].astype(np.float32) * alpha + outer[None].astype(np.float32) * (1.0 - alpha)  # 线性混合
+    return np.clip(np.rint(blended), 0, 255).astype(np.uint8)  # 量化为uint8
+
+
+def neighbour_masks(same: np.ndarray, edge_same: bool = True) -> np.ndarray:  # 定义邻接掩码计算函数
+    """对布尔地形网格计算每格的八邻域掩码，edge_same 决定地图外视为同类还是异类。"""  # 函数说明
+    padded = np.pad(same, 1, constant_values=edge_same)  # 外圈填充
+    height, width = same.shape  # 读取网格尺寸
+    masks = np.zeros(same.shape, dtype=np.uint8)  # 初始化掩码
+    for bit, dx, dy in NEIGHBOUR_OFFSETS:  # 遍历邻域方向
+        masks |= np.where(padded[1 + dy : 1 + dy + height, 1 + dx : 1 + dx + width], bit, 0).astype(np.uint8)  # 叠加方向位
+    return masks  # 返回掩码
+
+
+def pick_autotiles(same: np.ndarray, lookup: np.ndarray, edge_same: bool = True) -> np.ndarray:  # 定义过渡瓦片选择函数
+    """在构建期为整张地图选择过渡瓦片索引，避免运行时逐帧判断。"""  # 函数说明
+    return lookup[neighbour_masks(same, edge_same)]  # 查表得到索引
+
+
+def parse_pair(text: str) -> Tuple[str, str]:  # 定义地形对解析函数
+    """解析 "CENTER:OUTER" 格式的地形对。"""  # 函数说明
+    center, sep, outer = text.partition(":")  # 拆分字符串
+    if not sep or not center or not outer:  # 格式不合法
+        raise ValueError(f"地形对格式应为 CENTER:OUTER：{text}")  # 抛出错误
+    return center.strip().upper(), outer.strip().upper()  # 返回规范化名称
+
+
+def generate_autotiles(output_dir: Path, tile_size: int, pairs: Sequence[str] = DEFAULT_PAIRS) -> Path:  # 定义自动拼接图集生成函数
+    """为每个地形对输出 47 格图集，并写出含查找表的描述 JSON。"""  # 函数说明
+    masks = blob_masks()  # 读取47种掩码
+    autotile_dir = output_dir / "tiles" / "autotiles"  # 计算输出目录
+    ensure_directory(autotile_dir)  # 确保目录存在
+    painted: Dict[str, np.ndarray] = {}  # 缓存已绘制的基础瓦片
+    entries = []  # 记录各地形对
+    for text in pairs:  # 遍历地形对
+        center, outer = parse_pair(text)  # 解析地形对
+        for name in (center, outer):  # 准备两种基础瓦片
+            if name not in painted:  # 尚未绘制
+                painted[name] = render_tile(find_spec(name), tile_size)  # 每种地形只绘制一次
+        tiles = composite_blob_set(painted[center], painted[outer], masks)  # 向量化合成47格
+        image_path = autotile_dir / f"{center.lower()}_{outer.lower()}.png"  # 计算图集路径
+        Image.fromarray(compose_sheet(list(tiles), tile_size), "RGBA").save(image_path, format="PNG")  # 保存图集
+        entries.append({"center": center, "outer": outer, "image": f"autotiles/{image_path.name}"})  # 记录信息
+    descriptor = {  # 构造描述文件
+        "tile_size": tile_size,  # 瓦片尺寸
+        "columns": SHEET_COLUMNS,  # 每行瓦片数
+        "tilecount": len(masks),  # 每个地形对的瓦片数
+        "bits": {"N": NORTH, "NE": NORTH_EAST, "E": EAST, "SE": SOUTH_EAST, "S": SOUTH, "SW": SOUTH_WEST, "W": WEST, "NW": NORTH_WEST},  # 位定义
+        "masks": masks,  # 每个瓦片对应的归约掩码
+        "lookup": build_lookup_table().tolist(),  # 256项掩码到瓦片索引的查找表
+        "pairs": entries,  # 地形对列表
+    }  # 描述结束
+    descriptor_path = output_dir / "tiles" / "autotiles.json"  # 描述文件路径
+    descriptor_path.write_text(json.dumps(descriptor, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")  # 写入描述
+    return descriptor_path  # 返回描述文件路径
+
+
+def parse_arguments() -> argparse.Namespace:  # 定义命令行参数解析函数
+    """解析命令行参数。"""  # 函数说明
+    parser = argparse.ArgumentParser(description="生成 47 格 blob 自动拼接过渡图集。")  # 创建解析器
+    parser.add_argument("--output", default="assets/build", help="素材输出目录，默认 assets/build。")  # 添加输出目录参数
+    parser.add_argument("--tile-size", type=int, default=32, help="瓦片像素尺寸，默认32。")  # 添加瓦片尺寸参数
+    parser.add_argument("--pairs", nargs="+", default=list(DEFAULT_PAIRS), help="地形对列表，格式 CENTER:OUTER。")  # 添加地形对参数
+    return parser.parse_args()  # 返回解析结果
+
+
+def main() -> None:  # 定义脚本主函数
+    """执行自动拼接图集生成。"""  # 函数说明
+    args = parse_arguments()  # 解析命令行参数
+    descriptor_path = generate_autotiles(Path(args.output), args.tile_size, args.pairs)  # 生成图集
+    print(f"自动拼接描述输出：{descriptor_path}")  # 输出描述路径提示
+
+
+if __name__ == "__main__":  # 判断是否直接执行脚本
+    main()  # 调用主函数
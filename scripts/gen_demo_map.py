@@ -2,11 +2,27 @@
 from __future__ import annotations  # 启用未来注解支持
 
 import argparse  # 导入命令行参数解析库
+import contextlib  # 导入上下文工具按需打开索引文件
 import json  # 导入 JSON 序列化库
-import math  # 导入数学函数库
+import math  # 导入数学函数库计算块数量
 import random  # 导入随机数库
+import sys  # 导入 sys 以调整模块搜索路径
+from collections import deque  # 导入双端队列管理在途任务
+from concurrent.futures import Future, ProcessPoolExecutor  # 导入进程池并行生成块
+from dataclasses import dataclass  # 导入数据类描述全局规划
 from pathlib import Path  # 导入路径处理库
-from typing import Dict, List, Tuple  # 导入类型提示工具
+from typing import Any, Deque, Dict, Iterator, Optional, TextIO, Tuple  # 导入类型提示工具
+
+import numpy as np  # 导入 NumPy 以数组方式生成地图
+
+SCRIPT_ROOT = Path(__file__).resolve().parent  # 计算脚本目录
+if str(SCRIPT_ROOT.parent) not in sys.path:  # 确保仓库根目录在模块搜索路径中
+    sys.path.insert(0, str(SCRIPT_ROOT.parent))  # 插入仓库根目录
+
+from scripts.build_chunk_index import CHUNKS_PLACEHOLDER as INDEX_PLACEHOLDER  # 导入块索引占位符
+from scripts.build_chunk_index import INDEX_CHUNK_SIZE, build_chunk_index, chunk_summaries, dump_index, index_header, index_path  # 导入块索引工具
+from scripts.build_nav_sidecar import BINDING_PATH, load_binding, write_nav_sidecar  # 导入导航数据生成工具
+from scripts.utils_tiled_layers import COMPRESSIONS, ENCODINGS, encode_gids, encode_layer  # 导入图层编码工具
 
 TILE_MAPPING: Dict[str, int] = {  # 定义地形名称到 gid 的映射表
     "GRASS": 1,  # 草地 gid
@@ -22,6 +38,11 @@ TILE_MAPPING: Dict[str, int] = {  # 定义地形名称到 gid 的映射表
 }  # 映射表定义结束
 
 OUTPUT_PATH = Path("frontend/pixi/maps/demo_map.json")  # 指定输出文件路径
+LAYOUT_PATH = Path("assets/build/tiles/tilesheet_layout.json")  # 图集生成脚本写出的布局描述
+CHUNKS_PLACEHOLDER = "__chunks__"  # 流式写出块数组时的占位符
+MASK64 = (1 << 64) - 1  # 64 位掩码
+PLAN_STREAM = MASK64  # 全局规划使用的保留流编号（块坐标为非负数，不会与之冲突）
+LAYOUT_KEYS = ("columns", "tilecount", "imagewidth", "imageheight", "margin", "spacing")  # 从布局写入图集配置的字段
 
 
 def build_parser() -> argparse.ArgumentParser:  # 定义构建解析器的函数
@@ -31,81 +52,153 @@ def build_parser() -> argparse.ArgumentParser:  # 定义构建解析器的函数
     parser.add_argument("--height", type=int, default=40, help="地图高度（格）")  # 添加高度参数
     parser.add_argument("--tile-size", type=int, default=32, help="瓦片尺寸")  # 添加瓦片尺寸参数
     parser.add_argument("--seed", type=int, default=42, help="随机种子")  # 添加随机种子参数
+    parser.add_argument("--output", default=str(OUTPUT_PATH), help="地图输出路径")  # 添加输出路径参数
+    parser.add_argument("--chunk-size", type=int, default=0, help="大于 0 时输出 Tiled 无限地图的分块格式")  # 添加分块尺寸参数
+    parser.add_argument("--encoding", choices=ENCODINGS, default="csv", help="图层数据编码：csv 为整数数组，base64 为二进制编码")  # 添加编码参数
+    parser.add_argument("--compression", choices=[name or "none" for name in COMPRESSIONS], default="zlib", help="base64 编码时的压缩方式")  # 添加压缩参数
+    parser.add_argument("--workers", type=int, default=1, help="分块模式下生成块的进程数，输出与进程数无关")  # 添加进程数参数
+    parser.add_argument("--no-chunk-index", action="store_true", help="不写出 .chunks.json 块索引")  # 添加关闭块索引开关
+    parser.add_argument("--nav", action="store_true", help="同时写出 .nav.json 导航数据（通行位图、连通分量、到道路距离）")  # 添加导航数据开关
+    parser.add_argument("--layout", default=str(LAYOUT_PATH), help="图集布局描述 JSON，存在时同步 margin/spacing 等字段")  # 添加布局参数
     return parser  # 返回解析器
 
 
-def set_tile(data: List[int], width: int, x: int, y: int, gid: int) -> None:  # 定义设置瓦片的辅助函数
-    """在数据数组中设置指定位置的 gid"""  # 提供函数文档字符串
-    if 0 <= x < width and 0 <= y < len(data) // width:  # 判断坐标是否越界
-        data[y * width + x] = gid  # 写入 gid 值
+def load_layout(path: Path) -> Optional[Dict[str, Any]]:  # 定义读取图集布局的函数
+    """读取 gen_tiles_and_player 写出的布局描述，文件不存在时返回 None"""  # 函数说明
+    if not path.is_file():  # 布局文件缺失
+        return None  # 使用默认图集配置
+    with path.open("r", encoding="utf-8") as fp:  # 打开布局文件
+        return json.load(fp)  # 解析并返回布局
+
+
+def set_tile(data: np.ndarray, x: int, y: int, gid: int) -> None:  # 定义设置瓦片的辅助函数
+    """在 (height, width) 网格中设置指定位置的 gid，越界时忽略"""  # 提供函数文档字符串
+    if 0 <= x < data.shape[1] and 0 <= y < data.shape[0]:  # 判断坐标是否越界
+        data[y, x] = gid  # 写入 gid 值
 
 
-def generate_road(data: List[int], width: int, height: int) -> None:  # 定义道路生成函数
-    """生成一条带有分支的主道路"""  # 函数说明
+def generate_road(data: np.ndarray, width: int, height: int) -> None:  # 定义道路生成函数
+    """生成一条带有分支的主道路；随机数逐列抽取以保持调用顺序，写入一次完成"""  # 函数说明
+    randint, uniform = random.randint, random.random  # 缓存随机函数引用
+    rows = np.empty(width, dtype=np.int64)  # 记录每列道路所在行
+    branches = np.empty(width, dtype=bool)  # 记录每列是否生成分支
     current_y = height // 2  # 初始化道路位置
-    for x in range(width):  # 遍历每一列
-        current_y = max(1, min(height - 2, current_y + random.randint(-1, 1)))  # 调整道路高度
-        set_tile(data, width, x, current_y, TILE_MAPPING["ROAD"])  # 设置道路瓦片
-        if random.random() < 0.3:  # 随机决定是否生成分支
-            set_tile(data, width, x, current_y - 1, TILE_MAPPING["TILE_FLOOR"])  # 设置分支瓦片
+    for x in range(width):  # 逐列推进（下一列依赖上一列）
+        current_y = max(1, min(height - 2, current_y + randint(-1, 1)))  # 调整道路高度
+        rows[x] = current_y  # 记录道路行
+        branches[x] = uniform() < 0.3  # 随机决定是否生成分支
+    columns = np.arange(width)  # 列索引；每列只写本列，写入之间互不覆盖
+    road = rows < height  # 过滤越界行（高度不足 3 时可能出现）
+    data[rows[road], columns[road]] = TILE_MAPPING["ROAD"]  # 写入道路
+    branch = branches & (rows - 1 < height)  # 分支位于道路上方一格
+    data[rows[branch] - 1, columns[branch]] = TILE_MAPPING["TILE_FLOOR"]  # 写入分支
 
 
-def generate_obstacles(data: List[int], width: int, height: int) -> None:  # 定义生成障碍物函数
-    """随机放置树木与岩石"""  # 函数说明
-    attempts = width * height // 20  # 计算尝试次数
-    for _ in range(attempts):  # 执行多次尝试
-        tx = random.randint(0, width - 1)  # 随机选择 X 坐标
-        ty = random.randint(0, height - 1)  # 随机选择 Y 坐标
-        if data[ty * width + tx] == TILE_MAPPING["GRASS"]:  # 仅在草地放置
-            data[ty * width + tx] = random.choice([TILE_MAPPING["TREE"], TILE_MAPPING["ROCK"]])  # 设置树或岩石
+def generate_obstacles(data: np.ndarray, width: int, height: int) -> None:  # 定义生成障碍物函数
+    """随机放置树木与岩石；是否抽取树/岩取决于当前格，必须按顺序逐次判断"""  # 函数说明
+    randint, choice = random.randint, random.choice  # 缓存随机函数引用
+    cells = data.reshape(-1).data  # 取一维内存视图，标量读写比 NumPy 索引快
+    grass = TILE_MAPPING["GRASS"]  # 草地 gid
+    options = [TILE_MAPPING["TREE"], TILE_MAPPING["ROCK"]]  # 候选障碍
+    for _ in range(width * height // 20):  # 执行多次尝试
+        tx = randint(0, width - 1)  # 随机选择 X 坐标
+        ty = randint(0, height - 1)  # 随机选择 Y 坐标
+        index = ty * width + tx  # 计算一维索引
+        if cells[index] == grass:  # 仅在草地放置
+            cells[index] = choice(options)  # 设置树或岩石
 
 
-def generate_structures(data: List[int], width: int, height: int) -> None:  # 定义生成建筑的函数
+def generate_structures(data: np.ndarray, width: int, height: int) -> None:  # 定义生成建筑的函数
     """放置房屋与墙壁装饰"""  # 函数说明
     for _ in range(5):  # 固定尝试次数
         hx = random.randint(2, width - 3)  # 随机房屋 X 坐标
         hy = random.randint(2, height - 3)  # 随机房屋 Y 坐标
-        set_tile(data, width, hx, hy, TILE_MAPPING["HOUSE"])  # 放置房屋瓦片
-        set_tile(data, width, hx + 1, hy, TILE_MAPPING["WALL"])  # 放置墙壁瓦片
-        set_tile(data, width, hx - 1, hy, TILE_MAPPING["WALL"])  # 放置墙壁瓦片
+        set_tile(data, hx, hy, TILE_MAPPING["HOUSE"])  # 放置房屋瓦片
+        set_tile(data, hx + 1, hy, TILE_MAPPING["WALL"])  # 放置墙壁瓦片
+        set_tile(data, hx - 1, hy, TILE_MAPPING["WALL"])  # 放置墙壁瓦片
 
 
-def generate_lake(data: List[int], width: int, height: int) -> None:  # 定义生成湖泊函数
-    """创建带有外圈水面的湖泊"""  # 函数说明
+def generate_lake(data: np.ndarray, width: int, height: int) -> None:  # 定义生成湖泊函数
+    """用广播计算距离场，创建带有外圈水面的湖泊"""  # 函数说明
     center_x = random.randint(width // 4, width * 3 // 4)  # 计算湖泊中心 X
     center_y = random.randint(height // 4, height * 3 // 4)  # 计算湖泊中心 Y
     radius = max(3, min(width, height) // 6)  # 计算湖泊半径
-    for y in range(height):  # 遍历所有行
-        for x in range(width):  # 遍历所有列
-            distance = math.hypot(x - center_x, y - center_y)  # 计算距离
-            if distance <= radius * 0.6:  # 判断是否在湖泊核心
-                set_tile(data, width, x, y, TILE_MAPPING["LAKE"])  # 设置湖泊瓦片
-            elif distance <= radius:  # 判断是否在外圈
-                if data[y * width + x] == TILE_MAPPING["GRASS"]:  # 确保当前为草地
-                    set_tile(data, width, x, y, TILE_MAPPING["WATER"])  # 设置水面瓦片
-
-
-def generate_lava(data: List[int], width: int, height: int) -> None:  # 定义生成岩浆的函数
-    """随机散布岩浆"""  # 函数说明
-    attempts = max(3, width * height // 80)  # 计算放置次数
-    for _ in range(attempts):  # 多次尝试
-        lx = random.randint(0, width - 1)  # 随机 X 坐标
-        ly = random.randint(0, height - 1)  # 随机 Y 坐标
-        set_tile(data, width, lx, ly, TILE_MAPPING["LAVA"])  # 设置岩浆瓦片
-
-
-def generate_map(width: int, height: int, tile_size: int, seed: int) -> Tuple[Dict, Dict[int, int]]:  # 定义生成地图的主函数
-    """根据参数生成地图数据并返回统计"""  # 函数说明
+    top, bottom = max(0, center_y - radius), min(height, center_y + radius + 1)  # 只处理湖泊包围盒内的行
+    left, right = max(0, center_x - radius), min(width, center_x + radius + 1)  # 只处理湖泊包围盒内的列
+    dy = np.arange(top, bottom, dtype=np.float64)[:, None] - center_y  # 行偏移列向量
+    dx = np.arange(left, right, dtype=np.float64)[None, :] - center_x  # 列偏移行向量
+    distance = np.sqrt(dx * dx + dy * dy)  # 整数平方和开方，与 math.hypot 结果一致
+    window = data[top:bottom, left:right]  # 包围盒视图
+    core = distance <= radius * 0.6  # 湖泊核心
+    ring = (distance <= radius) & ~core & (window == TILE_MAPPING["GRASS"])  # 外圈仅覆盖草地
+    window[core] = TILE_MAPPING["LAKE"]  # 设置湖泊瓦片
+    window[ring] = TILE_MAPPING["WATER"]  # 设置水面瓦片
+
+
+def generate_lava(data: np.ndarray, width: int, height: int) -> None:  # 定义生成岩浆的函数
+    """随机散布岩浆，坐标按原顺序抽取后一次性写入"""  # 函数说明
+    randint = random.randint  # 缓存随机函数引用
+    points = [(randint(0, width - 1), randint(0, height - 1)) for _ in range(max(3, width * height // 80))]  # 抽取全部坐标
+    xs, ys = np.array(points, dtype=np.int64).reshape(-1, 2).T  # 拆分坐标
+    data[ys, xs] = TILE_MAPPING["LAVA"]  # 设置岩浆瓦片
+
+
+def generate_grid(width: int, height: int, seed: int) -> np.ndarray:  # 定义网格生成函数
+    """按固定顺序执行各生成步骤，返回 (height, width) 的 uint8 gid 网格"""  # 函数说明
     random.seed(seed)  # 设置随机种子
-    data = [TILE_MAPPING["GRASS"] for _ in range(width * height)]  # 初始化地图数据为草地
+    data = np.full((height, width), TILE_MAPPING["GRASS"], dtype=np.uint8)  # 初始化地图数据为草地
     generate_road(data, width, height)  # 生成道路
     generate_obstacles(data, width, height)  # 生成障碍物
     generate_structures(data, width, height)  # 生成建筑
     generate_lake(data, width, height)  # 生成湖泊
     generate_lava(data, width, height)  # 生成岩浆
-    counts: Dict[int, int] = {gid: 0 for gid in TILE_MAPPING.values()}  # 初始化统计字典
-    for gid in data:  # 遍历所有瓦片
-        counts[gid] = counts.get(gid, 0) + 1  # 更新统计
+    return data  # 返回网格
+
+
+def count_tiles(data: np.ndarray) -> Dict[int, int]:  # 定义统计函数
+    """用 np.bincount 统计每种 gid 的数量"""  # 函数说明
+    totals = np.bincount(data.reshape(-1), minlength=max(TILE_MAPPING.values()) + 1)  # 计数
+    counts: Dict[int, int] = {gid: int(totals[gid]) for gid in TILE_MAPPING.values()}  # 按映射表输出
+    for gid in np.flatnonzero(totals).tolist():  # 补充映射表之外的 gid
+        counts.setdefault(gid, int(totals[gid]))  # 保持与旧实现一致的键集合
+    return counts  # 返回统计
+
+
+def generate_map(  # 定义生成地图的主函数
+    width: int,
+    height: int,
+    tile_size: int,
+    seed: int,
+    layout: Optional[Dict[str, Any]] = None,
+) -> Tuple[Dict, Dict[int, int]]:
+    """根据参数生成地图数据并返回统计，layout 提供时图集配置与实际图集布局一致"""  # 函数说明
+    grid = generate_grid(width, height, seed)  # 生成网格
+    counts = count_tiles(grid)  # 统计数量
+    data = grid.reshape(-1).tolist()  # 转为 Tiled 需要的整数列表
+    layer = {  # 地图图层配置
+        "id": 1,  # 图层 ID
+        "name": "Ground",  # 图层名称
+        "type": "tilelayer",  # 图层类型
+        "visible": True,  # 是否可见
+        "opacity": 1,  # 透明度
+        "width": width,  # 图层宽度
+        "height": height,  # 图层高度
+        "x": 0,  # 图层 X 位置
+        "y": 0,  # 图层 Y 位置
+        "data": data,  # 瓦片数据
+    }  # 地图图层配置结束
+    return build_map_json(width, height, tile_size, layer, layout), counts  # 返回结果
+
+
+def build_map_json(  # 定义地图结构构建函数
+    width: int,
+    height: int,
+    tile_size: int,
+    layer: Dict[str, Any],
+    layout: Optional[Dict[str, Any]] = None,
+    infinite: bool = False,
+) -> Dict[str, Any]:
+    """组装 Tiled 地图外层结构，图层由调用方提供"""  # 函数说明
     map_json = {  # 构建 Tiled JSON 结构
         "height": height,  # 地图高度
         "width": width,  # 地图宽度
@@ -113,23 +206,10 @@ def generate_map(width: int, height: int, tile_size: int, seed: int) -> Tuple[Di
         "tileheight": tile_size,  # 瓦片高度
         "orientation": "orthogonal",  # 地图方向
         "renderorder": "right-down",  # 渲染顺序
-        "infinite": False,  # 是否无限地图
+        "infinite": infinite,  # 是否无限地图
         "version": "1.10",  # Tiled 版本
         "tiledversion": "1.10.2",  # Tiled 具体版本
-        "layers": [  # 图层数组
-            {  # 地图图层配置
-                "id": 1,  # 图层 ID
-                "name": "Ground",  # 图层名称
-                "type": "tilelayer",  # 图层类型
-                "visible": True,  # 是否可见
-                "opacity": 1,  # 透明度
-                "width": width,  # 图层宽度
-                "height": height,  # 图层高度
-                "x": 0,  # 图层 X 位置
-                "y": 0,  # 图层 Y 位置
-                "data": data,  # 瓦片数据
-            }  # 地图图层配置结束
-        ],  # 图层数组结束
+        "layers": [layer],  # 图层数组
         "tilesets": [  # 图集数组
             {  # 图集配置
                 "firstgid": 1,  # 起始 gid
@@ -149,18 +229,243 @@ def generate_map(width: int, height: int, tile_size: int, seed: int) -> Tuple[Di
         "nextobjectid": 1,  # 下一个对象 ID
         "type": "map",  # 数据类型
     }  # 结构体构建完成
-    return map_json, counts  # 返回结果
+    if layout is not None and layout.get("tilewidth", tile_size) == tile_size:  # 布局与瓦片尺寸匹配
+        map_json["tilesets"][0].update({key: layout[key] for key in LAYOUT_KEYS if key in layout})  # 写入实际布局字段
+    return map_json  # 返回地图结构
+
+
+@dataclass(frozen=True)  # 使用不可变数据类描述全局规划
+class WorldPlan:  # 定义分块生成的全局规划
+    """跨块的全局要素：道路走向、房屋位置与湖泊参数，内存只与宽度成正比"""  # 类说明
+
+    width: int  # 地图宽度
+    height: int  # 地图高度
+    seed: int  # 随机种子
+    road_rows: np.ndarray  # 每列道路所在行
+    branches: np.ndarray  # 每列是否有分支
+    structures: Tuple[Tuple[int, int], ...]  # 房屋中心坐标
+    lake: Tuple[int, int, int]  # 湖泊中心与半径
+
+
+def counter_rng(seed: int, stream: int) -> np.random.Generator:  # 定义计数器随机流函数
+    """以 (seed, stream) 作为 Philox 密钥创建随机流；计数器从 0 开始，结果与调用时机无关"""  # 函数说明
+    return np.random.Generator(np.random.Philox(key=np.array([seed & MASK64, stream & MASK64], dtype=np.uint64)))  # 创建随机流
+
+
+def chunk_stream(chunk_x: int, chunk_y: int) -> int:  # 定义块流编号函数
+    """把块坐标打包为 64 位流编号：高 32 位为 cx，低 32 位为 cy"""  # 函数说明
+    return ((chunk_x & 0xFFFFFFFF) << 32) | (chunk_y & 0xFFFFFFFF)  # 打包坐标
+
+
+def plan_world(width: int, height: int, seed: int) -> WorldPlan:  # 定义全局规划函数
+    """用保留流编号的 Philox 随机流生成跨块要素，块内细节由各块自己的随机流决定"""  # 函数说明
+    rng = counter_rng(seed, PLAN_STREAM)  # 创建全局随机流
+    steps = rng.integers(-1, 2, size=width)  # 一次抽取全部道路步长
+    branches = rng.random(width) < 0.3  # 一次抽取全部分支
+    rows = np.empty(width, dtype=np.int32)  # 记录道路行
+    current_y = height // 2  # 初始化道路位置
+    for x, step in enumerate(steps.tolist()):  # 逐列累计（夹取使其无法用 cumsum 表达）
+        current_y = max(1, min(height - 2, current_y + step))  # 调整道路高度
+        rows[x] = current_y  # 记录道路行
+    xs = rng.integers(2, width - 2, size=5)  # 房屋 X 坐标
+    ys = rng.integers(2, height - 2, size=5)  # 房屋 Y 坐标
+    structures = tuple(zip(xs.tolist(), ys.tolist()))  # 房屋位置
+    center_x = int(rng.integers(width // 4, width * 3 // 4 + 1))  # 湖泊中心 X
+    center_y = int(rng.integers(height // 4, height * 3 // 4 + 1))  # 湖泊中心 Y
+    radius = max(3, min(width, height) // 6)  # 湖泊半径
+    return WorldPlan(width, height, seed, rows, branches, structures, (center_x, center_y, radius))  # 返回规划
+
+
+def render_chunk(plan: WorldPlan, chunk_x: int, chunk_y: int, chunk_size: int) -> np.ndarray:  # 定义单块渲染函数
+    """生成 (chunk_size, chunk_size) 的块数据，地图外的格子为 0；只依赖规划与块坐标"""  # 函数说明
+    x0, y0 = chunk_x * chunk_size, chunk_y * chunk_size  # 块左上角世界坐标
+    cols, rows = min(chunk_size, plan.width - x0), min(chunk_size, plan.height - y0)  # 块内有效列数与行数
+    chunk = np.zeros((chunk_size, chunk_size), dtype=np.uint8)  # 初始化块（地图外为空）
+    data = chunk[:rows, :cols]  # 有效区域视图
+    data[:] = TILE_MAPPING["GRASS"]  # 默认草地
+    road = plan.road_rows[x0 : x0 + cols].astype(np.int64) - y0  # 道路在块内的行
+    columns = np.arange(cols)  # 块内列索引
+    inside = (road >= 0) & (road < rows)  # 道路落在块内
+    data[road[inside], columns[inside]] = TILE_MAPPING["ROAD"]  # 写入道路
+    branch = plan.branches[x0 : x0 + cols] & (road - 1 >= 0) & (road - 1 < rows)  # 分支落在块内
+    data[road[branch] - 1, columns[branch]] = TILE_MAPPING["TILE_FLOOR"]  # 写入分支
+    rng = counter_rng(plan.seed, chunk_stream(chunk_x, chunk_y))  # 创建块随机流
+    grass = TILE_MAPPING["GRASS"]  # 草地 gid
+    attempts = rows * cols // 20  # 与整图相同的障碍密度
+    targets = rng.integers(0, rows * cols, size=attempts)  # 一次抽取全部尝试位置
+    kinds = np.where(rng.random(attempts) < 0.5, TILE_MAPPING["TREE"], TILE_MAPPING["ROCK"]).astype(np.uint8)  # 每次尝试的障碍类型
+    unique, first = np.unique(targets, return_index=True)  # 同一格只有第一次命中生效（之后已不是草地）
+    flat_rows, flat_cols = np.divmod(unique, cols)  # 转为二维坐标
+    hit = data[flat_rows, flat_cols] == grass  # 仅在草地放置
+    data[flat_rows[hit], flat_cols[hit]] = kinds[first[hit]]  # 写入障碍
+    for hx, hy in plan.structures:  # 放置房屋与墙壁
+        for dx, gid in ((0, TILE_MAPPING["HOUSE"]), (1, TILE_MAPPING["WALL"]), (-1, TILE_MAPPING["WALL"])):  # 房屋及两侧墙壁
+            tx, ty = hx + dx - x0, hy - y0  # 转为块内坐标
+            if 0 <= tx < cols and 0 <= ty < rows:  # 位于块内
+                data[ty, tx] = gid  # 写入瓦片
+    center_x, center_y, radius = plan.lake  # 读取湖泊参数
+    top, bottom = max(0, center_y - radius - y0), min(rows, center_y + radius + 1 - y0)  # 湖泊包围盒与块的交集（行）
+    left, right = max(0, center_x - radius - x0), min(cols, center_x + radius + 1 - x0)  # 湖泊包围盒与块的交集（列）
+    if top < bottom and left < right:  # 块与湖泊相交
+        dy = np.arange(top, bottom, dtype=np.float64)[:, None] + (y0 - center_y)  # 行偏移
+        dx = np.arange(left, right, dtype=np.float64)[None, :] + (x0 - center_x)  # 列偏移
+        distance = np.sqrt(dx * dx + dy * dy)  # 距离场
+        window = data[top:bottom, left:right]  # 交集视图
+        core = distance <= radius * 0.6  # 湖泊核心
+        ring = (distance <= radius) & ~core & (window == grass)  # 外圈仅覆盖草地
+        window[core] = TILE_MAPPING["LAKE"]  # 设置湖泊
+        window[ring] = TILE_MAPPING["WATER"]  # 设置水面
+    lava = rng.integers(0, rows * cols, size=rows * cols // 80)  # 与整图相同的岩浆密度
+    data[lava // cols, lava % cols] = TILE_MAPPING["LAVA"]  # 设置岩浆
+    return chunk  # 返回块数据
+
+
+def chunk_record(  # 定义块记录函数
+    plan: WorldPlan,
+    chunk_x: int,
+    chunk_y: int,
+    chunk_size: int,
+    encoding: str,
+    compression: str,
+    index_size: int = 0,
+) -> Tuple[np.ndarray, Optional[str], str]:
+    """渲染并序列化单个块，返回 (gid 计数, JSON 文本, 块索引文本)；只含草地的块文本为 None，index_size 为 0 时不生成索引"""  # 函数说明
+    chunk = render_chunk(plan, chunk_x, chunk_y, chunk_size)  # 渲染块
+    totals = np.bincount(chunk.reshape(-1), minlength=256)  # 统计（0 为地图外格子）
+    summaries = chunk_summaries(chunk, chunk_x * chunk_size, chunk_y * chunk_size, index_size, TILE_MAPPING["GRASS"]) if index_size else []  # 计算索引块摘要
+    index_text = ",".join("\n" + json.dumps(item, separators=(",", ":")) for item in summaries)  # 完全在地图外的索引块全为 0，不会出现在摘要中
+    if ((chunk == TILE_MAPPING["GRASS"]) | (chunk == 0)).all():  # 只含草地
+        return totals, None, index_text  # 跳过写出
+    payload = encode_gids(chunk.reshape(-1), compression) if encoding == "base64" else chunk.reshape(-1).tolist()  # 按编码方式准备数据
+    entry = {"data": payload, "height": chunk_size, "width": chunk_size, "x": chunk_x * chunk_size, "y": chunk_y * chunk_size}  # 块结构
+    return totals, json.dumps(entry, separators=(",", ":")), index_text  # 返回统计与文本
+
+
+_WORKER_PLAN: Optional[WorldPlan] = None  # 子进程持有的全局规划
+
+
+def _init_worker(plan: WorldPlan) -> None:  # 定义子进程初始化函数
+    """每个子进程只接收一次全局规划，任务参数仅含块坐标"""  # 函数说明
+    global _WORKER_PLAN  # 声明修改全局变量
+    _WORKER_PLAN = plan  # 保存规划
+
+
+def _chunk_job(job: Tuple[int, int, int, str, str, int]) -> Tuple[np.ndarray, Optional[str], str]:  # 定义子进程任务函数
+    """在子进程中渲染并序列化一个块"""  # 函数说明
+    assert _WORKER_PLAN is not None  # 规划必须已初始化
+    return chunk_record(_WORKER_PLAN, *job)  # 生成块记录
+
+
+def iter_chunk_records(  # 定义块记录迭代器
+    plan: WorldPlan,
+    chunk_size: int,
+    encoding: str = "csv",
+    compression: str = "zlib",
+    workers: int = 1,
+    index_size: int = 0,
+) -> Iterator[Tuple[np.ndarray, Optional[str], str]]:
+    """按行优先产出块记录；多进程时限制在途任务数量，结果顺序与进程数无关"""  # 函数说明
+    jobs = (  # 行优先的任务生成器
+        (chunk_x, chunk_y, chunk_size, encoding, compression, index_size)
+        for chunk_y in range(math.ceil(plan.height / chunk_size))
+        for chunk_x in range(math.ceil(plan.width / chunk_size))
+    )  # 任务生成器结束
+    if workers <= 1:  # 单进程
+        for job in jobs:  # 逐块生成
+            yield chunk_record(plan, *job)  # 产出记录
+        return  # 结束
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(plan,)) as executor:  # 创建进程池
+        pending: Deque[Future] = deque()  # 在途任务队列
+        for job in jobs:  # 提交任务
+            pending.append(executor.submit(_chunk_job, job))  # 提交一个块
+            if len(pending) >= workers * 4:  # 在途任务达到上限
+                yield pending.popleft().result()  # 按提交顺序取回最早的块
+        while pending:  # 取回剩余任务
+            yield pending.popleft().result()  # 按顺序产出
+
+
+def write_chunked_map(  # 定义分块地图写出函数
+    fp: TextIO,
+    width: int,
+    height: int,
+    tile_size: int,
+    seed: int,
+    chunk_size: int,
+    layout: Optional[Dict[str, Any]] = None,
+    encoding: str = "csv",
+    compression: str = "zlib",
+    workers: int = 1,
+    index_fp: Optional[TextIO] = None,
+) -> Dict[int, int]:
+    """以 Tiled 无限地图格式流式写出，跳过只含草地的块，返回 gid 统计；给出 index_fp 时同步流式写出块索引"""  # 函数说明
+    plan = plan_world(width, height, seed)  # 生成全局规划
+    layer = {  # 无限地图图层
+        "id": 1,  # 图层 ID
+        "name": "Ground",  # 图层名称
+        "type": "tilelayer",  # 图层类型
+        "visible": True,  # 是否可见
+        "opacity": 1,  # 透明度
+        "startx": 0,  # 块区域起点 X
+        "starty": 0,  # 块区域起点 Y
+        "width": width,  # 图层宽度
+        "height": height,  # 图层高度
+        "x": 0,  # 图层 X 位置
+        "y": 0,  # 图层 Y 位置
+        "properties": [{"name": "defaultGid", "type": "int", "value": TILE_MAPPING["GRASS"]}],  # 缺失块按草地处理
+        "chunks": CHUNKS_PLACEHOLDER,  # 块数组占位，稍后流式写入
+    }  # 图层结束
+    if encoding == "base64":  # 二进制编码时在图层上声明
+        layer.update({"encoding": "base64", "compression": compression})  # 写入编码字段
+    text = json.dumps(build_map_json(width, height, tile_size, layer, layout, infinite=True), ensure_ascii=False, indent=2)  # 先序列化外层结构
+    head, tail = text.split(json.dumps(CHUNKS_PLACEHOLDER), 1)  # 在占位处切开
+    fp.write(head + "[")  # 写出块数组之前的部分
+    index_size = 0  # 默认不生成索引
+    if index_fp is not None:  # 需要块索引
+        index_size = INDEX_CHUNK_SIZE if chunk_size % INDEX_CHUNK_SIZE == 0 else chunk_size  # 地图块不能整分时索引块与地图块一致
+        index = index_header(index_size, TILE_MAPPING["GRASS"])  # 索引头部
+        index["layers"].append({"id": layer["id"], "name": layer["name"], "chunks": INDEX_PLACEHOLDER})  # 图层占位
+        index_head, index_tail = json.dumps(index, ensure_ascii=False, indent=2).split(json.dumps(INDEX_PLACEHOLDER), 1)  # 在占位处切开
+        index_fp.write(index_head + "[")  # 写出索引块数组之前的部分
+    totals = np.zeros(256, dtype=np.int64)  # 累计 gid 数量
+    written = indexed = 0  # 已写出的地图块与索引批次数量
+    for counts, record, index_text in iter_chunk_records(plan, chunk_size, encoding, compression, workers, index_size):  # 逐块取回
+        totals += counts  # 累计统计
+        if record is not None:  # 含非草地瓦片才写出
+            fp.write(("," if written else "") + "\n" + record)  # 每块单独一行
+            written += 1  # 更新计数
+        if index_fp is not None and index_text:  # 写出索引摘要
+            index_fp.write(("," if indexed else "") + index_text)  # 每个索引块单独一行
+            indexed += 1  # 更新计数
+    fp.write("\n" + " " * 6 + "]" + tail)  # 写出剩余部分
+    if index_fp is not None:  # 收尾索引文件
+        index_fp.write("\n" + " " * 6 + "]" + index_tail + "\n")  # 写出索引剩余部分
+    return {gid: int(totals[gid]) for gid in np.flatnonzero(totals).tolist() if gid}  # 返回统计
 
 
 def main() -> None:  # 定义脚本主入口
     """脚本主入口"""  # 函数说明
     parser = build_parser()  # 构建解析器
     args = parser.parse_args()  # 解析命令行参数
-    map_json, counts = generate_map(args.width, args.height, args.tile_size, args.seed)  # 生成地图与统计
-    OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)  # 确保输出目录存在
-    with OUTPUT_PATH.open("w", encoding="utf-8") as fp:  # 打开输出文件
-        json.dump(map_json, fp, ensure_ascii=False, indent=2)  # 写入 JSON 文件
-    print(f"已生成地图文件: {OUTPUT_PATH}")  # 打印生成提示
+    if args.nav and args.chunk_size > 0:  # 分块模式不在内存中保留整图
+        parser.error("--nav 仅支持单层模式，分块地图请用 scripts/build_nav_sidecar.py 单独处理")  # 报告参数错误
+    layout = load_layout(Path(args.layout))  # 读取图集布局
+    output_path = Path(args.output)  # 解析输出路径
+    output_path.parent.mkdir(parents=True, exist_ok=True)  # 确保输出目录存在
+    compression = "" if args.compression == "none" else args.compression  # 解析压缩方式
+    with output_path.open("w", encoding="utf-8") as fp:  # 打开输出文件
+        if args.chunk_size > 0:  # 分块模式
+            with contextlib.ExitStack() as stack:  # 按需打开索引文件
+                index_fp = None if args.no_chunk_index else stack.enter_context(index_path(output_path).open("w", encoding="utf-8"))  # 块索引文件
+                counts = write_chunked_map(fp, args.width, args.height, args.tile_size, args.seed, args.chunk_size, layout, args.encoding, compression, args.workers, index_fp)  # 流式写出分块地图
+        else:  # 单层模式
+            map_json, counts = generate_map(args.width, args.height, args.tile_size, args.seed, layout)  # 生成地图与统计
+            if not args.no_chunk_index:  # 需要块索引
+                index_path(output_path).write_text(dump_index(build_chunk_index(map_json, INDEX_CHUNK_SIZE, TILE_MAPPING["GRASS"])), encoding="utf-8")  # 写出块索引
+            encode_layer(map_json["layers"][0], args.encoding, compression)  # 按参数编码图层
+            json.dump(map_json, fp, ensure_ascii=False, indent=2)  # 写入 JSON 文件
+    if args.nav:  # 需要导航数据
+        print(f"已生成导航数据: {write_nav_sidecar(map_json, output_path, load_binding(BINDING_PATH))}")  # 写出并提示
+    print(f"已生成地图文件: {output_path}")  # 打印生成提示
     for gid, count in sorted(counts.items()):  # 遍历统计信息
         print(f"gid {gid}: {count}")  # 打印每种地形数量
 
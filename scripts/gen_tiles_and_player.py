@@ -2,15 +2,30 @@
 from __future__ import annotations  # 引入未来注解以兼容前向引用类型
 
 import argparse  # 导入参数解析模块处理命令行输入
+import hashlib  # 导入摘要库计算瓦片规格指纹
+import inspect  # 导入inspect读取绘制函数源码作为指纹
+import json  # 导入JSON库写出变体描述文件
 import math  # 导入数学库用于计算网格布局
 import os  # 导入操作系统库以处理符号链接兼容性
 import shutil  # 导入文件操作库以复制资源
+import zlib  # 导入zlib计算地形名称的稳定校验值
+from concurrent.futures import ProcessPoolExecutor  # 导入进程池并行渲染大尺寸变体
 from dataclasses import dataclass  # 导入数据类装饰器表达瓦片配置
 from pathlib import Path  # 导入Path类方便处理路径
-from typing import Callable, Iterable, Tuple  # 导入类型用于函数签名说明
+from typing import Callable, Dict, Iterable, List, Optional, Tuple  # 导入类型用于函数签名说明
 
+import numpy as np  # 导入NumPy在像素数组上生成噪声与色彩抖动
 from PIL import Image, ImageDraw  # 从Pillow导入图像与绘图工具
 
+VARIANT_ENGINE_VERSION = 1  # 变体算法版本，调整噪声参数时递增以淘汰缓存
+VARIANT_NOISE_CELLS = 4  # 值噪声网格的单元数
+VARIANT_NOISE_STRENGTH = 0.14  # 噪声对亮度的最大影响比例
+VARIANT_JITTER_STRENGTH = 0.06  # 每个变体整体色彩抖动的标准差
+PROCESS_POOL_MIN_TILE = 128  # 瓦片边长达到该值时启用进程池
+DEFAULT_VARIANT_CACHE = Path("assets/.cache/tile_variants")  # 变体缓存目录
+MIP_LEVELS = (64, 32, 16, 8)  # 多分辨率图集的瓦片边长，由大到小逐级减半
+SHEET_COLUMNS = 8  # 图集每行瓦片数
+
 
 def paint_grass(draw: ImageDraw.ImageDraw, size: int) -> None:  # 定义草地纹理绘制函数
     """绘制草地瓦片的深浅绿色杂点纹理。"""  # 函数docstring中文描述
@@ -117,27 +132,329 @@ def ensure_directory(path: Path) -> None:  # 定义目录创建辅助函数
     path.mkdir(parents=True, exist_ok=True)  # 创建目录并忽略已存在错误
 
 
-def generate_tilesheet(output_dir: Path, tile_size: int) -> Path:  # 定义生成瓦片图集的函数
-    """根据配置生成包含所有地形的瓦片图集。"""  # 函数说明
-    columns = 8  # 固定每行展示8个瓦片
-    rows = math.ceil(len(TILE_ORDER) / columns)  # 计算需要的行数
-    sheet_width = columns * tile_size  # 计算图集宽度
-    sheet_height = rows * tile_size  # 计算图集高度
-    sheet = Image.new("RGBA", (sheet_width, sheet_height), (0, 0, 0, 0))  # 创建透明底图
-    for index, spec in enumerate(TILE_ORDER):  # 遍历每个瓦片配置
-        col = index % columns  # 计算列索引
-        row = index // columns  # 计算行索引
-        tile_image = Image.new("RGBA", (tile_size, tile_size), (0, 0, 0, 0))  # 创建单个瓦片画布
-        tile_draw = ImageDraw.Draw(tile_image)  # 获取绘图对象
-        spec.painter(tile_draw, tile_size)  # 调用配置的绘制函数
-        sheet.paste(tile_image, (col * tile_size, row * tile_size))  # 将瓦片贴到图集对应位置
+def render_tile(spec: TileSpec, tile_size: int) -> np.ndarray:  # 定义单瓦片渲染函数
+    """调用绘制函数渲染单个瓦片并返回 (tile, tile, 4) 像素数组。"""  # 函数说明
+    tile_image = Image.new("RGBA", (tile_size, tile_size), (0, 0, 0, 0))  # 创建单个瓦片画布
+    spec.painter(ImageDraw.Draw(tile_image), tile_size)  # 调用配置的绘制函数
+    return np.asarray(tile_image)  # 转换为NumPy数组
+
+
+def find_spec(name: str) -> TileSpec:  # 定义按名称查找规格的函数
+    """根据地形名称返回 TILE_ORDER 中的规格。"""  # 函数说明
+    for spec in TILE_ORDER:  # 遍历瓦片配置
+        if spec.name == name:  # 名称匹配
+            return spec  # 返回规格
+    raise KeyError(f"未知地形: {name}")  # 未找到时报错
+
+
+def spec_fingerprint(spec: TileSpec) -> str:  # 定义规格指纹函数
+    """以地形名称与绘制函数源码计算指纹，绘制逻辑变化时缓存自动失效。"""  # 函数说明
+    try:  # 读取源码可能失败
+        source = inspect.getsource(spec.painter)  # 读取绘制函数源码
+    except (OSError, TypeError):  # 动态函数无源码
+        source = repr(spec.painter)  # 退化为函数表示
+    payload = f"{VARIANT_ENGINE_VERSION}:{spec.name}:{source}"  # 组合指纹内容
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]  # 返回短指纹
+
+
+def edge_window(tile_size: int) -> np.ndarray:  # 定义边缘衰减窗口函数
+    """返回中心为1、四边为0的正弦窗口，保证变体边缘与基础瓦片一致可无缝拼接。"""  # 函数说明
+    ramp = np.sin(np.pi * (np.arange(tile_size) + 0.5) / tile_size)  # 计算一维正弦窗口
+    window = np.outer(ramp, ramp)  # 外积得到二维窗口
+    window[[0, -1], :] = 0.0  # 最外圈像素保持原样
+    window[:, [0, -1]] = 0.0  # 最外圈像素保持原样
+    return window  # 返回窗口
+
+
+def value_noise(rng: np.random.Generator, tile_size: int, cells: int = VARIANT_NOISE_CELLS) -> np.ndarray:  # 定义值噪声函数
+    """在 (cells+1)^2 随机网格上做平滑双线性插值，返回 [-1, 1] 范围的噪声。"""  # 函数说明
+    lattice = rng.uniform(-1.0, 1.0, (cells + 1, cells + 1))  # 生成随机网格
+    coords = (np.arange(tile_size) + 0.5) * cells / tile_size  # 计算像素中心的网格坐标
+    base = np.minimum(coords.astype(np.int64), cells - 1)  # 计算所在单元
+    frac = coords - base  # 计算单元内偏移
+    smooth = frac * frac * (3.0 - 2.0 * frac)  # smoothstep 平滑插值权重
+    top = lattice[base][:, base] * (1 - smooth)[None, :] + lattice[base][:, base + 1] * smooth[None, :]  # 上边插值
+    bottom = lattice[base + 1][:, base] * (1 - smooth)[None, :] + lattice[base + 1][:, base + 1] * smooth[None, :]  # 下边插值
+    return top * (1 - smooth)[:, None] + bottom * smooth[:, None]  # 纵向插值得到噪声
+
+
+def render_variant(base: np.ndarray, name: str, seed: int, index: int) -> np.ndarray:  # 定义变体渲染函数
+    """对基础瓦片施加种子确定的噪声与色彩抖动，index 为 0 时返回基础瓦片。"""  # 函数说明
+    if index == 0:  # 第0号变体即基础瓦片
+        return base.copy()  # 返回副本
+    rng = np.random.default_rng([seed, zlib.crc32(name.encode("utf-8")), index])  # 按种子、地形与序号建立独立随机流
+    tile_size = base.shape[0]  # 读取瓦片边长
+    window = edge_window(tile_size)  # 计算边缘窗口
+    noise = value_noise(rng, tile_size)  # 生成亮度噪声
+    jitter = rng.normal(0.0, VARIANT_JITTER_STRENGTH, 3)  # 生成RGB整体抖动
+    factor = 1.0 + window[..., None] * (VARIANT_NOISE_STRENGTH * noise[..., None] + jitter[None, None, :])  # 合成逐像素系数
+    rgb = base[..., :3].astype(np.float32) * factor  # 应用系数
+    result = base.copy()  # 复制基础瓦片保留alpha
+    result[..., :3] = np.clip(np.rint(rgb), 0, 255).astype(np.uint8)  # 写回RGB
+    return result  # 返回变体
+
+
+def _render_variant_job(job: Tuple[np.ndarray, str, int, int]) -> np.ndarray:  # 定义进程池任务函数
+    """进程池入口，解包参数后渲染单个变体。"""  # 函数说明
+    base, name, seed, index = job  # 解包任务
+    return render_variant(base, name, seed, index)  # 渲染变体
+
+
+def render_variants(  # 定义批量变体渲染函数
+    tile_size: int,
+    count: int,
+    seed: int,
+    cache_dir: Optional[Path] = None,
+    workers: Optional[int] = None,
+) -> Dict[str, List[np.ndarray]]:
+    """为每个地形渲染 count 个变体，按 (规格指纹, 尺寸, 种子, 序号) 缓存，重跑只重绘变化部分。"""  # 函数说明
+    variants: Dict[str, List[Optional[np.ndarray]]] = {spec.name: [None] * count for spec in TILE_ORDER}  # 初始化结果
+    jobs: List[Tuple[np.ndarray, str, int, int]] = []  # 待渲染任务
+    job_paths: List[Optional[Path]] = []  # 任务对应的缓存文件
+    for spec in TILE_ORDER:  # 遍历瓦片配置
+        fingerprint = spec_fingerprint(spec)  # 计算规格指纹
+        base: Optional[np.ndarray] = None  # 基础瓦片按需渲染
+        for index in range(count):  # 遍历变体序号
+            cache_path = cache_dir / f"{spec.name}-{tile_size}-{seed}-{index}-{fingerprint}.npy" if cache_dir else None  # 计算缓存路径
+            if cache_path is not None and cache_path.exists():  # 缓存命中
+                variants[spec.name][index] = np.load(cache_path)  # 读取缓存
+                continue  # 处理下一个
+            if base is None:  # 首次需要基础瓦片
+                base = render_tile(spec, tile_size)  # 渲染基础瓦片
+            jobs.append((base, spec.name, seed, index))  # 记录任务
+            job_paths.append(cache_path)  # 记录缓存路径
+    if tile_size >= PROCESS_POOL_MIN_TILE and len(jobs) > 1 and workers != 1:  # 大尺寸瓦片使用进程池
+        with ProcessPoolExecutor(max_workers=workers) as executor:  # 创建进程池
+            results = list(executor.map(_render_variant_job, jobs, chunksize=max(1, len(jobs) // 32)))  # 并行渲染
+    else:  # 小尺寸瓦片直接串行
+        results = [_render_variant_job(job) for job in jobs]  # 串行渲染
+    for (_base, name, _seed, index), cache_path, tile in zip(jobs, job_paths, results):  # 回填结果
+        variants[name][index] = tile  # 写入变体
+        if cache_path is not None:  # 需要写入缓存
+            ensure_directory(cache_path.parent)  # 确保缓存目录存在
+            np.save(cache_path, tile)  # 保存缓存
+    print(f"变体渲染: 新绘制 {len(jobs)} 个，复用缓存 {count * len(TILE_ORDER) - len(jobs)} 个")  # 输出统计
+    return variants  # 返回变体字典
+
+
+def generate_variant_sheet(  # 定义变体图集生成函数
+    output_dir: Path,
+    tile_size: int,
+    count: int,
+    seed: int,
+    cache_dir: Optional[Path] = None,
+    workers: Optional[int] = None,
+) -> Path:
+    """生成每行一个地形、每列一个变体的图集，并写出描述 JSON。"""  # 函数说明
+    variants = render_variants(tile_size, count, seed, cache_dir, workers)  # 渲染全部变体
+    sheet = np.zeros((len(TILE_ORDER) * tile_size, count * tile_size, 4), dtype=np.uint8)  # 创建透明底图
+    tiles: Dict[str, List[int]] = {}  # 记录每个地形的瓦片索引
+    for row, spec in enumerate(TILE_ORDER):  # 遍历地形
+        for col, tile in enumerate(variants[spec.name]):  # 遍历变体
+            sheet[row * tile_size : (row + 1) * tile_size, col * tile_size : (col + 1) * tile_size] = tile  # 写入像素
+        tiles[spec.name] = [row * count + col for col in range(count)]  # 记录索引
+    tiles_dir = output_dir / "tiles"  # 计算输出目录
+    ensure_directory(tiles_dir)  # 确保目录存在
+    sheet_path = tiles_dir / "tilesheet_variants.png"  # 变体图集路径
+    Image.fromarray(sheet, "RGBA").save(sheet_path, format="PNG")  # 保存变体图集
+    descriptor = {  # 构造描述文件
+        "image": sheet_path.name,  # 图集文件名
+        "tile_size": tile_size,  # 瓦片尺寸
+        "columns": count,  # 每行变体数
+        "variants": count,  # 每个地形的变体数
+        "seed": seed,  # 随机种子
+        "tiles": tiles,  # 地形到瓦片索引的映射
+    }  # 描述结束
+    descriptor_path = tiles_dir / "tilesheet_variants.json"  # 描述文件路径
+    descriptor_path.write_text(json.dumps(descriptor, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")  # 写入描述
+    return sheet_path  # 返回图集路径
+
+
+def next_power_of_two(value: int) -> int:  # 定义2的幂取整函数
+    """返回不小于 value 的最小2的幂。"""  # 函数说明
+    return 1 << max(0, value - 1).bit_length()  # 利用位长计算
+
+
+def atlas_layout(  # 定义图集布局计算函数
+    tile_count: int,
+    tile_size: int,
+    columns: int = SHEET_COLUMNS,
+    padding: int = 0,
+    extrude: int = 0,
+    power_of_two: bool = False,
+) -> Dict[str, int]:
+    """计算带间距与边缘外扩的图集布局，字段与 Tiled 图集的 margin/spacing 含义一致。"""  # 函数说明
+    if padding < 0 or extrude < 0:  # 校验参数
+        raise ValueError("padding 与 extrude 不能为负数")  # 抛出错误
+    margin = padding + extrude  # 首个瓦片距图集边缘的距离
+    spacing = padding + extrude * 2  # 相邻瓦片之间的距离（含两侧外扩像素）
+    rows = math.ceil(tile_count / columns)  # 计算行数
+    width = margin * 2 + columns * tile_size + (columns - 1) * spacing  # 计算紧凑宽度
+    height = margin * 2 + rows * tile_size + (rows - 1) * spacing  # 计算紧凑高度
+    if power_of_two:  # 需要2的幂尺寸
+        width = next_power_of_two(width)  # 宽度向上取整
+        columns = (width - margin * 2 + spacing) // (tile_size + spacing)  # 列数扩展到填满宽度，与引擎按图宽推算的列数一致
+        rows = math.ceil(tile_count / columns)  # 重新计算行数
+        height = next_power_of_two(margin * 2 + rows * tile_size + (rows - 1) * spacing)  # 高度向上取整
+    return {  # 返回布局
+        "tilewidth": tile_size,  # 瓦片宽度
+        "tileheight": tile_size,  # 瓦片高度
+        "tilecount": tile_count,  # 瓦片数量
+        "columns": columns,  # 每行瓦片数
+        "rows": rows,  # 行数
+        "margin": margin,  # 外边距
+        "spacing": spacing,  # 瓦片间距
+        "padding": padding,  # 透明间隙
+        "extrude": extrude,  # 边缘外扩像素
+        "imagewidth": width,  # 图集宽度
+        "imageheight": height,  # 图集高度
+    }  # 布局结束
+
+
+def compose_padded_sheet(tiles: List[np.ndarray], layout: Dict[str, int]) -> np.ndarray:  # 定义带外扩的图集拼接函数
+    """按布局放置瓦片，并把每个瓦片的边缘像素向外复制 extrude 圈，线性过滤时不会采到相邻瓦片。"""  # 函数说明
+    sheet = np.zeros((layout["imageheight"], layout["imagewidth"], 4), dtype=np.uint8)  # 创建透明底图
+    extrude = layout["extrude"]  # 读取外扩像素
+    step = layout["tilewidth"] + layout["spacing"]  # 相邻瓦片起点间距
+    for index, tile in enumerate(tiles):  # 遍历瓦片
+        row, col = divmod(index, layout["columns"])  # 计算行列索引
+        left = layout["margin"] + col * step - extrude  # 计算外扩块左上角X
+        top = layout["margin"] + row * step - extrude  # 计算外扩块左上角Y
+        block = np.pad(tile, ((extrude, extrude), (extrude, extrude), (0, 0)), mode="edge") if extrude else tile  # 复制边缘像素
+        sheet[top : top + block.shape[0], left : left + block.shape[1]] = block  # 写入像素
+    return sheet  # 返回图集数组
+
+
+def generate_tilesheet(  # 定义生成瓦片图集的函数
+    output_dir: Path,
+    tile_size: int,
+    padding: int = 0,
+    extrude: int = 0,
+    power_of_two: bool = False,
+    tiles: Optional[List[np.ndarray]] = None,
+) -> Path:
+    """根据配置生成包含所有地形的瓦片图集，并写出布局描述 tilesheet_layout.json；传入 tiles 时复用已渲染的瓦片。"""  # 函数说明
+    layout = atlas_layout(len(TILE_ORDER), tile_size, SHEET_COLUMNS, padding, extrude, power_of_two)  # 计算布局
+    if tiles is None:  # 未提供已渲染的瓦片
+        tiles = [render_tile(spec, tile_size) for spec in TILE_ORDER]  # 按目标边长渲染
+    sheet = compose_padded_sheet(tiles, layout)  # 拼接瓦片
     tiles_dir = output_dir / "tiles"  # 计算图集输出目录
     ensure_directory(tiles_dir)  # 确保目录存在
     tilesheet_path = tiles_dir / "tilesheet.png"  # 定义图集文件路径
-    sheet.save(tilesheet_path, format="PNG")  # 保存图集为PNG文件
+    Image.fromarray(sheet, "RGBA").save(tilesheet_path, format="PNG")  # 保存图集为PNG文件
+    layout_path = tiles_dir / "tilesheet_layout.json"  # 定义布局文件路径
+    layout_path.write_text(json.dumps({"image": tilesheet_path.name, **layout}, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")  # 写入布局
     return tilesheet_path  # 返回文件路径
 
 
+def compose_sheet(tiles: List[np.ndarray], tile_size: int, columns: int = SHEET_COLUMNS) -> np.ndarray:  # 定义图集拼接函数
+    """按行优先把瓦片数组拼接为 (rows*tile, columns*tile, 4) 图集数组。"""  # 函数说明
+    rows = math.ceil(len(tiles) / columns)  # 计算需要的行数
+    sheet = np.zeros((rows * tile_size, columns * tile_size, 4), dtype=np.uint8)  # 创建透明底图
+    for index, tile in enumerate(tiles):  # 遍历瓦片
+        row, col = divmod(index, columns)  # 计算行列索引
+        sheet[row * tile_size : (row + 1) * tile_size, col * tile_size : (col + 1) * tile_size] = tile  # 写入像素
+    return sheet  # 返回图集数组
+
+
+def downsample_box(pixels: np.ndarray) -> np.ndarray:  # 定义2x2盒式降采样函数
+    """以预乘alpha做2x2盒式滤波，避免透明像素的颜色渗入边缘。"""  # 函数说明
+    height, width = pixels.shape[0] // 2, pixels.shape[1] // 2  # 计算目标尺寸
+    data = pixels[: height * 2, : width * 2].astype(np.float32)  # 截取偶数区域并转为浮点
+    alpha = data[..., 3:4] / 255.0  # 归一化alpha
+    premultiplied = np.concatenate((data[..., :3] * alpha, data[..., 3:4]), axis=2)  # 预乘颜色
+    blocks = premultiplied.reshape(height, 2, width, 2, 4).mean(axis=(1, 3))  # 2x2块求均值
+    coverage = blocks[..., 3:4] / 255.0  # 降采样后的alpha比例
+    rgb = np.divide(blocks[..., :3], coverage, out=np.zeros_like(blocks[..., :3]), where=coverage > 0)  # 反预乘
+    result = np.concatenate((rgb, blocks[..., 3:4]), axis=2)  # 合并通道
+    return np.clip(np.rint(result), 0, 255).astype(np.uint8)  # 量化为uint8
+
+
+def is_power_fraction(size: int, top: int) -> bool:  # 定义2的幂分之一判断函数
+    """判断 size 是否为 top 的 2 的幂分之一（含 top 本身）。"""  # 函数说明
+    return size > 0 and top % size == 0 and (top // size) & (top // size - 1) == 0  # 整除且倍数为2的幂
+
+
+def downsample_chain(tiles: List[np.ndarray], top: int, sizes: List[int]) -> Dict[int, List[np.ndarray]]:  # 定义逐级降采样函数
+    """把边长为 top 的一组瓦片逐级盒式降采样，返回 sizes 中每个边长的瓦片数组。"""  # 函数说明
+    chain: Dict[int, List[np.ndarray]] = {}  # 记录各级瓦片
+    if not sizes:  # 没有需要输出的级别
+        return chain  # 返回空结果
+    sheet = compose_sheet(tiles, top)  # 紧凑拼接，2x2块不会跨越瓦片边界
+    positions = [divmod(index, SHEET_COLUMNS) for index in range(len(tiles))]  # 计算行列索引
+    size = top  # 当前级别边长
+    while True:  # 逐级处理直到最小级别
+        if size in sizes:  # 当前级别需要输出
+            chain[size] = [sheet[row * size : (row + 1) * size, col * size : (col + 1) * size] for row, col in positions]  # 切出各瓦片
+        if size == min(sizes):  # 已到最小级别
+            return chain  # 返回各级瓦片
+        sheet = downsample_box(sheet)  # 降采样到下一级
+        size //= 2  # 边长减半
+
+
+def render_tile_chain(  # 定义多分辨率瓦片渲染函数
+    sizes: Iterable[int],
+    base_size: int = 0,
+    base_tiles: Optional[List[np.ndarray]] = None,
+) -> Dict[int, List[np.ndarray]]:
+    """返回每个边长的瓦片数组；给出按 base_size 绘制的 base_tiles 时，其2的幂分之一的级别直接由它降采样，其余级别在最大边长绘制一次后逐级降采样。"""  # 函数说明
+    sizes = sorted(set(sizes), reverse=True)  # 去重并由大到小排序
+    chain: Dict[int, List[np.ndarray]] = {}  # 记录各级瓦片
+    if base_tiles is not None:  # 复用基础图集的瓦片
+        chain.update(downsample_chain(base_tiles, base_size, [size for size in sizes if is_power_fraction(size, base_size)]))  # 基础边长及其分级
+        sizes = [size for size in sizes if size not in chain]  # 剩余级别
+    if not sizes:  # 没有剩余级别
+        return chain  # 返回结果
+    top = sizes[0]  # 剩余级别中的最大边长
+    for size in sizes:  # 校验每级尺寸
+        if not is_power_fraction(size, top):  # 必须是最大边长的2的幂分之一
+            raise ValueError(f"mip 级别 {size} 不是 {top} 的 2 的幂分之一")  # 抛出错误
+    chain.update(downsample_chain([render_tile(spec, top) for spec in TILE_ORDER], top, sizes))  # 只在最大边长绘制一次
+    return chain  # 返回各级瓦片
+
+
+def generate_mip_chain(  # 定义多分辨率图集生成函数
+    output_dir: Path,
+    levels: Iterable[int] = MIP_LEVELS,
+    padding: int = 0,
+    extrude: int = 0,
+    power_of_two: bool = False,
+    chain: Optional[Dict[int, List[np.ndarray]]] = None,
+) -> Path:
+    """按与基础图集相同的 padding/extrude 布局输出各级图集与描述 JSON；传入 chain 时复用已降采样的瓦片。"""  # 函数说明
+    sizes = sorted(set(levels), reverse=True)  # 去重并由大到小排序
+    if chain is None:  # 未提供已渲染的瓦片
+        chain = render_tile_chain(sizes)  # 绘制一次并逐级降采样
+    mips_dir = output_dir / "tiles" / "mips"  # 计算输出目录
+    ensure_directory(mips_dir)  # 确保目录存在
+    entries = []  # 记录各级信息
+    for size in sizes:  # 逐级输出
+        layout = atlas_layout(len(TILE_ORDER), size, SHEET_COLUMNS, padding, extrude, power_of_two)  # 计算该级布局
+        image_path = mips_dir / f"tilesheet_{size}.png"  # 计算文件路径
+        Image.fromarray(compose_padded_sheet(chain[size], layout), "RGBA").save(image_path, format="PNG")  # 保存该级图集
+        entries.append({  # 记录信息
+            "tile_size": size,  # 瓦片边长
+            "image": f"mips/{image_path.name}",  # 图集文件
+            "width": layout["imagewidth"],  # 图集宽度
+            "height": layout["imageheight"],  # 图集高度
+            "columns": layout["columns"],  # 该级每行瓦片数
+            "margin": layout["margin"],  # 外边距
+            "spacing": layout["spacing"],  # 瓦片间距
+        })  # 信息结束
+    descriptor = {  # 构造描述文件
+        "columns": SHEET_COLUMNS,  # 每行瓦片数
+        "rows": math.ceil(len(TILE_ORDER) / SHEET_COLUMNS),  # 行数
+        "tiles": [spec.name for spec in TILE_ORDER],  # 瓦片顺序
+        "filter": "box-premultiplied",  # 降采样方式
+        "padding": padding,  # 透明间隙
+        "extrude": extrude,  # 边缘外扩像素
+        "levels": entries,  # 各级图集
+    }  # 描述结束
+    descriptor_path = output_dir / "tiles" / "tilesheet_mips.json"  # 描述文件路径
+    descriptor_path.write_text(json.dumps(descriptor, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")  # 写入描述
+    return descriptor_path  # 返回描述文件路径
+
+
 def generate_player_sprite(output_dir: Path, tile_size: int) -> Path:  # 定义生成玩家精灵图的函数
     """绘制四帧简易小人动画图集。"""  # 函数说明
     frame_count = 4  # 定义帧数量
@@ -184,6 +501,15 @@ def parse_arguments() -> argparse.Namespace:  # 定义命令行参数解析函
     parser.add_argument("--output", default="assets/build", help="素材输出目录，默认 assets/build。")  # 添加输出目录参数
     parser.add_argument("--tile-size", type=int, default=32, help="瓦片像素尺寸，默认32。")  # 添加瓦片尺寸参数
     parser.add_argument("--skip-frontend-mirror", action="store_true", help="跳过同步到前端目录的步骤。")  # 添加跳过同步选项
+    parser.add_argument("--padding", type=int, default=0, help="瓦片之间额外的透明间隙像素。")  # 添加间隙参数
+    parser.add_argument("--extrude", type=int, default=0, help="每个瓦片边缘向外复制的像素圈数。")  # 添加外扩参数
+    parser.add_argument("--power-of-two", action="store_true", help="图集宽高向上取整为2的幂。")  # 添加2的幂选项
+    parser.add_argument("--mip-levels", default=",".join(str(size) for size in MIP_LEVELS), help="多分辨率图集的瓦片边长列表，逗号分隔。")  # 添加mip级别参数
+    parser.add_argument("--skip-mips", action="store_true", help="跳过多分辨率图集输出。")  # 添加跳过mip选项
+    parser.add_argument("--variants", type=int, default=0, help="每个地形生成的变体数量，0 表示不生成。")  # 添加变体数量参数
+    parser.add_argument("--variant-seed", type=int, default=0, help="变体随机种子。")  # 添加变体种子参数
+    parser.add_argument("--variant-cache", default=str(DEFAULT_VARIANT_CACHE), help="变体缓存目录，传空字符串禁用缓存。")  # 添加缓存目录参数
+    parser.add_argument("--workers", type=int, default=None, help="大尺寸变体渲染的进程数，默认按CPU数量。")  # 添加进程数参数
     return parser.parse_args()  # 返回解析结果
 
 
@@ -192,8 +518,18 @@ def main() -> None:  # 定义脚本主函数
     args = parse_arguments()  # 解析命令行参数
     output_root = Path(args.output)  # 解析输出目录路径
     ensure_directory(output_root)  # 确保输出根目录存在
-    tilesheet_path = generate_tilesheet(output_root, args.tile_size)  # 生成瓦片图集
+    levels = [] if args.skip_mips else [int(item) for item in args.mip_levels.split(",") if item.strip()]  # 解析mip级别
+    base_tiles = [render_tile(spec, args.tile_size) for spec in TILE_ORDER]  # 基础图集直接按目标边长绘制
+    tilesheet_path = generate_tilesheet(output_root, args.tile_size, args.padding, args.extrude, args.power_of_two, base_tiles)  # 生成瓦片图集
     player_path = generate_player_sprite(output_root, args.tile_size)  # 生成玩家精灵
+    mips_path = None  # 初始化多分辨率描述路径
+    if levels:  # 需要输出多分辨率图集
+        chain = render_tile_chain(levels, args.tile_size, base_tiles)  # 与基础边长同级或更小的级别复用基础瓦片
+        mips_path = generate_mip_chain(output_root, levels, args.padding, args.extrude, args.power_of_two, chain)  # 生成mip链
+    variant_path = None  # 初始化变体图集路径
+    if args.variants > 0:  # 需要生成变体
+        cache_dir = Path(args.variant_cache) if args.variant_cache else None  # 解析缓存目录
+        variant_path = generate_variant_sheet(output_root, args.tile_size, args.variants, args.variant_seed, cache_dir, args.workers)  # 生成变体图集
     if not args.skip_frontend_mirror:  # 根据参数决定是否同步
         mirror_to_frontend((tilesheet_path, player_path), output_root)  # 将资源同步到前端目录
     print("地形索引对照表：")  # 打印标题提示
@@ -201,6 +537,10 @@ def main() -> None:  # 定义脚本主函数
         print(f"{index}: {spec.name}")  # 输出索引与名称
     print(f"瓦片图集输出：{tilesheet_path}")  # 输出图集路径提示
     print(f"玩家动画输出：{player_path}")  # 输出玩家图路径提示
+    if mips_path is not None:  # 生成了多分辨率图集
+        print(f"多分辨率描述输出：{mips_path}")  # 输出mip描述路径提示
+    if variant_path is not None:  # 生成了变体图集
+        print(f"地形变体输出：{variant_path}")  # 输出变体图集路径提示
 
 
 if __name__ == "__main__":  # 判断是否直接执行脚本
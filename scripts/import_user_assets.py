@@ -8,9 +8,18 @@ import argparse  # 解析命令行参数
 import json  # 处理 JSON 文本
 import logging  # 记录日志到文本文件
 import shutil  # 执行复制或移动操作但不生成二进制
+import sys  # 调整模块搜索路径
 from datetime import datetime, timezone  # 生成 UTC 时间戳
 from pathlib import Path  # 进行路径运算
-from typing import Dict, List, Optional, Tuple  # 类型提示辅助
+from typing import Any, Dict, List, Optional, Tuple  # 类型提示辅助
+
+SCRIPT_ROOT = Path(__file__).resolve().parent  # 计算脚本目录
+if str(SCRIPT_ROOT.parent) not in sys.path:  # 确保仓库根目录在模块搜索路径中
+    sys.path.insert(0, str(SCRIPT_ROOT.parent))  # 插入仓库根目录
+
+from scripts.utils_json_stream import write_json_stream  # 流式写出索引
+
+INDEX_FORMATS = ("pretty", "compact")  # index.json 由前端与其他脚本直接解析，只提供标准 JSON 格式
 
 # 默认规则映射，键为用户素材目录，值为 build 下的目标相对路径
 DEFAULT_RULES: Dict[str, str] = {
@@ -30,6 +39,20 @@ DEFAULT_RULES: Dict[str, str] = {
     "ui": "ui",  # 兼容旧结构
 }
 
+# 默认地形顺序，与 gen_tiles_and_player.TILE_ORDER 保持一致
+DEFAULT_TILE_ORDER: List[str] = [
+    "GRASS",  # 草地
+    "ROAD",  # 道路
+    "TILE_FLOOR",  # 瓷砖地板
+    "WATER",  # 水面
+    "LAKE",  # 湖泊
+    "WALL",  # 墙体
+    "TREE",  # 树木
+    "HOUSE",  # 房屋
+    "ROCK",  # 岩石
+    "LAVA",  # 岩浆
+]
+
 # 图像二级分类关键字，用于未匹配目录时简单判断
 TILE_KEYWORDS = ["tile", "battleback", "parallax", "world", "map"]  # 判定为瓦片
 UI_KEYWORDS = ["icon", "ui", "menu", "button", "cursor"]  # 判定为界面
@@ -49,6 +72,31 @@ def load_rules(rule_path: Optional[Path]) -> Dict[str, str]:
     return {key.lower(): value for key, value in merged.items()}  # 返回小写键映射
 
 
+def load_manifest(manifest_path: Path) -> Dict[str, Any]:
+    """读取 user_manifest.json，文件缺失时返回空配置。"""
+
+    if not manifest_path.exists():  # manifest 为可选文件
+        return {}  # 返回空配置以使用默认值
+    with manifest_path.open("r", encoding="utf-8") as handle:  # 读取 JSON 文本
+        data = json.load(handle)  # 解析 JSON 内容
+    if not isinstance(data, dict):  # 顶层必须为对象
+        raise ValueError(f"manifest 顶层必须为对象: {manifest_path}")  # 抛出异常
+    return data  # 返回配置
+
+
+def resolve_tile_bindings(bindings: Dict[str, Any]) -> Dict[str, int]:
+    """合并默认地形顺序与用户绑定，忽略 _comment 字段。"""
+
+    resolved = {name: index for index, name in enumerate(DEFAULT_TILE_ORDER)}  # 默认从0递增
+    for name, value in bindings.items():  # 遍历用户绑定
+        if name.startswith("_"):  # 跳过注释字段
+            continue  # 继续下一个
+        if isinstance(value, bool) or not isinstance(value, int) or value < 0:  # 索引必须为非负整数
+            raise ValueError(f"地形 {name} 的绑定必须为非负整数: {value!r}")  # 抛出异常
+        resolved[name] = value  # 覆盖默认索引
+    return resolved  # 返回合并结果
+
+
 def classify_graphics(sub_path: Path, logger: logging.Logger) -> str:
     """根据图形子目录名称推断目标分类。"""
 
@@ -148,6 +196,7 @@ def run_import(
     root: Path,
     move_mode: bool = False,
     rule_file: Optional[Path] = None,
+    json_format: str = "pretty",
 ) -> Dict[str, Dict[str, List[str]]]:
     """执行导入流程并返回索引结构。"""
 
@@ -211,9 +260,7 @@ def run_import(
     }
     ensure_directory(build_root)  # 确保 build 目录存在
     index_path = build_root / "index.json"  # 索引文件路径
-    with index_path.open("w", encoding="utf-8") as handle:  # 打开文本文件
-        json.dump(index_payload, handle, ensure_ascii=False, indent=2)  # 写入 JSON
-        handle.write("\n")  # 结尾换行
+    write_json_stream(index_path, index_payload, json_format, newline=True)  # 逐条目写入 JSON 并以换行结尾
     logger.info("[INFO] Wrote index: %s", index_path.as_posix())  # 记录索引写入
     logger.info("[DONE] Import finished without binary generation.")  # 完成日志
     print("[DONE] Import finished without binary generation.")  # 控制台提示
@@ -229,6 +276,7 @@ def parse_arguments() -> argparse.Namespace:
     parser.add_argument("--move", action="store_true", help="是否将文件移动而非复制")  # move 参数
     parser.add_argument("--rules", type=str, help="自定义规则 JSON 路径", default=None)  # 规则文件参数
     parser.add_argument("--root", type=str, help="指定仓库根目录，默认为脚本上级", default=None)  # 自定义根目录
+    parser.add_argument("--json-format", choices=INDEX_FORMATS, default="pretty", help="index.json 格式：pretty（默认）或 compact")  # 输出格式参数
     return parser.parse_args()  # 返回解析结果
 
 
@@ -239,7 +287,7 @@ def main() -> None:
     root = Path(args.root).resolve() if args.root else Path(__file__).resolve().parents[1]  # 计算根目录
     rules_path = Path(args.rules).resolve() if args.rules else None  # 解析规则路径
     try:  # 捕获运行过程中的异常
-        run_import(root, move_mode=args.move, rule_file=rules_path)  # 执行导入
+        run_import(root, move_mode=args.move, rule_file=rules_path, json_format=args.json_format)  # 执行导入
     except Exception as error:  # 捕获异常
         print(f"[ERROR] {error}")  # 控制台输出错误
         raise  # 重新抛出以便上层处理
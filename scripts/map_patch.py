@@ -0,0 +1,233 @@
+"""逐格比较两张 Tiled 地图并生成紧凑的游程补丁，应用补丁可逐字节还原新地图。"""  # 模块功能说明
+from __future__ import annotations  # 启用未来注解支持
+
+import argparse  # 导入命令行参数解析库
+import copy  # 导入 copy 复制地图骨架
+import hashlib  # 导入 hashlib 校验补丁前后的地图
+import json  # 导入 JSON 序列化库
+import struct  # 导入 struct 读写补丁头部
+import sys  # 导入 sys 以调整模块搜索路径
+import zlib  # 导入 zlib 压缩补丁主体
+from pathlib import Path  # 导入路径处理库
+from typing import Any, Dict, List, Optional, Tuple  # 导入类型提示工具
+
+import numpy as np  # 导入 NumPy 进行向量化比较
+
+SCRIPT_ROOT = Path(__file__).resolve().parent  # 计算脚本目录
+if str(SCRIPT_ROOT.parent) not in sys.path:  # 确保仓库根目录在模块搜索路径中
+    sys.path.insert(0, str(SCRIPT_ROOT.parent))  # 插入仓库根目录
+
+from scripts.utils_tiled_layers import encode_gids, iter_tile_layers, layer_grid  # 导入图层编解码工具
+
+PATCH_MAGIC = b"MWP1"  # 补丁文件魔数与版本
+MERGE_GAP = 2  # 两段变化之间相同格子不超过该数量时合并为一段（每段头部 8 字节，每格 4 字节）
+MAP_FORMATS = ("pretty", "chunked")  # 支持还原的排版：pretty 为 indent=2，chunked 为 gen_demo_map 分块模式的每块一行
+CHUNKS_MARKER = "\u0000chunks:{}\u0000"  # 分块排版时替换块数组的占位字符串
+
+
+def canonical_text(map_json: Dict[str, Any]) -> str:  # 定义规范序列化函数
+    """与 gen_demo_map 单层模式写出的格式一致，补丁的基准校验基于该文本"""  # 函数说明
+    return json.dumps(map_json, ensure_ascii=False, indent=2)  # 返回文本
+
+
+def chunked_text(map_json: Dict[str, Any]) -> str:  # 定义分块排版序列化函数
+    """与 gen_demo_map 分块模式写出的格式一致：外层 indent=2，块数组中每块紧凑地单独一行"""  # 函数说明
+    skeleton = copy.copy(map_json)  # 浅复制外层
+    skeleton["layers"] = [dict(layer) for layer in map_json.get("layers", [])]  # 复制图层字典
+    chunk_lists = []  # 记录被替换的块数组
+    for layer in skeleton["layers"]:  # 遍历图层
+        if isinstance(layer.get("chunks"), list):  # 分块图层
+            chunk_lists.append(layer["chunks"])  # 保存块数组
+            layer["chunks"] = CHUNKS_MARKER.format(len(chunk_lists) - 1)  # 替换为占位符
+    text = json.dumps(skeleton, ensure_ascii=False, indent=2)  # 序列化外层
+    for position, chunks in enumerate(chunk_lists):  # 逐个还原块数组
+        marker = json.dumps(CHUNKS_MARKER.format(position), ensure_ascii=False)  # 占位符文本
+        start = text.index(marker)  # 占位符位置
+        line = text[:start].rsplit("\n", 1)[-1]  # 占位符所在行的前半部分
+        indent = len(line) - len(line.lstrip(" "))  # 所在行的缩进
+        rows = "".join(("," if index else "") + "\n" + json.dumps(chunk, ensure_ascii=False, separators=(",", ":")) for index, chunk in enumerate(chunks))  # 每块单独一行
+        text = text[:start] + "[" + rows + "\n" + " " * indent + "]" + text[start + len(marker) :]  # 替换占位符
+    return text  # 返回文本
+
+
+def map_text(map_json: Dict[str, Any], text_format: str = "pretty") -> str:  # 定义按排版序列化函数
+    """按补丁记录的排版序列化地图"""  # 函数说明
+    if text_format not in MAP_FORMATS:  # 校验排版名称
+        raise ValueError(f"不支持的地图排版: {text_format}")  # 抛出错误
+    return chunked_text(map_json) if text_format == "chunked" else canonical_text(map_json)  # 返回文本
+
+
+def detect_format(text: str, map_json: Dict[str, Any]) -> Optional[str]:  # 定义排版识别函数
+    """返回能逐字节重现 text 的排版名称，都不匹配时返回 None"""  # 函数说明
+    for text_format in MAP_FORMATS:  # 依次尝试
+        if map_text(map_json, text_format) == text:  # 逐字节一致
+            return text_format  # 返回排版
+    return None  # 无法重现
+
+
+def text_digest(text: str) -> str:  # 定义文本摘要函数
+    """计算 UTF-8 文本的 sha256"""  # 函数说明
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()  # 返回摘要
+
+
+def change_runs(old: np.ndarray, new: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:  # 定义变化游程函数
+    """向量化比较两个等长一维数组，返回合并短间隔后的 (起点, 长度)"""  # 函数说明
+    changed = np.concatenate(([False], old != new, [False])).astype(np.int8)  # 两端补 False 便于求边界
+    edges = np.diff(changed)  # 1 为段起点，-1 为段终点
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)  # 各段的半开区间
+    if starts.size > 1:  # 合并间隔很短的相邻段
+        keep = np.concatenate(([True], starts[1:] - ends[:-1] > MERGE_GAP))  # 间隔足够大时保留为新段
+        starts, ends = starts[keep], ends[np.concatenate((keep[1:], [True]))]  # 合并后的起点与终点
+    return starts, ends - starts  # 返回起点与长度
+
+
+def strip_layer_data(layer: Dict[str, Any]) -> None:  # 定义图层数据清除函数
+    """就地把图层 data 与各块 data 置空，只保留结构字段"""  # 函数说明
+    if "data" in layer:  # 单层数据
+        layer["data"] = None  # 清除数据
+    for chunk in layer.get("chunks", []):  # 分块数据
+        chunk["data"] = None  # 清除数据
+
+
+def fill_layer_data(layer: Dict[str, Any], grid: np.ndarray, origin: Tuple[int, int]) -> None:  # 定义图层数据回填函数
+    """按图层自身的编码方式把网格写回 data 或各块 data"""  # 函数说明
+    base64_layer = layer.get("encoding") == "base64"  # 是否为二进制编码
+    compression = layer.get("compression", "")  # 压缩方式
+
+    def encode(gids: np.ndarray) -> Any:  # 定义单段编码函数
+        return encode_gids(gids, compression) if base64_layer else gids.astype(np.int64).tolist()  # 按编码方式输出
+
+    if "data" in layer:  # 单层数据
+        layer["data"] = encode(grid.reshape(-1))  # 写回数据
+    for chunk in layer.get("chunks", []):  # 分块数据
+        x, y = int(chunk["x"]) - origin[0], int(chunk["y"]) - origin[1]  # 块在网格中的位置
+        chunk["data"] = encode(grid[y : y + int(chunk["height"]), x : x + int(chunk["width"])].reshape(-1))  # 写回块数据
+
+
+def reencodes_exactly(layer: Dict[str, Any], grid: np.ndarray, origin: Tuple[int, int]) -> bool:  # 定义重新编码校验函数
+    """按图层自身的编码方式重新编码网格，判断能否得到与原图层逐字节相同的 data（其他工具的压缩级别可能不同）"""  # 函数说明
+    if layer.get("encoding") != "base64":  # 整数数组总能原样还原
+        return True  # 直接通过
+    probe = {key: value for key, value in layer.items() if key != "chunks"}  # 浅复制图层
+    if "chunks" in layer:  # 分块图层
+        probe["chunks"] = [dict(chunk) for chunk in layer["chunks"]]  # 复制块字典
+    fill_layer_data(probe, grid, origin)  # 重新编码
+    return probe.get("data") == layer.get("data") and [chunk["data"] for chunk in probe.get("chunks", [])] == [chunk["data"] for chunk in layer.get("chunks", [])]  # 比较数据
+
+
+def diff_maps(old_map: Dict[str, Any], new_map: Dict[str, Any], text_format: str = "pretty") -> bytes:  # 定义补丁生成函数
+    """比较两张地图的全部瓦片图层，返回补丁字节；新地图的非瓦片字段以去掉数据的骨架形式携带，text_format 为新地图文件的排版；无法原样重新编码的图层连同原始数据放入骨架"""  # 函数说明
+    old_layers = [layer_grid(layer) for layer in iter_tile_layers(old_map)]  # 旧地图网格
+    skeleton = copy.deepcopy(new_map)  # 新地图骨架
+    layers: List[Dict[str, Any]] = []  # 图层描述
+    arrays: List[np.ndarray] = []  # 二进制数组
+    for index, layer in enumerate(iter_tile_layers(skeleton)):  # 遍历新地图图层
+        grid, origin_x, origin_y = layer_grid(layer)  # 新网格
+        flat = grid.reshape(-1).astype(np.uint32)  # 展平
+        same_shape = index < len(old_layers) and old_layers[index][0].shape == grid.shape and old_layers[index][1:] == (origin_x, origin_y)  # 能否逐格比较
+        if not reencodes_exactly(layer, grid, (origin_x, origin_y)):  # 重新编码与原数据不一致
+            layers.append({"height": int(grid.shape[0]), "width": int(grid.shape[1]), "origin": [origin_x, origin_y], "runs": 0, "base": None, "raw": True})  # 图层描述
+            arrays.extend((np.zeros(0, dtype="<u4"),) * 3)  # 不记录游程
+            continue  # 骨架保留原始数据
+        if same_shape:  # 尺寸一致时只记录变化
+            starts, lengths = change_runs(old_layers[index][0].reshape(-1), flat)  # 计算变化游程
+        else:  # 尺寸变化或新增图层时整体替换
+            starts, lengths = np.zeros(1 if flat.size else 0, dtype=np.int64), np.full(1 if flat.size else 0, flat.size, dtype=np.int64)  # 一段覆盖全部
+        covered = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths) + np.arange(int(lengths.sum()))  # 各段覆盖的下标
+        layers.append({"height": int(grid.shape[0]), "width": int(grid.shape[1]), "origin": [origin_x, origin_y], "runs": int(starts.size), "base": index if same_shape else None})  # 图层描述
+        arrays.extend((np.diff(starts, prepend=0).astype("<u4"), lengths.astype("<u4"), flat[covered].astype("<u4")))  # 起点差分、长度与新值
+        strip_layer_data(layer)  # 骨架中去掉数据
+    header = json.dumps({  # 补丁头部
+        "baseSha256": text_digest(canonical_text(old_map)),  # 旧地图规范文本摘要
+        "targetSha256": text_digest(map_text(new_map, text_format)),  # 新地图按原排版序列化后的文本摘要
+        "format": text_format,  # 新地图文件的排版
+        "layers": layers,  # 图层描述
+        "skeleton": skeleton,  # 新地图骨架
+    }, ensure_ascii=False, separators=(",", ":")).encode("utf-8")  # 头部结束
+    body = struct.pack("<I", len(header)) + header + b"".join(array.tobytes() for array in arrays)  # 拼接主体
+    return PATCH_MAGIC + zlib.compress(body, 9)  # 返回补丁
+
+
+def read_patch(patch: bytes) -> Tuple[Dict[str, Any], List[Tuple[np.ndarray, np.ndarray, np.ndarray]]]:  # 定义补丁解析函数
+    """解析补丁，返回头部与每层的 (起点, 长度, 新值)"""  # 函数说明
+    if patch[:4] != PATCH_MAGIC:  # 校验魔数
+        raise ValueError("不是有效的地图补丁文件")  # 抛出错误
+    body = zlib.decompress(patch[4:])  # 解压主体
+    (header_size,) = struct.unpack_from("<I", body)  # 头部长度
+    header = json.loads(body[4 : 4 + header_size].decode("utf-8"))  # 解析头部
+    offset = 4 + header_size  # 数组起始位置
+    runs: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []  # 每层游程
+
+    def take(count: int) -> np.ndarray:  # 定义顺序读取函数
+        nonlocal offset  # 修改外层偏移
+        values = np.frombuffer(body, dtype="<u4", count=count, offset=offset).astype(np.int64)  # 读取数组
+        offset += 4 * count  # 前进
+        return values  # 返回数组
+
+    for layer in header["layers"]:  # 逐层读取
+        starts = np.cumsum(take(layer["runs"]))  # 还原起点
+        lengths = take(layer["runs"])  # 读取长度
+        runs.append((starts, lengths, take(int(lengths.sum()))))  # 读取新值
+    return header, runs  # 返回结果
+
+
+def apply_patch_text(old_map: Dict[str, Any], patch: bytes, verify: bool = True) -> Tuple[Dict[str, Any], str]:  # 定义补丁应用函数
+    """把补丁应用到旧地图，返回新地图及按原排版序列化的文本；verify 为真时校验基准与目标文本的摘要"""  # 函数说明
+    header, runs = read_patch(patch)  # 解析补丁
+    if verify and text_digest(canonical_text(old_map)) != header["baseSha256"]:  # 旧地图不匹配
+        raise ValueError("补丁的基准地图与当前地图不一致")  # 抛出错误
+    old_layers = [layer_grid(layer)[0] for layer in iter_tile_layers(old_map)]  # 旧地图网格
+    new_map = copy.deepcopy(header["skeleton"])  # 从骨架开始
+    for layer, info, (starts, lengths, values) in zip(iter_tile_layers(new_map), header["layers"], runs):  # 逐层回填
+        if info.get("raw"):  # 骨架已携带原始数据
+            continue  # 无需回填
+        shape = (info["height"], info["width"])  # 新网格尺寸
+        grid = old_layers[info["base"]].reshape(-1).astype(np.uint32) if info["base"] is not None else np.zeros(shape[0] * shape[1], dtype=np.uint32)  # 起始网格
+        covered = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths) + np.arange(int(lengths.sum()))  # 各段覆盖的下标
+        grid[covered] = values  # 向量化写入新值
+        fill_layer_data(layer, grid.reshape(shape), tuple(info["origin"]))  # 按原编码写回
+    text = map_text(new_map, header.get("format", "pretty"))  # 按原排版序列化，旧补丁没有该字段时为 indent=2
+    if verify and text_digest(text) != header["targetSha256"]:  # 结果不一致
+        raise ValueError("应用补丁后的地图与目标摘要不一致")  # 抛出错误
+    return new_map, text  # 返回新地图与文本
+
+
+def apply_patch(old_map: Dict[str, Any], patch: bytes, verify: bool = True) -> Dict[str, Any]:  # 定义补丁应用函数
+    """把补丁应用到旧地图，返回新地图；verify 为真时校验前后地图的摘要"""  # 函数说明
+    return apply_patch_text(old_map, patch, verify)[0]  # 返回新地图
+
+
+def main() -> None:  # 定义脚本主入口
+    """diff 生成补丁，apply 应用补丁"""  # 函数说明
+    parser = argparse.ArgumentParser(description="Tiled 地图逐格差分与补丁应用")  # 创建解析器
+    commands = parser.add_subparsers(dest="command", required=True)  # 子命令
+    diff_parser = commands.add_parser("diff", help="比较两张地图并写出补丁")  # diff 子命令
+    diff_parser.add_argument("old", type=Path, help="旧地图 JSON")  # 旧地图参数
+    diff_parser.add_argument("new", type=Path, help="新地图 JSON")  # 新地图参数
+    diff_parser.add_argument("--output", "-o", type=Path, required=True, help="补丁输出路径")  # 输出参数
+    apply_parser = commands.add_parser("apply", help="把补丁应用到旧地图")  # apply 子命令
+    apply_parser.add_argument("old", type=Path, help="旧地图 JSON")  # 旧地图参数
+    apply_parser.add_argument("patch", type=Path, help="补丁文件")  # 补丁参数
+    apply_parser.add_argument("--output", "-o", type=Path, required=True, help="新地图输出路径")  # 输出参数
+    args = parser.parse_args()  # 解析参数
+    old_map = json.loads(args.old.read_text(encoding="utf-8"))  # 读取旧地图
+    args.output.parent.mkdir(parents=True, exist_ok=True)  # 确保输出目录存在
+    if args.command == "diff":  # 生成补丁
+        new_text = args.new.read_text(encoding="utf-8")  # 读取新地图文本
+        new_map = json.loads(new_text)  # 解析新地图
+        text_format = detect_format(new_text, new_map)  # 识别新地图的排版
+        if text_format is None:  # 无法逐字节重现
+            print("提示：新地图既不是 indent=2 也不是分块每块一行的排版，应用补丁后内容一致但排版会规范化")  # 打印提示
+        patch = diff_maps(old_map, new_map, text_format or "pretty")  # 生成补丁
+        raw_layers = sum(1 for layer in read_patch(patch)[0]["layers"] if layer.get("raw"))  # 携带原始数据的图层数
+        if raw_layers:  # 有图层无法原样重新编码
+            print(f"提示：{raw_layers} 个图层的压缩数据与本仓库编码器的输出不同，补丁携带这些图层的完整数据")  # 打印提示
+        args.output.write_bytes(patch)  # 写出补丁
+        print(f"已生成补丁: {args.output}（{len(patch):,} 字节，新地图 {len(new_text.encode('utf-8')):,} 字节）")  # 打印提示
+    else:  # 应用补丁
+        args.output.write_text(apply_patch_text(old_map, args.patch.read_bytes())[1], encoding="utf-8")  # 按原排版写出新地图
+        print(f"已应用补丁: {args.output}")  # 打印提示
+
+
+if __name__ == "__main__":  # 判断是否直接执行脚本
+    main()  # 调用主函数
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# 该脚本对构建目录中的 PNG 做无损重编码，挑选体积最小的结果
+# 导入 argparse 解析命令行参数
+import argparse
+# 导入 io 在内存中编码候选结果
+import io
+# 导入 json 写出报告
+import json
+# 导入 os 原子替换文件
+import os
+# 导入 sys 以便退出码控制
+import sys
+# 导入进程池并行处理图片
+from concurrent.futures import ProcessPoolExecutor
+# 导入 pathlib 用于文件路径操作
+from pathlib import Path
+# 导入 typing 提供类型注解
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# 导入 NumPy 统计颜色与校验像素
+import numpy as np
+# 导入 Pillow 解码与编码 PNG
+import PIL
+from PIL import Image
+
+# 定义脚本根目录
+SCRIPT_ROOT = Path(__file__).resolve().parent
+# 确保仓库根目录在模块搜索路径中
+if str(SCRIPT_ROOT.parent) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_ROOT.parent))
+# 导入文件状态缓存工具
+from scripts.utils_file_state import content_digest, load_state_cache, rules_fingerprint, save_state_cache
+
+# 定义优化策略版本，调整候选参数时递增
+OPTIMIZER_VERSION = 2
+# 定义超过 8 位的图像模式，转为 RGBA 比较会截断精度
+HIGH_BIT_DEPTH_MODES = {"I", "I;16", "I;16B", "I;16L", "F"}
+# 定义默认扫描目录
+DEFAULT_ROOTS = [Path("assets/build/images")]
+# 定义缓存默认路径
+DEFAULT_CACHE_PATH = Path("assets/.cache/optimize_pngs.json")
+# 定义候选编码参数：Pillow 的 optimize 模式与若干 zlib 等级 × 压缩策略
+# Pillow 不开放逐行 PNG 过滤器选择，compress_type 对应 zlib 的 default/filtered/rle 策略
+ENCODER_OPTIONS: List[Dict[str, Any]] = [
+    {"optimize": True},
+    {"compress_level": 9, "compress_type": 1},
+    {"compress_level": 6, "compress_type": 1},
+    {"compress_level": 9, "compress_type": 3},
+]
+
+# 定义计算优化器指纹的函数
+def optimizer_fingerprint() -> str:
+    """优化器版本、Pillow 版本与本脚本内容共同决定缓存是否可复用"""
+    return rules_fingerprint([OPTIMIZER_VERSION, PIL.__version__, Path(__file__).resolve()])
+
+# 定义无损调色板转换函数
+def to_palette(pixels: np.ndarray) -> Optional[Image.Image]:
+    """颜色数不超过 256 时构造等价的调色板图像，否则返回 None"""
+    # 将每个 RGBA 像素打包为 32 位整数
+    packed = np.ascontiguousarray(pixels).view(np.uint32).reshape(-1)
+    colors, inverse = np.unique(packed, return_inverse=True)
+    # 颜色过多无法无损转换
+    if colors.size > 256:
+        return None
+    # 解包调色板并按 alpha 升序排列，使半透明项集中在前以缩短 tRNS 块
+    entries = colors.view(np.uint8).reshape(-1, 4)
+    order = np.argsort(entries[:, 3], kind="stable")
+    remap = np.empty_like(order)
+    remap[order] = np.arange(order.size)
+    entries = entries[order]
+    # 构造索引图像并写入调色板
+    image = Image.fromarray(remap[inverse].astype(np.uint8).reshape(pixels.shape[:2]), "P")
+    image.putpalette(entries[:, :3].reshape(-1).tobytes())
+    # 仅为非不透明颜色写入透明度
+    translucent = int(np.count_nonzero(entries[:, 3] < 255))
+    if translucent:
+        image.info["transparency"] = entries[:translucent, 3].tobytes()
+    return image
+
+# 定义候选图像生成函数
+def candidate_images(image: Image.Image, pixels: np.ndarray) -> List[Tuple[str, Image.Image]]:
+    """返回原始模式、去除全不透明 alpha 与调色板等无损候选"""
+    candidates: List[Tuple[str, Image.Image]] = [(image.mode, image)]
+    # 全部不透明时可丢弃 alpha 通道
+    if image.mode == "RGBA" and bool((pixels[..., 3] == 255).all()):
+        candidates.append(("RGB", image.convert("RGB")))
+    # 颜色数允许时尝试调色板
+    if image.mode != "P":
+        palette = to_palette(pixels)
+        if palette is not None:
+            candidates.append(("P", palette))
+    return candidates
+
+# 定义编码函数
+def encode_png(image: Image.Image, options: Dict[str, Any], icc_profile: Optional[bytes]) -> bytes:
+    """按给定参数在内存中编码 PNG"""
+    buffer = io.BytesIO()
+    # 保留颜色配置与调色板透明度
+    extra: Dict[str, Any] = dict(options)
+    if icc_profile:
+        extra["icc_profile"] = icc_profile
+    if "transparency" in image.info:
+        extra["transparency"] = image.info["transparency"]
+    image.save(buffer, format="PNG", **extra)
+    return buffer.getvalue()
+
+# 定义位深读取函数
+def png_bit_depth(data: bytes) -> int:
+    """读取 IHDR 中每个通道的位深，非 PNG 数据返回 0"""
+    # 签名 8 字节，IHDR 长度与类型各 4 字节，宽高各 4 字节之后即位深
+    return data[24] if len(data) > 24 and data[12:16] == b"IHDR" else 0
+
+# 定义解码校验函数
+def decodes_to(data: bytes, pixels: np.ndarray) -> bool:
+    """确认候选结果解码后的 RGBA 像素与原图完全一致"""
+    with Image.open(io.BytesIO(data)) as decoded:
+        return np.array_equal(np.asarray(decoded.convert("RGBA")), pixels)
+
+# 定义单文件优化函数（进程池任务）
+def optimize_file(job: Tuple[str, bool]) -> Dict[str, Any]:
+    """尝试全部候选组合，返回最小结果的统计；apply 为真时原子写回"""
+    path_text, apply = job
+    path = Path(path_text)
+    original = path.read_bytes()
+    # 解码原图
+    try:
+        with Image.open(io.BytesIO(original)) as opened:
+            opened.load()
+            image = opened.copy()
+            icc_profile = opened.info.get("icc_profile")
+    except (OSError, ValueError) as exc:
+        return {"path": path_text, "size": len(original), "best_size": len(original), "params": None, "error": str(exc)}
+    # 高位深图像无法用 8 位 RGBA 校验无损，保持原文件
+    if image.mode in HIGH_BIT_DEPTH_MODES or png_bit_depth(original) > 8:
+        return {"path": path_text, "size": len(original), "best_size": len(original), "params": None}
+    pixels = np.asarray(image.convert("RGBA"))
+    best: Optional[bytes] = None
+    best_params: Optional[Dict[str, Any]] = None
+    # 遍历候选模式与编码参数
+    for mode, candidate in candidate_images(image, pixels):
+        for options in ENCODER_OPTIONS:
+            data = encode_png(candidate, options, icc_profile)
+            if best is not None and len(data) >= len(best):
+                continue
+            # 只接受像素完全一致的结果
+            if decodes_to(data, pixels):
+                best, best_params = data, {"mode": mode, **options}
+    # 未找到更小的结果时保持原文件
+    if best is None or len(best) >= len(original):
+        return {"path": path_text, "size": len(original), "best_size": len(original), "params": None}
+    # 写回时先写临时文件再替换
+    if apply:
+        temp_path = path.with_name(path.name + ".tmp")
+        temp_path.write_bytes(best)
+        os.replace(temp_path, path)
+    return {"path": path_text, "size": len(original), "best_size": len(best), "params": best_params}
+
+# 定义收集 PNG 的函数
+def collect_pngs(roots: Iterable[Path]) -> List[Tuple[Path, Path]]:
+    """返回 (根目录, 文件) 列表，按路径排序"""
+    found: List[Tuple[Path, Path]] = []
+    for root in roots:
+        if root.is_dir():
+            found.extend((root, path) for path in sorted(root.rglob("*")) if path.is_file() and path.suffix.lower() == ".png")
+    return found
+
+# 定义分类名称函数
+def category_of(root: Path, path: Path) -> str:
+    """以根目录下的第一级子目录作为分类"""
+    parts = path.relative_to(root).parts
+    return parts[0] if len(parts) > 1 else "."
+
+# 定义优化主流程
+def optimize_pngs(
+    roots: Iterable[Path],
+    cache: Dict[str, Any],
+    apply: bool = False,
+    workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """按内容摘要复用缓存结果，其余文件交给进程池，返回按分类汇总的报告"""
+    files = collect_pngs(roots)
+    digests = {path: content_digest(path) for _root, path in files}
+    # 缓存未命中或需要写回的文件才进入进程池
+    pending = [path for _root, path in files if digests[path] not in cache or (apply and cache[digests[path]]["params"])]
+    results: Dict[Path, Dict[str, Any]] = {}
+    if pending:
+        jobs = [(str(path), apply) for path in pending]
+        if workers == 1 or len(jobs) == 1:
+            outcomes = [optimize_file(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                outcomes = list(executor.map(optimize_file, jobs))
+        for path, outcome in zip(pending, outcomes):
+            results[path] = outcome
+    # 汇总结果并更新缓存
+    categories: Dict[str, Dict[str, int]] = {}
+    changed: List[Dict[str, Any]] = []
+    errors: List[Dict[str, str]] = []
+    seen: Dict[str, Any] = {}
+    for root, path in files:
+        digest = digests[path]
+        outcome = results.get(path) or {"path": str(path), **cache[digest]}
+        entry = {"size": outcome["size"], "best_size": outcome["best_size"], "params": outcome["params"]}
+        # 解码失败的结果连同错误一起缓存，下次复用时仍计入错误
+        if "error" in outcome:
+            entry["error"] = outcome["error"]
+            errors.append({"path": str(path), "error": outcome["error"]})
+        seen[digest] = entry
+        if outcome["params"]:
+            changed.append({"path": str(path), **entry})
+            # 写回后的新内容已是最优结果，记录其摘要以便下次跳过
+            if apply:
+                seen[content_digest(path)] = {"size": outcome["best_size"], "best_size": outcome["best_size"], "params": None}
+        bucket = categories.setdefault(category_of(root, path), {"files": 0, "before": 0, "after": 0, "saved": 0})
+        bucket["files"] += 1
+        bucket["before"] += outcome["size"]
+        bucket["after"] += outcome["best_size"]
+        bucket["saved"] += outcome["size"] - outcome["best_size"]
+    # 缓存只保留本次出现过的内容，避免无限增长
+    cache.clear()
+    cache.update(seen)
+    # 计算总计
+    totals = {key: sum(bucket[key] for bucket in categories.values()) for key in ("files", "before", "after", "saved")}
+    return {
+        "applied": apply,
+        "optimized": len(pending),
+        "reused": len(files) - len(pending),
+        "categories": dict(sorted(categories.items())),
+        "totals": totals,
+        "changed": changed,
+        "errors": errors,
+    }
+
+# 定义主函数
+def main(argv: Optional[List[str]] = None) -> int:
+    """程序入口"""
+    # 构造参数解析器
+    parser = argparse.ArgumentParser(description="Losslessly recompress PNG assets")
+    # 添加扫描目录
+    parser.add_argument("--roots", nargs="+", type=Path, default=DEFAULT_ROOTS, help="需要优化的目录")
+    # 添加写回开关，默认仅干跑统计
+    parser.add_argument("--apply", action="store_true", help="将更小的结果写回原文件")
+    # 添加进程数
+    parser.add_argument("--workers", type=int, default=None, help="进程池大小，默认按CPU数量")
+    # 添加报告路径
+    parser.add_argument("--report", type=Path, help="JSON 报告输出路径")
+    # 添加缓存路径
+    parser.add_argument("--cache", type=Path, default=DEFAULT_CACHE_PATH, help="结果缓存路径")
+    # 添加禁用缓存开关
+    parser.add_argument("--no-cache", action="store_true", help="忽略缓存并重新尝试全部文件")
+    # 解析参数
+    args = parser.parse_args(argv)
+    # 读取缓存
+    fingerprint = optimizer_fingerprint()
+    cache = {} if args.no_cache else load_state_cache(args.cache, fingerprint)
+    # 执行优化
+    report = optimize_pngs(args.roots, cache, args.apply, args.workers)
+    # 保存缓存
+    save_state_cache(args.cache, fingerprint, cache)
+    # 打印分类统计
+    for category, bucket in report["categories"].items():
+        print(f"{category}: {bucket['files']} files, {bucket['before']} -> {bucket['after']} bytes, saved {bucket['saved']}")
+    totals = report["totals"]
+    print(f"total: {totals['files']} files, saved {totals['saved']} bytes (optimized={report['optimized']}, reused={report['reused']})")
+    # 写出报告
+    if args.report:
+        args.report.parent.mkdir(parents=True, exist_ok=True)
+        args.report.write_text(json.dumps(report, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    # 干跑模式提示
+    if not args.apply:
+        print("dry-run: pass --apply to rewrite files")
+    return 1 if report["errors"] else 0
+
+# 脚本入口
+if __name__ == "__main__":
+    # 执行主函数并根据返回值退出
+    sys.exit(main())
@@ -24,6 +24,16 @@ def build_preview_entries(index_data: Dict[str, Dict[str, List[str]]]) -> Dict[s
     return {"audio": audio_entries, "images": image_entries}  # 返回组合结果
 
 
+def build_map_entries(build_root: Path) -> List[Dict[str, str]]:
+    """列出 render_map_preview.py 已生成的地图预览图与小地图。"""
+
+    entries: List[Dict[str, str]] = []  # 初始化地图条目列表
+    for path in sorted((build_root / "previews" / "maps").glob("*.png")):  # 遍历预览目录
+        map_type = "minimap" if path.name.endswith(".minimap.png") else "map"  # 按后缀区分小地图
+        entries.append({"type": map_type, "path": f"assets/build/previews/maps/{path.name}"})  # 追加条目
+    return entries  # 返回条目
+
+
 def run_preview(root: Path) -> Dict[str, List[Dict[str, str]]]:
     """执行预览索引生成流程。"""
 
@@ -35,14 +45,16 @@ def run_preview(root: Path) -> Dict[str, List[Dict[str, str]]]:
     with index_path.open("r", encoding="utf-8") as handle:  # 打开索引文件
         index_data = json.load(handle)  # 解析 JSON 内容
     preview_data = build_preview_entries(index_data)  # 构造预览数据
+    preview_data["maps"] = build_map_entries(build_root)  # 附加地图预览条目
     preview_path = assets_root / "preview_index.json"  # 预览文件路径
     with preview_path.open("w", encoding="utf-8") as handle:  # 打开输出文件
         json.dump(preview_data, handle, ensure_ascii=False, indent=2)  # 写入 JSON
         handle.write("\n")  # 末尾换行保持整洁
     audio_count = len(preview_data["audio"])  # 统计音频条目数量
     image_count = len(preview_data["images"])  # 统计图像条目数量
+    map_count = len(preview_data["maps"])  # 统计地图预览条目数量
     print(
-        f"[DONE] Preview index written: {preview_path.as_posix()} (audio={audio_count}, images={image_count})"
+        f"[DONE] Preview index written: {preview_path.as_posix()} (audio={audio_count}, images={image_count}, maps={map_count})"
     )  # 控制台输出摘要
     return preview_data  # 返回数据供调用方使用
 
@@ -0,0 +1,160 @@
+"""图集顺序调整后，按新旧绑定表构建 gid 查找表并用 np.take 批量改写仓库中全部地图的 gid。"""  # 模块功能说明
+from __future__ import annotations  # 启用未来注解支持
+
+import argparse  # 导入命令行参数解析库
+import json  # 导入 JSON 序列化库
+import subprocess  # 导入 subprocess 从 git 历史读取旧绑定表
+import sys  # 导入 sys 以调整模块搜索路径
+from concurrent.futures import ProcessPoolExecutor  # 导入进程池并行处理地图
+from pathlib import Path  # 导入路径处理库
+from typing import Any, Dict, List, Optional, Tuple  # 导入类型提示工具
+
+import numpy as np  # 导入 NumPy 进行向量化查表
+
+SCRIPT_ROOT = Path(__file__).resolve().parent  # 计算脚本目录
+if str(SCRIPT_ROOT.parent) not in sys.path:  # 确保仓库根目录在模块搜索路径中
+    sys.path.insert(0, str(SCRIPT_ROOT.parent))  # 插入仓库根目录
+
+from scripts.build_nav_sidecar import BINDING_PATH, default_maps  # 导入绑定表路径与用户地图扫描函数
+from scripts.gen_demo_map import OUTPUT_PATH as DEMO_MAP_PATH, TILE_MAPPING  # 导入演示地图路径与 gid 映射
+from scripts.utils_tiled_layers import GID_MASK, decode_region, encode_gids, iter_tile_layers  # 导入图层编解码工具
+
+MANIFEST_PATH = Path("assets/user_imports/user_manifest.json")  # 用户素材清单路径
+
+
+def binding_indices(config: Dict[str, Any]) -> Dict[str, int]:  # 定义绑定读取函数
+    """从 tileset_binding.json（bindings）或 user_manifest.json（tiles.bindings）中读取地形到图集索引的映射，忽略注释键"""  # 函数说明
+    bindings = config.get("bindings", config.get("tiles", {}).get("bindings", {}))  # 兼容两种结构
+    return {name: int(index) for name, index in bindings.items() if not name.startswith("_")}  # 返回映射
+
+
+def load_bindings(path: Path, revision: Optional[str] = None) -> Dict[str, int]:  # 定义绑定文件读取函数
+    """读取绑定文件；给出 revision 时通过 git show 读取该版本中的文件"""  # 函数说明
+    if revision is None:  # 读取工作区文件
+        text = path.read_text(encoding="utf-8")  # 读取文本
+    else:  # 读取历史版本
+        text = subprocess.run(["git", "show", f"{revision}:{path.as_posix()}"], check=True, capture_output=True, text=True, encoding="utf-8").stdout  # 调用 git
+    return binding_indices(json.loads(text))  # 解析映射
+
+
+def ordering_sources() -> Dict[str, Dict[str, int]]:  # 定义顺序来源收集函数
+    """收集仓库中四处记录图集顺序的位置，统一为地形到图集索引的映射"""  # 函数说明
+    from scripts.gen_tiles_and_player import TILE_ORDER  # 延迟导入图集生成脚本（依赖 Pillow 绘制）
+
+    return {  # 返回各来源
+        "gen_tiles_and_player.TILE_ORDER": {spec.name: index for index, spec in enumerate(TILE_ORDER)},  # 绘制顺序
+        "gen_demo_map.TILE_MAPPING": {name: gid - 1 for name, gid in TILE_MAPPING.items()},  # 演示地图 gid（firstgid 为 1）
+        MANIFEST_PATH.as_posix(): load_bindings(MANIFEST_PATH),  # 用户素材清单
+        BINDING_PATH.as_posix(): load_bindings(BINDING_PATH),  # 瓦片绑定表
+    }  # 来源结束
+
+
+def ordering_mismatches(sources: Dict[str, Dict[str, int]]) -> List[str]:  # 定义顺序一致性检查函数
+    """以第一个来源为基准，列出其余来源中缺失或索引不同的地形"""  # 函数说明
+    (base_name, base), *others = sources.items()  # 基准来源
+    problems: List[str] = []  # 记录问题
+    for name, indices in others:  # 逐个比较
+        for terrain in sorted(set(base) | set(indices)):  # 全部地形
+            if base.get(terrain) != indices.get(terrain):  # 不一致
+                problems.append(f"{terrain}: {base_name}={base.get(terrain)} {name}={indices.get(terrain)}")  # 记录问题
+    return problems  # 返回结果
+
+
+def build_remap_lut(old: Dict[str, int], new: Dict[str, int], firstgid: int = 1) -> np.ndarray:  # 定义查找表构建函数
+    """返回按旧 gid 下标的 uint32 查找表：0 与不属于绑定表的 gid 保持不变，旧地形映射到新绑定中同名地形的 gid"""  # 函数说明
+    missing = sorted(set(old) - set(new))  # 新绑定中缺失的地形
+    if missing:  # 无法映射
+        raise ValueError(f"新绑定表缺少地形: {', '.join(missing)}")  # 抛出错误
+    lut = np.arange(firstgid + max(old.values(), default=-1) + 1, dtype=np.uint32)  # 恒等映射
+    for name, index in old.items():  # 写入各地形
+        lut[firstgid + index] = firstgid + new[name]  # 旧 gid 到新 gid
+    return lut  # 返回查找表
+
+
+def remap_array(gids: np.ndarray, lut: np.ndarray) -> np.ndarray:  # 定义 gid 数组改写函数
+    """保留翻转标志位，只对低 29 位查表；超出查找表的 gid 原样保留"""  # 函数说明
+    base = gids & GID_MASK  # 去掉翻转标志
+    if base.size and int(base.max()) >= lut.size:  # 存在查找表之外的 gid（例如其他图集）
+        lut = np.concatenate((lut, np.arange(lut.size, int(base.max()) + 1, dtype=np.uint32)))  # 以恒等映射补齐
+    return np.take(lut, base) | (gids & ~np.uint32(GID_MASK))  # 查表后放回翻转标志
+
+
+def remap_map(map_json: Dict[str, Any], old: Dict[str, int], new: Dict[str, int]) -> int:  # 定义地图改写函数
+    """就地改写地图全部瓦片图层（含分块与 base64/压缩图层），保持各图层原有编码；返回发生变化的格子数（defaultGid 属性计为一处）"""  # 函数说明
+    tilesets = map_json.get("tilesets", [])  # 读取图集列表
+    lut = build_remap_lut(old, new, int(tilesets[0].get("firstgid", 1)) if tilesets else 1)  # 构建查找表
+    changed = 0  # 变化计数
+    for layer in iter_tile_layers(map_json):  # 遍历瓦片图层
+        base64_layer = layer.get("encoding") == "base64"  # 是否为二进制编码
+        regions = ([layer] if "data" in layer else []) + list(layer.get("chunks", []))  # 单层数据或各块
+        for region in regions:  # 逐段改写
+            gids = decode_region(region["data"], layer, int(region.get("width", 0)) * int(region.get("height", 0)))  # 解码
+            remapped = remap_array(gids, lut)  # 查表
+            changed += int(np.count_nonzero(remapped != gids))  # 统计变化
+            region["data"] = encode_gids(remapped, layer.get("compression", "")) if base64_layer else remapped.astype(np.int64).tolist()  # 按原编码写回
+        for item in layer.get("properties", []):  # 无限地图缺失块的填充 gid 同样需要改写
+            if item.get("name") == "defaultGid":  # 找到填充属性
+                value = int(remap_array(np.array([int(item.get("value", 0))], dtype=np.uint32), lut)[0])  # 查表改写
+                changed += int(value != int(item.get("value", 0)))  # 属性变化计为一处
+                item["value"] = value  # 写回属性
+    return changed  # 返回变化数
+
+
+def remap_file(job: Tuple[str, Dict[str, int], Dict[str, int], bool]) -> Tuple[str, int]:  # 定义单文件处理函数（供进程池调用）
+    """读取地图、改写 gid，非演练模式下以 indent=2 写回；返回 (路径, 变化格子数)"""  # 函数说明
+    path, old, new, dry_run = job  # 解包参数
+    map_json = json.loads(Path(path).read_text(encoding="utf-8"))  # 读取地图
+    changed = remap_map(map_json, old, new)  # 改写 gid
+    if changed and not dry_run:  # 有变化时写回
+        Path(path).write_text(json.dumps(map_json, ensure_ascii=False, indent=2), encoding="utf-8")  # 写回文件
+    return path, changed  # 返回结果
+
+
+def remap_files(paths: List[Path], old: Dict[str, int], new: Dict[str, int], dry_run: bool = False, workers: Optional[int] = None) -> List[Tuple[str, int]]:  # 定义批量处理函数
+    """多张地图交给进程池并行处理，单张地图或 workers=1 时在当前进程执行"""  # 函数说明
+    jobs = [(str(path), old, new, dry_run) for path in paths]  # 组装任务
+    if workers == 1 or len(jobs) <= 1:  # 无需进程池
+        return [remap_file(job) for job in jobs]  # 顺序处理
+    with ProcessPoolExecutor(max_workers=workers) as executor:  # 创建进程池
+        return list(executor.map(remap_file, jobs))  # 并行处理
+
+
+def repo_maps() -> List[Path]:  # 定义仓库地图列表函数
+    """演示地图（已生成时）与用户地图目录中的全部地图"""  # 函数说明
+    return ([DEMO_MAP_PATH] if DEMO_MAP_PATH.exists() else []) + default_maps()  # 返回列表
+
+
+def main() -> None:  # 定义脚本主入口
+    """检查各处图集顺序是否一致，或按新旧绑定表改写地图 gid"""  # 函数说明
+    parser = argparse.ArgumentParser(description="图集顺序调整后批量改写地图 gid")  # 创建解析器
+    parser.add_argument("maps", nargs="*", type=Path, help="地图 JSON 路径，默认处理演示地图与 assets/user_imports/maps")  # 添加地图参数
+    parser.add_argument("--old", type=Path, default=BINDING_PATH, help="旧绑定文件（tileset_binding.json 或 user_manifest.json 结构）")  # 添加旧绑定参数
+    parser.add_argument("--old-rev", help="从该 git 版本读取 --old 指定的文件，例如 HEAD~1")  # 添加旧版本参数
+    parser.add_argument("--new", type=Path, default=BINDING_PATH, help="新绑定文件，默认为当前瓦片绑定表")  # 添加新绑定参数
+    parser.add_argument("--workers", type=int, default=None, help="进程池大小，默认按CPU数量")  # 添加进程数参数
+    parser.add_argument("--dry-run", action="store_true", help="只统计变化，不写回地图")  # 添加演练参数
+    parser.add_argument("--check", action="store_true", help="只检查 TILE_ORDER、TILE_MAPPING 与两份绑定表的顺序是否一致")  # 添加检查参数
+    args = parser.parse_args()  # 解析参数
+    if args.check:  # 一致性检查
+        problems = ordering_mismatches(ordering_sources())  # 收集问题
+        for problem in problems:  # 逐条打印
+            print(f"顺序不一致: {problem}")  # 打印问题
+        if problems:  # 存在问题
+            raise SystemExit(1)  # 以非零状态退出
+        print("图集顺序一致")  # 打印提示
+        return  # 结束
+    old, new = load_bindings(args.old, args.old_rev), load_bindings(args.new)  # 读取新旧绑定
+    if old == new:  # 顺序未变化
+        print("新旧绑定表相同，无需改写（旧绑定可用 --old-rev 从 git 历史读取）")  # 打印提示
+        return  # 结束
+    maps = args.maps or repo_maps()  # 确定地图列表
+    if not maps:  # 没有可处理的地图
+        print("未找到需要处理的地图")  # 打印提示
+        return  # 结束
+    for path, changed in remap_files(maps, old, new, args.dry_run, args.workers):  # 逐张输出结果
+        print(f"{'将改写' if args.dry_run else '已改写'}: {path}（{changed} 格）")  # 打印提示
+    print("提示：导航数据、块索引等地图附属文件需要重新生成")  # 提醒重新生成附属文件
+
+
+if __name__ == "__main__":  # 判断是否直接执行脚本
+    main()  # 调用主函数
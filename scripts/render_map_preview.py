@@ -0,0 +1,186 @@
+"""用 NumPy 花式索引把 Tiled 地图与 tilesheet.png 合成为 PNG 预览图或每格一像素的小地图。"""  # 模块功能说明
+from __future__ import annotations  # 启用未来注解支持
+
+import argparse  # 导入命令行参数解析库
+import json  # 导入 JSON 序列化库
+import sys  # 导入 sys 以调整模块搜索路径
+from pathlib import Path  # 导入路径处理库
+from typing import Any, Dict, List, Optional, Tuple  # 导入类型提示工具
+
+import numpy as np  # 导入 NumPy 进行向量化合成
+from PIL import Image  # 导入 Pillow 读写 PNG
+
+SCRIPT_ROOT = Path(__file__).resolve().parent  # 计算脚本目录
+if str(SCRIPT_ROOT.parent) not in sys.path:  # 确保仓库根目录在模块搜索路径中
+    sys.path.insert(0, str(SCRIPT_ROOT.parent))  # 插入仓库根目录
+
+from scripts.build_nav_sidecar import default_maps  # 导入用户地图扫描函数
+from scripts.gen_demo_map import OUTPUT_PATH as DEMO_MAP_PATH  # 导入演示地图路径
+from scripts.utils_tiled_layers import GID_MASK, iter_tile_layers, layer_grid  # 导入图层拼装工具
+from scripts.verify_bindings import atlas_layout_for  # 导入图集布局读取函数
+
+TILESHEET_PATH = Path("assets/build/tiles/tilesheet.png")  # 默认图集路径
+PREVIEW_DIR = Path("assets/build/previews/maps")  # 默认预览输出目录
+MINIMAP_SUFFIX = ".minimap.png"  # 小地图文件后缀
+DEFAULT_MAX_SIZE = 4096  # 预览图最长边的默认上限（像素）
+FLIP_HORIZONTAL = 0x80000000  # Tiled 水平翻转标志
+FLIP_VERTICAL = 0x40000000  # Tiled 垂直翻转标志
+FLIP_DIAGONAL = 0x20000000  # Tiled 对角翻转标志
+
+
+def slice_tiles(sheet: np.ndarray, tile_size: int, layout: Optional[Dict[str, Any]] = None) -> np.ndarray:  # 定义图集切片函数
+    """按布局的 margin/spacing/columns 把图集切为 (n, t, t, 4) 数组，没有布局时按紧密排列处理"""  # 函数说明
+    margin = int(layout.get("margin", 0)) if layout else 0  # 外边距
+    spacing = int(layout.get("spacing", 0)) if layout else 0  # 间距
+    step = tile_size + spacing  # 相邻瓦片的步长
+    columns = int(layout["columns"]) if layout and "columns" in layout else (sheet.shape[1] - 2 * margin + spacing) // step  # 列数
+    rows = (sheet.shape[0] - 2 * margin + spacing) // step  # 行数
+    count = int(layout.get("tilecount", rows * columns)) if layout else rows * columns  # 瓦片数量
+    index = np.arange(count)  # 瓦片编号
+    top, left = margin + (index // columns) * step, margin + (index % columns) * step  # 每个瓦片的左上角
+    offsets = np.arange(tile_size)  # 瓦片内偏移
+    return sheet[top[:, None, None] + offsets[None, :, None], left[:, None, None] + offsets[None, None, :]]  # 一次花式索引切出全部瓦片
+
+
+def resize_tiles(tiles: np.ndarray, size: int) -> np.ndarray:  # 定义瓦片缩放函数
+    """把全部瓦片缩放到 size 像素（盒式滤波），size 与原尺寸相同时原样返回"""  # 函数说明
+    if tiles.shape[1] == size:  # 无需缩放
+        return tiles  # 原样返回
+    return np.stack([np.asarray(Image.fromarray(tile, "RGBA").resize((size, size), Image.BOX)) for tile in tiles]) if len(tiles) else np.zeros((0, size, size, 4), dtype=np.uint8)  # 逐瓦片缩放（仅图集中的少量瓦片）
+
+
+def average_colours(tiles: np.ndarray) -> np.ndarray:  # 定义瓦片平均色函数
+    """以预乘 alpha 计算每个瓦片的平均颜色，返回 (n, 4) 调色板"""  # 函数说明
+    data = tiles.reshape(len(tiles), -1, 4).astype(np.float32)  # 展平像素
+    alpha = data[..., 3:4] / 255.0  # 归一化 alpha
+    coverage = alpha.mean(axis=1)  # 平均覆盖率
+    rgb = np.divide((data[..., :3] * alpha).mean(axis=1), coverage, out=np.zeros((len(tiles), 3), dtype=np.float32), where=coverage > 0)  # 反预乘得到平均颜色
+    return np.clip(np.rint(np.concatenate((rgb, coverage * 255.0), axis=1)), 0, 255).astype(np.uint8)  # 量化为 uint8
+
+
+def oriented_tile(tile: np.ndarray, raw_gid: int) -> np.ndarray:  # 定义翻转处理函数
+    """按 Tiled 规则应用对角（先转置）、水平与垂直翻转"""  # 函数说明
+    if raw_gid & FLIP_DIAGONAL:  # 对角翻转
+        tile = tile.swapaxes(0, 1)  # 转置
+    if raw_gid & FLIP_HORIZONTAL:  # 水平翻转
+        tile = tile[:, ::-1]  # 左右翻转
+    if raw_gid & FLIP_VERTICAL:  # 垂直翻转
+        tile = tile[::-1]  # 上下翻转
+    return tile  # 返回瓦片
+
+
+def lookup_tiles(values: np.ndarray, tiles: np.ndarray, firstgid: int) -> np.ndarray:  # 定义取值瓦片查表函数
+    """为网格中出现过的每个原始 gid 准备一块瓦片（含翻转），0 与越界 gid 为透明"""  # 函数说明
+    blank = np.zeros(tiles.shape[1:], dtype=np.uint8)  # 透明瓦片
+    prepared: List[np.ndarray] = []  # 记录结果
+    for raw in values.tolist():  # 逐个取值（数量只与地形种类有关）
+        index = (raw & GID_MASK) - firstgid  # 图集下标
+        prepared.append(oriented_tile(tiles[index], raw) if raw and 0 <= index < len(tiles) else blank)  # 写入瓦片
+    return np.stack(prepared)  # 返回 (取值数, ...) 数组
+
+
+def compact_values(grid: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:  # 定义取值压缩函数
+    """返回 (出现过的取值, 每格在取值中的下标)；不含翻转标志时用计数代替排序"""  # 函数说明
+    highest = int(grid.max()) if grid.size else 0  # 最大取值
+    if highest >= 1 << 16:  # 含翻转标志等大取值时退化为排序去重
+        values, inverse = np.unique(grid, return_inverse=True)  # 排序去重
+        return values, inverse.reshape(grid.shape)  # 返回结果
+    values = np.flatnonzero(np.bincount(grid.reshape(-1), minlength=highest + 1))  # 出现过的取值
+    remap = np.zeros(highest + 1, dtype=np.intp)  # 取值到下标的映射
+    remap[values] = np.arange(values.size)  # 写入映射
+    return values.astype(grid.dtype), remap[grid]  # 返回结果
+
+
+def composite_layers(map_json: Dict[str, Any]) -> Tuple[List[Tuple[np.ndarray, float]], int, int, int, int]:  # 定义图层收集函数
+    """收集可见瓦片图层的 (网格, 不透明度)，并把各层放到统一范围内；返回 (图层, 宽, 高, 原点 x, 原点 y)"""  # 函数说明
+    placed = [(layer_grid(layer), float(layer.get("opacity", 1))) for layer in iter_tile_layers(map_json) if layer.get("visible", True)]  # 拼装可见图层
+    if not placed:  # 没有可见图层
+        raise ValueError("地图不含可见的瓦片图层")  # 抛出错误
+    left = min(x for (_grid, x, _y), _o in placed)  # 合并范围左边界
+    top = min(y for (_grid, _x, y), _o in placed)  # 合并范围上边界
+    right = max(x + grid.shape[1] for (grid, x, _y), _o in placed)  # 合并范围右边界
+    bottom = max(y + grid.shape[0] for (grid, _x, y), _o in placed)  # 合并范围下边界
+    layers: List[Tuple[np.ndarray, float]] = []  # 统一范围后的图层
+    for (grid, x, y), opacity in placed:  # 逐层放置
+        if grid.shape == (bottom - top, right - left):  # 已覆盖整个范围
+            layers.append((grid, opacity))  # 直接使用
+            continue  # 下一层
+        full = np.zeros((bottom - top, right - left), dtype=grid.dtype)  # 空白网格
+        full[y - top : y - top + grid.shape[0], x - left : x - left + grid.shape[1]] = grid  # 写入图层
+        layers.append((full, opacity))  # 记录
+    return layers, right - left, bottom - top, left, top  # 返回结果
+
+
+def render_map(map_json: Dict[str, Any], sheet: np.ndarray, tile_size: int, layout: Optional[Dict[str, Any]] = None, tile_px: Optional[int] = None) -> np.ndarray:  # 定义地图渲染函数
+    """逐层用花式索引把瓦片铺到 (h*px, w*px, 4) 画布并做 alpha 合成；tile_px 为 1 时每格取瓦片平均色"""  # 函数说明
+    tilesets = map_json.get("tilesets", [])  # 读取图集列表
+    firstgid = int(tilesets[0].get("firstgid", 1)) if tilesets else 1  # 图集起始 gid
+    px = tile_px or tile_size  # 每格像素
+    tiles = slice_tiles(sheet, tile_size, layout)  # 切出全部瓦片
+    tiles = average_colours(tiles)[:, None, None, :] if px == 1 else resize_tiles(tiles, px)  # 每格一像素时使用平均色
+    layers, width, height, _left, _top = composite_layers(map_json)  # 收集图层
+    canvas: Optional[np.ndarray] = None  # 画布
+    for grid, opacity in layers:  # 逐层合成
+        values, inverse = compact_values(grid)  # 只为出现过的 gid 准备瓦片
+        pixels = lookup_tiles(values, tiles, firstgid)[inverse]  # 花式索引得到 (h, w, px, px, 4)
+        layer = pixels.swapaxes(1, 2).reshape(height * px, width * px, 4)  # 重排为图像
+        if canvas is None and opacity >= 1:  # 第一层直接作为画布
+            canvas = np.ascontiguousarray(layer)  # 复制为连续数组
+            continue  # 下一层
+        if canvas is None:  # 第一层半透明时从透明画布开始
+            canvas = np.zeros_like(layer)  # 透明画布
+        alpha = layer[..., 3:4].astype(np.float32) / 255.0 * opacity  # 源 alpha
+        base_alpha = canvas[..., 3:4].astype(np.float32) / 255.0  # 目标 alpha
+        out_alpha = alpha + base_alpha * (1.0 - alpha)  # 合成后的 alpha
+        rgb = np.divide(layer[..., :3] * alpha + canvas[..., :3] * base_alpha * (1.0 - alpha), out_alpha, out=np.zeros(layer[..., :3].shape, dtype=np.float32), where=out_alpha > 0)  # source-over 合成
+        canvas = np.clip(np.rint(np.concatenate((rgb, out_alpha * 255.0), axis=2)), 0, 255).astype(np.uint8)  # 量化为 uint8
+    assert canvas is not None  # 至少有一层
+    return canvas  # 返回画布
+
+
+def pick_tile_px(width: int, height: int, tile_size: int, max_size: int) -> int:  # 定义每格像素选择函数
+    """在不超过 max_size 的前提下尽量使用原始瓦片尺寸"""  # 函数说明
+    return max(1, min(tile_size, max_size // max(width, height, 1)))  # 返回每格像素
+
+
+def preview_paths(map_path: Path, output_dir: Path) -> Tuple[Path, Path]:  # 定义预览路径函数
+    """返回 (预览图, 小地图) 路径"""  # 函数说明
+    return output_dir / f"{map_path.stem}.png", output_dir / f"{map_path.stem}{MINIMAP_SUFFIX}"  # 返回路径
+
+
+def main() -> None:  # 定义脚本主入口
+    """为指定地图写出预览图与小地图"""  # 函数说明
+    parser = argparse.ArgumentParser(description="把 Tiled 地图渲染为 PNG 预览图与小地图")  # 创建解析器
+    parser.add_argument("maps", nargs="*", type=Path, help="地图 JSON 路径，默认处理演示地图与 assets/user_imports/maps")  # 添加地图参数
+    parser.add_argument("--tilesheet", type=Path, default=TILESHEET_PATH, help="图集 PNG，旁边的 <名称>_layout.json 会被自动读取")  # 添加图集参数
+    parser.add_argument("--output-dir", type=Path, default=PREVIEW_DIR, help="预览输出目录")  # 添加输出目录参数
+    parser.add_argument("--tile-px", type=int, help="预览图每格像素，默认按 --max-size 自动选择")  # 添加每格像素参数
+    parser.add_argument("--max-size", type=int, default=DEFAULT_MAX_SIZE, help="自动选择每格像素时预览图最长边上限")  # 添加尺寸上限参数
+    parser.add_argument("--minimap-only", action="store_true", help="只输出每格一像素的小地图")  # 添加只输出小地图开关
+    args = parser.parse_args()  # 解析参数
+    maps = args.maps or ([DEMO_MAP_PATH] if DEMO_MAP_PATH.exists() else []) + default_maps()  # 确定地图列表
+    if not maps:  # 没有可处理的地图
+        print("未找到需要处理的地图")  # 打印提示
+        return  # 结束
+    with Image.open(args.tilesheet) as opened:  # 打开图集
+        sheet = np.asarray(opened.convert("RGBA"))  # 读取像素
+    layout = atlas_layout_for(args.tilesheet)  # 读取布局
+    args.output_dir.mkdir(parents=True, exist_ok=True)  # 确保输出目录存在
+    for map_path in maps:  # 遍历地图
+        map_json = json.loads(map_path.read_text(encoding="utf-8"))  # 读取地图
+        tile_size = int(layout.get("tilewidth", map_json.get("tilewidth", 32))) if layout else int(map_json.get("tilewidth", 32))  # 图集瓦片尺寸
+        preview_path, minimap_path = preview_paths(map_path, args.output_dir)  # 计算输出路径
+        Image.fromarray(render_map(map_json, sheet, tile_size, layout, 1), "RGBA").save(minimap_path, format="PNG")  # 写出小地图
+        print(f"已生成小地图: {minimap_path}")  # 打印提示
+        if args.minimap_only:  # 只需要小地图
+            continue  # 下一张
+        tile_px = args.tile_px or pick_tile_px(int(map_json.get("width", 0)), int(map_json.get("height", 0)), tile_size, args.max_size)  # 每格像素
+        if tile_px == 1:  # 每格一像素时预览图与小地图相同
+            print(f"地图过大，预览图与小地图相同，跳过: {preview_path}")  # 打印提示
+            continue  # 下一张
+        Image.fromarray(render_map(map_json, sheet, tile_size, layout, tile_px), "RGBA").save(preview_path, format="PNG")  # 写出预览图
+        print(f"已生成预览图: {preview_path}（每格 {tile_px} 像素）")  # 打印提示
+
+
+if __name__ == "__main__":  # 判断是否直接执行脚本
+    main()  # 调用主函数
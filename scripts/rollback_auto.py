@@ -23,7 +23,14 @@ def list_snapshots() -> list[Path]:  # 列出可用快照文件
 def restore_snapshot(prefix: str) -> None:  # 根据前缀恢复快照
     restored = []  # 记录恢复的文件
     for snapshot in SNAPSHOT_DIR.glob(f'{prefix}_*'):  # 遍历匹配前缀的快照文件
-        if snapshot.is_file() and is_text_file(snapshot):  # 确保为文本文件
+        if snapshot.is_dir():  # 子目录快照（如 state/）
+            target_dir = BASE_DIR / snapshot.name.split('_', 1)[1]  # 去除时间戳前缀
+            target_dir.mkdir(parents=True, exist_ok=True)  # 确保目标子目录存在
+            for file_path in sorted(snapshot.iterdir()):  # 遍历子目录中的文件
+                if file_path.is_file() and is_text_file(file_path):  # 确保为文本文件
+                    shutil.copyfile(file_path, target_dir / file_path.name)  # 覆盖目标文件
+                    restored.append(target_dir / file_path.name)  # 记录恢复结果
+        elif snapshot.is_file() and is_text_file(snapshot):  # 确保为文本文件
             target_name = snapshot.name.split('_', 1)[1]  # 去除时间戳前缀
             target_path = BASE_DIR / target_name  # 计算目标路径
             shutil.copyfile(snapshot, target_path)  # 覆盖目标文件
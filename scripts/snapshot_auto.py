@@ -8,6 +8,7 @@ from pathlib import Path  # 引入路径工具
 BASE_DIR = Path(__file__).resolve().parent.parent / 'assets' / 'auto'  # 计算自动数据目录
 SNAPSHOT_DIR = BASE_DIR / '.snapshots'  # 计算快照目录
 ALLOWED_SUFFIXES = {'.json', '.txt'}  # 定义允许的文本扩展名
+SNAPSHOT_SUBDIRS = ('state',)  # 需要一同快照的子目录（增量合成的ID分配与产物摘要）
 
 
 def is_text_file(file_path: Path) -> bool:  # 判断文件是否为文本文件
@@ -25,6 +26,16 @@ def create_snapshot() -> None:  # 创建快照的主函数
             target = SNAPSHOT_DIR / f'{timestamp}_{file_path.name}'  # 生成目标路径
             shutil.copyfile(file_path, target)  # 复制文件
             copied.append(target)  # 记录复制结果
+    for subdir in SNAPSHOT_SUBDIRS:  # 遍历需要快照的子目录
+        source_dir = BASE_DIR / subdir  # 子目录路径
+        files = [path for path in sorted(source_dir.iterdir()) if path.is_file() and is_text_file(path)] if source_dir.is_dir() else []  # 子目录中的文本文件
+        if not files:  # 子目录不存在或为空
+            continue  # 跳过
+        target_dir = SNAPSHOT_DIR / f'{timestamp}_{subdir}'  # 快照中的同名子目录
+        target_dir.mkdir(exist_ok=True)  # 创建子目录
+        for file_path in files:  # 逐个复制
+            shutil.copyfile(file_path, target_dir / file_path.name)  # 复制文件
+            copied.append(target_dir / file_path.name)  # 记录复制结果
     if not copied:  # 如果没有复制任何文件
         print('未找到可复制的文本文件')  # 输出提示
         return  # 结束函数
@@ -3,17 +3,28 @@
 
 import argparse  # 引入命令行参数解析库
 import datetime  # 引入日期时间模块用于生成时间戳
+import hashlib  # 引入hashlib计算增量指纹
 import json  # 引入json库用于处理文本JSON数据
 import math  # 引入数学库用于数值调整
+import os  # 引入os读取CPU数量
+from concurrent.futures import ProcessPoolExecutor  # 引入进程池并行序列化输出
+import sys  # 引入sys以调整模块搜索路径
 from pathlib import Path  # 引入Path便于处理路径
-from typing import Any, Dict, List, Tuple  # 引入类型注解提升可读性
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple  # 引入类型注解提升可读性
+
+SCRIPT_ROOT = Path(__file__).resolve().parent  # 计算脚本目录
+if str(SCRIPT_ROOT.parent) not in sys.path:  # 确保仓库根目录在模块搜索路径中
+    sys.path.insert(0, str(SCRIPT_ROOT.parent))  # 插入仓库根目录
+
+from scripts.utils_json_stream import JSON_FORMATS, read_json_stream, stream_path, write_json_stream  # 引入流式JSON写出工具
 
 # 预设的规则映射字典，缺少外部规则文件时使用
 DEFAULT_RULES: Dict[str, Any] = {  # 定义默认规则数据结构
     "version": 1,  # 指定规则版本
     "tags_to_blueprints": [  # 蓝图匹配规则列表
         {  # 第一条蓝图规则
-            "match_any": ["tile", "road"],  # 任意包含这些标签则匹配
+            "match_all": ["tile"],  # 必须是瓷砖资产
+            "match_any": ["road", "path"],  # 且带有道路类标签
             "blueprint": {  # 蓝图模板内容
                 "id_prefix": "road",  # 蓝图ID前缀
                 "tile": "ROAD",  # 对应游戏内瓷砖类型
@@ -24,7 +35,8 @@ DEFAULT_RULES: Dict[str, Any] = {  # 定义默认规则数据结构
             },  # 蓝图模板结束
         },  # 规则条目结束
         {  # 第二条蓝图规则
-            "match_any": ["tile", "wall", "fence"],  # 栅栏墙壁类标签
+            "match_all": ["tile"],  # 必须是瓷砖资产
+            "match_any": ["wall", "fence"],  # 栅栏墙壁类标签
             "blueprint": {  # 蓝图模板内容
                 "id_prefix": "fence",  # 前缀
                 "tile": "WALL",  # 瓷砖类型
@@ -35,7 +47,8 @@ DEFAULT_RULES: Dict[str, Any] = {  # 定义默认规则数据结构
             },  # 蓝图模板结束
         },  # 规则条目结束
         {  # 第三条蓝图规则
-            "match_any": ["tile", "house", "building"],  # 房屋相关标签
+            "match_all": ["tile"],  # 必须是瓷砖资产
+            "match_any": ["house", "building"],  # 房屋相关标签
             "blueprint": {  # 蓝图模板内容
                 "id_prefix": "house",  # 前缀
                 "tile": "HOUSE",  # 瓷砖类型
@@ -47,7 +60,8 @@ DEFAULT_RULES: Dict[str, Any] = {  # 定义默认规则数据结构
             },  # 蓝图模板结束
         },  # 规则条目结束
         {  # 第四条蓝图规则
-            "match_any": ["tile", "tree", "sapling"],  # 树木相关标签
+            "match_all": ["tile"],  # 必须是瓷砖资产
+            "match_any": ["tree", "sapling"],  # 树木相关标签
             "blueprint": {  # 蓝图模板内容
                 "id_prefix": "tree",  # 前缀
                 "tile": "TREE",  # 瓷砖类型
@@ -60,7 +74,7 @@ DEFAULT_RULES: Dict[str, Any] = {  # 定义默认规则数据结构
     ],  # 蓝图规则列表结束
     "tags_to_shop": [  # 商店规则列表
         {  # 木材商店条目
-            "match_any": ["shop", "material:wood"],  # 匹配木材标签
+            "match_all": ["shop", "material:wood"],  # 出售木材的商店资产
             "goods": {  # 商品模板
                 "id": "wood",  # 商品ID
                 "name": "木头",  # 名称
@@ -72,7 +86,7 @@ DEFAULT_RULES: Dict[str, Any] = {  # 定义默认规则数据结构
             },  # 商品模板结束
         },  # 条目结束
         {  # 石头商店条目
-            "match_any": ["shop", "material:stone"],  # 匹配石头标签
+            "match_all": ["shop", "material:stone"],  # 出售石头的商店资产
             "goods": {  # 商品模板
                 "id": "stone",  # 商品ID
                 "name": "石头",  # 名称
@@ -84,7 +98,8 @@ DEFAULT_RULES: Dict[str, Any] = {  # 定义默认规则数据结构
             },  # 商品模板结束
         },  # 条目结束
         {  # 树苗条目
-            "match_any": ["shop", "seed"],  # 匹配树苗标签
+            "match_all": ["shop"],  # 商店资产
+            "match_any": ["seed", "sapling"],  # 且带有树苗标签
             "goods": {  # 商品模板
                 "id": "seed",  # 商品ID
                 "name": "树苗",  # 名称
@@ -98,7 +113,7 @@ DEFAULT_RULES: Dict[str, Any] = {  # 定义默认规则数据结构
     ],  # 商店规则结束
     "tags_to_quests": [  # 任务规则列表
         {  # 收集木头任务
-            "match_any": ["quest", "collect:wood"],  # 匹配收集木头标签
+            "match_all": ["quest", "collect:wood"],  # 收集木头的任务资产
             "quest": {  # 任务模板
                 "kind": "side",  # 任务类型
                 "title": "收集木头",  # 标题
@@ -109,7 +124,7 @@ DEFAULT_RULES: Dict[str, Any] = {  # 定义默认规则数据结构
             },  # 任务模板结束
         },  # 条目结束
         {  # 前往湖岸任务
-            "match_any": ["quest", "reach:lake"],  # 匹配前往湖岸标签
+            "match_all": ["quest", "reach:lake"],  # 前往湖岸的任务资产
             "quest": {  # 任务模板
                 "kind": "side",  # 任务类型
                 "title": "前往湖岸",  # 标题
@@ -120,7 +135,7 @@ DEFAULT_RULES: Dict[str, Any] = {  # 定义默认规则数据结构
             },  # 任务模板结束
         },  # 条目结束
         {  # 拜访店主任务
-            "match_any": ["quest", "talk:shopkeeper"],  # 匹配拜访店主标签
+            "match_all": ["quest", "talk:shopkeeper"],  # 拜访店主的任务资产
             "quest": {  # 任务模板
                 "kind": "main",  # 任务类型
                 "title": "拜访店主",  # 标题
@@ -140,6 +155,13 @@ DEFAULT_RULES: Dict[str, Any] = {  # 定义默认规则数据结构
 TagsMap = Dict[str, List[str]]  # 标签映射类型
 DescriptionsMap = Dict[str, str]  # 描述映射类型
 CollectionsMap = Dict[str, Any]  # 集合映射类型
+TagSets = Dict[str, FrozenSet[str]]  # 资产标签集合类型
+TagIndex = Dict[str, List[int]]  # 标签到规则下标的倒排索引类型
+Predicate = Callable[[int], bool]  # 编译后的规则判定函数类型（参数为资产标签位图）
+RuleCheck = Tuple[int, Optional[int], int, Optional[Predicate]]  # 规则位图条件类型
+MATCH_KEYS = ("match_any", "match_all", "match_none", "match")  # 规则中表示匹配条件的键
+SYNTH_STATE_VERSION = 1  # 增量状态文件格式版本
+STATE_RELATIVE_PATH = Path("state") / "id_allocations.json"  # 增量状态相对输出目录的位置（子目录不会被前端的 auto/*.json 收集）
 
 # 工具函数：安全读取JSON文件
 
@@ -160,8 +182,187 @@ def load_json(path: Path, default: Any) -> Any:  # 定义读取函数
 
 # 工具函数：判断标签是否匹配规则
 
-def rule_matches(tags: List[str], candidates: List[str]) -> bool:  # 定义匹配函数
-    return any(tag in tags for tag in candidates)  # 只要有任意一个标签匹配即返回True
+def rule_matches(tags: Iterable[str], candidates: List[str]) -> bool:  # 定义匹配函数
+    tag_set = tags if isinstance(tags, frozenset) else frozenset(tags)  # 转为集合以便常数时间查询
+    return any(tag in tag_set for tag in candidates)  # 只要有任意一个标签匹配即返回True
+
+
+# 工具函数：为每个资产构造一次标签集合，三类合成共用
+
+def build_tag_sets(tags: TagsMap) -> TagSets:  # 定义标签集合构造函数
+    return {asset_id: frozenset(asset_tags) for asset_id, asset_tags in tags.items()}  # 每个资产一个frozenset
+
+
+# 工具函数：构造标签到规则下标的倒排索引
+
+def build_tag_index(rule_list: List[Dict[str, Any]]) -> TagIndex:  # 定义倒排索引构造函数
+    index: TagIndex = {}  # 初始化索引
+    for rule_id, rule in enumerate(rule_list):  # 遍历规则
+        for tag in dict.fromkeys(rule.get("match_any", [])):  # 去重后遍历规则标签
+            index.setdefault(tag, []).append(rule_id)  # 记录规则下标（天然升序）
+    return index  # 返回索引
+
+
+# 工具函数：通过倒排索引查找资产命中的规则，代价与资产标签数成正比
+
+def matching_rules(asset_tags: FrozenSet[str], tag_index: TagIndex) -> List[int]:  # 定义命中规则查询函数
+    matched = set()  # 初始化命中集合
+    for tag in asset_tags:  # 遍历资产标签
+        matched.update(tag_index.get(tag, ()))  # 合并该标签对应的规则
+    return sorted(matched)  # 按规则顺序返回，与逐条扫描的输出顺序一致
+
+
+# 工具函数：把标签登记到词表（每个标签占一位），返回这些标签的位图
+
+def intern_tags(tags: Iterable[str], vocabulary: Dict[str, int]) -> int:  # 定义标签登记函数
+    mask = 0  # 初始化位图
+    for tag in tags:  # 遍历标签
+        if tag not in vocabulary:  # 新标签
+            vocabulary[tag] = 1 << len(vocabulary)  # 分配下一位
+        mask |= vocabulary[tag]  # 合并该位
+    return mask  # 返回位图
+
+
+# 工具函数：把规则的 match_any / match_all / match_none / match 条件合并为一个表达式（各条件同时成立才算命中）
+
+def rule_expression(rule: Dict[str, Any]) -> Dict[str, Any]:  # 定义表达式合并函数
+    clauses: List[Any] = []  # 初始化条件列表
+    for key, operator in (("match_any", "any"), ("match_all", "all"), ("match_none", "none")):  # 三种标签列表条件
+        if key in rule:  # 规则给出了该条件
+            clauses.append({operator: list(rule[key])})  # 转为表达式
+    if "match" in rule:  # 嵌套布尔表达式
+        clauses.append(rule["match"])  # 原样加入
+    return {"all": clauses} if clauses else {"any": []}  # 没有任何条件的规则不命中任何资产
+
+
+# 工具函数：把布尔表达式编译为位图判定函数，同时给出触发标签集合（命中时资产必然带有其中至少一个标签，无法确定时为None）
+
+def compile_expression(expr: Any, vocabulary: Dict[str, int]) -> Tuple[Predicate, Optional[FrozenSet[str]]]:  # 定义表达式编译函数
+    if isinstance(expr, str):  # 单个标签
+        expr = {"any": [expr]}  # 等价于只含该标签的 any
+    if not isinstance(expr, dict) or len(expr) != 1:  # 表达式必须是单键对象
+        raise ValueError(f"无法识别的规则表达式: {expr!r}")  # 抛出明确错误
+    ((operator, operand),) = expr.items()  # 取出运算符与操作数
+    if operator == "not":  # 取反
+        inner, _triggers = compile_expression(operand, vocabulary)  # 编译内部表达式
+        return (lambda mask: not inner(mask)), None  # 取反后无法由标签触发
+    if operator not in ("any", "all", "none") or not isinstance(operand, list):  # 其余运算符只接受列表
+        raise ValueError(f"无法识别的规则表达式: {expr!r}")  # 抛出明确错误
+    tags = [item for item in operand if isinstance(item, str)]  # 直接列出的标签
+    nested = [compile_expression(item, vocabulary) for item in operand if not isinstance(item, str)]  # 嵌套子表达式
+    bits = intern_tags(tags, vocabulary)  # 直接标签合并为一个位图
+    predicates = [predicate for predicate, _triggers in nested]  # 子表达式判定函数
+    if operator == "all":  # 全部成立
+        options = [frozenset([tag]) for tag in tags] + [child for _predicate, child in nested if child is not None]  # 任一可触发的分支都足以作为触发集合
+        triggers = min(options, key=len) if options else None  # 取最小的触发集合以减少候选
+        if not predicates:  # 只有标签时一次位与即可
+            return (lambda mask: (mask & bits) == bits), triggers  # 返回判定函数
+        rest = predicates[0] if len(predicates) == 1 else (lambda mask: all(predicate(mask) for predicate in predicates))  # 单个子表达式直接调用
+        return (lambda mask: (mask & bits) == bits and rest(mask)), triggers  # 返回判定函数
+    triggers = None if operator == "none" or any(child is None for _predicate, child in nested) else frozenset(tags).union(*(child for _predicate, child in nested))  # any 的所有分支都可触发时取并集
+    if predicates:  # 存在子表达式
+        rest = predicates[0] if len(predicates) == 1 else (lambda mask: any(predicate(mask) for predicate in predicates))  # 单个子表达式直接调用
+        if operator == "none":  # 全部不成立
+            return (lambda mask: (mask & bits) == 0 and not rest(mask)), None  # 返回判定函数
+        if not bits:  # 没有直接标签
+            return rest, triggers  # 返回子表达式判定函数
+        return (lambda mask: (mask & bits) != 0 or rest(mask)), triggers  # 返回判定函数
+    if operator == "none":  # none 且只有标签
+        return (lambda mask: (mask & bits) == 0), None  # 返回判定函数
+    return (lambda mask: (mask & bits) != 0), triggers  # any 只有标签时一次位与即可
+
+
+# 编译后的规则表：每条规则编译一次为位图条件，倒排索引按触发标签给出候选规则，再用位运算确认
+
+class CompiledRules:  # 定义编译规则表
+    def __init__(self, rule_list: List[Dict[str, Any]]) -> None:  # 编译规则列表
+        self.vocabulary: Dict[str, int] = {}  # 规则用到的标签到位的映射
+        self.checks: List[Optional[RuleCheck]] = []  # 各规则的 (all位图, any位图, none位图, 嵌套判定函数)，纯 match_any 规则为None（候选即命中）
+        self.index: TagIndex = {}  # 触发标签到规则下标的倒排索引
+        self.always: List[int] = []  # 无法由标签触发、需要对每个资产判定的规则（例如只有 match_none）
+        for rule_id, rule in enumerate(rule_list):  # 遍历规则
+            any_tags = rule.get("match_any")  # any 条件（缺省时不限制）
+            all_tags = list(rule.get("match_all", []))  # all 条件
+            if [key for key in MATCH_KEYS if key in rule] in ([], ["match_any"]):  # 纯 match_any 规则沿用倒排索引的精确结果（没有条件的规则不命中任何资产）
+                any_tags = any_tags or []  # 兼容缺省
+                intern_tags(any_tags, self.vocabulary)  # 登记标签
+                self.checks.append(None)  # 无需再判定
+                self.register(rule_id, frozenset(any_tags))  # 登记触发标签
+                continue  # 下一条规则
+            predicate, nested_triggers = compile_expression(rule["match"], self.vocabulary) if "match" in rule else (None, None)  # 嵌套表达式单独编译
+            any_bits = None if any_tags is None else intern_tags(any_tags, self.vocabulary)  # any 位图
+            self.checks.append((intern_tags(all_tags, self.vocabulary), any_bits, intern_tags(rule.get("match_none", []), self.vocabulary), predicate))  # 记录位图条件
+            options = [frozenset([tag]) for tag in all_tags] + ([frozenset(any_tags)] if any_tags is not None else []) + ([nested_triggers] if nested_triggers is not None else [])  # 任一条件的触发集合都可作为候选依据
+            self.register(rule_id, min(options, key=len) if options else None)  # 取最小的触发集合以减少候选
+
+    def register(self, rule_id: int, triggers: Optional[FrozenSet[str]]) -> None:  # 登记规则的触发标签
+        if triggers is None:  # 无法由标签触发
+            self.always.append(rule_id)  # 每个资产都要判定
+            return  # 结束
+        for tag in sorted(triggers):  # 遍历触发标签
+            self.index.setdefault(tag, []).append(rule_id)  # 规则下标天然升序
+
+    def mask(self, asset_tags: Iterable[str]) -> int:  # 计算资产标签位图
+        vocabulary = self.vocabulary  # 局部变量加速查询
+        mask = 0  # 初始化位图
+        for tag in asset_tags:  # 遍历资产标签
+            mask |= vocabulary.get(tag, 0)  # 规则未用到的标签不占位
+        return mask  # 返回位图
+
+    def matches(self, asset_tags: FrozenSet[str]) -> List[int]:  # 查询资产命中的规则
+        candidates = matching_rules(asset_tags, self.index)  # 倒排索引给出的候选规则
+        if self.always:  # 存在需要逐个判定的规则
+            candidates = sorted(set(candidates).union(self.always))  # 合并候选并保持规则顺序
+        matched: List[int] = []  # 初始化命中列表
+        mask: Optional[int] = None  # 位图按需计算
+        for rule_id in candidates:  # 遍历候选
+            check = self.checks[rule_id]  # 取出位图条件
+            if check is not None:  # 需要确认
+                mask = self.mask(asset_tags) if mask is None else mask  # 每个资产最多计算一次位图
+                all_bits, any_bits, none_bits, predicate = check  # 解包条件
+                if (mask & all_bits) != all_bits or (any_bits is not None and not mask & any_bits) or mask & none_bits:  # 三个位与即可判定平铺条件
+                    continue  # 未命中
+                if predicate is not None and not predicate(mask):  # 嵌套表达式
+                    continue  # 未命中
+            matched.append(rule_id)  # 记录命中
+        return matched  # 按规则顺序返回
+
+
+# 工具函数：计算任意JSON兼容数据的内容指纹
+
+def content_digest(payload: Any) -> str:  # 定义指纹函数
+    text = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))  # 规范化序列化
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()  # 返回sha1摘要
+
+
+# 工具函数：计算产物文件的内容摘要，增量模式据此确认上次产物未被回滚或手动修改
+
+def file_digests(paths: Iterable[Path]) -> Dict[str, str]:  # 定义文件摘要函数
+    return {path.name: hashlib.sha1(path.read_bytes()).hexdigest() for path in paths if path.is_file()}  # 按文件名记录sha1摘要
+
+
+# 稳定ID分配表：同一来源、同一前缀的第n个条目总是得到同一个ID，新条目的序号只增不减
+
+class StableIds:  # 定义ID分配器
+    def __init__(self, saved: Optional[Dict[str, Any]] = None) -> None:  # 初始化分配器
+        saved = saved or {}  # 兼容缺省
+        self.table: Dict[str, str] = dict(saved.get("ids", {}))  # 分配键到ID的映射
+        self.serials: Dict[str, int] = dict(saved.get("serials", {}))  # 各前缀已用的最大序号
+        self.ordinals: Dict[Tuple[str, str], int] = {}  # 本次运行中每个来源与前缀的条目序数
+
+    def __call__(self, owner: str, prefix: str) -> str:  # 为来源分配ID
+        ordinal = self.ordinals.get((owner, prefix), 0) + 1  # 本来源该前缀的第几个条目
+        self.ordinals[(owner, prefix)] = ordinal  # 记录序数
+        key = f"{owner}\t{prefix}\t{ordinal}"  # 分配键
+        if key not in self.table:  # 首次出现时分配新序号
+            self.serials[prefix] = self.serials.get(prefix, 0) + 1  # 序号递增
+            self.table[key] = f"{prefix}-{self.serials[prefix]:03d}"  # 记录ID
+        return self.table[key]  # 返回ID
+
+    def to_json(self, owners: Iterable[str]) -> Dict[str, Any]:  # 导出分配表
+        alive = set(owners)  # 仍然存在的资产
+        ids = {key: value for key, value in self.table.items() if key.split("\t", 1)[0] in alive or key.startswith("rule:")}  # 丢弃已删除资产的分配
+        return {"ids": ids, "serials": self.serials}  # 序号保留以免ID被复用
 
 
 # 工具函数：根据规则归一化资产ID
@@ -196,50 +397,46 @@ def adjust_costs(costs: List[Dict[str, Any]], tags: List[str]) -> List[Dict[str,
     return adjusted  # 返回调整后的列表
 
 
-# 根据规则生成蓝图数据
-
-def synthesize_blueprints(
-    tags: TagsMap,  # 标签映射
-    descriptions: DescriptionsMap,  # 描述映射
-    rules: Dict[str, Any],  # 规则数据
+# 单个资产命中蓝图规则时构造蓝图条目
+
+def make_blueprint(
+    asset_id: str,  # 资产ID
+    asset_tags: FrozenSet[str],  # 资产标签集合
+    description: str,  # 资产描述
+    template: Dict[str, Any],  # 蓝图模板
+    allocate: StableIds,  # 蓝图ID分配器
+    normalize_rules: Dict[str, Any],  # ID归一化配置
+) -> Dict[str, Any]:  # 返回蓝图条目
+    prefix = template.get("id_prefix", normalize_id(asset_id, normalize_rules) or "auto")  # 计算ID前缀
+    blueprint_id = allocate(asset_id, prefix)  # 分配蓝图ID
+    name_hint = template.get("name") or description or blueprint_id  # 推断蓝图名称
+    cost_template = template.get("cost_defaults", [])  # 读取成本模板
+    costs = adjust_costs(cost_template, asset_tags)  # 根据标签调整成本
+    return {  # 构造蓝图条目
+        "id": blueprint_id,  # 蓝图ID
+        "name": name_hint,  # 蓝图名称
+        "tile": template.get("tile", "FLOOR"),  # 指定瓷砖类型
+        "source_asset": asset_id,  # 记录来源资产
+        "cost": costs,  # 写入成本数组
+    }  # 条目构造完成
+
+
+# 为未命中的蓝图规则补充兜底条目并写入报告
+
+def finish_blueprints(
+    blueprint_rules: List[Dict[str, Any]],  # 蓝图规则
+    hits: List[int],  # 规则命中统计
+    allocate: StableIds,  # 蓝图ID分配器
+    blueprints: List[Dict[str, Any]],  # 已生成的蓝图
     report_lines: List[str],  # 报告文本列表
 ) -> List[Dict[str, Any]]:  # 返回蓝图列表
-    blueprints: List[Dict[str, Any]] = []  # 初始化蓝图列表
-    counters: Dict[str, int] = {}  # 前缀计数器字典
-    blueprint_rules = rules.get("tags_to_blueprints", [])  # 获取蓝图规则
-    normalize_rules = rules.get("id_normalize", {})  # 获取ID归一化配置
-    hits: List[int] = [0] * len(blueprint_rules)  # 初始化规则命中统计
-    for asset_id, asset_tags in tags.items():  # 遍历每个资产
-        description = descriptions.get(asset_id, "")  # 获取描述文本
-        for index, rule in enumerate(blueprint_rules):  # 遍历规则列表
-            if not rule_matches(asset_tags, rule.get("match_any", [])):  # 若不匹配
-                continue  # 跳过
-            hits[index] += 1  # 记录命中次数
-            template = rule.get("blueprint", {})  # 获取蓝图模板
-            prefix = template.get("id_prefix", normalize_id(asset_id, normalize_rules) or "auto")  # 计算ID前缀
-            counters[prefix] = counters.get(prefix, 0) + 1  # 更新计数器
-            serial = counters[prefix]  # 获取序号
-            blueprint_id = f"{prefix}-{serial:03d}"  # 构造蓝图ID
-            name_hint = template.get("name") or description or blueprint_id  # 推断蓝图名称
-            cost_template = template.get("cost_defaults", [])  # 读取成本模板
-            costs = adjust_costs(cost_template, asset_tags)  # 根据标签调整成本
-            blueprint_entry = {  # 构造蓝图条目
-                "id": blueprint_id,  # 蓝图ID
-                "name": name_hint,  # 蓝图名称
-                "tile": template.get("tile", "FLOOR"),  # 指定瓷砖类型
-                "source_asset": asset_id,  # 记录来源资产
-                "cost": costs,  # 写入成本数组
-            }  # 条目构造完成
-            blueprints.append(blueprint_entry)  # 保存蓝图
     fallback_count = 0  # 初始化兜底计数
     for index, rule in enumerate(blueprint_rules):  # 遍历规则检查未命中项
         if hits[index] > 0:  # 若已有命中
             continue  # 无需兜底
         template = rule.get("blueprint", {})  # 读取模板
         prefix = template.get("id_prefix", f"auto{index}")  # 计算前缀
-        counters[prefix] = counters.get(prefix, 0) + 1  # 更新计数
-        serial = counters[prefix]  # 获取序号
-        blueprint_id = f"{prefix}-{serial:03d}"  # 构造蓝图ID
+        blueprint_id = allocate(f"rule:{index}", prefix)  # 分配蓝图ID
         name_base = template.get("name") or f"自动蓝图{index + 1}"  # 基础名称
         cost_template = template.get("cost_defaults", [])  # 成本模板
         costs = adjust_costs(cost_template, [])  # 使用默认标签调整
@@ -258,33 +455,62 @@ def synthesize_blueprints(
     return blueprints  # 返回蓝图列表
 
 
-# 根据规则生成商店数据
+# 根据规则生成蓝图数据
 
-def synthesize_shops(
+def synthesize_blueprints(
     tags: TagsMap,  # 标签映射
+    descriptions: DescriptionsMap,  # 描述映射
     rules: Dict[str, Any],  # 规则数据
+    report_lines: List[str],  # 报告文本列表
+    tag_sets: Optional[TagSets] = None,  # 预先构造的资产标签集合
+) -> List[Dict[str, Any]]:  # 返回蓝图列表
+    blueprints: List[Dict[str, Any]] = []  # 初始化蓝图列表
+    allocate = StableIds()  # 蓝图ID分配器
+    blueprint_rules = rules.get("tags_to_blueprints", [])  # 获取蓝图规则
+    normalize_rules = rules.get("id_normalize", {})  # 获取ID归一化配置
+    hits: List[int] = [0] * len(blueprint_rules)  # 初始化规则命中统计
+    tag_sets = build_tag_sets(tags) if tag_sets is None else tag_sets  # 准备资产标签集合
+    compiled = CompiledRules(blueprint_rules)  # 编译规则
+    for asset_id, asset_tags in tag_sets.items():  # 遍历每个资产
+        description = descriptions.get(asset_id, "")  # 获取描述文本
+        for index in compiled.matches(asset_tags):  # 只遍历命中的规则
+            hits[index] += 1  # 记录命中次数
+            template = blueprint_rules[index].get("blueprint", {})  # 获取蓝图模板
+            blueprints.append(make_blueprint(asset_id, asset_tags, description, template, allocate, normalize_rules))  # 保存蓝图
+    return finish_blueprints(blueprint_rules, hits, allocate, blueprints, report_lines)  # 补充兜底并返回
+
+
+# 单个资产命中商店规则时写入商品，返回是否计为命中
+
+def apply_goods(
+    goods_map: Dict[str, Dict[str, Any]],  # 商品字典
+    asset_id: str,  # 资产ID
+    asset_tags: FrozenSet[str],  # 资产标签集合
+    rule: Dict[str, Any],  # 商店规则
+) -> bool:  # 返回是否命中
+    goods_template = dict(rule.get("goods", {}))  # 克隆商品模板
+    if not goods_template.get("id"):  # 若缺少ID
+        return False  # 不计命中
+    goods_id = goods_template["id"]  # 读取ID
+    goods_template.setdefault("kind", "material")  # 默认商品类别
+    price = goods_template.get("basePrice", 1)  # 获取价格
+    if "discount" in asset_tags:  # 折扣标签
+        goods_template["basePrice"] = max(1, int(price * 0.8))  # 打折
+    if "inflation" in asset_tags:  # 通胀标签
+        goods_template["basePrice"] = max(1, int(math.ceil(price * 1.2)))  # 上调
+    goods_template["source_asset"] = asset_id  # 记录来源资产
+    goods_map[goods_id] = goods_template  # 按ID覆盖存储
+    return True  # 计为命中
+
+
+# 为未命中的商店规则补充兜底商品并组装商店
+
+def finish_shops(
+    shop_rules: List[Dict[str, Any]],  # 商店规则
+    hits: List[int],  # 规则命中统计
+    goods_map: Dict[str, Dict[str, Any]],  # 商品字典
     report_lines: List[str],  # 报告列表
 ) -> List[Dict[str, Any]]:  # 返回商店列表
-    goods_map: Dict[str, Dict[str, Any]] = {}  # 使用字典避免重复商品
-    shop_rules = rules.get("tags_to_shop", [])  # 获取商店规则
-    hits: List[int] = [0] * len(shop_rules)  # 初始化规则命中统计
-    for asset_id, asset_tags in tags.items():  # 遍历资产
-        for index, rule in enumerate(shop_rules):  # 遍历规则
-            if not rule_matches(asset_tags, rule.get("match_any", [])):  # 若不匹配
-                continue  # 跳过
-            goods_template = dict(rule.get("goods", {}))  # 克隆商品模板
-            if not goods_template.get("id"):  # 若缺少ID
-                continue  # 跳过
-            hits[index] += 1  # 记录命中
-            goods_id = goods_template["id"]  # 读取ID
-            goods_template.setdefault("kind", "material")  # 默认商品类别
-            price = goods_template.get("basePrice", 1)  # 获取价格
-            if "discount" in asset_tags:  # 折扣标签
-                goods_template["basePrice"] = max(1, int(price * 0.8))  # 打折
-            if "inflation" in asset_tags:  # 通胀标签
-                goods_template["basePrice"] = max(1, int(math.ceil(price * 1.2)))  # 上调
-            goods_template["source_asset"] = asset_id  # 记录来源资产
-            goods_map[goods_id] = goods_template  # 按ID覆盖存储
     fallback_goods = 0  # 初始化兜底商品计数
     for index, rule in enumerate(shop_rules):  # 检查未命中规则
         if hits[index] > 0:  # 若已有命中
@@ -316,62 +542,94 @@ def synthesize_shops(
     return [shop_entry]  # 返回列表
 
 
-# 根据规则生成任务数据
+# 根据规则生成商店数据
 
-def synthesize_quests(
+def synthesize_shops(
     tags: TagsMap,  # 标签映射
-    descriptions: DescriptionsMap,  # 描述映射
     rules: Dict[str, Any],  # 规则数据
     report_lines: List[str],  # 报告列表
+    tag_sets: Optional[TagSets] = None,  # 预先构造的资产标签集合
+) -> List[Dict[str, Any]]:  # 返回商店列表
+    goods_map: Dict[str, Dict[str, Any]] = {}  # 使用字典避免重复商品
+    shop_rules = rules.get("tags_to_shop", [])  # 获取商店规则
+    hits: List[int] = [0] * len(shop_rules)  # 初始化规则命中统计
+    tag_sets = build_tag_sets(tags) if tag_sets is None else tag_sets  # 准备资产标签集合
+    compiled = CompiledRules(shop_rules)  # 编译规则
+    for asset_id, asset_tags in tag_sets.items():  # 遍历资产
+        for index in compiled.matches(asset_tags):  # 只遍历命中的规则
+            if apply_goods(goods_map, asset_id, asset_tags, shop_rules[index]):  # 写入商品
+                hits[index] += 1  # 记录命中
+    return finish_shops(shop_rules, hits, goods_map, report_lines)  # 补充兜底并返回
+
+
+# 构造单步骤任务条目，返回 (任务, 是否缺少坐标)
+
+def make_quest(
+    quest_id: str,  # 任务ID
+    title: str,  # 任务标题
+    template: Dict[str, Any],  # 任务模板
+    defaults: Tuple[str, str],  # 缺省的收集物品与对话NPC
+) -> Tuple[Dict[str, Any], bool]:  # 返回任务条目与坐标缺失标记
+    step_type = template.get("type", "collect")  # 获取步骤类型
+    step_id = f"{quest_id}-step-1"  # 单步骤ID
+    step: Dict[str, Any] = {  # 构造步骤
+        "id": step_id,  # 步骤ID
+        "type": step_type,  # 步骤类型
+        "title": title,  # 步骤标题
+    }  # 步骤结束
+    missing = False  # 坐标缺失标记
+    if step_type == "collect":  # 如果是收集任务
+        step["itemId"] = template.get("targetId", defaults[0])  # 指定物品
+        step["count"] = template.get("count", 1)  # 数量
+    elif step_type == "talk":  # 如果是对话任务
+        step["npcId"] = template.get("npc", defaults[1])  # 指定NPC
+    elif step_type == "reach":  # 如果是到达任务
+        step["radius"] = template.get("radius", 1)  # 半径
+        if "targetX" in template and "targetY" in template:  # 若提供坐标
+            step["targetX"] = template["targetX"]  # 写入X坐标
+            step["targetY"] = template["targetY"]  # 写入Y坐标
+        else:  # 未提供坐标
+            missing = True  # 标记缺失
+            step["desc"] = f"reach target: {template.get('target', 'unknown')}"  # 写入说明
+    quest_entry = {  # 构造任务条目
+        "id": quest_id,  # 任务ID
+        "kind": template.get("kind", "side"),  # 任务类别
+        "title": title,  # 任务标题
+        "steps": [step],  # 步骤列表
+        "rewards": template.get("reward", {"gold": 10}),  # 奖励配置
+    }  # 任务条目结束
+    return quest_entry, missing  # 返回结果
+
+
+# 单个资产命中任务规则时构造任务条目
+
+def asset_quest(
+    asset_id: str,  # 资产ID
+    description: str,  # 资产描述
+    template: Dict[str, Any],  # 任务模板
+    allocate: StableIds,  # 任务ID分配器
+    normalize_rules: Dict[str, Any],  # ID归一化配置
+) -> Tuple[Dict[str, Any], bool]:  # 返回任务条目与坐标缺失标记
+    title = template.get("title") or description or "自动任务"  # 决定标题
+    base_prefix = normalize_id(title, normalize_rules) or "quest"  # 生成前缀
+    quest_id = allocate(asset_id, base_prefix)  # 分配任务ID
+    quest_entry, missing = make_quest(quest_id, title, template, ("unknown_item", "npc"))  # 构造条目
+    quest_entry["desc"] = description or title  # 任务简介
+    quest_entry["source_asset"] = asset_id  # 标记来源资产
+    return quest_entry, missing  # 返回结果
+
+
+# 为未命中的任务规则补充兜底任务并写入报告
+
+def finish_quests(
+    quest_rules: List[Dict[str, Any]],  # 任务规则
+    hits: List[int],  # 规则命中统计
+    allocate: StableIds,  # 任务ID分配器
+    quests: List[Dict[str, Any]],  # 已生成的任务
+    missing_coordinates: int,  # 未提供坐标的计数
+    normalize_rules: Dict[str, Any],  # ID归一化配置
+    report_lines: List[str],  # 报告列表
 ) -> List[Dict[str, Any]]:  # 返回任务列表
-    quests: List[Dict[str, Any]] = []  # 初始化任务列表
-    counters: Dict[str, int] = {}  # 任务ID计数器
-    quest_rules = rules.get("tags_to_quests", [])  # 获取任务规则
-    normalize_rules = rules.get("id_normalize", {})  # 获取ID归一化
-    missing_coordinates = 0  # 未提供坐标的计数
-    hits: List[int] = [0] * len(quest_rules)  # 初始化命中统计
-    for asset_id, asset_tags in tags.items():  # 遍历资产
-        description = descriptions.get(asset_id, "")  # 获取描述
-        for index, rule in enumerate(quest_rules):  # 遍历规则
-            if not rule_matches(asset_tags, rule.get("match_any", [])):  # 若不匹配
-                continue  # 跳过
-            hits[index] += 1  # 记录命中
-            template = rule.get("quest", {})  # 获取任务模板
-            title = template.get("title") or description or "自动任务"  # 决定标题
-            base_prefix = normalize_id(title, normalize_rules) or "quest"  # 生成前缀
-            counters[base_prefix] = counters.get(base_prefix, 0) + 1  # 更新序号
-            quest_id = f"{base_prefix}-{counters[base_prefix]:03d}"  # 生成ID
-            step_type = template.get("type", "collect")  # 获取步骤类型
-            step_id = f"{quest_id}-step-1"  # 单步骤ID
-            step: Dict[str, Any] = {  # 构造步骤
-                "id": step_id,  # 步骤ID
-                "type": step_type,  # 步骤类型
-                "title": title,  # 步骤标题
-            }  # 步骤结束
-            if step_type == "collect":  # 如果是收集任务
-                step["itemId"] = template.get("targetId", "unknown_item")  # 指定物品
-                step["count"] = template.get("count", 1)  # 数量
-            elif step_type == "talk":  # 如果是对话任务
-                step["npcId"] = template.get("npc", "npc")  # 指定NPC
-            elif step_type == "reach":  # 如果是到达任务
-                step["radius"] = template.get("radius", 1)  # 半径
-                if "targetX" in template and "targetY" in template:  # 若提供坐标
-                    step["targetX"] = template["targetX"]  # 写入X坐标
-                    step["targetY"] = template["targetY"]  # 写入Y坐标
-                else:  # 未提供坐标
-                    missing_coordinates += 1  # 统计缺失
-                    step["desc"] = f"reach target: {template.get('target', 'unknown')}"  # 写入说明
-            reward = template.get("reward", {"gold": 10})  # 奖励
-            quest_entry = {  # 构造任务条目
-                "id": quest_id,  # 任务ID
-                "kind": template.get("kind", "side"),  # 任务类别
-                "title": title,  # 任务标题
-                "desc": description or title,  # 任务简介
-                "steps": [step],  # 步骤列表
-                "rewards": reward,  # 奖励配置
-                "source_asset": asset_id,  # 标记来源资产
-            }  # 任务条目结束
-            quests.append(quest_entry)  # 添加到列表
     fallback_count = 0  # 初始化兜底计数
     for index, rule in enumerate(quest_rules):  # 遍历规则
         if hits[index] > 0:  # 若已有命中
@@ -379,37 +637,10 @@ def synthesize_quests(
         template = rule.get("quest", {})  # 获取模板
         title = template.get("title") or f"自动任务{index + 1}"  # 兜底标题
         base_prefix = normalize_id(title, normalize_rules) or "quest"  # 计算前缀
-        counters[base_prefix] = counters.get(base_prefix, 0) + 1  # 更新序号
-        quest_id = f"{base_prefix}-{counters[base_prefix]:03d}"  # 构造ID
-        step_type = template.get("type", "collect")  # 获取步骤类型
-        step_id = f"{quest_id}-step-1"  # 构造步骤ID
-        step: Dict[str, Any] = {  # 构造兜底步骤
-            "id": step_id,  # 步骤ID
-            "type": step_type,  # 步骤类型
-            "title": title,  # 步骤标题
-        }  # 步骤结束
-        if step_type == "collect":  # 收集任务兜底
-            step["itemId"] = template.get("targetId", "wood")  # 默认物品
-            step["count"] = template.get("count", 1)  # 默认数量
-        elif step_type == "talk":  # 对话任务兜底
-            step["npcId"] = template.get("npc", "villager")  # 默认NPC
-        elif step_type == "reach":  # 到达任务兜底
-            step["radius"] = template.get("radius", 1)  # 默认半径
-            if "targetX" in template and "targetY" in template:  # 若模板含坐标
-                step["targetX"] = template["targetX"]  # 写入X
-                step["targetY"] = template["targetY"]  # 写入Y
-            else:  # 否则
-                step["desc"] = f"reach target: {template.get('target', 'unknown')}"  # 提供说明
-        reward = template.get("reward", {"gold": 10})  # 默认奖励
-        quest_entry = {  # 构造兜底任务
-            "id": quest_id,  # 任务ID
-            "kind": template.get("kind", "side"),  # 任务类别
-            "title": title,  # 任务标题
-            "desc": title,  # 简介
-            "steps": [step],  # 步骤列表
-            "rewards": reward,  # 奖励配置
-            "source_asset": f"rule:{index}",  # 标记来源
-        }  # 兜底条目结束
+        quest_id = allocate(f"rule:{index}", base_prefix)  # 分配任务ID
+        quest_entry, _missing = make_quest(quest_id, title, template, ("wood", "villager"))  # 构造兜底任务
+        quest_entry["desc"] = title  # 简介
+        quest_entry["source_asset"] = f"rule:{index}"  # 标记来源
         quests.append(quest_entry)  # 添加兜底任务
         fallback_count += 1  # 累计兜底数量
     report_lines.append(f"quests generated: {len(quests)}")  # 记录数量
@@ -420,13 +651,153 @@ def synthesize_quests(
     return quests  # 返回任务列表
 
 
-# 写入JSON文件，确保格式统一
+# 根据规则生成任务数据
+
+def synthesize_quests(
+    tags: TagsMap,  # 标签映射
+    descriptions: DescriptionsMap,  # 描述映射
+    rules: Dict[str, Any],  # 规则数据
+    report_lines: List[str],  # 报告列表
+    tag_sets: Optional[TagSets] = None,  # 预先构造的资产标签集合
+) -> List[Dict[str, Any]]:  # 返回任务列表
+    quests: List[Dict[str, Any]] = []  # 初始化任务列表
+    allocate = StableIds()  # 任务ID分配器
+    quest_rules = rules.get("tags_to_quests", [])  # 获取任务规则
+    normalize_rules = rules.get("id_normalize", {})  # 获取ID归一化
+    missing_coordinates = 0  # 未提供坐标的计数
+    hits: List[int] = [0] * len(quest_rules)  # 初始化命中统计
+    tag_sets = build_tag_sets(tags) if tag_sets is None else tag_sets  # 准备资产标签集合
+    compiled = CompiledRules(quest_rules)  # 编译规则
+    for asset_id, asset_tags in tag_sets.items():  # 遍历资产
+        description = descriptions.get(asset_id, "")  # 获取描述
+        for index in compiled.matches(asset_tags):  # 只遍历命中的规则
+            hits[index] += 1  # 记录命中
+            quest_entry, missing = asset_quest(asset_id, description, quest_rules[index].get("quest", {}), allocate, normalize_rules)  # 构造任务
+            missing_coordinates += int(missing)  # 统计缺失坐标
+            quests.append(quest_entry)  # 添加到列表
+    return finish_quests(quest_rules, hits, allocate, quests, missing_coordinates, normalize_rules, report_lines)  # 补充兜底并返回
+
+
+# 增量合成状态：ID分配表、上次的资产指纹与按来源分组的上次产物
+
+class SynthState:  # 定义增量状态
+    def __init__(self, saved: Optional[Dict[str, Any]] = None, previous: Optional[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]] = None, track: bool = True) -> None:  # 初始化状态
+        saved = saved or {}  # 兼容缺省
+        self.track = track  # 是否计算资产指纹（仅增量模式需要）
+        self.blueprint_ids = StableIds(saved.get("blueprints"))  # 蓝图ID分配器
+        self.quest_ids = StableIds(saved.get("quests"))  # 任务ID分配器
+        self.previous_fingerprints: Dict[str, str] = dict(saved.get("assets", {})) if previous is not None else {}  # 上次产物缺失时全部重新合成
+        self.previous_blueprints = group_by_source(previous[0] if previous else [])  # 上次的蓝图
+        self.previous_quests = group_by_source(previous[1] if previous else [])  # 上次的任务
+        self.fingerprints: Dict[str, str] = {}  # 本次的资产指纹，不计算指纹时值为空字符串
+        self.outputs: Dict[str, str] = {}  # 本次写出后各产物文件的摘要
+        self.resynthesized = 0  # 本次重新合成的资产数
+
+    def to_json(self) -> Dict[str, Any]:  # 导出状态
+        return {  # 返回可写出的状态
+            "version": SYNTH_STATE_VERSION,  # 状态格式版本
+            "assets": self.fingerprints if self.track else {},  # 资产指纹；全量运行不计算指纹，下次增量运行会全部重新合成
+            "blueprints": self.blueprint_ids.to_json(self.fingerprints),  # 蓝图ID分配表
+            "quests": self.quest_ids.to_json(self.fingerprints),  # 任务ID分配表
+            "outputs": self.outputs,  # 产物文件摘要
+        }  # 状态结束
+
+
+# 工具函数：按来源资产分组产物条目
+
+def group_by_source(entries: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:  # 定义分组函数
+    grouped: Dict[str, List[Dict[str, Any]]] = {}  # 初始化分组
+    for entry in entries:  # 遍历条目
+        grouped.setdefault(str(entry.get("source_asset", "")), []).append(entry)  # 按来源归类
+    return grouped  # 返回分组
 
-def write_json(path: Path, payload: Dict[str, Any]) -> None:  # 定义写入函数
-    path.parent.mkdir(parents=True, exist_ok=True)  # 确保父目录存在
-    with path.open("w", encoding="utf-8") as handle:  # 打开文件
-        json.dump(payload, handle, ensure_ascii=False, indent=2, sort_keys=True)  # 写入格式化JSON
-        handle.write("\n")  # 末尾追加换行
+
+# 工具函数：判断任务条目是否缺少到达坐标
+
+def quest_missing_coordinates(quest_entry: Dict[str, Any]) -> bool:  # 定义坐标缺失判断函数
+    return any(step.get("type") == "reach" and "targetX" not in step for step in quest_entry.get("steps", []))  # 到达步骤缺少坐标
+
+
+# 单遍遍历资产目录，同时生成蓝图、商店与任务；给出 state 时复用未变化资产的上次产物并使用稳定ID
+
+def synthesize_all(
+    tags: TagsMap,  # 标签映射
+    descriptions: DescriptionsMap,  # 描述映射
+    rules: Dict[str, Any],  # 规则数据
+    report_lines: List[str],  # 报告列表
+    tag_sets: Optional[TagSets] = None,  # 预先构造的资产标签集合
+    state: Optional[SynthState] = None,  # 增量合成状态
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:  # 返回 (蓝图, 商店, 任务)
+    blueprint_rules = rules.get("tags_to_blueprints", [])  # 获取蓝图规则
+    shop_rules = rules.get("tags_to_shop", [])  # 获取商店规则
+    quest_rules = rules.get("tags_to_quests", [])  # 获取任务规则
+    normalize_rules = rules.get("id_normalize", {})  # 获取ID归一化配置
+    blueprint_compiled, shop_compiled, quest_compiled = (CompiledRules(rule_list) for rule_list in (blueprint_rules, shop_rules, quest_rules))  # 三类编译规则
+    blueprint_hits, shop_hits, quest_hits = [0] * len(blueprint_rules), [0] * len(shop_rules), [0] * len(quest_rules)  # 命中统计
+    state = SynthState(track=False) if state is None else state  # 未给出状态时使用空分配表，ID与流水号一致
+    track = state.track  # 只有增量模式才计算资产指纹
+    blueprint_prints = [content_digest(rule) for rule in blueprint_rules] if track else []  # 蓝图规则指纹
+    quest_prints = [content_digest(rule) for rule in quest_rules] if track else []  # 任务规则指纹
+    normalize_print = content_digest(normalize_rules) if track else ""  # 归一化配置指纹
+    blueprints: List[Dict[str, Any]] = []  # 蓝图列表
+    goods_map: Dict[str, Dict[str, Any]] = {}  # 商品字典
+    quests: List[Dict[str, Any]] = []  # 任务列表
+    missing_coordinates = 0  # 未提供坐标的计数
+    tag_sets = build_tag_sets(tags) if tag_sets is None else tag_sets  # 准备资产标签集合
+    for asset_id, asset_tags in tag_sets.items():  # 每个资产只遍历一次
+        description = descriptions.get(asset_id, "")  # 只查询一次描述
+        blueprint_matches = blueprint_compiled.matches(asset_tags)  # 命中的蓝图规则
+        quest_matches = quest_compiled.matches(asset_tags)  # 命中的任务规则
+        for index in shop_compiled.matches(asset_tags):  # 商品按ID后写覆盖，每次全部重算
+            if apply_goods(goods_map, asset_id, asset_tags, shop_rules[index]):  # 写入商品
+                shop_hits[index] += 1  # 记录命中
+        for index in blueprint_matches:  # 统计蓝图命中
+            blueprint_hits[index] += 1  # 记录命中
+        for index in quest_matches:  # 统计任务命中
+            quest_hits[index] += 1  # 记录命中
+        fingerprint = content_digest([sorted(asset_tags), description, [blueprint_prints[index] for index in blueprint_matches], [quest_prints[index] for index in quest_matches], normalize_print]) if track else ""  # 资产指纹
+        state.fingerprints[asset_id] = fingerprint  # 记录指纹
+        if track and state.previous_fingerprints.get(asset_id) == fingerprint:  # 标签、描述与命中规则均未变化
+            blueprints.extend(state.previous_blueprints.get(asset_id, []))  # 复用上次的蓝图
+            reused_quests = state.previous_quests.get(asset_id, [])  # 上次的任务
+            quests.extend(reused_quests)  # 复用上次的任务
+            missing_coordinates += sum(quest_missing_coordinates(entry) for entry in reused_quests)  # 统计缺失坐标
+            continue  # 下一个资产
+        state.resynthesized += 1  # 统计重新合成的资产
+        for index in blueprint_matches:  # 命中的蓝图规则
+            blueprints.append(make_blueprint(asset_id, asset_tags, description, blueprint_rules[index].get("blueprint", {}), state.blueprint_ids, normalize_rules))  # 保存蓝图
+        for index in quest_matches:  # 命中的任务规则
+            quest_entry, missing = asset_quest(asset_id, description, quest_rules[index].get("quest", {}), state.quest_ids, normalize_rules)  # 构造任务
+            missing_coordinates += int(missing)  # 统计缺失坐标
+            quests.append(quest_entry)  # 添加任务
+    blueprints = finish_blueprints(blueprint_rules, blueprint_hits, state.blueprint_ids, blueprints, report_lines)  # 蓝图兜底与报告
+    shops = finish_shops(shop_rules, shop_hits, goods_map, report_lines)  # 商店兜底与报告
+    quests = finish_quests(quest_rules, quest_hits, state.quest_ids, quests, missing_coordinates, normalize_rules, report_lines)  # 任务兜底与报告
+    return blueprints, shops, quests  # 返回结果
+
+
+# 写入JSON文件，确保格式统一；条目逐个序列化写出，默认格式与 json.dump(indent=2, sort_keys=True) 逐字节一致
+
+def write_json(path: Path, payload: Dict[str, Any], json_format: str = "pretty") -> None:  # 定义写入函数
+    write_json_stream(path, payload, json_format, sort_keys=True, newline=True)  # 流式写出，内容未变化时保留原文件
+
+
+# 进程池任务：写入单个JSON文件
+
+def write_json_job(job: Tuple[Any, ...]) -> None:  # 定义进程池任务函数
+    write_json(*job)  # 解包 (路径, 负载[, 格式]) 并写入
+
+
+# 并行写入多个JSON文件，格式化序列化在各进程中独立进行
+
+def write_outputs(jobs: List[Tuple[Any, ...]], workers: Optional[int] = None) -> None:  # 定义批量写入函数
+    workers = min(len(jobs), os.cpu_count() or 1) if workers is None else workers  # 默认按文件数与CPU数取较小值
+    if workers <= 1 or len(jobs) <= 1:  # 无需进程池
+        for job in jobs:  # 逐个写入
+            write_json_job(job)  # 写入文件
+        return  # 结束
+    with ProcessPoolExecutor(max_workers=workers) as executor:  # 创建进程池
+        list(executor.map(write_json_job, jobs))  # 并行写入并传播异常
 
 
 # 生成报告文件
@@ -448,11 +819,8 @@ def write_report(path: Path, lines: List[str]) -> None:  # 定义写报告函数
 
 # 主执行流程
 
-def main() -> None:  # 定义主函数
-    parser = argparse.ArgumentParser(description="synthesize default gameplay data")  # 创建参数解析器
-    parser.add_argument("--base", type=str, default=str(Path(__file__).resolve().parents[1]), help="项目根目录路径")  # 添加基准路径参数
-    args = parser.parse_args()  # 解析参数
-    base_path = Path(args.base).resolve()  # 解析基准路径
+def run_synthesis(base_path: Path, workers: Optional[int] = None, incremental: bool = False, json_format: str = "pretty") -> List[str]:  # 定义完整合成流程
+    """读取元数据、单遍合成并写出全部产物，返回报告行；增量模式复用未变化资产的产物并只改写内容变化的文件；jsonl 格式的产物后缀为 .jsonl"""  # 函数文档字符串
     assets_path = base_path / "assets"  # 资产目录
     metadata_path = assets_path / "metadata"  # 元数据目录
     auto_path = assets_path / "auto"  # 输出目录
@@ -461,6 +829,12 @@ def main() -> None:  # 定义主函数
     descriptions_path = metadata_path / "descriptions.json"  # 描述文件路径
     collections_path = metadata_path / "collections.json"  # 集合文件路径
     rules_path = base_path / "scripts" / "rules_mapping.json"  # 规则文件路径
+    state_path = auto_path / STATE_RELATIVE_PATH  # 增量状态路径
+    output_paths = {  # 三类产物路径
+        "blueprints": stream_path(auto_path / "blueprints_auto.json", json_format),  # 蓝图JSON
+        "shops": stream_path(auto_path / "shops_auto.json", json_format),  # 商店JSON
+        "quests": stream_path(auto_path / "quests_auto.json", json_format),  # 任务JSON
+    }  # 路径结束
 
     preview_index = load_json(preview_index_path, {})  # 读取预览索引
     tags: TagsMap = load_json(tags_path, {})  # 读取标签映射
@@ -472,17 +846,45 @@ def main() -> None:  # 定义主函数
     report_lines.append(f"preview_index sections: {len(preview_index.keys())}")  # 记录预览索引规模
     report_lines.append(f"tagged assets: {len(tags.keys())}")  # 记录标签数量
 
-    blueprints = synthesize_blueprints(tags, descriptions, rules, report_lines)  # 生成蓝图
-    shops = synthesize_shops(tags, rules, report_lines)  # 生成商店
-    quests = synthesize_quests(tags, descriptions, rules, report_lines)  # 生成任务
+    previous_files = {key: read_json_stream(path) if path.is_file() else None for key, path in output_paths.items()} if incremental else {}  # 增量模式读取上次产物
+    previous = None  # 上次的蓝图与任务
+    if previous_files.get("blueprints") is not None and previous_files.get("quests") is not None:  # 两类产物都存在时才能复用
+        previous = (previous_files["blueprints"].get("blueprints", []), previous_files["quests"].get("quests", []))  # 读取条目
+    saved_state = load_json(state_path, {})  # 读取上次的状态
+    if previous is not None and saved_state.get("outputs") != file_digests(output_paths.values()):  # 产物已被回滚或修改，上次的条目不可信
+        report_lines.append("incremental: outputs differ from saved state, resynthesizing all assets")  # 记录原因
+        previous = None  # 不复用上次的条目
+    state = SynthState(saved_state, previous, track=incremental)  # 全量模式同样沿用已有ID分配，避免重新编号
+    tag_sets = build_tag_sets(tags)  # 每个资产只构造一次标签集合
+    blueprints, shops, quests = synthesize_all(tags, descriptions, rules, report_lines, tag_sets, state)  # 单遍生成蓝图、商店与任务
+    if incremental:  # 记录增量统计
+        report_lines.append(f"incremental: resynthesized {state.resynthesized} of {len(tags)} assets")  # 重新合成的资产数
 
     timestamp = current_utc_iso()  # 生成统一时间戳
     meta = {"generatedAt": timestamp, "rulesVersion": rules.get("version", 1)}  # 构造元信息
 
-    write_json(auto_path / "blueprints_auto.json", {"meta": meta, "blueprints": blueprints})  # 写入蓝图JSON
-    write_json(auto_path / "shops_auto.json", {"meta": meta, "shops": shops})  # 写入商店JSON
-    write_json(auto_path / "quests_auto.json", {"meta": meta, "quests": quests})  # 写入任务JSON
+    jobs: List[Tuple[Path, Dict[str, Any], str]] = []  # 需要写出的文件
+    for key, entries in (("blueprints", blueprints), ("shops", shops), ("quests", quests)):  # 遍历三类产物
+        old = previous_files.get(key)  # 上次的文件内容
+        if old is not None and old.get(key) == entries and old.get("meta", {}).get("rulesVersion") == meta["rulesVersion"]:  # 内容未变化
+            report_lines.append(f"{key} unchanged, kept {output_paths[key].name}")  # 记录跳过
+            continue  # 保留原文件（含生成时间）
+        jobs.append((output_paths[key], {"meta": meta, key: entries}, json_format))  # 加入写出列表
+    write_outputs(jobs, workers)  # 并行写入变化的JSON文件
+    state.outputs = file_digests(output_paths.values())  # 记录写出后的产物摘要
+    write_json_stream(state_path, state.to_json(), "compact", newline=True)  # 紧凑写出ID分配表与指纹
     write_report(auto_path / "report.txt", report_lines)  # 写入报告文本
+    return report_lines  # 返回报告内容
+
+
+def main() -> None:  # 定义主函数
+    parser = argparse.ArgumentParser(description="synthesize default gameplay data")  # 创建参数解析器
+    parser.add_argument("--base", type=str, default=str(Path(__file__).resolve().parents[1]), help="项目根目录路径")  # 添加基准路径参数
+    parser.add_argument("--workers", type=int, default=None, help="写入输出文件的进程数，默认按文件数与CPU数取较小值")  # 添加进程数参数
+    parser.add_argument("--incremental", action="store_true", help="沿用 assets/auto/state/id_allocations.json 中的ID分配，只重新合成变化的资产")  # 添加增量参数
+    parser.add_argument("--json-format", choices=JSON_FORMATS, default="pretty", help="产物格式：pretty（默认，indent=2）、compact（单行）或 jsonl（每行一个条目，后缀 .jsonl，前端不加载）")  # 添加输出格式参数
+    args = parser.parse_args()  # 解析参数
+    run_synthesis(Path(args.base).resolve(), args.workers, args.incremental, args.json_format)  # 执行合成流程
 
 
 if __name__ == "__main__":  # 确保脚本作为主程序执行时才运行主函数
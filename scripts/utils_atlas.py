@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# 该脚本提供瓦片图集的 NumPy 视图与内容分析工具
+# 导入 hashlib 计算瓦片摘要
+import hashlib
+# 导入 pathlib 用于处理路径
+from pathlib import Path
+# 导入 typing 提供类型注解
+from typing import Any, Dict, List
+
+# 导入 NumPy 进行向量化计算
+import numpy as np
+# 导入 Pillow 解码图集像素
+from PIL import Image
+
+# 定义近似重复的默认阈值（RGBA 通道平均绝对差，0-255）
+DEFAULT_NEAR_THRESHOLD = 4.0
+# 定义签名缩略的边长（每个瓦片压缩为 4x4 块均值）
+SIGNATURE_BLOCKS = 4
+
+# 定义读取 RGBA 像素的函数
+def load_rgba(path: Path) -> np.ndarray:
+    """以 (H, W, 4) uint8 数组读取图片"""
+    # 打开图片并统一为 RGBA
+    with Image.open(path) as image:
+        return np.asarray(image.convert("RGBA"))
+
+# 定义构造瓦片网格视图的函数
+def tile_grid_view(pixels: np.ndarray, tile_size: int) -> np.ndarray:
+    """将 (H, W, 4) 图集重排为 (rows, cols, tile, tile, 4) 视图，不复制像素"""
+    # 计算完整的行列数，多余的边缘像素被忽略
+    rows = pixels.shape[0] // tile_size
+    cols = pixels.shape[1] // tile_size
+    # 截取完整网格区域
+    trimmed = pixels[: rows * tile_size, : cols * tile_size]
+    # 先拆分行列再交换轴，reshape 与 swapaxes 均返回视图
+    return trimmed.reshape(rows, tile_size, cols, tile_size, pixels.shape[2]).swapaxes(1, 2)
+
+# 定义判定全透明瓦片的函数
+def empty_tile_mask(grid: np.ndarray) -> np.ndarray:
+    """返回 (rows, cols) 布尔数组，True 表示 alpha 全为 0"""
+    # 检查每个瓦片的 alpha 通道
+    return ~grid[..., 3].any(axis=(2, 3))
+
+# 定义计算瓦片摘要的函数
+def tile_digests(flat_tiles: np.ndarray) -> List[str]:
+    """对 (n, tile*tile*4) 的连续数组逐瓦片计算 blake2b 摘要"""
+    # 每行即一个瓦片的完整字节
+    return [hashlib.blake2b(row.tobytes(), digest_size=16).hexdigest() for row in flat_tiles]
+
+# 定义计算瓦片签名的函数
+def tile_signatures(tiles: np.ndarray) -> np.ndarray:
+    """将每个瓦片压缩为 4x4 块均值，作为近似比较的下界签名"""
+    # 取得瓦片数量与边长
+    count, size = tiles.shape[0], tiles.shape[1]
+    # 瓦片边长不可整除时退化为整块均值
+    blocks = SIGNATURE_BLOCKS if size % SIGNATURE_BLOCKS == 0 else 1
+    step = size // blocks
+    # 按块求均值得到 (n, blocks, blocks, 4)
+    reshaped = tiles.reshape(count, blocks, step, blocks, step, tiles.shape[3]).astype(np.float32)
+    return reshaped.mean(axis=(2, 4)).reshape(count, -1)
+
+# 定义查找近似重复瓦片的函数
+def find_near_duplicates(tiles: np.ndarray, threshold: float) -> List[List[Any]]:
+    """返回 [i, j, score] 列表，score 为像素级平均绝对差"""
+    # 少于两个瓦片无需比较
+    if tiles.shape[0] < 2:
+        return []
+    # 计算块均值签名；块均值差的均值不超过像素差的均值，可安全剪枝
+    signatures = tile_signatures(tiles)
+    flat = tiles.reshape(tiles.shape[0], -1)
+    # 整体均值同样是下界，按其排序后只需比较阈值窗口内的瓦片
+    means = signatures.mean(axis=1)
+    order = np.argsort(means, kind="stable")
+    sorted_means = means[order]
+    window_end = np.searchsorted(sorted_means, sorted_means + threshold, side="right")
+    pairs: List[List[Any]] = []
+    # 逐个瓦片比较其窗口内的签名距离
+    for position, index in enumerate(order.tolist()):
+        candidates = order[position + 1 : window_end[position]]
+        if candidates.size == 0:
+            continue
+        distance = np.abs(signatures[candidates] - signatures[index]).mean(axis=1)
+        for other in candidates[distance <= threshold].tolist():
+            # 对候选对计算精确像素差
+            score = float(np.abs(flat[index].astype(np.int16) - flat[other].astype(np.int16)).mean())
+            if score <= threshold:
+                pairs.append([min(index, other), max(index, other), round(score, 3)])
+    # 按索引排序后返回近似重复对
+    return sorted(pairs)
+
+# 定义图集内容分析主函数
+def analyze_atlas(pixels: np.ndarray, tile_size: int, near_threshold: float = DEFAULT_NEAR_THRESHOLD) -> Dict[str, Any]:
+    """统计空瓦片、完全重复与近似重复瓦片，索引按行优先编号"""
+    # 构造网格视图
+    grid = tile_grid_view(pixels, tile_size)
+    rows, cols = grid.shape[0], grid.shape[1]
+    # 标记空瓦片
+    empty = empty_tile_mask(grid).reshape(-1)
+    # 仅在计算摘要时复制一次为连续数组
+    tiles = np.ascontiguousarray(grid).reshape(rows * cols, tile_size, tile_size, grid.shape[4])
+    digests = tile_digests(tiles.reshape(rows * cols, -1))
+    # 按摘要分组非空瓦片
+    groups: Dict[str, List[int]] = {}
+    for index, digest in enumerate(digests):
+        if not empty[index]:
+            groups.setdefault(digest, []).append(index)
+    duplicates = [members for members in groups.values() if len(members) > 1]
+    # 每组完全重复只取代表参与近似比较
+    representatives = np.array(sorted(members[0] for members in groups.values()), dtype=np.int64)
+    near = [
+        [int(representatives[i]), int(representatives[j]), score]
+        for i, j, score in find_near_duplicates(tiles[representatives], near_threshold)
+    ]
+    # 汇总结果
+    return {
+        "rows": rows,
+        "cols": cols,
+        "tile_count": rows * cols,
+        "empty": np.flatnonzero(empty).tolist(),
+        "duplicates": duplicates,
+        "near_duplicates": near,
+        "near_threshold": near_threshold,
+    }
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# 该脚本提供基于文件状态的缓存工具函数
+# 导入 hashlib 计算摘要
+import hashlib
+# 导入 json 读写缓存文件
+import json
+# 导入 os 读取文件状态
+import os
+# 导入 pathlib 用于处理路径
+from pathlib import Path
+# 导入 typing 提供类型注解
+from typing import Any, Dict, Iterable, List, Optional
+
+# 定义缓存文件格式版本
+CACHE_FORMAT = 1
+
+# 定义读取文件状态的函数
+def file_state(file_path: Path) -> Optional[List[int]]:
+    """返回 [size, mtime_ns]，文件不存在时返回 None"""
+    # 读取文件状态
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        # 文件缺失或不可读
+        return None
+    # 返回大小与纳秒级修改时间
+    return [int(stat.st_size), int(stat.st_mtime_ns)]
+
+# 定义计算内容摘要的函数
+def content_digest(file_path: Path) -> str:
+    """计算文件内容的 SHA1 摘要"""
+    # 初始化摘要对象
+    digest = hashlib.sha1()
+    # 分块读取避免大文件占用内存
+    with Path(file_path).open("rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    # 返回十六进制摘要
+    return digest.hexdigest()
+
+# 定义计算规则指纹的函数
+def rules_fingerprint(parts: Iterable[Any]) -> str:
+    """将规则相关的对象序列化后计算指纹"""
+    # 初始化摘要对象
+    digest = hashlib.sha1()
+    # 逐项写入摘要
+    for part in parts:
+        # 文件路径按内容计入
+        if isinstance(part, Path):
+            digest.update(part.read_bytes() if part.is_file() else b"<missing>")
+        else:
+            digest.update(json.dumps(part, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8"))
+        # 使用分隔符避免拼接歧义
+        digest.update(b"\0")
+    # 返回十六进制指纹
+    return digest.hexdigest()
+
+# 定义读取缓存的函数
+def load_state_cache(cache_path: Path, fingerprint: str) -> Dict[str, Any]:
+    """读取缓存条目，版本或指纹不一致时返回空字典"""
+    # 缓存不存在直接返回空
+    if not cache_path.is_file():
+        return {}
+    try:
+        # 解析缓存 JSON
+        payload = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        # 缓存损坏时视为空缓存
+        return {}
+    # 校验格式版本与规则指纹
+    if payload.get("format") != CACHE_FORMAT or payload.get("fingerprint") != fingerprint:
+        return {}
+    # 返回条目字典
+    entries = payload.get("entries", {})
+    return entries if isinstance(entries, dict) else {}
+
+# 定义写入缓存的函数
+def save_state_cache(cache_path: Path, fingerprint: str, entries: Dict[str, Any]) -> None:
+    """以紧凑格式写入缓存条目"""
+    # 确保父目录存在
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    # 组装缓存对象
+    payload = {"format": CACHE_FORMAT, "fingerprint": fingerprint, "entries": entries}
+    # 先写临时文件再替换，避免中断留下半份缓存
+    temp_path = cache_path.with_name(cache_path.name + ".tmp")
+    temp_path.write_text(json.dumps(payload, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    os.replace(temp_path, cache_path)
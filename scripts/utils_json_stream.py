@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# 该脚本提供逐条目流式写出大型 JSON 的工具，支持格式化、紧凑与 JSONL 三种格式
+# 导入 filecmp 分块比较新旧文件
+import filecmp
+# 导入 json 序列化单个条目
+import json
+# 导入 os 原子替换文件
+import os
+# 导入 pathlib 用于处理路径
+from pathlib import Path
+# 导入 typing 提供类型注解
+from typing import Any, Iterator, Optional
+
+# 定义支持的输出格式：pretty 与 json.dumps(indent=2) 逐字节一致，compact 为无空白单行，jsonl 每行一个条目
+JSON_FORMATS = ("pretty", "compact", "jsonl")
+# 定义流式展开的层数：顶层对象与其直接包含的列表/字典逐条目写出，更深的值整体序列化
+STREAM_DEPTH = 2
+
+# 定义单值序列化函数
+def dump_value(value: Any, indent: Optional[int], sort_keys: bool) -> str:
+    """按格式序列化一个值，紧凑格式不带任何空白"""
+    # 格式化与紧凑格式使用不同的分隔符
+    separators = (",", ": ") if indent else (",", ":")
+    # 紧凑格式走 C 加速的编码器
+    return json.dumps(value, ensure_ascii=False, indent=indent, sort_keys=sort_keys, separators=separators)
+
+# 定义字典键序列化函数
+def dump_key(key: Any) -> str:
+    """与 json 模块一致地把非字符串键转为字符串"""
+    # 字符串键直接转义，其余键先转为 JSON 字面量
+    return json.dumps(key if isinstance(key, str) else json.dumps(key), ensure_ascii=False)
+
+# 定义递归分块函数
+def iter_value_chunks(value: Any, indent: Optional[int], level: int, depth: int, sort_keys: bool) -> Iterator[str]:
+    """逐条目产出文本块，拼接结果与 json.dumps 对整个值的输出一致"""
+    # 到达展开层数、非容器或空容器时整体序列化
+    if depth == 0 or not isinstance(value, (dict, list)) or not value:
+        text = dump_value(value, indent, sort_keys)
+        # 多行文本按所在层级补齐缩进
+        yield text.replace("\n", "\n" + " " * (indent * level)) if indent and level else text
+        return
+    # 计算条目前缀与收尾缩进
+    inner = "\n" + " " * (indent * (level + 1)) if indent else ""
+    outer = "\n" + " " * (indent * level) if indent else ""
+    # 字典按需排序键
+    is_dict = isinstance(value, dict)
+    items = (sorted(value.items()) if sort_keys else value.items()) if is_dict else enumerate(value)
+    # 写出开括号
+    yield "{" if is_dict else "["
+    # 逐条目写出
+    for position, (key, item) in enumerate(items):
+        # 条目分隔符与键
+        prefix = ("," if position else "") + inner
+        yield prefix + dump_key(key) + (": " if indent else ":") if is_dict else prefix
+        yield from iter_value_chunks(item, indent, level + 1, depth - 1, sort_keys)
+    # 写出闭括号
+    yield outer + ("}" if is_dict else "]")
+
+# 定义 JSONL 分行函数
+def iter_jsonl_lines(payload: Any, sort_keys: bool) -> Iterator[str]:
+    """首行为顶层容器清空后的骨架，其后每行一个 {键: 条目}；列表条目为元素本身，字典条目为单个键值对"""
+    # 非字典负载整体写成一行
+    if not isinstance(payload, dict):
+        yield dump_value(payload, None, sort_keys) + "\n"
+        return
+    # 写出骨架行，保留标量字段与空容器
+    yield dump_value({key: type(value)() if isinstance(value, (dict, list)) else value for key, value in payload.items()}, None, sort_keys) + "\n"
+    # 逐个容器写出条目
+    for key, value in sorted(payload.items()) if sort_keys else payload.items():
+        if isinstance(value, list):
+            for item in value:
+                yield dump_value({key: item}, None, sort_keys) + "\n"
+        elif isinstance(value, dict):
+            for sub_key, item in sorted(value.items()) if sort_keys else value.items():
+                yield dump_value({key: {sub_key: item}}, None, sort_keys) + "\n"
+
+# 定义统一的分块入口
+def iter_json_chunks(payload: Any, json_format: str = "pretty", sort_keys: bool = False) -> Iterator[str]:
+    """按格式逐块产出负载的文本，不构造整份字符串"""
+    # 校验格式名称
+    if json_format not in JSON_FORMATS:
+        raise ValueError(f"不支持的 JSON 格式: {json_format}")
+    # JSONL 按行产出
+    if json_format == "jsonl":
+        return iter_jsonl_lines(payload, sort_keys)
+    # 格式化与紧凑格式共用递归展开
+    return iter_value_chunks(payload, 2 if json_format == "pretty" else None, 0, STREAM_DEPTH, sort_keys)
+
+# 定义输出路径换算函数
+def stream_path(path: Path, json_format: str) -> Path:
+    """JSONL 格式把 .json 后缀换成 .jsonl，其余格式保持原路径"""
+    # 只改写 .json 后缀
+    return path.with_suffix(".jsonl") if json_format == "jsonl" and path.suffix == ".json" else path
+
+# 定义流式写出函数
+def write_json_stream(path: Path, payload: Any, json_format: str = "pretty", sort_keys: bool = False, newline: bool = False) -> bool:
+    """逐条目写入临时文件，内容与原文件相同时不改写（保持时间戳），否则原子替换；返回是否改写"""
+    # 确保父目录存在
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # 先写入同目录下的临时文件
+    temp_path = path.with_name(path.name + ".tmp")
+    with temp_path.open("w", encoding="utf-8") as handle:
+        for chunk in iter_json_chunks(payload, json_format, sort_keys):
+            handle.write(chunk)
+        # JSONL 每行自带换行
+        if newline and json_format != "jsonl":
+            handle.write("\n")
+    # 分块比较，内容未变化时丢弃临时文件
+    if path.is_file() and filecmp.cmp(temp_path, path, shallow=False):
+        temp_path.unlink()
+        return False
+    # 原子替换目标文件
+    os.replace(temp_path, path)
+    return True
+
+# 定义读取函数
+def read_json_stream(path: Path) -> Any:
+    """读取 write_json_stream 写出的文件：.jsonl 按骨架与条目逐行还原，其余按普通 JSON 解析"""
+    # 普通 JSON 直接解析
+    path = Path(path)
+    if path.suffix != ".jsonl":
+        return json.loads(path.read_text(encoding="utf-8"))
+    # 逐行还原 JSONL
+    with path.open("r", encoding="utf-8") as handle:
+        payload = json.loads(handle.readline() or "null")
+        for line in handle:
+            # 跳过空行
+            if not line.strip():
+                continue
+            ((key, item),) = json.loads(line).items()
+            # 列表追加元素，字典合并键值对
+            if isinstance(payload[key], list):
+                payload[key].append(item)
+            else:
+                payload[key].update(item)
+    return payload
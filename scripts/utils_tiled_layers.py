@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# 该脚本提供 Tiled 图层数据的 base64 + zlib/gzip/zstd 编解码工具
+# 导入 base64 处理文本编码
+import base64
+# 导入 gzip 处理 gzip 压缩
+import gzip
+# 导入 zlib 处理 zlib 压缩
+import zlib
+# 导入 typing 提供类型注解
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# 导入 NumPy 以小端 uint32 表示 gid
+import numpy as np
+
+# zstd 为可选依赖，未安装时仅禁用该压缩方式
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - 取决于运行环境
+    zstandard = None
+
+# 定义 gid 中翻转标志位之外的掩码
+GID_MASK = 0x1FFFFFFF
+# 定义支持的编码方式
+ENCODINGS = ("csv", "base64")
+# 定义支持的压缩方式，空字符串表示不压缩
+COMPRESSIONS = ("", "zlib", "gzip", "zstd")
+
+# 定义 zstd 可用性检查函数
+def zstd_available() -> bool:
+    """返回当前环境是否安装了 zstandard"""
+    return zstandard is not None
+
+# 定义压缩函数
+def compress_bytes(raw: bytes, compression: str) -> bytes:
+    """按 Tiled 的压缩名称压缩字节，gzip 固定 mtime 保证输出可复现"""
+    # 不压缩
+    if not compression:
+        return raw
+    # zlib 压缩
+    if compression == "zlib":
+        return zlib.compress(raw, 9)
+    # gzip 压缩
+    if compression == "gzip":
+        return gzip.compress(raw, compresslevel=9, mtime=0)
+    # zstd 压缩
+    if compression == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd 压缩需要安装 zstandard")
+        return zstandard.ZstdCompressor(level=19).compress(raw)
+    raise ValueError(f"不支持的压缩方式: {compression}")
+
+# 定义解压函数
+def decompress_bytes(payload: bytes, compression: str) -> bytes:
+    """按 Tiled 的压缩名称解压字节"""
+    # 不压缩
+    if not compression:
+        return payload
+    # zlib 解压
+    if compression == "zlib":
+        return zlib.decompress(payload)
+    # gzip 解压
+    if compression == "gzip":
+        return gzip.decompress(payload)
+    # zstd 解压
+    if compression == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd 解压需要安装 zstandard")
+        return zstandard.ZstdDecompressor().decompressobj().decompress(payload)
+    raise ValueError(f"不支持的压缩方式: {compression}")
+
+# 定义 gid 编码函数
+def encode_gids(gids: Any, compression: str = "zlib") -> str:
+    """把 gid 序列编码为 Tiled 的 base64 文本（小端 uint32）"""
+    # 转为小端 uint32 字节
+    raw = np.asarray(gids, dtype="<u4").tobytes()
+    # 压缩后进行 base64 编码
+    return base64.b64encode(compress_bytes(raw, compression)).decode("ascii")
+
+# 定义 gid 解码函数
+def decode_gids(text: str, compression: str = "", count: Optional[int] = None) -> np.ndarray:
+    """把 base64 文本解码为 uint32 数组，count 给出时校验数量"""
+    # base64 解码并解压
+    raw = decompress_bytes(base64.b64decode(text, validate=True), compression)
+    # 字节数必须为 4 的倍数
+    if len(raw) % 4:
+        raise ValueError(f"图层数据长度 {len(raw)} 不是 4 的倍数")
+    gids = np.frombuffer(raw, dtype="<u4")
+    # 校验数量
+    if count is not None and gids.size != count:
+        raise ValueError(f"图层数据应有 {count} 个 gid，实际 {gids.size} 个")
+    return gids
+
+# 定义图层编码函数
+def encode_layer(layer: Dict[str, Any], encoding: str = "base64", compression: str = "zlib") -> Dict[str, Any]:
+    """就地把图层的 data 或各 chunk 的 data 转为指定编码，csv 时保持整数数组"""
+    # 校验参数
+    if encoding not in ENCODINGS:
+        raise ValueError(f"不支持的编码方式: {encoding}")
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"不支持的压缩方式: {compression}")
+    # csv 即 JSON 整数数组，无需处理
+    if encoding == "csv":
+        return layer
+    # 编码单层数据
+    if "data" in layer:
+        layer["data"] = encode_gids(layer["data"], compression)
+    # 编码分块数据
+    for chunk in layer.get("chunks", []):
+        chunk["data"] = encode_gids(chunk["data"], compression)
+    # 写入编码字段
+    layer["encoding"] = encoding
+    layer["compression"] = compression
+    return layer
+
+# 定义区域解码函数
+def decode_region(data: Any, layer: Dict[str, Any], count: int) -> np.ndarray:
+    """按图层的 encoding/compression 解码一段 data"""
+    # base64 文本
+    if layer.get("encoding") == "base64":
+        if not isinstance(data, str):
+            raise ValueError("base64 图层的 data 必须为字符串")
+        return decode_gids(data, layer.get("compression", ""), count)
+    # JSON 整数数组
+    if not isinstance(data, list):
+        raise ValueError("csv 图层的 data 必须为整数数组")
+    gids = np.asarray(data, dtype=np.int64)
+    if gids.size != count:
+        raise ValueError(f"图层数据应有 {count} 个 gid，实际 {gids.size} 个")
+    if gids.size and (gids.min() < 0 or gids.max() > 0xFFFFFFFF):
+        raise ValueError("gid 超出 uint32 范围")
+    return gids.astype(np.uint32)
+
+# 定义图层区域迭代函数
+def iter_layer_regions(layer: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """逐个产出 {x, y, width, height, gids}，单层数据视为一个区域"""
+    # 单层数据
+    if "data" in layer:
+        width, height = int(layer.get("width", 0)), int(layer.get("height", 0))
+        yield {"x": 0, "y": 0, "width": width, "height": height, "gids": decode_region(layer["data"], layer, width * height)}
+    # 分块数据
+    for chunk in layer.get("chunks", []):
+        width, height = int(chunk.get("width", 0)), int(chunk.get("height", 0))
+        gids = decode_region(chunk.get("data"), layer, width * height)
+        yield {"x": chunk.get("x", 0), "y": chunk.get("y", 0), "width": width, "height": height, "gids": gids}
+
+# 定义地图最大 gid 计算函数
+def max_tileset_gid(tilesets: Iterable[Dict[str, Any]]) -> Optional[int]:
+    """根据内嵌图集的 firstgid + tilecount 计算最大合法 gid，含外部图集时返回 None"""
+    highest = 0
+    for tileset in tilesets:
+        # 外部图集或缺少数量时无法判断
+        if "tilecount" not in tileset or "firstgid" not in tileset:
+            return None
+        highest = max(highest, int(tileset["firstgid"]) + int(tileset["tilecount"]) - 1)
+    return highest
+
+# 定义地图图层校验函数
+def validate_map_layers(map_json: Dict[str, Any]) -> List[str]:
+    """解码全部 tilelayer（含分组图层），返回数量或 gid 越界等问题"""
+    problems: List[str] = []
+    limit = max_tileset_gid(map_json.get("tilesets", []))
+    # 展开分组图层
+    for layer in iter_tile_layers(map_json):
+        name = layer.get("name", layer.get("id"))
+        try:
+            for region in iter_layer_regions(layer):
+                # 去掉翻转标志后检查越界
+                gids = region["gids"] & GID_MASK
+                if limit is not None and gids.size and int(gids.max()) > limit:
+                    problems.append(f"图层 {name} 在 ({region['x']}, {region['y']}) 区域含越界 gid {int(gids.max())}（最大 {limit}）")
+        except (ValueError, zlib.error, OSError, EOFError) as exc:
+            problems.append(f"图层 {name} 解码失败: {exc}")
+    return problems
+
+# 定义图层拼装函数
+def layer_grid(layer: Dict[str, Any]) -> Tuple[np.ndarray, int, int]:
+    """把单层或分块图层拼成 (height, width) 的 uint32 网格，返回 (网格, 原点 x, 原点 y)"""
+    # 单层数据直接按宽高重排
+    if "data" in layer:
+        region = next(iter_layer_regions(layer))
+        return region["gids"].reshape(region["height"], region["width"]), 0, 0
+    regions = list(iter_layer_regions(layer))
+    # 无限地图缺失的块按 defaultGid 属性填充，未声明时为空
+    default = next((int(item.get("value", 0)) for item in layer.get("properties", []) if item.get("name") == "defaultGid"), 0)
+    if not regions:
+        width, height = int(layer.get("width", 0)), int(layer.get("height", 0))
+        return np.full((height, width), default, dtype=np.uint32), int(layer.get("startx", 0)), int(layer.get("starty", 0))
+    # 以所有块的包围盒为范围，并至少覆盖图层声明的宽高
+    left = min(min(int(region["x"]) for region in regions), int(layer.get("startx", 0)))
+    top = min(min(int(region["y"]) for region in regions), int(layer.get("starty", 0)))
+    right = max(max(int(region["x"]) + region["width"] for region in regions), left + int(layer.get("width", 0)))
+    bottom = max(max(int(region["y"]) + region["height"] for region in regions), top + int(layer.get("height", 0)))
+    grid = np.full((bottom - top, right - left), default, dtype=np.uint32)
+    for region in regions:
+        x, y = int(region["x"]) - left, int(region["y"]) - top
+        grid[y : y + region["height"], x : x + region["width"]] = region["gids"].reshape(region["height"], region["width"])
+    return grid, left, top
+
+# 定义地图图层展开函数
+def iter_tile_layers(map_json: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """按绘制顺序产出全部 tilelayer，分组图层会被展开"""
+    pending = list(map_json.get("layers", []))
+    while pending:
+        layer = pending.pop(0)
+        if layer.get("type") == "group":
+            pending[:0] = layer.get("layers", [])
+        elif layer.get("type") == "tilelayer":
+            yield layer
@@ -2,9 +2,20 @@
 from __future__ import annotations  # 启用未来注解规范
 
 import json  # 导入JSON库解析映射文件
+import os  # 导入os读取文件状态
 import sys  # 导入sys以设置退出码
 from pathlib import Path  # 导入Path方便路径处理
-from typing import Dict, Any, List  # 导入类型提示
+from typing import Dict, Any, Iterable, List, Optional, Tuple  # 导入类型提示
+
+SCRIPT_ROOT = Path(__file__).resolve().parent  # 计算脚本目录
+if str(SCRIPT_ROOT.parent) not in sys.path:  # 确保仓库根目录在模块搜索路径中
+    sys.path.insert(0, str(SCRIPT_ROOT.parent))  # 插入仓库根目录
+
+from scripts.utils_png_probe import probe_png_size  # 导入PNG头部探测函数
+
+DEFAULT_ATLAS = "assets/build/tiles/tilesheet.png"  # 整数绑定默认指向的图集路径
+
+TargetInfo = Dict[str, Any]  # 目标文件探测结果类型别名
 
 
 def load_json(path: Path) -> Dict[str, Any]:  # 定义通用JSON加载函数
@@ -13,36 +24,146 @@ def load_json(path: Path) -> Dict[str, Any]:  # 定义通用JSON加载函数
         return json.load(file)  # 解析并返回数据
 
 
-def validate_tileset(data: Dict[str, Any], project_root: Path) -> List[str]:  # 校验瓦片映射
-    """检查瓦片映射结构与图集文件存在性。"""  # 函数说明
+def probe_targets(paths: Iterable[Path]) -> Dict[Path, TargetInfo]:  # 定义批量探测函数
+    """对每个去重后的目标只做一次 stat，PNG 再读取一次文件头尺寸。"""  # 函数说明
+    probes: Dict[Path, TargetInfo] = {}  # 初始化结果
+    for path in paths:  # 遍历目标
+        if path in probes:  # 已探测过
+            continue  # 跳过重复目标
+        try:  # 读取文件状态
+            is_file = os.stat(path).st_mode & 0o170000 == 0o100000  # 判断是否普通文件
+        except OSError:  # 文件不存在
+            is_file = False  # 标记缺失
+        size = probe_png_size(path) if is_file and path.suffix.lower() == ".png" else None  # 读取PNG尺寸
+        probes[path] = {"exists": is_file, "size": size}  # 记录结果
+    return probes  # 返回探测结果
+
+
+def atlas_layout_for(atlas_path: Path) -> Optional[Dict[str, Any]]:  # 定义布局读取函数
+    """读取图集旁的 <名称>_layout.json（由 gen_tiles_and_player 写出），不存在或损坏时返回 None。"""  # 函数说明
+    layout_path = atlas_path.with_name(f"{atlas_path.stem}_layout.json")  # 计算布局文件路径
+    try:  # 读取布局
+        layout = load_json(layout_path)  # 解析JSON
+    except (OSError, ValueError):  # 文件缺失或损坏
+        return None  # 视为无布局
+    return layout if isinstance(layout, dict) else None  # 返回布局
+
+
+def grid_tile_count(size: Tuple[int, int], tile_size: int, margin: int = 0, spacing: int = 0) -> int:  # 定义格数计算函数
+    """按 Tiled 的 margin/spacing 规则计算图集容纳的瓦片数。"""  # 函数说明
+    columns = (size[0] - margin * 2 + spacing) // (tile_size + spacing)  # 计算列数
+    rows = (size[1] - margin * 2 + spacing) // (tile_size + spacing)  # 计算行数
+    return max(0, columns) * max(0, rows)  # 返回格数
+
+
+def iter_tile_bindings(data: Dict[str, Any]) -> Iterable[Tuple[str, Any]]:  # 定义绑定遍历函数
+    """遍历瓦片绑定并跳过 _comment 字段。"""  # 函数说明
+    bindings = data.get("bindings")  # 读取绑定字典
+    if not isinstance(bindings, dict):  # 结构不合法
+        return []  # 返回空序列
+    return [(name, info) for name, info in bindings.items() if not name.startswith("_")]  # 过滤注释字段
+
+
+def binding_atlas(data: Dict[str, Any], info: Any) -> Any:  # 定义图集路径解析函数
+    """整数绑定使用顶层 atlas（缺省为 build 图集），对象绑定使用自身 atlas。"""  # 函数说明
+    if isinstance(info, dict):  # 对象形式
+        return info.get("atlas")  # 返回自身图集
+    return data.get("atlas", DEFAULT_ATLAS)  # 返回顶层或默认图集
+
+
+def collect_targets(tileset_data: Dict[str, Any], persona_data: Dict[str, Any], project_root: Path) -> List[Path]:  # 定义目标收集函数
+    """收集两份映射文件引用的全部文件路径。"""  # 函数说明
+    targets: List[Path] = []  # 初始化列表
+    for _name, info in iter_tile_bindings(tileset_data):  # 遍历瓦片绑定
+        atlas_path = binding_atlas(tileset_data, info)  # 解析图集路径
+        if isinstance(atlas_path, str):  # 路径合法
+            targets.append(project_root / atlas_path)  # 加入目标
+    for persona, info in persona_data.items():  # 遍历角色条目
+        if persona.startswith("_") or not isinstance(info, dict):  # 跳过注释与非法结构
+            continue  # 继续下一个
+        sprite_path = info.get("sprite")  # 读取精灵路径
+        if isinstance(sprite_path, str):  # 路径合法
+            targets.append(project_root / sprite_path)  # 加入目标
+    return targets  # 返回目标列表
+
+
+def validate_tileset(  # 校验瓦片映射
+    data: Dict[str, Any],
+    project_root: Path,
+    probes: Optional[Dict[Path, TargetInfo]] = None,
+) -> List[str]:
+    """检查瓦片映射结构，并依据图集头部尺寸校验每个索引未越界。"""  # 函数说明
     errors: List[str] = []  # 初始化错误列表
     tile_size = data.get("tile_size")  # 读取瓦片尺寸
-    if not isinstance(tile_size, int) or tile_size <= 0:  # 校验瓦片尺寸
+    if isinstance(tile_size, bool) or not isinstance(tile_size, int) or tile_size <= 0:  # 校验瓦片尺寸
         errors.append("tile_size 必须为正整数。")  # 记录错误
+        tile_size = None  # 无法计算格数
     bindings = data.get("bindings")  # 读取绑定字典
     if not isinstance(bindings, dict):  # 校验绑定结构
         errors.append("bindings 必须为对象。")  # 记录错误
         return errors  # 返回错误
-    for tile_name, info in bindings.items():  # 遍历绑定项
-        if not isinstance(info, dict):  # 校验信息结构
-            errors.append(f"{tile_name} 的绑定必须为对象。")  # 记录错误
+    if probes is None:  # 未传入共享探测结果
+        probes = probe_targets(collect_targets(data, {}, project_root))  # 自行探测
+    reported_atlases = set()  # 记录已报告的图集问题，避免重复输出
+    layouts: Dict[Path, Optional[Dict[str, Any]]] = {}  # 每个图集的布局描述只读取一次
+    for tile_name, info in iter_tile_bindings(data):  # 遍历绑定项
+        if isinstance(info, dict):  # 对象形式
+            tile_id = info.get("id")  # 读取瓦片索引
+        elif isinstance(info, int) and not isinstance(info, bool):  # 整数形式
+            tile_id = info  # 直接使用索引
+        else:  # 其他结构
+            errors.append(f"{tile_name} 的绑定必须为整数或对象。")  # 记录错误
             continue  # 跳过后续处理
-        atlas_path = info.get("atlas")  # 读取图集路径
-        tile_id = info.get("id")  # 读取瓦片索引
+        atlas_path = binding_atlas(data, info)  # 读取图集路径
+        if isinstance(tile_id, bool) or not isinstance(tile_id, int):  # 校验索引类型
+            errors.append(f"{tile_name} 的 id 必须为整数。")  # 记录错误
+            continue  # 跳过越界检查
         if not isinstance(atlas_path, str):  # 校验路径类型
             errors.append(f"{tile_name} 的 atlas 必须为字符串。")  # 记录错误
-        else:  # 路径类型正确
-            resolved = project_root / atlas_path  # 计算实际路径
-            if not resolved.exists():  # 若文件不存在
+            continue  # 跳过越界检查
+        resolved = project_root / atlas_path  # 计算实际路径
+        probe = probes.get(resolved) or probe_targets([resolved])[resolved]  # 读取探测结果
+        if not probe["exists"]:  # 若文件不存在
+            if resolved not in reported_atlases:  # 同一图集只报告一次
                 errors.append(f"未找到图集文件：{resolved}")  # 记录错误
-        if not isinstance(tile_id, int):  # 校验索引类型
-            errors.append(f"{tile_name} 的 id 必须为整数。")  # 记录错误
+                reported_atlases.add(resolved)  # 标记已报告
+            continue  # 跳过越界检查
+        size = probe["size"]  # 读取尺寸
+        if size is None:  # 文件头无法解析
+            if resolved not in reported_atlases:  # 同一图集只报告一次
+                errors.append(f"图集不是有效的PNG：{resolved}")  # 记录错误
+                reported_atlases.add(resolved)  # 标记已报告
+            continue  # 跳过越界检查
+        if tile_size is None:  # 缺少合法瓦片尺寸
+            continue  # 无法计算格数
+        if resolved not in layouts:  # 首次遇到该图集
+            layouts[resolved] = atlas_layout_for(resolved)  # 读取带间距的布局描述
+        layout = layouts[resolved]  # 复用缓存的布局
+        if layout is not None and layout.get("tilewidth") == tile_size:  # 布局与瓦片尺寸一致
+            tile_count = min(  # 以布局声明与图集实际容量中的较小者为准
+                int(layout.get("tilecount", 0)),
+                grid_tile_count(size, tile_size, int(layout.get("margin", 0)), int(layout.get("spacing", 0))),
+            )
+        else:  # 紧密排列的图集
+            if size[0] % tile_size or size[1] % tile_size:  # 尺寸无法整除
+                if resolved not in reported_atlases:  # 同一图集只报告一次
+                    errors.append(f"图集尺寸 {size[0]}x{size[1]} 无法被 tile_size {tile_size} 整除：{resolved}")  # 记录错误
+                    reported_atlases.add(resolved)  # 标记已报告
+            tile_count = grid_tile_count(size, tile_size)  # 计算图集格数
+        if not 0 <= tile_id < tile_count:  # 索引越界
+            errors.append(f"{tile_name} 的 id {tile_id} 超出图集 {resolved.name} 的 {tile_count} 格。")  # 记录错误
     return errors  # 返回错误列表
 
 
-def validate_personas(data: Dict[str, Any], project_root: Path) -> List[str]:  # 校验角色映射
-    """检查角色映射结构与精灵文件存在性。"""  # 函数说明
+def validate_personas(  # 校验角色映射
+    data: Dict[str, Any],
+    project_root: Path,
+    probes: Optional[Dict[Path, TargetInfo]] = None,
+) -> List[str]:
+    """检查角色映射结构与精灵文件存在性，PNG 精灵需能读取文件头。"""  # 函数说明
     errors: List[str] = []  # 初始化错误列表
+    if probes is None:  # 未传入共享探测结果
+        probes = probe_targets(collect_targets({}, data, project_root))  # 自行探测
     for persona, info in data.items():  # 遍历角色条目
         if persona.startswith("_"):  # 跳过注释字段
             continue  # 继续下一个
@@ -57,8 +178,11 @@ def validate_personas(data: Dict[str, Any], project_root: Path) -> List[str]:  #
             errors.append(f"{persona} 的 sprite 必须为字符串。")  # 记录错误
             continue  # 跳过后续
         resolved = project_root / sprite_path  # 解析实际路径
-        if not resolved.exists():  # 若文件不存在
+        probe = probes.get(resolved) or probe_targets([resolved])[resolved]  # 读取探测结果
+        if not probe["exists"]:  # 若文件不存在
             errors.append(f"未找到角色精灵：{resolved}")  # 记录错误
+        elif resolved.suffix.lower() == ".png" and probe["size"] is None:  # PNG 文件头无法解析
+            errors.append(f"角色精灵不是有效的PNG：{resolved}")  # 记录错误
     return errors  # 返回错误列表
 
 
@@ -78,9 +202,10 @@ def main() -> None:  # 主入口
     tileset_data = load_json(tileset_path)  # 加载瓦片映射
     persona_data = load_json(personas_path)  # 加载角色映射
 
+    probes = probe_targets(collect_targets(tileset_data, persona_data, project_root))  # 对全部目标做一次探测
     errors = []  # 初始化总错误列表
-    errors.extend(validate_tileset(tileset_data, project_root))  # 收集瓦片错误
-    errors.extend(validate_personas(persona_data, project_root))  # 收集角色错误
+    errors.extend(validate_tileset(tileset_data, project_root, probes))  # 收集瓦片错误
+    errors.extend(validate_personas(persona_data, project_root, probes))  # 收集角色错误
 
     if errors:  # 若存在错误
         print("发现以下问题：")  # 输出提示
@@ -2,16 +2,30 @@
 from __future__ import annotations  # 引入未来注解以提升类型兼容性
 
 import argparse  # 导入argparse解析命令行参数
+import json  # 导入json输出机器可读报告
 import sys  # 导入sys以便设定退出码
+from concurrent.futures import ThreadPoolExecutor  # 导入线程池并行读取文件头
 from pathlib import Path  # 导入Path处理文件路径
-from typing import Any, Dict, List  # 导入类型注解辅助
+from typing import Any, Dict, List, Optional, Sequence, Tuple  # 导入类型注解辅助
 
-from PIL import Image  # 从Pillow导入Image进行图像校验
+SCRIPT_ROOT = Path(__file__).resolve().parent  # 计算脚本目录
+if str(SCRIPT_ROOT.parent) not in sys.path:  # 确保仓库根目录在模块搜索路径中
+    sys.path.insert(0, str(SCRIPT_ROOT.parent))  # 插入仓库根目录
 
 from scripts.import_user_assets import (  # 从导入脚本复用函数
     load_manifest,  # 复用manifest加载逻辑
     resolve_tile_bindings,  # 复用地形映射生成逻辑
 )  # 导入结束
+from scripts.utils_atlas import DEFAULT_NEAR_THRESHOLD, analyze_atlas, load_rgba  # 导入图集内容分析工具
+from scripts.utils_file_state import file_state, load_state_cache, rules_fingerprint, save_state_cache  # 导入文件状态缓存工具
+from scripts.utils_png_probe import probe_png_size  # 导入PNG头部探测函数
+from scripts.utils_tiled_layers import validate_map_layers  # 导入图层解码校验函数
+
+DEFAULT_CACHE_PATH = Path("assets/.cache/verify_user_assets.json")  # 默认尺寸缓存路径（相对根目录）
+DEFAULT_WORKERS = 8  # 默认线程数
+REPORT_VERSION = 1  # 报告格式版本
+
+PngSize = Optional[Tuple[int, int]]  # PNG尺寸类型别名
 
 
 def parse_args() -> argparse.Namespace:  # 定义参数解析函数
@@ -20,11 +34,61 @@ def parse_args() -> argparse.Namespace:  # 定义参数解析函数
     parser = argparse.ArgumentParser(description="校验 assets/user_imports 素材")  # 创建解析器
     parser.add_argument("--root", type=Path, default=Path("."), help="设置仓库根目录，默认当前路径")  # 添加根目录参数
     parser.add_argument("--force", action="store_true", help="忽略错误仅输出警告")  # 添加force选项
+    parser.add_argument("--report", type=Path, default=None, help="写出JSON报告的路径")  # 添加报告路径参数
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="并行读取文件头的线程数")  # 添加线程数参数
+    parser.add_argument("--cache", type=Path, default=DEFAULT_CACHE_PATH, help="尺寸缓存路径，相对 --root")  # 添加缓存路径参数
+    parser.add_argument("--no-cache", action="store_true", help="忽略缓存重新读取全部文件头")  # 添加禁用缓存选项
+    parser.add_argument("--near-threshold", type=float, default=DEFAULT_NEAR_THRESHOLD, help="近似重复瓦片的平均像素差阈值")  # 添加近似阈值参数
+    parser.add_argument("--skip-atlas-analysis", action="store_true", help="跳过图集空瓦片与重复瓦片分析")  # 添加跳过分析选项
     return parser.parse_args()  # 返回解析结果
 
 
-def verify_tiles(user_dir: Path, tile_config: Dict[str, Any], tile_size: int, force: bool) -> List[str]:  # 定义瓦片校验函数
-    """验证瓦片资源是否满足尺寸与文件要求。"""  # 函数docstring中文说明
+def add_error(errors: List[Dict[str, Any]], check: str, message: str, path: Optional[Path] = None) -> None:  # 定义记录错误的辅助函数
+    """以结构化形式追加一条错误。"""  # 函数docstring中文说明
+
+    entry: Dict[str, Any] = {"check": check, "message": message}  # 构造错误条目
+    if path is not None:  # 若关联文件
+        entry["path"] = path.as_posix()  # 记录文件路径
+    errors.append(entry)  # 追加错误
+
+
+def probe_sizes(paths: Sequence[Path], cache: Optional[Dict[str, Any]], workers: int) -> Dict[Path, PngSize]:  # 定义批量探测函数
+    """在线程池中读取PNG头部尺寸，文件状态未变时复用缓存。"""  # 函数docstring中文说明
+
+    results: Dict[Path, PngSize] = {}  # 初始化结果字典
+    pending: List[Tuple[Path, Optional[List[int]]]] = []  # 需要重新探测的文件
+    for path in paths:  # 遍历所有文件
+        state = file_state(path)  # 读取文件状态
+        cached = cache.get(path.as_posix()) if cache is not None else None  # 查询缓存
+        if cached is not None and state is not None and cached.get("state") == state:  # 缓存命中
+            size = cached.get("size")  # 读取缓存尺寸
+            results[path] = (size[0], size[1]) if size else None  # 还原为元组
+        else:  # 缓存未命中
+            pending.append((path, state))  # 加入待探测列表
+    if pending:  # 存在待探测文件
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:  # 创建线程池
+            sizes = list(executor.map(probe_png_size, [path for path, _ in pending]))  # 并行读取文件头
+        for (path, state), size in zip(pending, sizes):  # 合并探测结果
+            results[path] = size  # 记录尺寸
+            if cache is not None and state is not None:  # 写回缓存
+                cache[path.as_posix()] = {"state": state, "size": list(size) if size else None}  # 更新缓存条目
+    return results  # 返回尺寸字典
+
+
+def verify_tiles(  # 定义瓦片校验函数
+    user_dir: Path,
+    tile_config: Dict[str, Any],
+    tile_size: int,
+    errors: List[Dict[str, Any]],
+    cache: Optional[Dict[str, Any]] = None,
+    workers: int = DEFAULT_WORKERS,
+    details: Optional[Dict[str, Any]] = None,
+    near_threshold: Optional[float] = DEFAULT_NEAR_THRESHOLD,
+) -> List[str]:
+    """验证瓦片资源是否满足尺寸与文件要求，错误写入 errors 而不中断。
+
+    图集模式下 near_threshold 不为 None 时会分析空瓦片与重复瓦片，结构化结果写入 details["atlas"]。
+    """  # 函数docstring中文说明
 
     tiles_dir = user_dir / "tiles"  # 计算瓦片目录
     mode = tile_config.get("mode", "auto")  # 读取模式
@@ -32,6 +96,7 @@ def verify_tiles(user_dir: Path, tile_config: Dict[str, Any], tile_size: int, fo
     loose_glob = tile_config.get("loose_glob", "*.png")  # 获取散瓦片匹配规则
     chosen_mode = mode  # 初始化模式
     messages: List[str] = []  # 准备消息列表
+    analysis: Optional[Dict[str, Any]] = None  # 图集内容分析结果
     if mode == "auto":  # 自动模式判断
         if (tiles_dir / atlas_name).exists():  # 若存在图集文件
             chosen_mode = "atlas"  # 选择图集模式
@@ -40,44 +105,60 @@ def verify_tiles(user_dir: Path, tile_config: Dict[str, Any], tile_size: int, fo
     if chosen_mode == "atlas":  # 校验图集模式
         atlas_path = tiles_dir / atlas_name  # 计算图集路径
         if not atlas_path.exists():  # 若缺少图集
-            message = f"缺少图集文件 {atlas_path}"  # 构造消息
-            messages.append(message)  # 记录错误
-            if not force:  # 若非强制模式
-                raise FileNotFoundError(message)  # 抛出异常
+            add_error(errors, "tiles", f"缺少图集文件 {atlas_path}", atlas_path)  # 记录错误
         else:  # 若文件存在
-            with Image.open(atlas_path) as image:  # 打开图像
-                width, height = image.size  # 读取尺寸
-            if width % tile_size != 0 or height % tile_size != 0:  # 检查整除性
-                message = f"图集尺寸 {width}x{height} 无法被 tile_size {tile_size} 整除"  # 构造错误描述
-                messages.append(message)  # 追加消息
-                if not force:  # 若非强制
-                    raise ValueError(message)  # 抛出异常
+            size = probe_sizes([atlas_path], cache, workers)[atlas_path]  # 读取图集尺寸
+            if size is None:  # 文件头无法解析
+                add_error(errors, "tiles", f"图集 {atlas_path.name} 不是有效的PNG", atlas_path)  # 记录错误
+            elif size[0] % tile_size != 0 or size[1] % tile_size != 0:  # 检查整除性
+                add_error(errors, "tiles", f"图集尺寸 {size[0]}x{size[1]} 无法被 tile_size {tile_size} 整除", atlas_path)  # 记录错误
             else:  # 尺寸符合
-                messages.append(f"图集模式通过，共 {width // tile_size * height // tile_size} 格")  # 添加成功信息
+                messages.append(f"图集模式通过，共 {size[0] // tile_size * size[1] // tile_size} 格")  # 添加成功信息
+                if near_threshold is not None:  # 需要分析图集内容
+                    analysis = analyze_atlas(load_rgba(atlas_path), tile_size, near_threshold)  # 向量化分析瓦片内容
+                    if details is not None:  # 调用方需要结构化结果
+                        details["atlas"] = analysis  # 写入分析结果
+                    messages.append(  # 添加分析摘要
+                        f"图集内容: 空瓦片 {len(analysis['empty'])} 格，重复组 {len(analysis['duplicates'])} 组，"
+                        f"近似重复 {len(analysis['near_duplicates'])} 对"
+                    )  # 摘要结束
     else:  # 散瓦片模式校验
         loose_paths = sorted(tiles_dir.glob(loose_glob))  # 按字典序列出瓦片
         if not loose_paths:  # 若无文件
-            message = f"散瓦片模式下未找到匹配 {loose_glob} 的文件"  # 构造消息
-            messages.append(message)  # 记录
-            if not force:  # 非强制时
-                raise FileNotFoundError(message)  # 抛出异常
+            add_error(errors, "tiles", f"散瓦片模式下未找到匹配 {loose_glob} 的文件")  # 记录错误
+        sizes = probe_sizes(loose_paths, cache, workers)  # 并行读取全部尺寸
         valid_count = 0  # 初始化计数
-        for path in loose_paths:  # 遍历文件
-            with Image.open(path) as image:  # 打开图像
-                if image.size != (tile_size, tile_size):  # 检查尺寸
-                    message = f"散瓦片 {path.name} 尺寸 {image.size} 与 {tile_size}px 不符"  # 构造消息
-                    messages.append(message)  # 记录
-                    if not force:  # 非强制模式
-                        raise ValueError(message)  # 抛出异常
-                else:  # 尺寸正确
-                    valid_count += 1  # 增加计数
-        messages.append(f"散瓦片模式通过，共 {valid_count} 张瓦片")  # 追加统计信息
-    bindings = resolve_tile_bindings(tile_config.get("bindings", {}))  # 计算绑定以确保存在顺序
+        for path in loose_paths:  # 按顺序汇总结果
+            size = sizes[path]  # 读取尺寸
+            if size is None:  # 文件头无法解析
+                add_error(errors, "tiles", f"散瓦片 {path.name} 不是有效的PNG", path)  # 记录错误
+            elif size != (tile_size, tile_size):  # 检查尺寸
+                add_error(errors, "tiles", f"散瓦片 {path.name} 尺寸 {size} 与 {tile_size}px 不符", path)  # 记录错误
+            else:  # 尺寸正确
+                valid_count += 1  # 增加计数
+        messages.append(f"散瓦片模式检查 {len(loose_paths)} 张，通过 {valid_count} 张")  # 追加统计信息
+    try:  # 绑定值可能非法
+        bindings = resolve_tile_bindings(tile_config.get("bindings", {}))  # 计算绑定以确保存在顺序
+    except ValueError as error:  # 捕获非法绑定
+        add_error(errors, "tiles", str(error))  # 记录错误
+        return messages  # 无法继续检查绑定
     messages.append(f"地形绑定数量: {len(bindings)}")  # 输出绑定数量
+    if analysis is not None:  # 存在分析结果时检查绑定目标
+        empty_cells = set(analysis["empty"])  # 空瓦片集合
+        for name, index in bindings.items():  # 遍历绑定
+            if index >= analysis["tile_count"]:  # 索引越界
+                add_error(errors, "tiles", f"地形 {name} 绑定的索引 {index} 超出图集 {analysis['tile_count']} 格")  # 记录错误
+            elif index in empty_cells:  # 指向空瓦片
+                add_error(errors, "tiles", f"地形 {name} 绑定的索引 {index} 指向全透明瓦片")  # 记录错误
     return messages  # 返回消息列表
 
 
-def verify_player(user_dir: Path, character_config: Dict[str, Any], force: bool) -> List[str]:  # 定义角色校验函数
+def verify_player(  # 定义角色校验函数
+    user_dir: Path,
+    character_config: Dict[str, Any],
+    errors: List[Dict[str, Any]],
+    cache: Optional[Dict[str, Any]] = None,
+) -> List[str]:
     """验证玩家雪碧图的尺寸信息。"""  # 函数docstring中文说明
 
     messages: List[str] = []  # 初始化消息列表
@@ -88,19 +169,17 @@ def verify_player(user_dir: Path, character_config: Dict[str, Any], force: bool)
     frames = player_config.get("frames", 4)  # 获取帧数
     sprite_path = user_dir / "characters" / file_name  # 构造文件路径
     if not sprite_path.exists():  # 若文件不存在
-        message = f"缺少玩家雪碧图 {sprite_path}"  # 构造错误信息
-        messages.append(message)  # 记录错误
-        if not force:  # 非强制模式
-            raise FileNotFoundError(message)  # 抛出异常
+        add_error(errors, "player", f"缺少玩家雪碧图 {sprite_path}", sprite_path)  # 记录错误
         return messages  # 返回消息
-    with Image.open(sprite_path) as image:  # 打开图片
-        width, height = image.size  # 读取尺寸
+    size = probe_sizes([sprite_path], cache, 1)[sprite_path]  # 读取文件头尺寸
+    if size is None:  # 文件头无法解析
+        add_error(errors, "player", f"玩家雪碧图 {sprite_path.name} 不是有效的PNG", sprite_path)  # 记录错误
+        return messages  # 返回消息
+    width, height = size  # 解包尺寸
     expected_width = frame_width * frames  # 计算期望宽度
     if width != expected_width or height != frame_height:  # 校验尺寸
         message = f"玩家雪碧图尺寸 {width}x{height} 不等于 {frames} 帧 {frame_width}x{frame_height}"  # 构造错误描述
-        messages.append(message)  # 记录
-        if not force:  # 非强制
-            raise ValueError(message)  # 抛出异常
+        add_error(errors, "player", message, sprite_path)  # 记录错误
     else:  # 尺寸正确
         messages.append(f"玩家雪碧图通过，帧数 {frames}，尺寸 {frame_width}x{frame_height}")  # 输出成功信息
     fps = player_config.get("fps", 8)  # 读取帧率
@@ -108,8 +187,8 @@ def verify_player(user_dir: Path, character_config: Dict[str, Any], force: bool)
     return messages  # 返回消息列表
 
 
-def verify_maps(user_dir: Path, map_config: Dict[str, Any], force: bool) -> List[str]:  # 定义地图校验函数
-    """验证地图文件是否存在。"""  # 函数docstring中文说明
+def verify_maps(user_dir: Path, map_config: Dict[str, Any], errors: List[Dict[str, Any]]) -> List[str]:  # 定义地图校验函数
+    """验证地图文件是否存在，Tiled JSON 地图还会解码全部图层（含 base64 + 压缩）并检查 gid。"""  # 函数docstring中文说明
 
     messages: List[str] = []  # 初始化消息列表
     use_user_map = map_config.get("use_user_map", False)  # 读取启用标志
@@ -119,15 +198,43 @@ def verify_maps(user_dir: Path, map_config: Dict[str, Any], force: bool) -> List
         return messages  # 返回消息列表
     map_path = user_dir / "maps" / map_file  # 计算地图路径
     if not map_path.exists():  # 若文件缺失
-        message = f"启用用户地图但找不到 {map_path}"  # 构造错误描述
-        messages.append(message)  # 记录
-        if not force:  # 非强制
-            raise FileNotFoundError(message)  # 抛出异常
-    else:  # 文件存在
-        messages.append(f"用户地图已找到: {map_path.name}")  # 输出成功信息
+        add_error(errors, "maps", f"启用用户地图但找不到 {map_path}", map_path)  # 记录错误
+        return messages  # 无法继续校验
+    if map_path.suffix.lower() == ".json":  # Tiled JSON 地图
+        try:  # 解析地图
+            map_json = json.loads(map_path.read_text(encoding="utf-8"))  # 读取JSON
+        except (OSError, ValueError) as exc:  # 解析失败
+            add_error(errors, "maps", f"地图 JSON 无法解析: {exc}", map_path)  # 记录错误
+            return messages  # 无法继续校验
+        problems = validate_map_layers(map_json) if isinstance(map_json, dict) else ["地图根节点必须为对象"]  # 解码并校验图层
+        for problem in problems:  # 遍历问题
+            add_error(errors, "maps", problem, map_path)  # 记录错误
+        if problems:  # 存在问题
+            return messages  # 不输出成功信息
+    messages.append(f"用户地图已找到: {map_path.name}")  # 输出成功信息
     return messages  # 返回消息列表
 
 
+def build_report(  # 定义报告构造函数
+    tile_size: int,
+    messages: List[str],
+    errors: List[Dict[str, Any]],
+    details: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """组装机器可读的校验报告。"""  # 函数docstring中文说明
+
+    report = {  # 构造报告字典
+        "version": REPORT_VERSION,  # 报告版本
+        "ok": not errors,  # 是否全部通过
+        "tile_size": tile_size,  # 瓦片尺寸
+        "error_count": len(errors),  # 错误数量
+        "errors": errors,  # 错误明细
+        "messages": messages,  # 通过信息
+    }  # 报告结束
+    report.update(details or {})  # 合并结构化分析结果
+    return report  # 返回报告
+
+
 def main() -> None:  # 定义主函数
     """执行校验并打印总结。"""  # 函数docstring中文说明
 
@@ -138,17 +245,31 @@ def main() -> None:  # 定义主函数
     manifest = load_manifest(manifest_path)  # 加载配置
     tile_size = manifest.get("tile_size", 32)  # 读取瓦片尺寸
     print(f"开始校验，瓦片尺寸设定为 {tile_size} 像素")  # 打印标题
+    cache_path = root / args.cache  # 计算缓存路径
+    fingerprint = rules_fingerprint([SCRIPT_ROOT / "utils_png_probe.py"])  # 探测代码变化时缓存失效
+    cache = {} if args.no_cache else load_state_cache(cache_path, fingerprint)  # 读取尺寸缓存
     messages: List[str] = []  # 初始化汇总消息
-    try:  # 捕获潜在异常
-        messages.extend(verify_tiles(user_dir, manifest.get("tiles", {}), tile_size, args.force))  # 校验瓦片
-        messages.extend(verify_player(user_dir, manifest.get("characters", {}), args.force))  # 校验玩家
-        messages.extend(verify_maps(user_dir, manifest.get("maps", {}), args.force))  # 校验地图
-    except Exception as error:  # 捕获异常
-        print(f"校验失败: {error}")  # 输出错误
-        if not args.force:  # 若未启用强制模式
-            sys.exit(1)  # 使用失败退出码
+    errors: List[Dict[str, Any]] = []  # 初始化错误列表
+    details: Dict[str, Any] = {}  # 初始化结构化分析结果
+    near_threshold = None if args.skip_atlas_analysis else args.near_threshold  # 决定是否分析图集内容
+    messages.extend(  # 校验瓦片
+        verify_tiles(user_dir, manifest.get("tiles", {}), tile_size, errors, cache, args.workers, details, near_threshold)
+    )  # 瓦片校验结束
+    messages.extend(verify_player(user_dir, manifest.get("characters", {}), errors, cache))  # 校验玩家
+    messages.extend(verify_maps(user_dir, manifest.get("maps", {}), errors))  # 校验地图
+    save_state_cache(cache_path, fingerprint, cache)  # 保存尺寸缓存
+    report = build_report(tile_size, messages, errors, details)  # 构造报告
+    if args.report is not None:  # 需要写出报告
+        args.report.parent.mkdir(parents=True, exist_ok=True)  # 确保目录存在
+        args.report.write_text(json.dumps(report, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")  # 写入JSON报告
     for line in messages:  # 遍历所有消息
         print(f"- {line}")  # 逐条输出
+    for error in errors:  # 遍历所有错误
+        print(f"! [{error['check']}] {error['message']}")  # 逐条输出错误
+    if errors:  # 存在错误
+        print(f"校验失败: 共 {len(errors)} 个问题")  # 输出错误统计
+        if not args.force:  # 若未启用强制模式
+            sys.exit(1)  # 使用失败退出码
     print("校验完成。")  # 输出结束语
 
 
@@ -0,0 +1,52 @@
+"""验证改名分析在缓存命中时只重新分类新增或变更的文件。"""
+
+from __future__ import annotations
+
+import os
+import struct
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from scripts.analyze_assets import build_plan
+
+
+def _write_png_header(path: Path, width: int, height: int) -> None:
+    """写入仅包含签名与 IHDR 的最小 PNG 头部。"""
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    ihdr = struct.pack(">II", width, height) + b"\x08\x06\x00\x00\x00"
+    path.write_bytes(b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + ihdr + b"\0\0\0\0")
+
+
+def test_incremental_plan_matches_full_scan(tmp_path: Path) -> None:
+    """缓存复用后的计划应与全量扫描一致，且仅变更文件被重新分类。"""
+
+    source = tmp_path / "user_imports"
+    _write_png_header(source / "characters" / "Hero.png", 96, 128)
+    _write_png_header(source / "tilesets" / "World_A1.png", 768, 576)
+    (source / "audio" / "se").mkdir(parents=True)
+    (source / "audio" / "se" / "Click.ogg").write_bytes(b"OggS" + b"\0" * 8)
+
+    cache: dict = {}
+    stats: dict = {}
+    first = build_plan([source], cache, stats)
+    assert stats == {"reused": 0, "reclassified": 3}
+
+    build_plan([source], cache, stats)
+    assert stats == {"reused": 3, "reclassified": 0}
+
+    hero = source / "characters" / "Hero.png"
+    previous_mtime = hero.stat().st_mtime_ns
+    _write_png_header(hero, 144, 192)
+    os.utime(hero, ns=(previous_mtime + 10**9, previous_mtime + 10**9))  # 避免同一时钟刻度内改写导致状态不变
+    (source / "audio" / "se" / "Click.ogg").unlink()
+    plan, conflicts = build_plan([source], cache, stats)
+    assert stats == {"reused": 1, "reclassified": 1}
+    assert len(cache) == 2
+    assert (plan, conflicts) == build_plan([source])
+    assert plan != first[0]
+    assert any("png:width=144,height=192" in item["reasons"] for item in plan)
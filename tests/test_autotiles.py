@@ -0,0 +1,39 @@
+"""测试 47 格 blob 自动拼接查找表与过渡图集输出。"""  # 模块docstring中文说明用途
+from __future__ import annotations  # 引入未来注解便于类型标注
+
+import json  # 导入JSON解析描述文件
+import sys  # 导入sys以调整模块搜索路径
+from pathlib import Path  # 导入Path处理路径
+
+import numpy as np  # 导入NumPy构造地形网格
+from PIL import Image  # 导入Pillow检查图集尺寸
+
+ROOT_DIR = Path(__file__).resolve().parents[1]  # 计算仓库根目录
+if str(ROOT_DIR) not in sys.path:  # 根目录不在搜索路径时
+    sys.path.insert(0, str(ROOT_DIR))  # 插入根目录
+
+from scripts.gen_autotiles import blob_masks, build_lookup_table, generate_autotiles, pick_autotiles  # 导入被测函数
+
+
+def test_lookup_table_covers_47_tiles() -> None:  # 定义查找表测试
+    """256种掩码应映射到恰好47个瓦片，全同与孤立格分别取最后与第一个。"""  # 函数docstring中文说明
+    lookup = build_lookup_table()  # 构建查找表
+    assert len(blob_masks()) == 47  # 归约后为47种
+    assert sorted(set(lookup.tolist())) == list(range(47))  # 覆盖全部索引
+    assert lookup[255] == 46 and lookup[0] == 0  # 全同与孤立格
+    same = np.zeros((3, 3), dtype=bool)  # 构造3x3网格
+    same[1, :] = True  # 中间一行为同类地形
+    picked = pick_autotiles(same, lookup, edge_same=False)  # 选择过渡瓦片
+    east_west = blob_masks().index(4 | 64)  # 仅东西相连的瓦片索引
+    assert picked[1, 1] == east_west  # 中心格只与东西相连
+
+
+def test_generate_autotiles_outputs(tmp_path: Path) -> None:  # 定义输出测试
+    """每个地形对输出一张47格图集，描述文件包含查找表。"""  # 函数docstring中文说明
+    descriptor_path = generate_autotiles(tmp_path, 32, ["grass:road"])  # 生成单个地形对
+    descriptor = json.loads(descriptor_path.read_text(encoding="utf-8"))  # 读取描述
+    assert len(descriptor["lookup"]) == 256  # 查找表长度
+    pair = descriptor["pairs"][0]  # 读取地形对
+    assert (pair["center"], pair["outer"]) == ("GRASS", "ROAD")  # 名称规范化
+    with Image.open(tmp_path / "tiles" / pair["image"]) as image:  # 打开图集
+        assert image.size == (32 * 8, 32 * 6)  # 47格占8列6行
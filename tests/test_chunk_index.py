@@ -0,0 +1,39 @@
+"""验证块索引的计数、包围盒、哈希以及流式写出与整图计算的一致性。"""  # 模块docstring中文说明用途
+from __future__ import annotations  # 引入未来注解便于类型标注
+
+import io  # 导入io在内存中接收流式输出
+import json  # 导入JSON解析输出
+import sys  # 导入sys以调整模块搜索路径
+from pathlib import Path  # 导入Path处理路径
+
+import numpy as np  # 导入NumPy构造网格
+
+ROOT_DIR = Path(__file__).resolve().parents[1]  # 计算仓库根目录
+if str(ROOT_DIR) not in sys.path:  # 根目录不在搜索路径时
+    sys.path.insert(0, str(ROOT_DIR))  # 插入根目录
+
+from scripts.build_chunk_index import build_chunk_index, chunk_summaries, dump_index  # 导入被测函数
+from scripts.gen_demo_map import write_chunked_map  # 导入分块地图写出函数
+
+
+def test_summaries_count_bbox_and_hash() -> None:  # 定义摘要字段测试
+    """计数排除空格子，包围盒只覆盖非地面内容，相同内容哈希相同。"""  # 函数docstring中文说明
+    grid = np.ones((6, 10), dtype=np.uint32)  # 全部为地面
+    grid[1:3, 2:4] = 8  # 左块放一座房屋
+    grid[:, 8:] = 0  # 右块末两列为空
+    left, right = chunk_summaries(grid, 0, 0, 5, 1)[:2]  # 取第一行的两块
+    assert left["counts"] == {"1": 21, "8": 4} and left["bbox"] == [2, 1, 4, 3]  # 左块统计与包围盒
+    assert right["counts"] == {"1": 15} and right["bbox"] is None  # 右块只有地面
+    assert chunk_summaries(grid[:5, :5], 0, 0, 5, 1)[0]["hash"] == left["hash"]  # 同一内容哈希一致
+    assert len(chunk_summaries(np.zeros((4, 4), dtype=np.uint32), 0, 0, 2, 1)) == 0  # 全空块不写出
+
+
+def test_streamed_index_matches_full_map_index() -> None:  # 定义流式一致性测试
+    """分块地图流式写出的索引应与读回整张地图后重新计算的结果一致。"""  # 函数docstring中文说明
+    map_buffer, index_buffer = io.StringIO(), io.StringIO()  # 内存缓冲区
+    write_chunked_map(map_buffer, 100, 70, 32, 4, 64, encoding="base64", index_fp=index_buffer)  # 同步写出索引
+    streamed = json.loads(index_buffer.getvalue())  # 解析流式索引
+    rebuilt = json.loads(dump_index(build_chunk_index(json.loads(map_buffer.getvalue()), 32, 1)))  # 整图重新计算
+    key = lambda chunk: (chunk["y"], chunk["x"])  # 按坐标排序
+    assert streamed["chunkSize"] == 32 and len(streamed["layers"][0]["chunks"]) == 12  # 100×70 覆盖 4×3 个索引块
+    assert sorted(streamed["layers"][0]["chunks"], key=key) == sorted(rebuilt["layers"][0]["chunks"], key=key)  # 内容一致
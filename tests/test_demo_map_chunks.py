@@ -0,0 +1,51 @@
+"""验证分块无限地图的流式输出、草地块跳过与块级可复现性。"""  # 模块docstring中文说明用途
+from __future__ import annotations  # 引入未来注解便于类型标注
+
+import io  # 导入io在内存中接收流式输出
+import json  # 导入JSON解析输出
+import sys  # 导入sys以调整模块搜索路径
+from pathlib import Path  # 导入Path处理路径
+
+import numpy as np  # 导入NumPy比较块数据
+
+ROOT_DIR = Path(__file__).resolve().parents[1]  # 计算仓库根目录
+if str(ROOT_DIR) not in sys.path:  # 根目录不在搜索路径时
+    sys.path.insert(0, str(ROOT_DIR))  # 插入根目录
+
+from scripts.gen_demo_map import TILE_MAPPING, plan_world, render_chunk, write_chunked_map  # 导入被测函数
+
+
+def test_chunked_map_streams_valid_tiled_json() -> None:  # 定义流式输出测试
+    """输出应为合法的无限地图，块尺寸固定，统计覆盖全部格子。"""  # 函数docstring中文说明
+    buffer = io.StringIO()  # 内存缓冲区
+    counts = write_chunked_map(buffer, 40, 30, 32, 42, 16)  # 写出分块地图
+    data = json.loads(buffer.getvalue())  # 解析输出
+    layer = data["layers"][0]  # 读取图层
+    assert data["infinite"] is True and "data" not in layer  # 无限地图只含块
+    assert {(chunk["width"], chunk["height"]) for chunk in layer["chunks"]} == {(16, 16)}  # 块尺寸固定
+    assert sum(counts.values()) == 40 * 30  # 统计覆盖全部格子
+    plan = plan_world(40, 30, 42)  # 重建全局规划
+    for chunk in reversed(layer["chunks"]):  # 以相反顺序重新生成
+        again = render_chunk(plan, chunk["x"] // 16, chunk["y"] // 16, 16)  # 单独生成该块
+        assert np.array_equal(np.array(chunk["data"]).reshape(16, 16), again)  # 与流式结果一致
+
+
+def test_grass_only_chunks_are_skipped() -> None:  # 定义草地块跳过测试
+    """小块内没有障碍物时，只含草地的块不应写出。"""  # 函数docstring中文说明
+    buffer = io.StringIO()  # 内存缓冲区
+    counts = write_chunked_map(buffer, 60, 60, 32, 3, 2)  # 2x2 块内不放障碍物
+    chunks = json.loads(buffer.getvalue())["layers"][0]["chunks"]  # 读取块列表
+    assert 0 < len(chunks) < 30 * 30  # 跳过了大部分草地块
+    grass = TILE_MAPPING["GRASS"]  # 草地 gid
+    assert all(any(gid not in (0, grass) for gid in chunk["data"]) for chunk in chunks)  # 写出的块都含非草地瓦片
+    assert sum(counts.values()) == 60 * 60  # 统计仍覆盖全部格子
+
+
+def test_chunked_map_is_independent_of_worker_count() -> None:  # 定义进程数无关性测试
+    """计数器随机流按块坐标取值，单进程与进程池的输出应逐字节一致。"""  # 函数docstring中文说明
+    outputs = []  # 记录各次输出
+    for workers in (1, 2):  # 分别使用单进程与进程池
+        buffer = io.StringIO()  # 内存缓冲区
+        write_chunked_map(buffer, 70, 50, 32, 11, 16, encoding="base64", workers=workers)  # 写出分块地图
+        outputs.append(buffer.getvalue())  # 保存输出
+    assert outputs[0] == outputs[1]  # 输出完全一致
@@ -0,0 +1,33 @@
+"""确认 NumPy 版地图生成与原列表实现逐格一致。"""  # 模块docstring中文说明用途
+from __future__ import annotations  # 引入未来注解便于类型标注
+
+import hashlib  # 导入hashlib计算地图数据摘要
+import json  # 导入JSON序列化地图数据
+import sys  # 导入sys以调整模块搜索路径
+from pathlib import Path  # 导入Path处理路径
+
+import pytest  # 导入pytest进行参数化
+
+ROOT_DIR = Path(__file__).resolve().parents[1]  # 计算仓库根目录
+if str(ROOT_DIR) not in sys.path:  # 根目录不在搜索路径时
+    sys.path.insert(0, str(ROOT_DIR))  # 插入根目录
+
+from scripts.gen_demo_map import generate_map  # 导入被测函数
+
+# 以下摘要与统计由原列表实现（逐格 math.hypot + set_tile）生成
+REFERENCE = [  # 参考结果列表
+    ((50, 40, 42), "8850bd949b741d791528ea5a91c075b95867d963", {1: 1686, 2: 49, 3: 24, 4: 71, 5: 36, 6: 10, 7: 55, 8: 5, 9: 39, 10: 25}),
+    ((20, 15, 99), "ee3afb6bd2604057f923c6c34b9068bcda1f66ae", {1: 221, 2: 20, 3: 8, 4: 14, 5: 9, 6: 9, 7: 6, 8: 4, 9: 6, 10: 3}),
+    ((123, 77, 7), "477bc796e1bbd4d7b55758f7e597e917bdc7d357", {1: 8353, 2: 119, 3: 33, 4: 248, 5: 157, 6: 10, 7: 229, 8: 4, 9: 200, 10: 118}),
+]  # 参考结果结束
+
+
+@pytest.mark.parametrize("params, digest, counts", REFERENCE)  # 参数化三组尺寸与种子
+def test_generate_map_matches_list_implementation(params, digest, counts) -> None:  # 定义一致性测试
+    """固定种子下地图数据与统计应与原实现完全一致。"""  # 函数docstring中文说明
+    width, height, seed = params  # 解包参数
+    map_json, actual_counts = generate_map(width, height, 32, seed)  # 生成地图
+    data = map_json["layers"][0]["data"]  # 读取图层数据
+    assert all(type(gid) is int for gid in data[:10])  # JSON数据为Python整数
+    assert hashlib.sha1(json.dumps(data).encode()).hexdigest() == digest  # 逐格一致
+    assert actual_counts == counts  # 统计一致
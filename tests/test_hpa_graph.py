@@ -0,0 +1,51 @@
+"""验证 HPA* 图的构建、序列化往返与查询结果的正确性。"""  # 模块docstring中文说明用途
+from __future__ import annotations  # 引入未来注解便于类型标注
+
+import json  # 导入JSON模拟写出与读回
+import sys  # 导入sys以调整模块搜索路径
+from pathlib import Path  # 导入Path处理路径
+
+import numpy as np  # 导入NumPy构造网格
+
+ROOT_DIR = Path(__file__).resolve().parents[1]  # 计算仓库根目录
+if str(ROOT_DIR) not in sys.path:  # 根目录不在搜索路径时
+    sys.path.insert(0, str(ROOT_DIR))  # 插入根目录
+
+from scripts.build_hpa_graph import HpaGraph, build_map_graph  # 导入被测对象
+from scripts.build_nav_sidecar import UNREACHABLE, distance_field, load_binding  # 导入 BFS 作为最优代价参照
+from scripts.gen_demo_map import generate_map  # 导入地图生成函数
+
+
+def optimal_cost(passable: np.ndarray, start: tuple, goal: tuple) -> int:  # 定义最优代价辅助函数
+    """用整图 BFS 计算最短步数。"""  # 函数docstring中文说明
+    sources = np.zeros_like(passable)  # 初始化起点
+    sources[start[1], start[0]] = True  # 写入起点
+    return int(distance_field(passable, sources)[goal[1], goal[0]])  # 返回代价
+
+
+def test_queries_on_demo_map_are_valid() -> None:  # 定义演示地图查询测试
+    """序列化往返后查询：代价不低于最优，展开路径逐格相邻且长度等于代价。"""  # 函数docstring中文说明
+    map_json, _counts = generate_map(64, 48, 32, 42)  # 生成地图
+    graph = build_map_graph(map_json, load_binding(ROOT_DIR / "assets" / "mapping" / "tileset_binding.json"), 8)  # 构建图
+    graph = HpaGraph.from_json(json.loads(json.dumps(graph.to_json())))  # 序列化往返
+    rng = np.random.default_rng(0)  # 固定随机流
+    for _ in range(30):  # 随机查询
+        start = (int(rng.integers(64)), int(rng.integers(48)))  # 起点
+        goal = (int(rng.integers(64)), int(rng.integers(48)))  # 终点
+        optimal = optimal_cost(graph.passable, start, goal)  # 最优代价
+        result = graph.find_path(start, goal, refine=True)  # HPA* 查询
+        if optimal == UNREACHABLE:  # 不可达
+            assert result is None  # 应直接拒绝
+            continue  # 下一组
+        cost, path = result  # 解包结果
+        assert cost >= optimal and path[0] == start and path[-1] == goal and len(path) == cost + 1  # 代价与端点
+        assert all(abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 and graph.passable[b[1], b[0]] for a, b in zip(path, path[1:]))  # 逐格相邻且可通行
+
+
+def test_walled_clusters_are_unreachable() -> None:  # 定义隔断测试
+    """被墙完全隔开的两侧应返回 None，同侧跨簇查询应找到最优路径。"""  # 函数docstring中文说明
+    passable = np.ones((12, 12), dtype=bool)  # 全部可通行
+    passable[:, 6] = False  # 竖墙隔开左右
+    graph = HpaGraph.build(passable, 4)  # 构建图
+    assert graph.find_path((0, 0), (11, 11)) is None  # 左右不可达
+    assert graph.find_path((0, 0), (5, 11)) == (16, graph.find_path((0, 0), (5, 11))[1])  # 同侧为曼哈顿最优
@@ -0,0 +1,63 @@
+"""验证流式 JSON 写出与 json.dumps 逐字节一致、JSONL 可还原，以及合成脚本的 jsonl 产物。"""  # 模块docstring中文说明用途
+from __future__ import annotations  # 引入未来注解便于类型标注
+
+import json  # 导入JSON生成参考输出
+import os  # 导入os读取文件时间戳
+import sys  # 导入sys以调整模块搜索路径
+from pathlib import Path  # 导入Path处理路径
+
+import pytest  # 导入pytest断言异常
+
+ROOT_DIR = Path(__file__).resolve().parents[1]  # 计算仓库根目录
+if str(ROOT_DIR) not in sys.path:  # 根目录不在搜索路径时
+    sys.path.insert(0, str(ROOT_DIR))  # 插入根目录
+
+from scripts.synth_defaults import run_synthesis  # 导入合成流程
+from scripts.utils_json_stream import iter_json_chunks, read_json_stream, write_json_stream  # 导入被测函数
+
+PAYLOAD = {  # 覆盖嵌套容器、空容器、非字符串键与转义字符的负载
+    "meta": {"generatedAt": "2026-01-01T00:00:00Z", "rulesVersion": 1},  # 元信息
+    "items": [{"id": "b", "tags": ["中文", "line\nbreak"], "cost": []}, {"id": "a", "nested": {"z": {"y": [1, 2.5, None, True]}}}],  # 条目列表
+    "index": {"images": ["x.png"], "audio": [], 3: "int key"},  # 字典容器
+    "empty": {},  # 空字典
+    "scalar": "值",  # 标量
+}  # 负载结束
+
+
+@pytest.mark.parametrize("sort_keys", [False, True])  # 排序与不排序两种情况
+def test_chunks_match_json_dumps(sort_keys: bool) -> None:  # 定义逐字节一致测试
+    """pretty 与 compact 的拼接结果应与 json.dumps 完全一致。"""  # 函数docstring中文说明
+    payload = {key: value for key, value in PAYLOAD.items() if not (sort_keys and key == "index")}  # 排序时混合类型的键无法比较
+    assert "".join(iter_json_chunks(payload, "pretty", sort_keys)) == json.dumps(payload, ensure_ascii=False, indent=2, sort_keys=sort_keys)  # 格式化一致
+    assert "".join(iter_json_chunks(payload, "compact", sort_keys)) == json.dumps(payload, ensure_ascii=False, separators=(",", ":"), sort_keys=sort_keys)  # 紧凑一致
+    with pytest.raises(ValueError):  # 未知格式
+        iter_json_chunks(payload, "yaml")  # 调用失败
+
+
+def test_jsonl_round_trip_and_unchanged_skip(tmp_path: Path) -> None:  # 定义 JSONL 与跳过写入测试
+    """JSONL 每行一个条目且可还原；内容相同时不改写文件。"""  # 函数docstring中文说明
+    path = tmp_path / "out.jsonl"  # 输出路径
+    assert write_json_stream(path, PAYLOAD, "jsonl")  # 首次写出
+    lines = path.read_text(encoding="utf-8").splitlines()  # 读取行
+    assert len(lines) == 1 + 2 + 2 + 3  # 骨架行、meta 两个键、两个列表条目与 index 三个键
+    expected = json.loads(json.dumps(PAYLOAD))  # 非字符串键还原为字符串
+    assert read_json_stream(path) == expected  # 还原结果一致
+    os.utime(path, ns=(1, 1))  # 固定时间戳
+    assert not write_json_stream(path, PAYLOAD, "jsonl")  # 内容相同不改写
+    assert os.stat(path).st_mtime_ns == 1 and not list(tmp_path.glob("*.tmp"))  # 时间戳保持且无临时文件残留
+
+
+def test_synthesis_writes_jsonl_outputs(tmp_path: Path) -> None:  # 定义合成 jsonl 产物测试
+    """jsonl 格式的合成产物改用 .jsonl 后缀，内容与默认格式一致，并可用于增量模式。"""  # 函数docstring中文说明
+    (tmp_path / "assets" / "metadata").mkdir(parents=True)  # 创建元数据目录
+    tags = {f"images:tiles/road_{index}.png": ["tile", "road", "quest", "collect:wood"] for index in range(3)}  # 三个道路资产
+    (tmp_path / "assets" / "metadata" / "tags.json").write_text(json.dumps(tags), encoding="utf-8")  # 写入标签
+    run_synthesis(tmp_path)  # 默认格式
+    run_synthesis(tmp_path, incremental=True, json_format="jsonl")  # jsonl 格式，增量运行写出指纹
+    auto_dir = tmp_path / "assets" / "auto"  # 输出目录
+    for name in ("blueprints_auto", "shops_auto", "quests_auto"):  # 逐个比较
+        pretty = json.loads((auto_dir / f"{name}.json").read_text(encoding="utf-8"))  # 默认产物
+        streamed = read_json_stream(auto_dir / f"{name}.jsonl")  # jsonl 产物
+        key = name.split("_")[0]  # 条目键
+        assert streamed[key] == pretty[key]  # 条目一致
+    assert "incremental: resynthesized 0 of 3 assets" in run_synthesis(tmp_path, incremental=True, json_format="jsonl")  # 增量模式读取 jsonl 产物
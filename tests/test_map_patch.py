@@ -0,0 +1,79 @@
+"""验证地图补丁的游程合并、逐字节还原与基准校验。"""  # 模块docstring中文说明用途
+from __future__ import annotations  # 引入未来注解便于类型标注
+
+import base64  # 导入base64构造外部工具编码的图层
+import copy  # 导入copy修改地图副本
+import io  # 导入io在内存中接收流式输出
+import json  # 导入JSON解析分块地图
+import sys  # 导入sys以调整模块搜索路径
+import zlib  # 导入zlib按默认级别压缩图层
+from pathlib import Path  # 导入Path处理路径
+
+import numpy as np  # 导入NumPy构造数组
+import pytest  # 导入pytest断言异常
+
+ROOT_DIR = Path(__file__).resolve().parents[1]  # 计算仓库根目录
+if str(ROOT_DIR) not in sys.path:  # 根目录不在搜索路径时
+    sys.path.insert(0, str(ROOT_DIR))  # 插入根目录
+
+from scripts.gen_demo_map import generate_map, write_chunked_map  # 导入地图生成函数
+from scripts.map_patch import apply_patch, apply_patch_text, canonical_text, change_runs, detect_format, diff_maps  # 导入被测函数
+from scripts.utils_tiled_layers import encode_layer  # 导入图层编码函数
+
+
+def test_change_runs_merge_short_gaps() -> None:  # 定义游程测试
+    """间隔不超过两格的变化应合并为一段。"""  # 函数docstring中文说明
+    old = np.zeros(20, dtype=np.uint32)  # 旧数组
+    new = old.copy()  # 新数组
+    new[[2, 3, 6, 15]] = 1  # 写入变化
+    starts, lengths = change_runs(old, new)  # 计算游程
+    assert starts.tolist() == [2, 15] and lengths.tolist() == [5, 1]  # 2-6 合并，15 单独成段
+
+
+@pytest.mark.parametrize("encoding", ["csv", "base64"])  # 覆盖两种图层编码
+def test_patch_round_trip_is_byte_identical(encoding: str) -> None:  # 定义往返测试
+    """应用补丁后的规范文本应与新地图逐字节一致，补丁远小于整张地图。"""  # 函数docstring中文说明
+    old_map, _counts = generate_map(120, 80, 32, 3)  # 生成旧地图
+    new_map = copy.deepcopy(old_map)  # 复制为新地图
+    new_map["layers"][0]["data"][100:130] = [8] * 30  # 修改一段瓦片
+    new_map["layers"][0]["data"][5000] = 10  # 修改单个瓦片
+    for map_json in (old_map, new_map):  # 统一编码
+        encode_layer(map_json["layers"][0], encoding, "zlib")  # 按参数编码
+    patch = diff_maps(old_map, new_map)  # 生成补丁
+    assert canonical_text(apply_patch(old_map, patch)) == canonical_text(new_map)  # 逐字节一致
+    assert len(patch) < 1024  # 补丁只有几百字节
+
+
+@pytest.mark.parametrize("encoding", ["csv", "base64"])  # 覆盖两种图层编码
+def test_chunked_map_round_trip_keeps_layout(encoding: str) -> None:  # 定义分块排版往返测试
+    """gen_demo_map 分块模式写出的地图经 diff/apply 后应按每块一行的原排版逐字节还原。"""  # 函数docstring中文说明
+    texts = []  # 新旧地图文本
+    for seed in (3, 4):  # 两个种子生成两张地图
+        buffer = io.StringIO()  # 内存缓冲区
+        write_chunked_map(buffer, 64, 48, 32, seed, 16, encoding=encoding)  # 流式写出分块地图
+        texts.append(buffer.getvalue())  # 保存文本
+    old_map, new_map = (json.loads(text) for text in texts)  # 解析地图
+    assert detect_format(texts[1], new_map) == "chunked"  # 识别为分块排版
+    patch = diff_maps(old_map, new_map, "chunked")  # 生成补丁
+    assert apply_patch_text(old_map, patch)[1] == texts[1]  # 排版与内容逐字节一致
+
+
+def test_foreign_compression_round_trip() -> None:  # 定义外部压缩级别测试
+    """按 Tiled 默认 zlib 级别压缩的图层无法原样重新编码时，补丁携带原始数据并仍可逐字节还原。"""  # 函数docstring中文说明
+    old_map, _counts = generate_map(60, 40, 32, 5)  # 生成旧地图
+    new_map = copy.deepcopy(old_map)  # 复制为新地图
+    new_map["layers"][0]["data"][10:20] = [8] * 10  # 修改一段瓦片
+    for map_json in (old_map, new_map):  # 按默认压缩级别编码
+        layer = map_json["layers"][0]  # 读取图层
+        layer.update({"data": base64.b64encode(zlib.compress(np.asarray(layer["data"], dtype="<u4").tobytes())).decode("ascii"), "encoding": "base64", "compression": "zlib"})  # 写入外部编码数据
+    patch = diff_maps(old_map, new_map)  # 生成补丁
+    assert apply_patch_text(old_map, patch)[1] == canonical_text(new_map)  # 逐字节一致
+
+
+def test_patch_rejects_wrong_base() -> None:  # 定义基准校验测试
+    """补丁只能应用到生成它时的旧地图。"""  # 函数docstring中文说明
+    old_map, _counts = generate_map(30, 20, 32, 1)  # 生成旧地图
+    other_map, _counts = generate_map(30, 20, 32, 2)  # 生成另一张地图
+    patch = diff_maps(old_map, other_map)  # 生成补丁
+    with pytest.raises(ValueError):  # 基准不一致
+        apply_patch(other_map, patch)  # 应用到错误的地图
@@ -0,0 +1,75 @@
+"""验证地图预览渲染的图集切片、小地图平均色、翻转处理与预览清单条目。"""  # 模块docstring中文说明用途
+from __future__ import annotations  # 引入未来注解便于类型标注
+
+import json  # 导入JSON写出索引
+import sys  # 导入sys以调整模块搜索路径
+from pathlib import Path  # 导入Path处理路径
+
+import numpy as np  # 导入NumPy构造图集
+
+ROOT_DIR = Path(__file__).resolve().parents[1]  # 计算仓库根目录
+if str(ROOT_DIR) not in sys.path:  # 根目录不在搜索路径时
+    sys.path.insert(0, str(ROOT_DIR))  # 插入根目录
+
+from scripts.preview_user_assets import run_preview  # 导入预览清单函数
+from scripts.render_map_preview import FLIP_HORIZONTAL, average_colours, render_map, slice_tiles  # 导入被测函数
+
+
+def make_tiles(count: int, size: int) -> np.ndarray:  # 定义测试瓦片构造函数
+    """每个瓦片左半与右半颜色不同，便于检查翻转"""  # 函数docstring中文说明
+    tiles = np.zeros((count, size, size, 4), dtype=np.uint8)  # 空瓦片
+    tiles[..., 3] = 255  # 不透明
+    tiles[:, :, : size // 2, 0] = np.arange(count, dtype=np.uint8)[:, None, None] * 20 + 10  # 左半红色通道
+    tiles[:, :, size // 2 :, 1] = 200  # 右半绿色通道
+    return tiles  # 返回瓦片
+
+
+def make_map(data: list, width: int, height: int) -> dict:  # 定义测试地图构造函数
+    """构造单图层 CSV 地图"""  # 函数docstring中文说明
+    layer = {"type": "tilelayer", "name": "ground", "width": width, "height": height, "x": 0, "y": 0, "data": data, "visible": True, "opacity": 1}  # 图层
+    return {"width": width, "height": height, "tilewidth": 4, "tileheight": 4, "tilesets": [{"firstgid": 1}], "layers": [layer]}  # 返回地图
+
+
+def test_slice_tiles_honours_margin_and_spacing() -> None:  # 定义切片测试
+    """带外边距与间距的图集应切出与紧密图集相同的瓦片。"""  # 函数docstring中文说明
+    tiles = make_tiles(5, 4)  # 构造瓦片
+    sheet = np.zeros((1 + 2 * 4 + 2 + 1, 1 + 3 * 4 + 2 * 2 + 1, 4), dtype=np.uint8)  # margin=1、spacing=2、3 列 2 行
+    for index, tile in enumerate(tiles):  # 逐个放置
+        row, col = divmod(index, 3)  # 行列位置
+        sheet[1 + row * 6 : 1 + row * 6 + 4, 1 + col * 6 : 1 + col * 6 + 4] = tile  # 写入瓦片
+    sliced = slice_tiles(sheet, 4, {"margin": 1, "spacing": 2, "columns": 3, "tilecount": 5})  # 切片
+    assert np.array_equal(sliced, tiles)  # 与原瓦片一致
+
+
+def test_minimap_and_preview_pixels() -> None:  # 定义渲染测试
+    """小地图每格取平均色，预览图尺寸为格数乘每格像素，空格子透明。"""  # 函数docstring中文说明
+    tiles = make_tiles(3, 4)  # 构造瓦片
+    sheet = tiles.transpose(1, 0, 2, 3).reshape(4, 12, 4)  # 三个瓦片横向排列
+    map_json = make_map([1, 2, 3, 0, 2, 1], 3, 2)  # 3×2 地图
+    minimap = render_map(map_json, sheet, 4, None, 1)  # 渲染小地图
+    palette = average_colours(tiles)  # 平均色
+    assert minimap.shape == (2, 3, 4)  # 每格一像素
+    assert np.array_equal(minimap[0], palette[[0, 1, 2]]) and minimap[1, 0, 3] == 0  # 颜色与透明格
+    preview = render_map(map_json, sheet, 4, None, 2)  # 每格 2 像素
+    assert preview.shape == (4, 6, 4) and np.array_equal(preview[2:4, 2:4], tiles[1, ::2, ::2])  # 尺寸与缩放后的瓦片
+
+
+def test_horizontal_flip_is_applied() -> None:  # 定义翻转测试
+    """带水平翻转标志的格子应渲染为左右镜像的瓦片。"""  # 函数docstring中文说明
+    tiles = make_tiles(1, 4)  # 构造瓦片
+    preview = render_map(make_map([1, 1 | FLIP_HORIZONTAL], 2, 1), tiles[0], 4)  # 原样与翻转各一格
+    assert np.array_equal(preview[:, 4:], tiles[0][:, ::-1])  # 右格为镜像
+
+
+def test_preview_index_lists_map_previews(tmp_path: Path) -> None:  # 定义清单测试
+    """预览清单应列出已生成的地图预览图与小地图。"""  # 函数docstring中文说明
+    build_root = tmp_path / "assets" / "build"  # build 目录
+    (build_root / "previews" / "maps").mkdir(parents=True)  # 创建预览目录
+    (build_root / "index.json").write_text(json.dumps({"audio": {}, "images": {}}), encoding="utf-8")  # 写入空索引
+    for name in ("demo.png", "demo.minimap.png"):  # 两种预览
+        (build_root / "previews" / "maps" / name).write_bytes(b"")  # 占位文件
+    maps = run_preview(tmp_path)["maps"]  # 生成清单
+    assert maps == [  # 按文件名排序
+        {"type": "minimap", "path": "assets/build/previews/maps/demo.minimap.png"},  # 小地图
+        {"type": "map", "path": "assets/build/previews/maps/demo.png"},  # 预览图
+    ]  # 断言结束
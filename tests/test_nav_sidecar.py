@@ -0,0 +1,75 @@
+"""验证导航数据的通行解析、连通分量、距离场与分块地图支持。"""  # 模块docstring中文说明用途
+from __future__ import annotations  # 引入未来注解便于类型标注
+
+import io  # 导入io在内存中接收分块地图
+import json  # 导入JSON解析地图
+import sys  # 导入sys以调整模块搜索路径
+from pathlib import Path  # 导入Path处理路径
+
+import numpy as np  # 导入NumPy构造网格
+
+ROOT_DIR = Path(__file__).resolve().parents[1]  # 计算仓库根目录
+if str(ROOT_DIR) not in sys.path:  # 根目录不在搜索路径时
+    sys.path.insert(0, str(ROOT_DIR))  # 插入根目录
+
+from scripts.build_nav_sidecar import (  # 导入被测函数
+    UNREACHABLE,
+    build_nav,
+    distance_field,
+    label_components,
+    load_binding,
+    load_nav,
+    reachable,
+    terrain_passability,
+)  # 导入结束
+from scripts.gen_demo_map import TILE_MAPPING, generate_map, write_chunked_map  # 导入地图生成函数
+
+
+def test_binding_comments_define_passability() -> None:  # 定义通行性解析测试
+    """绑定表说明中的“可通行/不可通行”应被正确区分。"""  # 函数docstring中文说明
+    flags = terrain_passability(load_binding(ROOT_DIR / "assets" / "mapping" / "tileset_binding.json"))  # 解析仓库绑定表
+    assert {name for name, flag in flags.items() if flag} == {"GRASS", "ROAD", "TILE_FLOOR"}  # 仅三种地形可通行
+
+
+def test_components_and_distance_on_small_grid() -> None:  # 定义小网格测试
+    """被墙隔开的两侧应属于不同分量，距离场绕开障碍且不可达处为哨兵值。"""  # 函数docstring中文说明
+    passable = np.array(  # 构造网格（中间一列为墙）
+        [
+            [1, 1, 0, 1],
+            [1, 1, 0, 1],
+            [0, 1, 0, 1],
+        ],
+        dtype=bool,
+    )  # 网格结束
+    labels, sizes = label_components(passable)  # 标记分量
+    assert labels.tolist() == [[1, 1, 0, 2], [1, 1, 0, 2], [0, 1, 0, 2]]  # 按行优先首次出现编号
+    assert sizes.tolist() == [5, 3]  # 分量格数
+    sources = np.zeros_like(passable)  # 距离起点
+    sources[2, 1] = True  # 起点位于左下
+    distance = distance_field(passable, sources)  # 计算距离
+    assert distance[0, 0] == 3 and distance[2, 1] == 0  # 左侧按步数计
+    assert (distance[:, 3] == UNREACHABLE).all() and distance[0, 2] == UNREACHABLE  # 右侧与墙不可达
+
+
+def test_demo_map_nav_round_trip() -> None:  # 定义演示地图测试
+    """导航数据解码后应与地图一致，可达性查询与连通分量相符。"""  # 函数docstring中文说明
+    binding = load_binding(ROOT_DIR / "assets" / "mapping" / "tileset_binding.json")  # 读取绑定表
+    map_json, _counts = generate_map(30, 20, 32, 5)  # 生成地图
+    grid = np.array(map_json["layers"][0]["data"]).reshape(20, 30)  # 原始网格
+    nav = json.loads(json.dumps(build_nav(map_json, binding)))  # 经过一次序列化
+    arrays = load_nav(nav)  # 解码导航数据
+    assert np.array_equal(arrays["passable"], np.isin(grid, [TILE_MAPPING["GRASS"], TILE_MAPPING["ROAD"], TILE_MAPPING["TILE_FLOOR"]]))  # 通行位图一致
+    assert (arrays["road_distance"][grid == TILE_MAPPING["ROAD"]] == 0).all()  # 道路距离为 0
+    road = np.argwhere(grid == TILE_MAPPING["ROAD"])[0]  # 任取一格道路
+    blocked = np.argwhere(~arrays["passable"])[0]  # 任取一格障碍
+    assert not reachable(arrays["labels"], (int(road[1]), int(road[0])), (int(blocked[1]), int(blocked[0])))  # 障碍不可达
+
+
+def test_chunked_map_matches_inline_nav() -> None:  # 定义分块地图测试
+    """分块地图按 defaultGid 补齐缺失块后，导航尺寸应覆盖整张地图。"""  # 函数docstring中文说明
+    binding = load_binding(ROOT_DIR / "assets" / "mapping" / "tileset_binding.json")  # 读取绑定表
+    buffer = io.StringIO()  # 内存缓冲区
+    write_chunked_map(buffer, 40, 24, 32, 8, 8, encoding="base64")  # 写出分块地图
+    nav = build_nav(json.loads(buffer.getvalue()), binding)  # 构建导航数据
+    assert (nav["width"], nav["height"]) == (40, 24)  # 尺寸覆盖整张地图
+    assert nav["components"]["count"] >= 1 and sum(nav["components"]["sizes"]) == nav["passable"]["count"]  # 分量格数与通行格数一致
@@ -0,0 +1,87 @@
+"""验证 PNG 优化阶段无损、按内容摘要缓存并按分类统计节省字节。"""
+
+from __future__ import annotations
+
+import json
+import struct
+import sys
+import zlib
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from scripts.optimize_pngs import main, optimize_pngs
+
+
+def test_palette_conversion_is_lossless_and_cached(tmp_path: Path) -> None:
+    """少色 RGBA 图片应转为更小的调色板 PNG，像素不变，重跑全部命中缓存。"""
+
+    root = tmp_path / "images"
+    (root / "tiles").mkdir(parents=True)
+    (root / "ui").mkdir()
+    pixels = np.zeros((64, 64, 4), dtype=np.uint8)
+    pixels[::2, :, :] = (200, 40, 40, 255)
+    pixels[:, ::3, :] = (10, 120, 200, 128)
+    Image.fromarray(pixels, "RGBA").save(root / "tiles" / "checker.png", compress_level=0)
+    noise = np.random.default_rng(1).integers(0, 256, (16, 16, 4), dtype=np.uint8)
+    Image.fromarray(noise, "RGBA").save(root / "ui" / "noise.png", optimize=True)
+
+    cache: dict = {}
+    report = optimize_pngs([root], cache, apply=True, workers=1)
+    assert report["optimized"] == 2
+    assert report["categories"]["tiles"]["saved"] > 0
+    assert [item["params"]["mode"] for item in report["changed"] if item["path"].endswith("checker.png")] == ["P"]
+    with Image.open(root / "tiles" / "checker.png") as image:
+        assert image.mode == "P"
+        assert np.array_equal(np.asarray(image.convert("RGBA")), pixels)
+
+    again = optimize_pngs([root], cache, apply=True, workers=1)
+    assert again["optimized"] == 0
+    assert again["totals"]["saved"] == 0
+
+
+def test_corrupt_png_error_survives_cache(tmp_path: Path) -> None:
+    """损坏的 PNG 第二次运行命中缓存时仍应报告错误并返回非零退出码。"""
+
+    root = tmp_path / "images"
+    root.mkdir()
+    (root / "broken.png").write_bytes(b"\x89PNG\r\n\x1a\nnot really a png")
+    argv = ["--roots", str(root), "--cache", str(tmp_path / "cache.json"), "--workers", "1", "--report", str(tmp_path / "report.json")]
+    for expected_reused in (0, 1):
+        assert main(argv) == 1
+        report = json.loads((tmp_path / "report.json").read_text(encoding="utf-8"))
+        assert report["reused"] == expected_reused
+        assert [item["path"] for item in report["errors"]] == [str(root / "broken.png")]
+
+
+def write_rgb48_png(path: Path, pixels: np.ndarray) -> None:
+    """手工写出 16 位 RGB PNG，Pillow 读取时会截断为 8 位 RGB。"""
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    height, width = pixels.shape[:2]
+    rows = b"".join(b"\x00" + row.astype(">u2").tobytes() for row in pixels)
+    header = struct.pack(">IIBBBBB", width, height, 16, 2, 0, 0, 0)
+    path.write_bytes(b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b""))
+
+
+def test_high_bit_depth_pngs_are_left_unchanged(tmp_path: Path) -> None:
+    """16 位灰度与 16 位 RGB 图片无法用 8 位像素校验无损，应保持原文件。"""
+
+    root = tmp_path / "images"
+    root.mkdir()
+    gray = (np.arange(64 * 64, dtype=np.uint16).reshape(64, 64) * 16).astype(np.uint16)
+    Image.fromarray(gray).save(root / "gray16.png", compress_level=0)
+    rgb = np.zeros((32, 32, 3), dtype=np.uint16)
+    rgb[..., 0] = np.arange(32 * 32).reshape(32, 32)
+    write_rgb48_png(root / "rgb48.png", rgb)
+    originals = {path.name: path.read_bytes() for path in root.iterdir()}
+    report = optimize_pngs([root], {}, apply=True, workers=1)
+    assert report["changed"] == [] and report["errors"] == []
+    assert {path.name: path.read_bytes() for path in root.iterdir()} == originals
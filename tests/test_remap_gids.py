@@ -0,0 +1,53 @@
+"""验证 gid 重映射查找表、翻转标志保留、分块压缩图层改写与仓库图集顺序一致性。"""  # 模块docstring中文说明用途
+from __future__ import annotations  # 引入未来注解便于类型标注
+
+import io  # 导入io在内存中接收分块地图
+import json  # 导入JSON读写地图
+import sys  # 导入sys以调整模块搜索路径
+from pathlib import Path  # 导入Path处理路径
+
+import numpy as np  # 导入NumPy比较网格
+import pytest  # 导入pytest断言异常
+
+ROOT_DIR = Path(__file__).resolve().parents[1]  # 计算仓库根目录
+if str(ROOT_DIR) not in sys.path:  # 根目录不在搜索路径时
+    sys.path.insert(0, str(ROOT_DIR))  # 插入根目录
+
+from scripts.gen_demo_map import TILE_MAPPING, generate_map, write_chunked_map  # 导入地图生成函数
+from scripts.remap_gids import build_remap_lut, ordering_mismatches, ordering_sources, remap_array, remap_files  # 导入被测函数
+from scripts.utils_tiled_layers import iter_tile_layers, layer_grid  # 导入图层拼装工具
+
+OLD = {name: gid - 1 for name, gid in TILE_MAPPING.items()}  # 当前顺序
+NEW = {name: len(OLD) - 1 - index for name, index in OLD.items()}  # 完全倒序
+
+
+def test_repo_orderings_agree(monkeypatch: pytest.MonkeyPatch) -> None:  # 定义一致性测试
+    """仓库中四处图集顺序应保持一致。"""  # 函数docstring中文说明
+    monkeypatch.chdir(ROOT_DIR)  # 绑定文件使用相对路径
+    assert ordering_mismatches(ordering_sources()) == []  # 没有不一致
+
+
+def test_lut_keeps_flags_and_foreign_gids() -> None:  # 定义查找表测试
+    """查表只改低位 gid，翻转标志、空格子与其他图集的 gid 保持不变。"""  # 函数docstring中文说明
+    lut = build_remap_lut(OLD, NEW)  # 构建查找表
+    gids = np.array([0, 1, 10 | 0x80000000, 11, 500], dtype=np.uint32)  # 含翻转与越界 gid
+    assert remap_array(gids, lut).tolist() == [0, 10, 1 | 0x80000000, 11, 500]  # 改写结果
+    with pytest.raises(ValueError):  # 新绑定缺少地形
+        build_remap_lut(OLD, {"GRASS": 0})  # 构建失败
+
+
+def test_remap_files_rewrites_single_and_chunked_maps(tmp_path: Path) -> None:  # 定义批量改写测试
+    """并行改写 csv 单层地图与 gzip 分块地图，图层编码不变且结果与逐格映射一致。"""  # 函数docstring中文说明
+    single, _counts = generate_map(40, 30, 32, 5)  # 单层地图
+    buffer = io.StringIO()  # 分块地图缓冲区
+    write_chunked_map(buffer, 50, 40, 32, 6, 16, encoding="base64", compression="gzip")  # 分块压缩地图
+    paths = [tmp_path / "single.json", tmp_path / "chunked.json"]  # 地图路径
+    paths[0].write_text(json.dumps(single), encoding="utf-8")  # 写出单层地图
+    paths[1].write_text(buffer.getvalue(), encoding="utf-8")  # 写出分块地图
+    before = [layer_grid(next(iter_tile_layers(json.loads(path.read_text(encoding="utf-8")))))[0] for path in paths]  # 改写前网格
+    results = remap_files(paths, OLD, NEW, workers=2)  # 进程池改写
+    assert all(changed > 0 for _path, changed in results)  # 两张地图都有变化
+    for path, grid in zip(paths, before):  # 逐张检查
+        layer = next(iter_tile_layers(json.loads(path.read_text(encoding="utf-8"))))  # 改写后的图层
+        assert np.array_equal(layer_grid(layer)[0], np.where(grid > 0, 11 - grid.astype(np.int64), 0))  # 倒序映射
+    assert layer.get("compression") == "gzip" and "chunks" in layer  # 分块与压缩方式保持不变
@@ -0,0 +1,67 @@
+"""验证生态区标注、刷怪候选格子与 Vose 别名表。"""  # 模块docstring中文说明用途
+from __future__ import annotations  # 引入未来注解便于类型标注
+
+import sys  # 导入sys以调整模块搜索路径
+from pathlib import Path  # 导入Path处理路径
+
+import numpy as np  # 导入NumPy构造网格
+import pytest  # 导入pytest断言异常
+
+ROOT_DIR = Path(__file__).resolve().parents[1]  # 计算仓库根目录
+if str(ROOT_DIR) not in sys.path:  # 根目录不在搜索路径时
+    sys.path.insert(0, str(ROOT_DIR))  # 插入根目录
+
+from scripts.build_nav_sidecar import load_binding  # 导入绑定表读取函数
+from scripts.build_spawn_tables import alias_table, build_spawns, load_spawner_cells, sample_spawn, window_counts  # 导入被测函数
+from scripts.gen_demo_map import TILE_MAPPING  # 导入地形 gid
+
+BINDING = load_binding(ROOT_DIR / "assets" / "mapping" / "tileset_binding.json")  # 仓库绑定表
+SPAWNERS = {  # 测试用刷怪点
+    "forest": {"time": "day", "biome": "forest", "limit": 2, "candidates": [{"id": "rabbit", "weight": 3}, {"id": "deer", "weight": 1}]},  # 森林刷怪点
+    "field": {"time": "night", "biome": "field", "limit": 4, "candidates": [{"id": "slime", "weight": 1}]},  # 草地刷怪点
+}  # 刷怪点结束
+
+
+def make_map() -> dict:  # 定义测试地图构造函数
+    """左侧 5×5 区域内有一片树林，右侧为空旷草地"""  # 函数docstring中文说明
+    grid = np.full((8, 16), TILE_MAPPING["GRASS"], dtype=np.int64)  # 全部为草地
+    grid[1:4, 1:4:2] = TILE_MAPPING["TREE"]  # 六棵树
+    grid[:, 10] = TILE_MAPPING["ROAD"]  # 一列道路
+    layer = {"type": "tilelayer", "name": "ground", "width": 16, "height": 8, "x": 0, "y": 0, "data": grid.reshape(-1).tolist()}  # 图层
+    return {"width": 16, "height": 8, "tilesets": [{"firstgid": 1}], "layers": [layer]}  # 返回地图
+
+
+def test_alias_table_reproduces_weights() -> None:  # 定义别名表测试
+    """别名表每列的概率质量之和应精确还原归一化权重。"""  # 函数docstring中文说明
+    weights = np.array([3.0, 2.0, 0.0, 5.0, 1.0])  # 含零权重
+    prob, alias = alias_table(weights)  # 构建别名表
+    mass = np.zeros(weights.size)  # 各候选的概率质量
+    np.add.at(mass, np.arange(weights.size), prob / weights.size)  # 自身部分
+    np.add.at(mass, alias, (1 - prob) / weights.size)  # 别名部分
+    assert np.allclose(mass, weights / weights.sum())  # 与权重一致
+    with pytest.raises(ValueError):  # 非法权重
+        alias_table([0, 0])  # 总和为 0
+
+
+def test_window_counts_matches_direct_sum() -> None:  # 定义方窗计数测试
+    """前缀和方窗计数应与逐格求和一致。"""  # 函数docstring中文说明
+    mask = np.random.default_rng(3).random((9, 11)) < 0.3  # 随机位图
+    counts = window_counts(mask, 2)  # 前缀和计数
+    expected = np.array([[mask[max(y - 2, 0) : y + 3, max(x - 2, 0) : x + 3].sum() for x in range(11)] for y in range(9)])  # 逐格求和
+    assert np.array_equal(counts, expected)  # 结果一致
+
+
+def test_spawner_cells_follow_biomes() -> None:  # 定义候选格子测试
+    """森林格子靠近树林，草地格子不含道路与树木，抽样结果落在候选格子内。"""  # 函数docstring中文说明
+    spawns = build_spawns(make_map(), BINDING, SPAWNERS)  # 构建刷怪表
+    forest = set(load_spawner_cells(spawns, "forest").tolist())  # 森林格子
+    field = set(load_spawner_cells(spawns, "field").tolist())  # 草地格子
+    assert forest and field and not forest & field  # 两个生态区互不重叠
+    assert all(divmod(cell, 16)[1] < 7 for cell in forest)  # 森林都在树林附近
+    assert len(forest) + len(field) == 16 * 8 - 6 - 8  # 除树与道路外的草地都有生态区
+    rng = np.random.default_rng(0)  # 随机数生成器
+    for _ in range(50):  # 多次抽样
+        monster, x, y = sample_spawn(spawns, "forest", rng)  # 抽样
+        assert monster in ("rabbit", "deer") and y * 16 + x in forest  # 结果合法
+    with pytest.raises(ValueError):  # 未定义的生态区
+        build_spawns(make_map(), BINDING, {"cave": {"biome": "cave", "candidates": [{"id": "bat", "weight": 1}]}})  # 构建失败
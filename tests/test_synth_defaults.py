@@ -3,6 +3,29 @@ import subprocess  # 引入子进程库调用脚本
 import sys  # 引入sys库获取python解释器路径
 from pathlib import Path  # 引入Path处理路径
 
+import pytest  # 引入pytest断言异常
+
+ROOT_DIR = Path(__file__).resolve().parents[1]  # 计算仓库根目录
+if str(ROOT_DIR) not in sys.path:  # 根目录不在搜索路径时
+    sys.path.insert(0, str(ROOT_DIR))  # 插入根目录
+
+from scripts.synth_defaults import (  # 导入被测函数
+    DEFAULT_RULES,
+    CompiledRules,
+    build_tag_index,
+    build_tag_sets,
+    matching_rules,
+    rule_expression,
+    rule_matches,
+    run_synthesis,
+    synthesize_all,
+    synthesize_blueprints,
+    synthesize_quests,
+    synthesize_shops,
+    write_json,
+    write_outputs,
+)  # 导入结束
+
 
 def test_synth_defaults_generates_expected_files(tmp_path):  # 定义测试函数
     base_dir = tmp_path / 'pixelworld'  # 创建模拟项目根目录
@@ -45,3 +68,126 @@ def test_synth_defaults_generates_expected_files(tmp_path):  # 定义测试函
     assert isinstance(shops_data.get('shops'), list)  # 断言商店为列表
     assert isinstance(quests_data.get('quests'), list)  # 断言任务为列表
     assert 'no binary generated' in report_text.lower()  # 确认报告包含无二进制声明
+
+
+def test_tag_index_matches_linear_scan():  # 定义倒排索引测试
+    rule_list = [{"match_any": ["tile", "road"]}, {"match_any": ["wall", "tile", "wall"]}, {"match_any": []}, {"match_any": ["quest"]}]  # 含重复与空规则
+    tags = {"a": ["road"], "b": ["tile", "quest"], "c": ["other"], "d": []}  # 构造资产标签
+    tag_index = build_tag_index(rule_list)  # 构造倒排索引
+    for asset_id, asset_tags in build_tag_sets(tags).items():  # 遍历资产
+        expected = [index for index, rule in enumerate(rule_list) if rule_matches(tags[asset_id], rule["match_any"])]  # 逐条扫描结果
+        assert matching_rules(asset_tags, tag_index) == expected  # 倒排索引结果一致且保持规则顺序
+
+
+def evaluate(expr, tags):  # 定义逐集合求值的参考实现
+    if isinstance(expr, str):  # 单个标签
+        return expr in tags  # 直接判断
+    ((operator, operand),) = expr.items()  # 取出运算符
+    if operator == "not":  # 取反
+        return not evaluate(operand, tags)  # 返回结果
+    results = [evaluate(item, tags) for item in operand]  # 子表达式结果
+    return {"any": any(results), "all": all(results), "none": not any(results)}[operator]  # 返回结果
+
+
+def test_compiled_rules_match_set_evaluation():  # 定义编译规则测试
+    rule_list = [  # 覆盖各种条件组合
+        {"match_any": ["tile", "road"]},  # 纯 any 规则
+        {"match_all": ["tile", "road"]},  # 全部标签
+        {"match_all": ["tile"], "match_any": ["road", "wall"], "match_none": ["cheap"]},  # 组合条件
+        {"match_none": ["tile"]},  # 只有排除条件
+        {"match": {"any": [{"all": ["shop", "seed"]}, {"not": {"any": ["quest", "tile"]}}]}},  # 嵌套表达式
+        {"match": {"all": ["quest", {"any": ["collect:wood", "reach:lake"]}]}},  # 嵌套全部条件
+        {},  # 没有条件
+    ]  # 规则列表结束
+    tags = {"a": ["tile", "road"], "b": ["tile", "wall", "cheap"], "c": ["shop", "seed", "tile"], "d": ["quest", "reach:lake"], "e": [], "f": ["other"]}  # 构造资产标签
+    compiled = CompiledRules(rule_list)  # 编译规则
+    for asset_id, asset_tags in build_tag_sets(tags).items():  # 遍历资产
+        expected = [index for index, rule in enumerate(rule_list) if evaluate(rule_expression(rule), asset_tags)]  # 逐集合求值
+        assert compiled.matches(asset_tags) == expected  # 位运算结果一致且保持规则顺序
+    assert compiled.always == [3, 4]  # 含取反的规则无法由标签触发
+    with pytest.raises(ValueError):  # 非法表达式
+        CompiledRules([{"match": {"xor": ["a"]}}])  # 编译失败
+
+
+def test_fused_pass_matches_separate_passes(tmp_path):  # 定义单遍合成测试
+    tags = {"a": ["tile", "road", "cheap"], "b": ["shop", "seed", "discount"], "c": ["quest", "reach:lake"], "d": ["quest", "collect:wood", "tile"]}  # 构造资产标签
+    descriptions = {"a": "道路", "c": "湖岸"}  # 构造描述
+    separate_report, fused_report = [], []  # 报告行
+    separate = (synthesize_blueprints(tags, descriptions, DEFAULT_RULES, separate_report), synthesize_shops(tags, DEFAULT_RULES, separate_report), synthesize_quests(tags, descriptions, DEFAULT_RULES, separate_report))  # 三遍合成
+    assert synthesize_all(tags, descriptions, DEFAULT_RULES, fused_report) == separate and fused_report == separate_report  # 结果与报告一致
+    payloads = [(tmp_path / "pool" / f"{index}.json", {"entries": entries}) for index, entries in enumerate(separate)]  # 进程池写出任务
+    write_outputs(payloads, workers=2)  # 进程池写出
+    for path, payload in payloads:  # 逐个比较
+        write_json(tmp_path / "serial.json", payload)  # 顺序写出
+        assert path.read_text(encoding="utf-8") == (tmp_path / "serial.json").read_text(encoding="utf-8")  # 内容逐字节一致
+
+
+def test_incremental_mode_keeps_ids_stable(tmp_path):  # 定义增量模式测试
+    base_dir = tmp_path / 'pixelworld'  # 模拟项目根目录
+    (base_dir / 'assets' / 'metadata').mkdir(parents=True)  # 创建元数据目录
+    tags_path = base_dir / 'assets' / 'metadata' / 'tags.json'  # 标签文件路径
+    tags = {f"images:tiles/road_{index}.png": ["tile", "road", "quest", "collect:wood"] for index in range(5)}  # 五个道路资产
+    tags_path.write_text(json.dumps(tags), encoding='utf-8')  # 写入标签
+    run_synthesis(base_dir, incremental=True)  # 首次增量运行，无状态时全部合成
+    blueprints_path = base_dir / 'assets' / 'auto' / 'blueprints_auto.json'  # 蓝图输出
+    shops_path = base_dir / 'assets' / 'auto' / 'shops_auto.json'  # 商店输出
+    before = {entry["source_asset"] + entry["id"][:4]: entry["id"] for entry in json.loads(blueprints_path.read_text(encoding='utf-8'))["blueprints"]}  # 全量ID
+    shops_text = shops_path.read_text(encoding='utf-8')  # 商店文件内容
+    assert "incremental: resynthesized 0 of 5 assets" in run_synthesis(base_dir, incremental=True)  # 无变化时不重新合成
+    items = list(tags.items())  # 资产列表
+    items.insert(0, ("images:tiles/aaa.png", ["tile", "road"]))  # 在最前面插入新资产
+    items[3] = (items[3][0], items[3][1] + ["cheap"])  # 修改一个资产的标签
+    tags_path.write_text(json.dumps(dict(items)), encoding='utf-8')  # 写回标签
+    report = run_synthesis(base_dir, incremental=True)  # 增量合成
+    after = {entry["source_asset"] + entry["id"][:4]: entry["id"] for entry in json.loads(blueprints_path.read_text(encoding='utf-8'))["blueprints"]}  # 增量ID
+    assert "incremental: resynthesized 2 of 6 assets" in report  # 只合成新增与修改的资产
+    assert all(after[key] == value for key, value in before.items())  # 已有资产的ID保持不变
+    assert after["images:tiles/aaa.pngroad"] == "road-006"  # 新资产取下一个序号
+    assert shops_path.read_text(encoding='utf-8') == shops_text  # 内容未变的产物不改写
+
+
+def test_full_run_keeps_incremental_ids(tmp_path):  # 定义增量与全量交替测试
+    base_dir = tmp_path / 'pixelworld'  # 模拟项目根目录
+    (base_dir / 'assets' / 'metadata').mkdir(parents=True)  # 创建元数据目录
+    tags_path = base_dir / 'assets' / 'metadata' / 'tags.json'  # 标签文件路径
+    blueprints_path = base_dir / 'assets' / 'auto' / 'blueprints_auto.json'  # 蓝图输出
+    tags = {f"images:tiles/road_{index}.png": ["tile", "road", "quest", "collect:wood"] for index in range(4)}  # 四个道路资产
+    tags_path.write_text(json.dumps(tags), encoding='utf-8')  # 写入标签
+
+    def read_ids():  # 读取来源到ID的映射
+        return {entry["source_asset"]: entry["id"] for entry in json.loads(blueprints_path.read_text(encoding='utf-8'))["blueprints"]}  # 返回映射
+
+    run_synthesis(base_dir, incremental=True)  # 增量合成
+    first = read_ids()  # 首次ID
+    tags_path.write_text(json.dumps(dict([("images:tiles/aaa.png", ["tile", "road"])] + list(tags.items()))), encoding='utf-8')  # 在最前面插入新资产
+    run_synthesis(base_dir)  # 全量合成
+    second = read_ids()  # 全量ID
+    assert all(second[key] == value for key, value in first.items())  # 全量运行不重新编号
+    assert second["images:tiles/aaa.png"] == "road-005"  # 新资产取下一个序号
+    state = json.loads((base_dir / 'assets' / 'auto' / 'state' / 'id_allocations.json').read_text(encoding='utf-8'))  # 读取状态
+    assert state["assets"] == {}  # 全量运行不计算指纹
+    assert "incremental: resynthesized 5 of 5 assets" in run_synthesis(base_dir, incremental=True)  # 没有指纹时全部重新合成
+    assert read_ids() == second  # ID保持不变
+    assert "incremental: resynthesized 0 of 5 assets" in run_synthesis(base_dir, incremental=True)  # 之后恢复增量复用
+
+
+def test_incremental_rebuilds_after_output_rollback(tmp_path):  # 定义产物回滚测试
+    base_dir = tmp_path / 'pixelworld'  # 模拟项目根目录
+    (base_dir / 'assets' / 'metadata').mkdir(parents=True)  # 创建元数据目录
+    tags_path = base_dir / 'assets' / 'metadata' / 'tags.json'  # 标签文件路径
+    auto_dir = base_dir / 'assets' / 'auto'  # 输出目录
+    tags = {f"images:tiles/wall_{index}.png": ["tile", "wall"] for index in range(3)}  # 三个墙体资产
+    tags_path.write_text(json.dumps(tags), encoding='utf-8')  # 写入标签
+    run_synthesis(base_dir, incremental=True)  # 首次增量合成
+    snapshot = {name: (auto_dir / name).read_bytes() for name in ('blueprints_auto.json', 'shops_auto.json', 'quests_auto.json')}  # 只快照顶层产物
+    tags["images:tiles/road.png"] = ["tile", "road"]  # 新增道路资产
+    tags_path.write_text(json.dumps(tags), encoding='utf-8')  # 写回标签
+    run_synthesis(base_dir, incremental=True)  # 增量合成新资产
+    for name, content in snapshot.items():  # 回滚顶层产物，状态保持不变
+        (auto_dir / name).write_bytes(content)  # 覆盖文件
+    report = run_synthesis(base_dir, incremental=True)  # 再次增量合成
+    assert "incremental: outputs differ from saved state, resynthesizing all assets" in report  # 检测到产物与状态不一致
+    assert "incremental: resynthesized 4 of 4 assets" in report  # 全部重新合成
+    sources = {entry["source_asset"] for entry in json.loads((auto_dir / 'blueprints_auto.json').read_text(encoding='utf-8'))["blueprints"]}  # 蓝图来源
+    assert "images:tiles/road.png" in sources  # 新资产的蓝图没有丢失
+    assert "incremental: resynthesized 0 of 4 assets" in run_synthesis(base_dir, incremental=True)  # 之后恢复增量复用
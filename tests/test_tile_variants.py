@@ -0,0 +1,119 @@
+"""测试地形变体引擎、多分辨率图集与带外扩的图集布局。"""  # 模块docstring中文说明用途
+from __future__ import annotations  # 引入未来注解便于类型标注
+
+import json  # 导入JSON解析描述文件
+import sys  # 导入sys以调整模块搜索路径
+from pathlib import Path  # 导入Path处理路径
+
+import numpy as np  # 导入NumPy比较像素
+import pytest  # 导入pytest替换绘制函数
+from PIL import Image  # 导入Pillow读取图集
+
+ROOT_DIR = Path(__file__).resolve().parents[1]  # 计算仓库根目录
+if str(ROOT_DIR) not in sys.path:  # 根目录不在搜索路径时
+    sys.path.insert(0, str(ROOT_DIR))  # 插入根目录
+
+import scripts.gen_tiles_and_player as gen_tiles  # 导入模块以统计绘制次数
+from scripts.gen_tiles_and_player import (  # 导入被测函数
+    TILE_ORDER,
+    atlas_layout,
+    downsample_box,
+    generate_tilesheet,
+    generate_mip_chain,
+    render_tile,
+    render_tile_chain,
+    render_variant,
+    render_variants,
+)
+
+
+def test_variants_are_seeded_and_seamless() -> None:  # 定义确定性与无缝测试
+    """同一种子结果一致，不同序号有差异，且边缘像素与基础瓦片相同。"""  # 函数docstring中文说明
+    base = render_tile(TILE_ORDER[0], 32)  # 渲染基础草地瓦片
+    first = render_variant(base, TILE_ORDER[0].name, 7, 1)  # 渲染1号变体
+    again = render_variant(base, TILE_ORDER[0].name, 7, 1)  # 重复渲染1号变体
+    other = render_variant(base, TILE_ORDER[0].name, 7, 2)  # 渲染2号变体
+    assert np.array_equal(first, again)  # 同种子结果一致
+    assert not np.array_equal(first, other)  # 不同序号产生差异
+    assert np.array_equal(render_variant(base, TILE_ORDER[0].name, 7, 0), base)  # 0号变体即基础瓦片
+    for variant in (first, other):  # 检查每个变体
+        assert np.array_equal(variant[[0, -1]], base[[0, -1]])  # 上下边缘不变
+        assert np.array_equal(variant[:, [0, -1]], base[:, [0, -1]])  # 左右边缘不变
+        assert np.array_equal(variant[..., 3], base[..., 3])  # alpha通道不变
+
+
+def test_variant_cache_reuse(tmp_path: Path) -> None:  # 定义缓存复用测试
+    """第二次渲染应全部命中缓存且结果一致。"""  # 函数docstring中文说明
+    cache_dir = tmp_path / "cache"  # 构造缓存目录
+    first = render_variants(32, 3, 5, cache_dir)  # 首次渲染写入缓存
+    assert len(list(cache_dir.glob("*.npy"))) == 3 * len(TILE_ORDER)  # 每个变体一个缓存文件
+    second = render_variants(32, 3, 5, cache_dir)  # 再次渲染读取缓存
+    for spec in TILE_ORDER:  # 遍历地形
+        for left, right in zip(first[spec.name], second[spec.name]):  # 遍历变体
+            assert np.array_equal(left, right)  # 缓存结果一致
+
+
+def test_downsample_box_ignores_transparent_colour() -> None:  # 定义预乘降采样测试
+    """透明像素的颜色不应渗入降采样结果。"""  # 函数docstring中文说明
+    pixels = np.zeros((2, 2, 4), dtype=np.uint8)  # 构造2x2透明块
+    pixels[0, 0] = (200, 100, 50, 255)  # 仅左上角不透明
+    result = downsample_box(pixels)  # 执行降采样
+    assert result.shape == (1, 1, 4)  # 尺寸减半
+    assert tuple(result[0, 0]) == (200, 100, 50, 64)  # 颜色保持、alpha取均值
+
+
+def test_mip_chain_levels(tmp_path: Path) -> None:  # 定义mip链输出测试
+    """各级图集尺寸逐级减半，描述文件列出全部级别。"""  # 函数docstring中文说明
+    descriptor_path = generate_mip_chain(tmp_path)  # 生成默认mip链
+    descriptor = json.loads(descriptor_path.read_text(encoding="utf-8"))  # 读取描述
+    assert [level["tile_size"] for level in descriptor["levels"]] == [64, 32, 16, 8]  # 校验级别顺序
+    for level in descriptor["levels"]:  # 遍历级别
+        assert (tmp_path / "tiles" / level["image"]).exists()  # 图集文件存在
+        assert level["width"] == level["tile_size"] * descriptor["columns"]  # 宽度与列数一致
+
+
+def test_tilesheet_and_mips_share_one_render(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:  # 定义绘制复用测试
+    """基础图集按目标边长直接绘制，同边长及更小的mip由它降采样，更大的级别只绘制一次；各级沿用外扩布局。"""  # 函数docstring中文说明
+    calls = []  # 记录绘制调用
+    original = gen_tiles.render_tile  # 保存原函数
+    monkeypatch.setattr(gen_tiles, "render_tile", lambda spec, size: calls.append((spec.name, size)) or original(spec, size))  # 统计调用
+    base_tiles = [gen_tiles.render_tile(spec, 32) for spec in TILE_ORDER]  # 按目标边长绘制基础瓦片
+    chain = render_tile_chain([64, 32, 16, 8], 32, base_tiles)  # 复用基础瓦片生成各级
+    sheet_path = generate_tilesheet(tmp_path, 32, padding=2, extrude=1, power_of_two=True, tiles=base_tiles)  # 生成基础图集
+    descriptor_path = generate_mip_chain(tmp_path, [64, 32, 16, 8], padding=2, extrude=1, power_of_two=True, chain=chain)  # 生成mip链
+    assert sorted(calls) == sorted([(spec.name, 32) for spec in TILE_ORDER] + [(spec.name, 64) for spec in TILE_ORDER])  # 每个边长每个地形只绘制一次
+    assert all(np.array_equal(level_tile, base_tile) for level_tile, base_tile in zip(chain[32], base_tiles))  # 同边长级别即基础瓦片
+    assert (tmp_path / "tiles" / "mips" / "tilesheet_32.png").read_bytes() == sheet_path.read_bytes()  # 基础图集与同级mip一致
+    for level in json.loads(descriptor_path.read_text(encoding="utf-8"))["levels"]:  # 遍历级别
+        layout = atlas_layout(len(TILE_ORDER), level["tile_size"], padding=2, extrude=1, power_of_two=True)  # 该级布局
+        image = Image.open(tmp_path / "tiles" / level["image"])  # 读取图集
+        assert image.size == (layout["imagewidth"], layout["imageheight"]) == (level["width"], level["height"])  # 尺寸与布局一致
+        assert (level["margin"], level["spacing"]) == (3, 4)  # 外边距与间距沿用外扩配置
+
+
+def test_mip_chain_accepts_any_tile_size() -> None:  # 定义非2的幂边长测试
+    """基础边长不在mip链中时不参与校验，空级别列表返回空结果。"""  # 函数docstring中文说明
+    base_tiles = [render_tile(spec, 48) for spec in TILE_ORDER]  # 48像素基础瓦片
+    chain = render_tile_chain([64, 32, 16, 8], 48, base_tiles)  # 各级改由64像素绘制
+    assert sorted(chain) == [8, 16, 32, 64] and chain[32][0].shape == (32, 32, 4)  # 级别与尺寸正确
+    assert render_tile_chain([]) == {} and render_tile_chain([], 32, base_tiles) == {}  # 空列表不报错
+
+
+def test_padded_extruded_layout(tmp_path: Path) -> None:  # 定义带外扩布局测试
+    """2的幂图集的列数应与按图宽推算的列数一致，外扩像素复制瓦片边缘。"""  # 函数docstring中文说明
+    layout = atlas_layout(len(TILE_ORDER), 32, padding=2, extrude=1, power_of_two=True)  # 计算布局
+    assert (layout["margin"], layout["spacing"]) == (3, 4)  # 外边距与间距包含外扩
+    assert layout["imagewidth"] & (layout["imagewidth"] - 1) == 0  # 宽度为2的幂
+    assert layout["imageheight"] & (layout["imageheight"] - 1) == 0  # 高度为2的幂
+    inferred = (layout["imagewidth"] - 2 * layout["margin"] + layout["spacing"]) // (32 + layout["spacing"])  # 按Tiled规则推算列数
+    assert inferred == layout["columns"]  # 列数一致，gid不会错位
+    sheet_path = generate_tilesheet(tmp_path, 32, padding=2, extrude=1, power_of_two=True)  # 生成图集
+    sheet = np.asarray(Image.open(sheet_path).convert("RGBA"))  # 读取像素
+    written = json.loads((sheet_path.parent / "tilesheet_layout.json").read_text(encoding="utf-8"))  # 读取布局文件
+    assert sheet.shape[:2] == (written["imageheight"], written["imagewidth"])  # 尺寸与布局一致
+    tile = render_tile(TILE_ORDER[1], 32)  # 渲染第二个瓦片
+    left = written["margin"] + (32 + written["spacing"])  # 第二个瓦片左上角X
+    top = written["margin"]  # 第二个瓦片左上角Y
+    assert np.array_equal(sheet[top : top + 32, left : left + 32], tile)  # 瓦片位置正确
+    assert np.array_equal(sheet[top : top + 32, left - 1], tile[:, 0])  # 左侧外扩复制边缘列
+    assert np.array_equal(sheet[top - 1, left : left + 32], tile[0])  # 上方外扩复制边缘行
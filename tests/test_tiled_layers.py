@@ -0,0 +1,59 @@
+"""验证 Tiled 图层的 base64 + 压缩编解码与地图校验。"""  # 模块docstring中文说明用途
+from __future__ import annotations  # 引入未来注解便于类型标注
+
+import io  # 导入io在内存中接收流式输出
+import json  # 导入JSON解析地图
+import sys  # 导入sys以调整模块搜索路径
+from pathlib import Path  # 导入Path处理路径
+
+import numpy as np  # 导入NumPy比较解码结果
+import pytest  # 导入pytest进行参数化
+
+ROOT_DIR = Path(__file__).resolve().parents[1]  # 计算仓库根目录
+if str(ROOT_DIR) not in sys.path:  # 根目录不在搜索路径时
+    sys.path.insert(0, str(ROOT_DIR))  # 插入根目录
+
+from scripts.gen_demo_map import generate_map, write_chunked_map  # 导入地图生成函数
+from scripts.utils_tiled_layers import encode_layer, iter_layer_regions, validate_map_layers, zstd_available  # 导入被测函数
+from scripts.verify_user_assets import verify_maps  # 导入地图校验函数
+
+COMPRESSIONS = ["", "zlib", "gzip"] + (["zstd"] if zstd_available() else [])  # 当前环境可用的压缩方式
+
+
+@pytest.mark.parametrize("compression", COMPRESSIONS)  # 参数化压缩方式
+def test_encoded_layers_round_trip(compression: str) -> None:  # 定义往返测试
+    """单层与分块地图编码后解码应与整数数组完全一致。"""  # 函数docstring中文说明
+    map_json, _counts = generate_map(30, 20, 32, 5)  # 生成单层地图
+    expected = np.array(map_json["layers"][0]["data"], dtype=np.uint32)  # 原始数据
+    layer = encode_layer(map_json["layers"][0], "base64", compression)  # 编码图层
+    assert isinstance(layer["data"], str) and layer["compression"] == compression  # 编码字段正确
+    assert np.array_equal(next(iter_layer_regions(layer))["gids"], expected)  # 解码一致
+    assert validate_map_layers(map_json) == []  # 校验通过
+    plain, packed = io.StringIO(), io.StringIO()  # 分块地图的两种输出
+    write_chunked_map(plain, 40, 40, 32, 5, 16)  # 整数数组分块
+    write_chunked_map(packed, 40, 40, 32, 5, 16, encoding="base64", compression=compression)  # 编码分块
+    plain_regions = list(iter_layer_regions(json.loads(plain.getvalue())["layers"][0]))  # 解析整数数组分块
+    packed_regions = list(iter_layer_regions(json.loads(packed.getvalue())["layers"][0]))  # 解析编码分块
+    assert len(plain_regions) == len(packed_regions)  # 块数量一致
+    for left, right in zip(plain_regions, packed_regions):  # 逐块比较
+        assert (left["x"], left["y"]) == (right["x"], right["y"])  # 位置一致
+        assert np.array_equal(left["gids"], right["gids"])  # 数据一致
+
+
+def test_verify_maps_decodes_and_flags_bad_layers(tmp_path: Path) -> None:  # 定义地图校验测试
+    """损坏的压缩数据与越界 gid 都应记为 maps 错误。"""  # 函数docstring中文说明
+    maps_dir = tmp_path / "maps"  # 地图目录
+    maps_dir.mkdir()  # 创建目录
+    map_json, _counts = generate_map(10, 8, 32, 1)  # 生成地图
+    layer = map_json["layers"][0]  # 读取图层
+    layer["data"][0] = 101  # 超出 tilecount=100 的 gid
+    encode_layer(layer, "base64", "zlib")  # 编码图层
+    broken = dict(layer, id=2, name="Broken", data=layer["data"][:-8])  # 截断的压缩数据
+    map_json["layers"].append(broken)  # 追加损坏图层
+    (maps_dir / "world.json").write_text(json.dumps(map_json), encoding="utf-8")  # 写入地图
+    errors: list = []  # 错误列表
+    verify_maps(tmp_path, {"use_user_map": True, "file": "world.json"}, errors)  # 执行校验
+    messages = [error["message"] for error in errors]  # 提取错误信息
+    assert len(messages) == 2  # 两个图层各一个错误
+    assert "越界 gid 101" in messages[0]  # 越界gid
+    assert "Broken" in messages[1] and "解码失败" in messages[1]  # 解码失败
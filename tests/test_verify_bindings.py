@@ -0,0 +1,66 @@
+"""校验瓦片绑定索引按图集头部尺寸做越界检查。"""  # 模块docstring中文说明
+from __future__ import annotations  # 引入未来注解特性
+
+import json  # 导入JSON写入布局描述
+import sys  # 导入sys调整模块搜索路径
+from pathlib import Path  # 导入Path处理文件路径
+
+import pytest  # 导入pytest替换布局读取函数
+from PIL import Image  # 导入Pillow生成测试图集
+
+ROOT_DIR = Path(__file__).resolve().parents[1]  # 计算仓库根目录
+if str(ROOT_DIR) not in sys.path:  # 确保可以导入scripts包
+    sys.path.insert(0, str(ROOT_DIR))  # 插入仓库根目录
+
+import scripts.verify_bindings as verify_bindings  # 导入模块以便统计布局读取次数
+from scripts.verify_bindings import collect_targets, probe_targets, validate_personas, validate_tileset  # 导入校验函数
+
+
+def test_binding_ids_checked_against_atlas_grid(tmp_path: Path) -> None:  # 定义测试函数
+    """64x64 图集在 32px 下只有4格，越界索引与无效精灵应报错。"""  # 函数docstring中文说明
+    atlas_dir = tmp_path / "assets" / "build" / "tiles"  # 计算图集目录
+    atlas_dir.mkdir(parents=True)  # 创建目录
+    Image.new("RGBA", (64, 64)).save(atlas_dir / "tilesheet.png")  # 保存2x2格图集
+    (tmp_path / "hero.png").write_text("not a png", encoding="utf-8")  # 写入伪造精灵
+    tileset = {  # 构造瓦片映射
+        "tile_size": 32,  # 瓦片尺寸
+        "bindings": {  # 绑定字典
+            "_comment_GRASS": "草地",  # 注释字段应被忽略
+            "GRASS": 0,  # 整数绑定，合法
+            "ROAD": {"atlas": "assets/build/tiles/tilesheet.png", "id": 3},  # 对象绑定，合法
+            "LAVA": 9,  # 整数绑定，越界
+            "WALL": {"atlas": "assets/build/tiles/tilesheet.png", "id": 4},  # 对象绑定，越界
+        },  # 绑定结束
+    }  # 映射结束
+    personas = {"_comment": "注释", "hero": {"sprite": "hero.png"}}  # 构造角色映射
+    probes = probe_targets(collect_targets(tileset, personas, tmp_path))  # 一次性探测全部目标
+    assert len(probes) == 2  # 图集只探测一次
+    errors = validate_tileset(tileset, tmp_path, probes)  # 校验瓦片映射
+    assert len(errors) == 2  # 仅两个越界索引
+    assert any("LAVA" in error and "4 格" in error for error in errors)  # LAVA越界
+    assert any("WALL" in error for error in errors)  # WALL越界
+    assert validate_personas(personas, tmp_path, probes) == [f"角色精灵不是有效的PNG：{tmp_path / 'hero.png'}"]  # 精灵无效
+
+
+def test_padded_atlas_uses_layout(tmp_path: Path) -> None:  # 定义带间距图集测试
+    """存在布局描述时按 margin/spacing 计算格数，不再报告尺寸无法整除。"""  # 函数docstring中文说明
+    atlas_dir = tmp_path / "tiles"  # 计算图集目录
+    atlas_dir.mkdir()  # 创建目录
+    Image.new("RGBA", (128, 64)).save(atlas_dir / "sheet.png")  # 保存2的幂图集
+    layout = {"tilewidth": 32, "tilecount": 3, "margin": 3, "spacing": 4}  # 3格带外扩布局
+    (atlas_dir / "sheet_layout.json").write_text(json.dumps(layout), encoding="utf-8")  # 写入布局
+    tileset = {"tile_size": 32, "atlas": "tiles/sheet.png", "bindings": {"GRASS": 2, "ROAD": 3}}  # 构造映射
+    errors = validate_tileset(tileset, tmp_path)  # 校验映射
+    assert errors == ["ROAD 的 id 3 超出图集 sheet.png 的 3 格。"]  # 仅ROAD越界
+
+
+def test_layout_read_once_per_atlas(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:  # 定义布局缓存测试
+    """多个绑定指向同一图集时布局描述只读取一次。"""  # 函数docstring中文说明
+    (tmp_path / "tiles").mkdir()  # 创建目录
+    Image.new("RGBA", (128, 64)).save(tmp_path / "tiles" / "sheet.png")  # 保存图集
+    calls = []  # 记录读取次数
+    original = verify_bindings.atlas_layout_for  # 原始读取函数
+    monkeypatch.setattr(verify_bindings, "atlas_layout_for", lambda path: calls.append(path) or original(path))  # 统计调用
+    tileset = {"tile_size": 32, "atlas": "tiles/sheet.png", "bindings": {f"T{index}": index for index in range(8)}}  # 八个绑定共用一个图集
+    assert validate_tileset(tileset, tmp_path) == []  # 全部合法
+    assert calls == [tmp_path / "tiles" / "sheet.png"]  # 只读取一次
@@ -0,0 +1,84 @@
+"""测试用户素材校验脚本能一次性汇总全部错误并输出JSON报告。"""  # 模块docstring中文说明用途
+from __future__ import annotations  # 引入未来注解以兼容前向引用
+
+import json  # 导入json读取报告
+import subprocess  # 导入subprocess以调用脚本
+import sys  # 导入sys获取当前解释器路径
+from pathlib import Path  # 导入Path处理临时目录
+
+from PIL import Image  # 导入Pillow生成测试用PNG
+
+
+def _write_loose_tiles(root: Path) -> None:  # 定义内部辅助函数创建散瓦片
+    """生成3张合规瓦片、2张尺寸错误瓦片与1个伪造PNG。"""  # 函数docstring中文说明
+
+    tiles_dir = root / "assets" / "user_imports" / "tiles"  # 计算瓦片目录
+    characters_dir = root / "assets" / "user_imports" / "characters"  # 计算角色目录
+    tiles_dir.mkdir(parents=True, exist_ok=True)  # 创建瓦片目录
+    characters_dir.mkdir(parents=True, exist_ok=True)  # 创建角色目录
+    for index in range(3):  # 生成合规瓦片
+        Image.new("RGBA", (32, 32), (index, 0, 0, 255)).save(tiles_dir / f"ok_{index}.png")  # 保存32x32瓦片
+    for index in range(2):  # 生成尺寸错误瓦片
+        Image.new("RGBA", (32, 16), (0, index, 0, 255)).save(tiles_dir / f"bad_{index}.png")  # 保存32x16瓦片
+    (tiles_dir / "broken.png").write_text("not a png", encoding="utf-8")  # 写入伪造PNG
+    Image.new("RGBA", (128, 32)).save(characters_dir / "player.png")  # 保存合规玩家图
+    manifest = {"tile_size": 32, "tiles": {"mode": "loose", "loose_glob": "*.png"}}  # 构造manifest
+    manifest_path = root / "assets" / "user_imports" / "user_manifest.json"  # 计算manifest路径
+    manifest_path.write_text(json.dumps(manifest), encoding="utf-8")  # 写入配置
+
+
+def _run_verify(root: Path, report_path: Path) -> subprocess.CompletedProcess:  # 定义调用脚本的辅助函数
+    """以子进程运行校验脚本。"""  # 函数docstring中文说明
+
+    script_path = Path(__file__).resolve().parents[1] / "scripts" / "verify_user_assets.py"  # 计算脚本路径
+    return subprocess.run(  # 调用脚本
+        [sys.executable, str(script_path), "--root", str(root), "--report", str(report_path)],  # 构造命令参数
+        capture_output=True,  # 捕获输出
+        text=True,  # 文本模式
+        check=False,  # 允许非零退出码
+    )  # 子进程结束
+
+
+def test_verify_collects_all_errors_into_report(tmp_path: Path) -> None:  # 定义测试函数
+    """所有错误应在一次运行中收集，且缓存复用后结果一致。"""  # 函数docstring中文说明
+
+    _write_loose_tiles(tmp_path)  # 准备素材
+    report_path = tmp_path / "report.json"  # 报告路径
+    first = _run_verify(tmp_path, report_path)  # 第一次运行
+    assert first.returncode == 1  # 存在错误时返回1
+    report = json.loads(report_path.read_text(encoding="utf-8"))  # 读取报告
+    assert report["ok"] is False  # 报告标记失败
+    assert report["error_count"] == 3  # 两张尺寸错误加一张非法PNG
+    assert sorted(Path(error["path"]).name for error in report["errors"]) == ["bad_0.png", "bad_1.png", "broken.png"]  # 错误文件完整
+    assert (tmp_path / "assets" / ".cache" / "verify_user_assets.json").exists()  # 缓存已写入
+    second = _run_verify(tmp_path, report_path)  # 第二次运行命中缓存
+    assert second.returncode == 1  # 结果保持一致
+    assert json.loads(report_path.read_text(encoding="utf-8")) == report  # 报告内容一致
+
+
+def test_atlas_analysis_flags_empty_and_duplicate_tiles(tmp_path: Path) -> None:  # 定义图集分析测试
+    """空瓦片、完全重复与近似重复瓦片应被识别，绑定指向空瓦片时报错。"""  # 函数docstring中文说明
+
+    tiles_dir = tmp_path / "assets" / "user_imports" / "tiles"  # 计算瓦片目录
+    characters_dir = tmp_path / "assets" / "user_imports" / "characters"  # 计算角色目录
+    tiles_dir.mkdir(parents=True, exist_ok=True)  # 创建瓦片目录
+    characters_dir.mkdir(parents=True, exist_ok=True)  # 创建角色目录
+    atlas = Image.new("RGBA", (96, 64), (0, 0, 0, 0))  # 创建3x2格透明图集
+    atlas.paste((200, 10, 10, 255), (0, 0, 32, 32))  # 第0格红色
+    atlas.paste((200, 10, 10, 255), (32, 0, 64, 32))  # 第1格与第0格完全重复
+    atlas.paste((10, 200, 10, 255), (64, 0, 96, 32))  # 第2格绿色
+    atlas.paste((12, 201, 10, 255), (0, 32, 32, 64))  # 第3格与第2格近似重复
+    atlas.save(tiles_dir / "tilesheet.png")  # 保存图集，第4、5格为空
+    Image.new("RGBA", (128, 32)).save(characters_dir / "player.png")  # 保存合规玩家图
+    manifest = {"tile_size": 32, "tiles": {"mode": "atlas", "bindings": {"GRASS": 0, "ROAD": 4, "LAVA": 2}}}  # ROAD指向空瓦片
+    (tmp_path / "assets" / "user_imports" / "user_manifest.json").write_text(json.dumps(manifest), encoding="utf-8")  # 写入配置
+    report_path = tmp_path / "report.json"  # 报告路径
+    result = _run_verify(tmp_path, report_path)  # 运行校验
+    assert result.returncode == 1  # 存在绑定错误
+    report = json.loads(report_path.read_text(encoding="utf-8"))  # 读取报告
+    assert report["atlas"]["empty"] == [4, 5]  # 空瓦片索引
+    assert report["atlas"]["duplicates"] == [[0, 1]]  # 完全重复组
+    assert [pair[:2] for pair in report["atlas"]["near_duplicates"]] == [[2, 3]]  # 近似重复对
+    messages = [error["message"] for error in report["errors"]]  # 提取错误信息
+    assert any("ROAD" in message and "全透明" in message for message in messages)  # ROAD绑定报错
+    assert any("HOUSE" in message and "超出" in message for message in messages)  # 默认绑定越界报错